@@ -19,20 +19,42 @@ def create_app():
     app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev-secret-key')
     app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL')
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    # Largest request body accepted; larger ones are answered with 413
+    app.config['MAX_CONTENT_LENGTH'] = int(os.getenv('MAX_REQUEST_BYTES', 4 * 1024 * 1024))
     
     # Enable CORS
     CORS(app)
     
     # Register blueprints
-    from src.api import design_routes, lease_routes, user_routes
+    from src.api import dependencies, design_routes, lease_routes, metrics, user_routes
     app.register_blueprint(design_routes.bp)
     app.register_blueprint(lease_routes.bp)
     app.register_blueprint(user_routes.bp)
     
+    # Request timing and the Prometheus /metrics endpoint
+    metrics.init_app(app)
+    
+    @app.errorhandler(413)
+    def payload_too_large(error):
+        return {'error': 'Request body too large', 'code': 'PAYLOAD_TOO_LARGE'}, 413
+    
     @app.route('/health')
     def health_check():
         return {'status': 'healthy', 'service': 'AI Interior Design Platform'}
     
+    @app.route('/ready')
+    def readiness_check():
+        state = dependencies.readiness()
+        return state, 200 if state['ready'] else 503
+    
+    # Load models ahead of the first request: 'blocking' (default),
+    # 'background' or 'off' (load lazily on first use)
+    warm_up_mode = os.getenv('MODEL_WARM_UP', 'blocking')
+    if warm_up_mode == 'blocking':
+        dependencies.warm_up()
+    elif warm_up_mode == 'background':
+        dependencies.start_warm_up()
+    
     return app
 
 if __name__ == '__main__':
@@ -0,0 +1,4 @@
+"""
+Performance benchmarks. Run from the repository root, e.g.
+``python -m benchmarks.bench_ann``.
+"""
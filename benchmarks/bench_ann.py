@@ -0,0 +1,61 @@
+"""
+Recall@k and latency of the ANN recommender path against the exact scan.
+
+Usage:
+    python -m benchmarks.bench_ann [--items 200000] [--queries 200] [--k 10]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import make_catalog, make_requests
+from src.ml.ann_index import IVFIndex
+from src.ml.recommender import DesignRecommender
+from src.services.catalog_index import CatalogIndex
+
+def _run(recommender, requests, k):
+    latencies, results = [], []
+    for request in requests:
+        started = time.perf_counter()
+        items = recommender.get_recommendations(top_k=k, **request)
+        latencies.append(time.perf_counter() - started)
+        results.append({item['id'] for item in items})
+    return np.array(latencies) * 1000.0, results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--items', type=int, default=200000)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--lists', type=int, default=None)
+    parser.add_argument('--probes', type=int, nargs='+', default=[1, 2, 4, 8, 16, 32])
+    args = parser.parse_args()
+    
+    catalog = CatalogIndex()
+    catalog.add_many(make_catalog(args.items))
+    requests = make_requests(args.queries, seed=1)
+    
+    exact = DesignRecommender(catalog=catalog)
+    exact_ms, truth = _run(exact, requests, args.k)
+    print(f"items={args.items} queries={args.queries} k={args.k}")
+    print(f"exact      p50={np.percentile(exact_ms, 50):7.3f}ms "
+          f"p99={np.percentile(exact_ms, 99):7.3f}ms recall=1.000")
+    
+    index = IVFIndex(n_lists=args.lists)
+    approximate = DesignRecommender(catalog=catalog, ann_index=index, ann_min_items=0)
+    started = time.perf_counter()
+    approximate.build_ann_index()
+    print(f"build      {time.perf_counter() - started:7.3f}s lists={len(index.centroids)}")
+    
+    for n_probe in args.probes:
+        index.n_probe = n_probe
+        ann_ms, found = _run(approximate, requests, args.k)
+        recall = np.mean([
+            len(got & want) / len(want) for got, want in zip(found, truth) if want
+        ])
+        print(f"n_probe={n_probe:<3d} p50={np.percentile(ann_ms, 50):7.3f}ms "
+              f"p99={np.percentile(ann_ms, 99):7.3f}ms recall={recall:.3f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""
+Throughput and conflict rate of concurrent reservations on a hot item set.
+
+Usage:
+    python -m benchmarks.bench_contention [--threads 16] [--items 50] [--ops 5000]
+"""
+import argparse
+import random
+import threading
+import time
+from datetime import date, timedelta
+
+from src.services.availability_index import AvailabilityIndex
+from src.services.inventory_service import InventoryService
+
+def _worker(inventory, args, seed, barrier, counts):
+    rng = random.Random(seed)
+    first = date(2026, 1, 1)
+    booked = conflicts = 0
+    held = []
+    barrier.wait()
+    for op in range(args.ops):
+        if held and rng.random() < args.release:
+            inventory.release_items(held.pop(rng.randrange(len(held))))
+            continue
+        item_ids = rng.sample(range(args.items), rng.randint(1, args.max_items))
+        start = first + timedelta(days=rng.randrange(args.days))
+        lease_id = (seed, op)
+        unavailable = inventory.reserve_items(
+            [f'hot-{i}' for i in item_ids], start, start + timedelta(days=rng.randint(1, 30)), lease_id
+        )
+        if unavailable:
+            conflicts += 1
+        else:
+            booked += 1
+            held.append(lease_id)
+    counts.append((booked, conflicts))
+
+def _double_bookings(inventory, items):
+    overlaps = 0
+    for i in range(items):
+        spans = inventory.availability.bookings(f'hot-{i}')
+        overlaps += sum(1 for a, b in zip(spans, spans[1:]) if b[0] < a[1])
+    return overlaps
+
+def run(args, stripes):
+    inventory = InventoryService(availability=AvailabilityIndex(stripes=stripes))
+    inventory.add_items([{'id': f'hot-{i}', 'category': 'seating', 'price': 10} for i in range(args.items)])
+    barrier = threading.Barrier(args.threads + 1)
+    counts = []
+    threads = [
+        threading.Thread(target=_worker, args=(inventory, args, seed, barrier, counts))
+        for seed in range(args.threads)
+    ]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    booked = sum(b for b, _ in counts)
+    conflicts = sum(c for _, c in counts)
+    attempts = booked + conflicts
+    return attempts / elapsed, conflicts / max(attempts, 1), _double_bookings(inventory, args.items)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--items', type=int, default=50)
+    parser.add_argument('--ops', type=int, default=5000, help='operations per thread')
+    parser.add_argument('--max-items', type=int, default=3, help='largest items per lease')
+    parser.add_argument('--days', type=int, default=365, help='window lease starts fall in')
+    parser.add_argument('--release', type=float, default=0.3, help='share of operations cancelling a lease')
+    parser.add_argument('--stripes', type=int, nargs='+', default=[1, 64])
+    args = parser.parse_args()
+    
+    print(f"threads={args.threads} items={args.items} ops/thread={args.ops} max_items={args.max_items}")
+    failed = False
+    for stripes in args.stripes:
+        throughput, conflict_rate, overlaps = run(args, stripes)
+        failed = failed or overlaps > 0
+        print(f"stripes={stripes:<4d} {throughput:10.0f} reservations/s "
+              f"conflict_rate={conflict_rate:.3f} double_bookings={overlaps}")
+    raise SystemExit(1 if failed else 0)
+
+if __name__ == '__main__':
+    main()
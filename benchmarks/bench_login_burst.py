@@ -0,0 +1,103 @@
+"""
+Recommendation latency while a burst of logins hashes passwords.
+
+Runs the app on a local threaded server and times /api/design/recommendations
+alone and then under concurrent /api/user/login traffic, once with bcrypt
+running on every request thread (one worker per login thread, the old
+behaviour) and once on the bounded hasher pool.
+
+Usage:
+    python -m benchmarks.bench_login_burst [--logins 32] [--rounds 12]
+"""
+import argparse
+import http.client
+import json
+import logging
+import os
+import threading
+import time
+
+import numpy as np
+
+def _post(port, path, body):
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=120)
+    try:
+        started = time.perf_counter()
+        connection.request('POST', path, json.dumps(body), {'Content-Type': 'application/json'})
+        status = connection.getresponse().status
+        return status, (time.perf_counter() - started) * 1000.0
+    finally:
+        connection.close()
+
+def _recommendations(port, requests):
+    return np.array([_post(port, '/api/design/recommendations', request)[1] for request in requests])
+
+def _burst(port, args, requests):
+    """Time recommendations while ``args.logins`` threads log in back to back."""
+    stop = threading.Event()
+    statuses = []
+    
+    def login():
+        while not stop.is_set():
+            statuses.append(_post(port, '/api/user/login', {'email': 'bench@example.com', 'password': 'bench-password'})[0])
+    
+    threads = [threading.Thread(target=login, daemon=True) for _ in range(args.logins)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.2)
+    started = time.perf_counter()
+    latencies = _recommendations(port, requests)
+    elapsed = time.perf_counter() - started
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return latencies, statuses.count(200) / elapsed, statuses.count(503)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--logins', type=int, default=32, help='concurrent login threads')
+    parser.add_argument('--rounds', type=int, default=12, help='bcrypt cost')
+    parser.add_argument('--workers', type=int, default=2, help='bounded hasher threads')
+    parser.add_argument('--max-queue', type=int, default=16, help='bounded hasher queue')
+    parser.add_argument('--items', type=int, default=20000)
+    parser.add_argument('--queries', type=int, default=50)
+    args = parser.parse_args()
+    
+    os.environ.update({
+        'JWT_SECRET': os.environ.get('JWT_SECRET') or 'bench-' + '0' * 32,
+        'BCRYPT_ROUNDS': str(args.rounds),
+        'RECOMMENDATION_CACHE_SIZE': '0',
+        'LEASE_SCHEDULER_INTERVAL': '0',
+        'MODEL_WARM_UP': 'blocking',
+    })
+    from werkzeug.serving import make_server
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    
+    from app import create_app
+    from benchmarks.synthetic import make_catalog, make_requests
+    from src.api.dependencies import get_auth_manager, get_inventory_service, get_user_service
+    from src.utils.auth import PasswordHasher
+    
+    get_inventory_service().add_items(make_catalog(args.items))
+    server = make_server('127.0.0.1', 0, create_app(), threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_port
+    get_user_service().register('bench@example.com', 'bench-password')
+    requests = make_requests(args.queries, seed=2)
+    
+    print(f"logins={args.logins} rounds={args.rounds} items={args.items} queries={args.queries} cpus={os.cpu_count()}")
+    idle = _recommendations(port, requests)
+    print(f"{'idle':<22} p50={np.percentile(idle, 50):8.2f}ms p99={np.percentile(idle, 99):8.2f}ms")
+    auth = get_auth_manager()
+    for label, workers, max_queue in (
+        ('inline bcrypt', args.logins, 0),
+        (f'bounded ({args.workers}+{args.max_queue})', args.workers, args.max_queue),
+    ):
+        auth.passwords = PasswordHasher(rounds=args.rounds, workers=workers, max_queue=max_queue)
+        latencies, rate, rejected = _burst(port, args, requests)
+        print(f"{label:<22} p50={np.percentile(latencies, 50):8.2f}ms p99={np.percentile(latencies, 99):8.2f}ms "
+              f"logins={rate:6.1f}/s rejected={rejected}")
+    server.shutdown()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+"""
+Cold-start cost of the API: module imports, create_app and model warm-up.
+
+Every measurement runs in a fresh interpreter, so each figure is a cold
+import. Exits with status 1 if create_app or a warm-up step exceeds its
+budget, or regresses past the tolerance of a saved baseline.
+
+Usage:
+    python -m benchmarks.bench_startup [--runs 5] [--baseline startup.json]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+from src.api.dependencies import WARM_UP_COMPONENTS
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Modules whose standalone cold import time is reported
+MODULES = (
+    'flask',
+    'numpy',
+    'PIL.Image',
+    'src.api.design_routes',
+    'src.ml.recommender',
+    'src.ml.style_analyzer',
+    'app',
+)
+
+IMPORT_SNIPPET = """
+import importlib, json, time
+started = time.perf_counter()
+importlib.import_module({module!r})
+print(json.dumps({{'ms': (time.perf_counter() - started) * 1000.0}}))
+"""
+
+STARTUP_SNIPPET = """
+import json, time
+started = time.perf_counter()
+from app import create_app
+create_app()
+timings = {{'create_app': (time.perf_counter() - started) * 1000.0}}
+from src.api import dependencies
+for name in {components!r}:
+    started = time.perf_counter()
+    state = dependencies.warm_up([name])[name]
+    if state['status'] != 'ready':
+        raise SystemExit(f"{{name}} failed to load: {{state}}")
+    timings['warm_up.' + name] = (time.perf_counter() - started) * 1000.0
+print(json.dumps(timings))
+"""
+
+def _child(code: str) -> dict:
+    env = dict(os.environ, MODEL_WARM_UP='off')
+    output = subprocess.run(
+        [sys.executable, '-c', code], cwd=ROOT, env=env,
+        check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def measure(runs: int) -> dict:
+    """Return the median cold-start timings in milliseconds."""
+    samples = {}
+    for _ in range(runs):
+        for module in MODULES:
+            result = _child(IMPORT_SNIPPET.format(module=module))
+            samples.setdefault('import.' + module, []).append(result['ms'])
+        for name, ms in _child(STARTUP_SNIPPET.format(components=WARM_UP_COMPONENTS)).items():
+            samples.setdefault(name, []).append(ms)
+    return {name: float(np.median(values)) for name, values in samples.items()}
+
+def check(timings: dict, budgets: dict, baseline: dict, tolerance: float) -> list:
+    """Return a message for every budget or baseline regression."""
+    failures = []
+    for name, limit in budgets.items():
+        if timings.get(name, 0.0) > limit:
+            failures.append(f"{name}: {timings[name]:.1f}ms exceeds budget {limit:.1f}ms")
+    for name, previous in baseline.items():
+        # Small absolute differences are noise, whatever the ratio
+        limit = max(previous * (1.0 + tolerance), previous + 20.0)
+        if name in timings and timings[name] > limit:
+            failures.append(
+                f"{name}: {timings[name]:.1f}ms regressed from baseline {previous:.1f}ms"
+            )
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--create-app-budget-ms', type=float, default=1000.0)
+    parser.add_argument('--warm-up-budget-ms', type=float, default=10000.0)
+    parser.add_argument('--baseline', help='JSON file of timings to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.5,
+                        help='Allowed relative slowdown against the baseline')
+    parser.add_argument('--save', help='Write the measured timings to this JSON file')
+    args = parser.parse_args()
+    
+    timings = measure(args.runs)
+    for name, ms in timings.items():
+        print(f"{name:<32} {ms:9.1f}ms")
+    
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as fh:
+            json.dump(timings, fh, indent=2, sort_keys=True)
+    
+    budgets = {'create_app': args.create_app_budget_ms}
+    budgets.update({'warm_up.' + name: args.warm_up_budget_ms for name in WARM_UP_COMPONENTS})
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as fh:
+            baseline = json.load(fh)
+    
+    failures = check(timings, budgets, baseline, args.tolerance)
+    for failure in failures:
+        print(f"FAIL {failure}")
+    sys.exit(1 if failures else 0)
+
+if __name__ == '__main__':
+    main()
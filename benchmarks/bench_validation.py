@@ -0,0 +1,107 @@
+"""
+Cost of request validation and sanitizing on large nested payloads.
+
+Times the compiled lease schemas and the iterative ``sanitize_input``
+against copies of the hand-written checks they replaced.
+
+Usage:
+    python -m benchmarks.bench_validation [--leases 1000] [--items 10] [--runs 20]
+"""
+import argparse
+import html
+import random
+import time
+from datetime import datetime
+
+from src.api.lease_routes import BULK_SCHEMA
+from src.utils.validators import sanitize_input
+
+def _legacy_sanitize(data):
+    """The recursive sanitizer, copying every container and string."""
+    if isinstance(data, str):
+        return html.escape(data.strip(), quote=True)
+    elif isinstance(data, dict):
+        return {k: _legacy_sanitize(v) for k, v in data.items()}
+    elif isinstance(data, list):
+        return [_legacy_sanitize(item) for item in data]
+    return data
+
+def _legacy_parse_lease(data):
+    """The hand-written lease check of the bulk endpoint."""
+    if not isinstance(data, dict):
+        return None
+    items = data.get('items')
+    duration_months = data.get('duration_months')
+    if not data.get('user_id') or not isinstance(items, list) or not items:
+        return None
+    if not all(isinstance(item, dict) and 'id' in item for item in items):
+        return None
+    if isinstance(duration_months, bool) or not isinstance(duration_months, int) or duration_months < 1:
+        return None
+    try:
+        start_date = datetime.fromisoformat(str(data.get('start_date')))
+    except ValueError:
+        return None
+    return {
+        'user_id': data['user_id'],
+        'items': items,
+        'start_date': start_date,
+        'duration_months': duration_months,
+    }
+
+def _legacy_bulk(data):
+    leases = data.get('leases')
+    if not isinstance(leases, list) or not 1 <= len(leases) <= 1000:
+        return None
+    return [_legacy_parse_lease(lease) for lease in leases]
+
+def _payload(args, dirty_share):
+    rng = random.Random(7)
+    
+    def text(value):
+        return f'<{value}>' if rng.random() < dirty_share else value
+    
+    return {'leases': [
+        {
+            'user_id': f'U{lease}',
+            'start_date': '2026-01-01',
+            'duration_months': rng.randint(1, 24),
+            'items': [
+                {'id': f'item-{rng.randrange(100000)}', 'price': rng.uniform(10, 500),
+                 'name': text('oak chair'), 'tags': [text('wood'), text('modern')]}
+                for _ in range(args.items)
+            ],
+        }
+        for lease in range(args.leases)
+    ]}
+
+def _time(function, payload, runs):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        function(payload)
+        timings.append((time.perf_counter() - started) * 1000.0)
+    timings.sort()
+    return timings[len(timings) // 2]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--leases', type=int, default=1000)
+    parser.add_argument('--items', type=int, default=10, help='items per lease')
+    parser.add_argument('--runs', type=int, default=20)
+    args = parser.parse_args()
+    
+    print(f"leases={args.leases} items/lease={args.items} runs={args.runs} (median ms)")
+    for dirty_share in (0.0, 0.1):
+        payload = _payload(args, dirty_share)
+        print(f"dirty strings {dirty_share:.0%}")
+        for label, function in (
+            ('sanitize (recursive)', _legacy_sanitize),
+            ('sanitize (iterative)', sanitize_input),
+            ('bulk checks (legacy)', _legacy_bulk),
+            ('bulk schema', BULK_SCHEMA.validate),
+        ):
+            print(f"  {label:<22} {_time(function, payload, args.runs):8.2f}ms")
+
+if __name__ == '__main__':
+    main()
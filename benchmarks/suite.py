@@ -0,0 +1,207 @@
+"""
+Regression suite: hot-path timings at several data sizes against a baseline.
+
+Every case builds its data with the deterministic generators in
+``benchmarks.synthetic``, then repeatedly times one operation and reports
+the median time per operation. Exits with status 1 if any result is slower
+than the baseline by more than the tolerance.
+
+Usage:
+    python -m benchmarks.suite [--sizes 1000 10000] [--baseline benchmarks/baseline.json]
+    python -m benchmarks.suite --save benchmarks/baseline.json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from itertools import cycle
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from benchmarks.synthetic import make_catalog, make_leases, make_requests
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+def _inventory(size):
+    from src.services.inventory_service import InventoryService
+    inventory = InventoryService()
+    inventory.add_items(make_catalog(size))
+    return inventory
+
+def case_recommend(size):
+    """One ``get_recommendations`` call over a catalog of ``size`` items, without the result cache."""
+    from src.ml.recommender import DesignRecommender
+    recommender = DesignRecommender(catalog=_inventory(size).index)
+    requests = cycle(make_requests(64, seed=1))
+    return lambda: recommender.get_recommendations(**next(requests))
+
+def case_filter(size):
+    """One category, style and price filter over a catalog of ``size`` items."""
+    inventory = _inventory(size)
+    requests = cycle(make_requests(64, seed=2))
+    categories = cycle(inventory.index.categories)
+    
+    def filter_items():
+        request = next(requests)
+        return inventory.get_available_items(
+            category=next(categories), style=request['style_preference'], max_price=request['budget']
+        )
+    return filter_items
+
+def case_availability(size):
+    """A 20-item availability check after ``size`` leases have been booked."""
+    from src.services.lease_service import LeaseService
+    inventory = _inventory(max(size // 10, 100))
+    items = inventory.get_available_items()
+    LeaseService(inventory=inventory).create_leases_bulk(make_leases(size, items, seed=3))
+    rng = np.random.default_rng(4)
+    checks = cycle([
+        (
+            [items[i]['id'] for i in rng.choice(len(items), 20, replace=False).tolist()],
+            datetime(2026, 1, 1) + timedelta(days=int(day)),
+        )
+        for day in rng.integers(0, 365, 64)
+    ])
+    
+    def check():
+        item_ids, start = next(checks)
+        return inventory.check_availability_many(item_ids, start, start + timedelta(days=30))
+    return check
+
+def case_quote(size):
+    """Quoting ``size`` leases in one ``quote_leases`` call."""
+    from src.services.quote_engine import default_quote_engine
+    leases = make_leases(size, make_catalog(1000, style_scores=False), seed=5)
+    prices = [[item['price'] for item in lease['items']] for lease in leases]
+    months = [lease['duration_months'] for lease in leases]
+    quotes = default_quote_engine()
+    return lambda: quotes.quote_leases(prices, months)
+
+def _auth(cache_size):
+    from src.utils.auth import AuthManager
+    os.environ['JWT_SECRET'] = os.environ.get('JWT_SECRET') or 'bench-' + '0' * 32
+    return AuthManager(token_cache_size=cache_size)
+
+def case_verify_token(size):
+    """Verifying one of ``size`` tokens with the signature check (cache disabled)."""
+    auth = _auth(0)
+    tokens = cycle([auth.generate_token(f'U{n}', f'user{n}@example.com') for n in range(min(size, 1000))])
+    return lambda: auth.verify_token(next(tokens))
+
+def case_verify_token_cached(size):
+    """Verifying one of ``size`` tokens already in the token cache."""
+    auth = _auth(size)
+    tokens = [auth.generate_token(f'U{n}', f'user{n}@example.com') for n in range(size)]
+    for token in tokens:
+        auth.verify_token(token)
+    tokens = cycle(tokens)
+    return lambda: auth.verify_token(next(tokens))
+
+def case_sanitize(size):
+    """Sanitizing a bulk-lease payload of ``size`` leases."""
+    from src.utils.validators import sanitize_input
+    leases = make_leases(size, make_catalog(1000, style_scores=False), seed=6)
+    payload = {'leases': [dict(lease, start_date=lease['start_date'].isoformat()) for lease in leases]}
+    return lambda: sanitize_input(payload, max_values=sys.maxsize)
+
+CASES: Dict[str, Callable] = {
+    'recommender.recommend': case_recommend,
+    'inventory.filter': case_filter,
+    'inventory.availability': case_availability,
+    'lease.quote': case_quote,
+    'auth.verify_token': case_verify_token,
+    'auth.verify_token_cached': case_verify_token_cached,
+    'validation.sanitize': case_sanitize,
+}
+
+def time_operation(operation: Callable, repeats: int, min_time: float) -> float:
+    """
+    Return the median time per call in milliseconds.
+    
+    Each repeat calls ``operation`` until ``min_time`` seconds have passed.
+    """
+    operation()
+    per_call = []
+    for _ in range(repeats):
+        calls = 0
+        started = time.perf_counter()
+        while True:
+            operation()
+            calls += 1
+            elapsed = time.perf_counter() - started
+            if elapsed >= min_time:
+                break
+        per_call.append(elapsed / calls * 1000.0)
+    return float(np.median(per_call))
+
+def run(cases: List[str], sizes: List[int], repeats: int = 5, min_time: float = 0.1) -> Dict[str, float]:
+    """
+    Time every case at every size.
+    
+    Returns:
+        Median milliseconds per operation, keyed ``"<case>[<size>]"``
+    """
+    results = {}
+    for name in cases:
+        for size in sizes:
+            results[f'{name}[{size}]'] = time_operation(CASES[name](size), repeats, min_time)
+    return results
+
+def compare(results: Dict[str, float], baseline: Dict[str, float], tolerance: float, min_delta_ms: float) -> List[str]:
+    """
+    Return a message for every result slower than its baseline.
+    
+    A result regresses when it exceeds the baseline by more than
+    ``tolerance`` (relative) and by more than ``min_delta_ms``, so tiny
+    timings do not fail on noise.
+    """
+    failures = []
+    for name, previous in sorted(baseline.items()):
+        current = results.get(name)
+        if current is not None and current > previous * (1.0 + tolerance) and current - previous > min_delta_ms:
+            failures.append(
+                f"{name}: {current:.4f}ms regressed from baseline {previous:.4f}ms "
+                f"(+{(current / previous - 1.0) * 100:.0f}%)"
+            )
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--cases', nargs='+', choices=sorted(CASES), default=list(CASES))
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--min-time', type=float, default=0.1, help='seconds per repeat')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='JSON file of timings to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='Allowed relative slowdown against the baseline')
+    parser.add_argument('--min-delta-ms', type=float, default=0.005,
+                        help='Slowdowns smaller than this are never regressions')
+    parser.add_argument('--save', help='Write the results to this JSON file (e.g. a new baseline)')
+    args = parser.parse_args()
+    
+    baseline = {}
+    if args.baseline and os.path.exists(args.baseline) and not args.save:
+        with open(args.baseline, 'r', encoding='utf-8') as fh:
+            baseline = json.load(fh)
+    
+    results = run(args.cases, args.sizes, args.repeats, args.min_time)
+    for name, ms in results.items():
+        previous = baseline.get(name)
+        change = f"{(ms / previous - 1.0) * 100:+6.0f}%" if previous else '    new'
+        print(f"{name:<36} {ms:10.4f}ms {change}")
+    
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as fh:
+            json.dump(results, fh, indent=2, sort_keys=True)
+            fh.write('\n')
+    
+    failures = compare(results, baseline, args.tolerance, args.min_delta_ms)
+    for failure in failures:
+        print(f"FAIL {failure}")
+    sys.exit(1 if failures else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+"""
+Deterministic synthetic data for benchmarks.
+"""
+from datetime import datetime, timedelta
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+from src.utils.settings import load_settings
+
+def make_catalog(n_items: int, seed: int = 0, style_scores: bool = True) -> List[Dict]:
+    """
+    Generate a synthetic catalog.
+    
+    Args:
+        n_items: Number of items
+        seed: Random seed
+        style_scores: Attach StyleAnalyzer-like per-style scores to each item
+    
+    Returns:
+        List of item dictionaries
+    """
+    settings = load_settings()
+    styles = settings['supported_styles']
+    categories = settings['furniture_categories']
+    rng = np.random.default_rng(seed)
+    
+    style_codes = rng.integers(0, len(styles), n_items)
+    category_codes = rng.integers(0, len(categories), n_items)
+    prices = np.round(rng.lognormal(mean=4.0, sigma=0.8, size=n_items), 2)
+    sizes = rng.uniform(0.5, 8.0, size=(n_items, 3)).round(2)
+    if style_scores:
+        # Mostly the item's own style, with some mass on the others
+        alpha = np.full((n_items, len(styles)), 0.3)
+        alpha[np.arange(n_items), style_codes] = 6.0
+        scores = np.vstack([rng.dirichlet(a) for a in alpha]).round(4)
+    
+    items = []
+    for i in range(n_items):
+        item = {
+            'id': f'ITEM{i:08d}',
+            'name': f'{styles[style_codes[i]]} {categories[category_codes[i]]} {i}',
+            'category': categories[category_codes[i]],
+            'style': styles[style_codes[i]],
+            'price': float(prices[i]),
+            'dimensions': {
+                'width': float(sizes[i, 0]),
+                'depth': float(sizes[i, 1]),
+                'height': float(sizes[i, 2]),
+            },
+        }
+        if style_scores:
+            item['style_scores'] = dict(zip(styles, scores[i].tolist()))
+        items.append(item)
+    return items
+
+def make_requests(n_requests: int, seed: int = 0) -> List[Dict]:
+    """
+    Generate synthetic recommendation requests.
+    
+    Args:
+        n_requests: Number of requests
+        seed: Random seed
+    
+    Returns:
+        List of ``get_recommendations`` argument dictionaries
+    """
+    settings = load_settings()
+    rng = np.random.default_rng(seed)
+    requests = []
+    for _ in range(n_requests):
+        requests.append({
+            'space_type': str(rng.choice(settings['space_types'])),
+            'style_preference': str(rng.choice(settings['supported_styles'])),
+            'budget': float(np.round(rng.uniform(50, 1000), 2)),
+            'dimensions': {
+                'length': float(np.round(rng.uniform(8, 30), 1)),
+                'width': float(np.round(rng.uniform(8, 25), 1)),
+                'height': float(np.round(rng.uniform(8, 12), 1)),
+            },
+        })
+    return requests
+
+def make_leases(
+    n_leases: int,
+    items: Sequence[Dict],
+    seed: int = 0,
+    n_users: int = 1000,
+    start: datetime = datetime(2026, 1, 1),
+    days: int = 365
+) -> List[Dict]:
+    """
+    Generate a synthetic lease history over a catalog.
+    
+    Leases start on random days within ``days`` of ``start``, run for one
+    of the configured duration tiers and hold one to four random items;
+    some of them overlap, as in a real history.
+    
+    Args:
+        n_leases: Number of leases
+        items: Catalog items (from ``make_catalog``)
+        seed: Random seed
+        n_users: Number of distinct users
+        start: Earliest start date
+        days: Span of start dates in days
+    
+    Returns:
+        List of ``create_lease`` argument dictionaries
+    """
+    durations = [tier['months'] for tier in load_settings()['lease_durations']]
+    rng = np.random.default_rng(seed)
+    leases = []
+    for _ in range(n_leases):
+        picked = rng.choice(len(items), size=int(rng.integers(1, 5)), replace=False)
+        leases.append({
+            'user_id': f'U{int(rng.integers(n_users)):06d}',
+            'items': [{'id': items[i]['id'], 'price': items[i]['price']} for i in picked.tolist()],
+            'start_date': start + timedelta(days=int(rng.integers(days))),
+            'duration_months': int(rng.choice(durations)),
+        })
+    return leases
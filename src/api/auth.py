@@ -0,0 +1,33 @@
+"""
+Request authentication for the API blueprints.
+"""
+from functools import wraps
+
+from flask import g, jsonify, request
+
+from src.api.dependencies import get_auth_manager
+
+def require_auth(view):
+    """
+    Reject requests without a valid ``Authorization: Bearer`` token.
+    
+    The verified token payload is available to the view as ``g.user``.
+    
+    Args:
+        view: Flask view function
+    
+    Returns:
+        Wrapped view answering 401 ``UNAUTHORIZED`` when the token is
+        missing, invalid or expired
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+        payload = None
+        if scheme.lower() == 'bearer' and token.strip():
+            payload = get_auth_manager().verify_token(token.strip())
+        if payload is None:
+            return jsonify({'error': 'Authentication required', 'code': 'UNAUTHORIZED'}), 401
+        g.user = payload
+        return view(*args, **kwargs)
+    return wrapper
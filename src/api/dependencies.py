@@ -0,0 +1,422 @@
+"""
+Process-wide service and model instances shared by the API blueprints.
+
+Model modules (and with them NumPy, PIL and TensorFlow) are imported on
+first use rather than at import time, so building the app stays cheap; call
+``warm_up`` or ``start_warm_up`` to load them ahead of the first request.
+"""
+import os
+import threading
+import time
+from typing import TYPE_CHECKING, Dict, Iterable, Optional
+
+from src.utils.settings import load_settings
+
+if TYPE_CHECKING:
+    from src.db.database import Database
+    from src.ml.batching import MicroBatcher
+    from src.ml.co_lease import CoLeaseModel
+    from src.ml.recommender import DesignRecommender
+    from src.ml.style_analyzer import StyleAnalyzer
+    from src.services.inventory_service import InventoryService
+    from src.services.lease_scheduler import LeaseScheduler
+    from src.services.lease_service import LeaseService
+    from src.services.user_service import UserService
+    from src.services.visualization_jobs import VisualizationJobs
+    from src.utils.auth import AuthManager
+
+# Components loaded by ``warm_up``, in order
+WARM_UP_COMPONENTS = ('recommender', 'style_analyzer', 'lease_scheduler')
+
+_lock = threading.Lock()
+_database = None
+_database_loaded = False
+_inventory = None
+_recommender = None
+_batcher = None
+_style_analyzer = None
+_co_lease = None
+_lease_service = None
+_lease_scheduler = None
+_auth_manager = None
+_user_service = None
+_visualization_jobs = None
+
+_warm_up_lock = threading.Lock()
+_warm_up_thread: Optional[threading.Thread] = None
+_component_state: Dict[str, Dict] = {name: {'status': 'cold'} for name in WARM_UP_COMPONENTS}
+
+def get_database() -> Optional['Database']:
+    """
+    Return the shared database, creating its schema on first use.
+    
+    The URL comes from ``DATABASE_URL``; without one, services keep their
+    data in memory only. The pool holds up to ``DATABASE_POOL_SIZE``
+    connections and a checkout waits at most ``DATABASE_POOL_TIMEOUT``
+    seconds.
+    
+    Returns:
+        Database instance, or None when no database is configured
+    """
+    global _database, _database_loaded
+    if not _database_loaded:
+        with _lock:
+            if not _database_loaded:
+                url = os.getenv('DATABASE_URL')
+                if url:
+                    from src.db.database import Database
+                    from src.db.repositories import create_schema
+                    database = Database(
+                        url,
+                        pool_size=int(os.getenv('DATABASE_POOL_SIZE', 10)),
+                        timeout=float(os.getenv('DATABASE_POOL_TIMEOUT', 5))
+                    )
+                    create_schema(database)
+                    _database = database
+                _database_loaded = True
+    return _database
+
+def get_auth_manager() -> 'AuthManager':
+    """
+    Return the shared auth manager and its verified-token cache.
+    
+    ``JWT_SECRET``, ``JWT_EXPIRATION`` and ``AUTH_TOKEN_CACHE_SIZE`` are
+    read once, when it is created.
+    
+    Returns:
+        AuthManager instance
+    """
+    global _auth_manager
+    if _auth_manager is None:
+        with _lock:
+            if _auth_manager is None:
+                from src.utils.auth import AuthManager
+                _auth_manager = AuthManager()
+    return _auth_manager
+
+def get_user_service() -> 'UserService':
+    """
+    Return the shared user service, hashing through the shared auth manager
+    and persisting accounts to the shared database, if one is configured.
+    
+    Returns:
+        UserService instance
+    """
+    global _user_service
+    if _user_service is None:
+        auth = get_auth_manager()
+        database = get_database()
+        with _lock:
+            if _user_service is None:
+                from src.services.user_service import UserService
+                _user_service = UserService(auth, db_connection=database)
+    return _user_service
+
+def get_visualization_jobs() -> 'VisualizationJobs':
+    """
+    Return the shared visualization job queue, creating it on first use.
+    
+    Renders run on ``VISUALIZATION_WORKERS`` processes (default 2), at most
+    ``VISUALIZATION_MAX_PENDING`` (default 32) at once, and are stored in
+    ``VISUALIZATION_DIR`` (default ``./visualizations``).
+    
+    Returns:
+        VisualizationJobs instance
+    """
+    global _visualization_jobs
+    if _visualization_jobs is None:
+        with _lock:
+            if _visualization_jobs is None:
+                from src.services.visualization_jobs import VisualizationJobs
+                _visualization_jobs = VisualizationJobs(
+                    output_dir=os.path.abspath(os.getenv('VISUALIZATION_DIR', 'visualizations')),
+                    workers=int(os.getenv('VISUALIZATION_WORKERS', 2)),
+                    max_pending=int(os.getenv('VISUALIZATION_MAX_PENDING', 32))
+                )
+    return _visualization_jobs
+
+def get_inventory_service() -> 'InventoryService':
+    """
+    Return the shared inventory service, creating it on first use.
+    
+    Returns:
+        InventoryService instance
+    """
+    global _inventory
+    if _inventory is None:
+        database = get_database()
+        with _lock:
+            if _inventory is None:
+                from src.services.inventory_service import InventoryService
+                _inventory = InventoryService(db_connection=database)
+    return _inventory
+
+def get_co_lease_model() -> 'CoLeaseModel':
+    """
+    Return the shared co-lease model, updated by the lease service.
+    
+    Returns:
+        CoLeaseModel instance
+    """
+    global _co_lease
+    if _co_lease is None:
+        with _lock:
+            if _co_lease is None:
+                from src.ml.co_lease import CoLeaseModel
+                _co_lease = CoLeaseModel()
+    return _co_lease
+
+def get_lease_service() -> 'LeaseService':
+    """
+    Return the shared lease service, booking through the shared inventory.
+    
+    Its lifecycle scheduler is created and started along with it (see
+    ``get_lease_scheduler``).
+    
+    Returns:
+        LeaseService instance
+    """
+    global _lease_service, _lease_scheduler
+    if _lease_service is None:
+        database = get_database()
+        inventory = get_inventory_service()
+        co_lease = get_co_lease_model()
+        with _lock:
+            if _lease_service is None:
+                from src.services.lease_scheduler import LeaseScheduler
+                from src.services.lease_service import LeaseService
+                service = LeaseService(db_connection=database, inventory=inventory, co_lease=co_lease)
+                _lease_scheduler = LeaseScheduler(service)
+                _lease_scheduler.rebuild()
+                poll_interval = float(os.getenv('LEASE_SCHEDULER_INTERVAL', 60))
+                if poll_interval > 0:
+                    _lease_scheduler.start(poll_interval)
+                _lease_service = service
+    return _lease_service
+
+def get_lease_scheduler() -> 'LeaseScheduler':
+    """
+    Return the scheduler moving shared leases through their lifecycle.
+    
+    It is rebuilt from the stored leases when created and, unless
+    ``LEASE_SCHEDULER_INTERVAL`` is 0, runs on a background thread that
+    wakes at the next due transition or every ``LEASE_SCHEDULER_INTERVAL``
+    seconds.
+    
+    Returns:
+        LeaseScheduler instance
+    """
+    get_lease_service()
+    return _lease_scheduler
+
+def get_recommender() -> 'DesignRecommender':
+    """
+    Return the shared recommender, bound to the shared inventory catalog.
+    
+    Its result cache is sized by ``RECOMMENDATION_CACHE_SIZE`` entries with
+    a ``RECOMMENDATION_CACHE_TTL`` lifetime in seconds; a size of 0
+    disables it. The model artifact is ``RECOMMENDER_MODEL_PATH`` (default:
+    ``ml_models.recommender`` in the settings file) and is checked for
+    replacement every ``MODEL_RELOAD_INTERVAL`` seconds (0 disables).
+    ``BUNDLE_TIME_LIMIT_MS`` bounds the bundle optimizer's search.
+    
+    Returns:
+        DesignRecommender instance
+    """
+    global _recommender
+    if _recommender is None:
+        inventory = get_inventory_service()
+        co_lease = get_co_lease_model()
+        with _lock:
+            if _recommender is None:
+                from src.ml.recommendation_cache import RecommendationCache
+                from src.ml.recommender import DesignRecommender
+                cache_size = int(os.getenv('RECOMMENDATION_CACHE_SIZE', 10000))
+                cache = RecommendationCache(
+                    max_entries=cache_size,
+                    ttl_seconds=float(os.getenv('RECOMMENDATION_CACHE_TTL', 300))
+                ) if cache_size > 0 else None
+                model = load_settings().get('ml_models', {}).get('recommender', {})
+                reload_interval = float(os.getenv('MODEL_RELOAD_INTERVAL', 5))
+                _recommender = DesignRecommender(
+                    model_path=os.getenv('RECOMMENDER_MODEL_PATH') or model.get('path'),
+                    catalog=inventory.index,
+                    cache=cache,
+                    reload_interval=reload_interval if reload_interval > 0 else None,
+                    co_lease=co_lease,
+                    bundle_time_limit_ms=float(os.getenv('BUNDLE_TIME_LIMIT_MS', 50))
+                )
+    return _recommender
+
+def get_recommendation_batcher() -> 'MicroBatcher':
+    """
+    Return the shared micro-batcher in front of the recommender.
+    
+    Batch size and wait window come from ``RECOMMENDER_MAX_BATCH_SIZE`` and
+    ``RECOMMENDER_MAX_WAIT_MS``.
+    
+    Returns:
+        MicroBatcher dispatching to ``get_recommendations_batch``
+    """
+    global _batcher
+    if _batcher is None:
+        recommender = get_recommender()
+        with _lock:
+            if _batcher is None:
+                from src.ml.batching import MicroBatcher
+                _batcher = MicroBatcher(
+                    recommender.get_recommendations_batch,
+                    max_batch_size=int(os.getenv('RECOMMENDER_MAX_BATCH_SIZE', 32)),
+                    max_wait_ms=float(os.getenv('RECOMMENDER_MAX_WAIT_MS', 2))
+                )
+    return _batcher
+
+def get_style_analyzer() -> 'StyleAnalyzer':
+    """
+    Return the shared style analyzer.
+    
+    The classifier path comes from ``ml_models.style_classifier`` in the
+    settings file; ``STYLE_FEATURE_STORE_DIR`` enables the on-disk feature
+    cache, which worker processes may share. The model itself is loaded on
+    first use or by ``warm_up``.
+    
+    Returns:
+        StyleAnalyzer instance
+    """
+    global _style_analyzer
+    if _style_analyzer is None:
+        with _lock:
+            if _style_analyzer is None:
+                from src.ml.style_analyzer import StyleAnalyzer
+                model = load_settings().get('ml_models', {}).get('style_classifier', {})
+                _style_analyzer = StyleAnalyzer(
+                    model_path=model.get('path'),
+                    feature_store_dir=os.getenv('STYLE_FEATURE_STORE_DIR') or None
+                )
+    return _style_analyzer
+
+def _warm_recommender() -> None:
+    get_recommendation_batcher()
+    get_recommender().warm_up()
+
+def _warm_style_analyzer() -> None:
+    get_style_analyzer().warm_up()
+
+def _warm_lease_scheduler() -> None:
+    get_lease_scheduler()
+
+_WARMERS = {
+    'recommender': _warm_recommender,
+    'style_analyzer': _warm_style_analyzer,
+    'lease_scheduler': _warm_lease_scheduler,
+}
+
+def warm_up(components: Iterable[str] = WARM_UP_COMPONENTS) -> Dict[str, Dict]:
+    """
+    Load and exercise models ahead of the first request.
+    
+    Components that are already ready are skipped. A component that fails
+    to load is reported as failed and keeps being loaded lazily on first
+    use; the remaining components still warm up.
+    
+    Args:
+        components: Names from ``WARM_UP_COMPONENTS``
+    
+    Returns:
+        Per-component readiness, as in ``readiness``
+    """
+    for name in components:
+        if name not in _WARMERS:
+            raise ValueError(f"Unknown component: {name}")
+        if _component_state[name]['status'] == 'ready':
+            continue
+        _component_state[name] = {'status': 'loading'}
+        started = time.perf_counter()
+        try:
+            _WARMERS[name]()
+        except Exception as exc:
+            _component_state[name] = {'status': 'failed', 'error': str(exc)}
+            continue
+        _component_state[name] = {
+            'status': 'ready',
+            'load_ms': round((time.perf_counter() - started) * 1000.0, 1)
+        }
+    return readiness()['components']
+
+def start_warm_up() -> threading.Thread:
+    """
+    Run ``warm_up`` once per process on a background thread.
+    
+    Returns:
+        The warm-up thread (the existing one on repeated calls)
+    """
+    global _warm_up_thread
+    with _warm_up_lock:
+        if _warm_up_thread is None:
+            _warm_up_thread = threading.Thread(target=warm_up, name='model-warm-up', daemon=True)
+            _warm_up_thread.start()
+        return _warm_up_thread
+
+def _after_fork_in_child() -> None:
+    """
+    Restart the background threads a fork leaves behind in the parent.
+    
+    Under a pre-forking server that builds the app before forking (e.g.
+    ``gunicorn --preload``) the workers inherit the loaded models but not
+    the warm-up or scheduler threads.
+    """
+    global _warm_up_lock, _warm_up_thread
+    _warm_up_lock = threading.Lock()
+    if _warm_up_thread is not None:
+        _warm_up_thread = None
+        for name, state in list(_component_state.items()):
+            if state['status'] == 'loading':
+                _component_state[name] = {'status': 'cold'}
+        start_warm_up()
+    if _lease_scheduler is not None:
+        _lease_scheduler.restart_after_fork()
+
+os.register_at_fork(after_in_child=_after_fork_in_child)
+
+def readiness() -> Dict:
+    """
+    Report whether every model component has been loaded.
+    
+    Returns:
+        Dictionary with an overall ``ready`` flag, per-component status
+        (``cold``, ``loading``, ``ready`` or ``failed``) and, once the
+        database is in use, its connection pool statistics
+    """
+    components = {name: dict(state) for name, state in _component_state.items()}
+    state = {
+        'ready': all(state['status'] == 'ready' for state in components.values()),
+        'components': components
+    }
+    if _database is not None:
+        state['database'] = _database.pool.stats()
+    return state
+
+def component_stats() -> Dict[str, Dict]:
+    """
+    Collect the statistics of the components created so far.
+    
+    Components that have not been created are left out rather than built.
+    
+    Returns:
+        Dictionary of statistics by component (``database``,
+        ``token_cache``, ``password_hasher``, ``recommendation_batcher``,
+        ``recommendation_cache``, ``visualization_jobs``)
+    """
+    stats = {}
+    if _database is not None:
+        stats['database'] = _database.pool.stats()
+    if _auth_manager is not None:
+        stats['token_cache'] = _auth_manager.token_cache.stats()
+        stats['password_hasher'] = _auth_manager.passwords.stats()
+    if _batcher is not None:
+        stats['recommendation_batcher'] = _batcher.stats()
+    if _recommender is not None and _recommender.cache is not None:
+        stats['recommendation_cache'] = _recommender.cache.stats()
+    if _visualization_jobs is not None:
+        stats['visualization_jobs'] = _visualization_jobs.stats()
+    return stats
@@ -1,49 +1,168 @@
 """
 Design recommendation API routes.
 """
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, g, request, jsonify, send_from_directory, url_for
+
+from src.api.dependencies import (
+    get_inventory_service,
+    get_recommendation_batcher,
+    get_recommender,
+    get_visualization_jobs
+)
+from src.api.validation import validate_json
+from src.services.visualization_jobs import VisualizationBusyError
+from src.utils.schemas import Field, Schema
+from src.utils.validators import validate_space_type
 
 bp = Blueprint('design', __name__, url_prefix='/api/design')
 
+_BUDGET_ERROR = ('Invalid budget', 'INVALID_BUDGET')
+_DIMENSIONS_ERROR = ('Invalid dimensions', 'INVALID_DIMENSIONS')
+
+def _dimensions() -> Field:
+    return Field('object', error=_DIMENSIONS_ERROR, fields={
+        key: Field('number', required=True, gt=0, error=_DIMENSIONS_ERROR)
+        for key in ('length', 'width', 'height')
+    })
+
+RECOMMENDATIONS_SCHEMA = Schema({
+    'space_type': Field('string', sanitize=True),
+    'style_preference': Field('string', sanitize=True),
+    'budget': Field('number', ge=0, error=_BUDGET_ERROR),
+    'dimensions': _dimensions(),
+})
+
+BUNDLE_SCHEMA = Schema({
+    'space_type': Field('string', required=True, error=('Invalid space type', 'INVALID_SPACE_TYPE')),
+    'style_preference': Field('string', sanitize=True),
+    'monthly_budget': Field('number', required=True, ge=0, error=_BUDGET_ERROR),
+    'dimensions': _dimensions(),
+    'duration_months': Field('integer', ge=1, default=1, error=('Invalid lease duration', 'INVALID_DURATION')),
+})
+
+# Most catalog items drawn in one visualization
+MAX_VISUALIZE_ITEMS = 100
+
+VISUALIZE_SCHEMA = Schema({
+    'items': Field(
+        'array', required=True, min_length=1, max_length=MAX_VISUALIZE_ITEMS,
+        items=Field('string', required=True), error=('Invalid items', 'INVALID_ITEMS')
+    ),
+    'space_type': Field('string', sanitize=True),
+    'style_preference': Field('string', sanitize=True),
+    'room_layout': Field('string', sanitize=True),
+    'dimensions': _dimensions(),
+})
+
 @bp.route('/recommendations', methods=['POST'])
+@validate_json(RECOMMENDATIONS_SCHEMA)
 def get_recommendations():
     """
     Get AI-powered design recommendations based on user preferences.
     """
-    data = request.get_json()
-    
-    # Extract parameters
-    space_type = data.get('space_type')
-    style_preference = data.get('style_preference')
-    budget = data.get('budget')
-    dimensions = data.get('dimensions')
-    
-    # TODO: Integrate with ML model for recommendations
+    items = get_recommendation_batcher().submit(g.payload)
     recommendations = {
-        'items': [
-            {
-                'id': 1,
-                'name': 'Modern Sofa',
-                'category': 'furniture',
-                'style': style_preference,
-                'price': 150,
-                'lease_term': '6 months'
-            }
-        ],
-        'total_estimated_cost': 150
+        'items': items,
+        'total_estimated_cost': sum(item.get('price', 0) for item in items)
     }
     
     return jsonify(recommendations), 200
 
+@bp.route('/bundle', methods=['POST'])
+@validate_json(BUNDLE_SCHEMA)
+def get_bundle():
+    """
+    Furnish a room with one item per required category within a monthly budget.
+    """
+    data = g.payload
+    # Space types are settings, so they are checked here rather than in the schema
+    if not validate_space_type(data['space_type']):
+        return jsonify({'error': 'Invalid space type', 'code': 'INVALID_SPACE_TYPE'}), 400
+    
+    bundle = get_recommender().get_bundle(
+        data['space_type'],
+        data['style_preference'],
+        data['monthly_budget'],
+        dimensions=data['dimensions'],
+        duration_months=data['duration_months']
+    )
+    return jsonify(bundle), 200
+
+@bp.route('/recommendations/stats', methods=['GET'])
+def get_recommendation_stats():
+    """
+    Get micro-batching and result-cache counters for tuning.
+    """
+    stats = get_recommendation_batcher().stats()
+    cache = get_recommender().cache
+    stats['cache'] = cache.stats() if cache is not None else None
+    return jsonify(stats), 200
+
+@bp.route('/items/<item_id>/also-leased', methods=['GET'])
+def get_also_leased(item_id):
+    """
+    Get items frequently leased together with an item.
+    """
+    limit = request.args.get('limit', 10, type=int)
+    if limit is None or not 1 <= limit <= 100:
+        return jsonify({'error': 'Invalid limit', 'code': 'INVALID_LIMIT'}), 400
+    
+    items = get_recommender().get_also_leased(item_id, top_k=limit)
+    return jsonify({'item_id': item_id, 'items': items}), 200
+
+def _job_response(job):
+    """API view of a visualization job."""
+    response = {
+        'job_id': job['job_id'],
+        'status': job['status'],
+        'cached': job['cached'],
+        'status_url': url_for('design.get_visualization', job_id=job['job_id'])
+    }
+    if job['status'] == 'done':
+        response['visualization_url'] = url_for('design.get_visualization_image', key=job['key'])
+    if 'error' in job:
+        response['error'] = job['error']
+    return response
+
 @bp.route('/visualize', methods=['POST'])
+@validate_json(VISUALIZE_SCHEMA)
 def visualize_design():
     """
-    Generate 3D visualization of the design.
+    Queue a floor-plan visualization of a design; poll ``status_url`` for the result.
     """
-    data = request.get_json()
+    data = g.payload
+    inventory = get_inventory_service()
+    items, unknown = [], []
+    for item_id in data['items']:
+        item = inventory.get_item(item_id)
+        if item is None:
+            unknown.append(item_id)
+        else:
+            items.append({key: item.get(key) for key in ('id', 'name', 'category', 'dimensions')})
+    if unknown:
+        return jsonify({'error': 'Unknown items', 'code': 'UNKNOWN_ITEMS', 'items': unknown}), 400
     
-    # TODO: Implement visualization logic
-    return jsonify({
-        'visualization_url': '/visualizations/sample.png',
-        'status': 'success'
-    }), 200
+    try:
+        job = get_visualization_jobs().submit(dict(data, items=items))
+    except VisualizationBusyError:
+        response = jsonify({'error': 'Visualization queue is full, retry shortly', 'code': 'VISUALIZATION_BUSY'})
+        response.headers['Retry-After'] = '5'
+        return response, 503
+    return jsonify(_job_response(job)), 202
+
+@bp.route('/visualize/<job_id>', methods=['GET'])
+def get_visualization(job_id):
+    """
+    Get the status of a visualization job, with the image URL once it is done.
+    """
+    job = get_visualization_jobs().get(job_id)
+    if job is None:
+        return jsonify({'error': 'Visualization job not found', 'code': 'JOB_NOT_FOUND'}), 404
+    return jsonify(_job_response(job)), 200
+
+@bp.route('/visualizations/<key>.png', methods=['GET'])
+def get_visualization_image(key):
+    """
+    Serve a rendered visualization.
+    """
+    return send_from_directory(get_visualization_jobs().output_dir, f'{key}.png', mimetype='image/png')
@@ -1,29 +1,113 @@
 """
 Leasing management API routes.
 """
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, g, jsonify
+
+from src.api.auth import require_auth
+from src.api.dependencies import get_lease_service
+from src.api.validation import validate_json
+from src.services.availability_index import ItemsUnavailableError, UnknownItemsError
+from src.utils.schemas import Field, Schema
 
 bp = Blueprint('lease', __name__, url_prefix='/api/lease')
 
+# Largest number of leases accepted by one bulk request
+MAX_BULK_LEASES = 1000
+
+_LEASE_ERROR = ('Invalid lease request', 'INVALID_LEASE')
+_ITEMS_ERROR = ('Invalid items', 'INVALID_ITEMS')
+
+# Fields of one lease, as passed to ``create_lease`` along with the
+# authenticated user's ID; items are priced from the catalog, a client price
+# is only checked
+_LEASE_FIELDS = {
+    'items': Field('array', required=True, min_length=1, error=_LEASE_ERROR, items=Field(
+        'object', extra=True, error=_LEASE_ERROR, fields={
+            'id': Field('string', required=True, error=_LEASE_ERROR),
+            'price': Field('number', ge=0, error=_LEASE_ERROR),
+        }
+    )),
+    'start_date': Field('date', required=True, error=_LEASE_ERROR),
+    'duration_months': Field('integer', required=True, ge=1, error=_LEASE_ERROR),
+}
+
+LEASE_SCHEMA = Schema(_LEASE_FIELDS, error=_LEASE_ERROR)
+
+BULK_SCHEMA = Schema({
+    'leases': Field(
+        'array', required=True, min_length=1, max_length=MAX_BULK_LEASES,
+        error=('Invalid lease list', 'INVALID_LEASES'),
+        items=Field('object', fields=_LEASE_FIELDS, error=_LEASE_ERROR),
+        item_error=_LEASE_ERROR
+    ),
+}, error=('Invalid lease list', 'INVALID_LEASES'))
+
+QUOTE_SCHEMA = Schema({
+    'items': Field('array', required=True, min_length=1, error=_ITEMS_ERROR, items=Field(
+        'object', extra=True, error=_ITEMS_ERROR, fields={'price': Field('number', required=True, ge=0, error=_ITEMS_ERROR)}
+    )),
+}, error=_ITEMS_ERROR)
+
 @bp.route('/create', methods=['POST'])
+@require_auth
+@validate_json(LEASE_SCHEMA)
 def create_lease():
     """
-    Create a new lease agreement.
-    """
-    data = request.get_json()
-    
-    # TODO: Implement lease creation logic
-    lease = {
-        'lease_id': 'L12345',
-        'status': 'pending',
-        'items': data.get('items', []),
-        'start_date': data.get('start_date'),
-        'end_date': data.get('end_date'),
-        'total_cost': data.get('total_cost')
-    }
-    
+    Create a new lease agreement for the authenticated user.
+    """
+    try:
+        lease = get_lease_service().create_lease(user_id=g.user['user_id'], **g.payload)
+    except UnknownItemsError as e:
+        return jsonify({'error': str(e), 'code': 'UNKNOWN_ITEMS', 'items': e.item_ids}), 400
+    except ItemsUnavailableError as e:
+        return jsonify({'error': str(e), 'code': 'ITEMS_UNAVAILABLE', 'items': e.item_ids}), 409
     return jsonify(lease), 201
 
+@bp.route('/bulk', methods=['POST'])
+@require_auth
+@validate_json(BULK_SCHEMA)
+def create_leases_bulk():
+    """
+    Create many lease agreements for the authenticated user in one request.
+    """
+    user_id = g.user['user_id']
+    result = get_lease_service().create_leases_bulk(
+        [dict(lease, user_id=user_id) for lease in g.payload['leases']]
+    )
+    return jsonify(result), 201
+
+@bp.route('/quote', methods=['POST'])
+@validate_json(QUOTE_SCHEMA)
+def quote_lease():
+    """
+    Quote a set of items for every lease duration.
+    """
+    items = g.payload['items']
+    quotes = get_lease_service().quotes
+    prices = [item['price'] for item in items]
+    per_item = quotes.price_matrix(prices)
+    months = per_item['months'].tolist()
+    totals = quotes.quote_leases([prices] * len(months), months)
+    return jsonify({
+        'quotes': [
+            {
+                'months': tier_months,
+                'discount': quotes.discount_rate(tier_months),
+                'monthly_cost': monthly / 100,
+                'total_cost': total / 100
+            }
+            for tier_months, monthly, total in zip(
+                months,
+                totals['monthly_cents'].tolist(),
+                totals['total_cents'].tolist()
+            )
+        ],
+        'items': [
+            {'id': item.get('id'), 'monthly_cost': [cents / 100 for cents in row]}
+            for item, row in zip(items, per_item['monthly_cents'].tolist())
+        ]
+    }), 200
+
 @bp.route('/status/<lease_id>', methods=['GET'])
 def get_lease_status(lease_id):
     """
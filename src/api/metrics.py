@@ -0,0 +1,85 @@
+"""
+Request metrics and the Prometheus ``/metrics`` endpoint.
+"""
+import time
+
+from flask import Flask, Response, g, request
+
+from src.api import dependencies
+from src.utils.metrics import REGISTRY, SIZE_BUCKETS
+
+# Component statistics that only ever grow, exported as counters
+MONOTONIC_STATS = frozenset({
+    'checkouts', 'timeouts', 'wait_seconds_total', 'rejected', 'hits', 'misses', 'evictions',
+    'expirations', 'invalidations', 'batches', 'requests', 'submitted', 'rendered', 'cached',
+    'coalesced', 'failed',
+})
+
+def _endpoint() -> str:
+    # The route pattern, so the label has one value per route rather than per URL
+    return request.url_rule.rule if request.url_rule is not None else 'unmatched'
+
+def _before_request():
+    # Counted for every request, so the gauge is exact whatever the sample rate
+    g.metrics_in_flight = True
+    REGISTRY.add('http_requests_in_flight', 'Requests being handled', 1)
+    if REGISTRY.sampled():
+        g.metrics_started = time.perf_counter()
+
+def _after_request(response):
+    started = g.get('metrics_started')
+    if started is None:
+        return response
+    endpoint = _endpoint()
+    REGISTRY.histogram(
+        'http_request_duration_seconds', 'Request latency by route',
+        {'endpoint': endpoint, 'method': request.method, 'status': str(response.status_code)}
+    ).observe(time.perf_counter() - started)
+    REGISTRY.histogram(
+        'http_request_size_bytes', 'Request body size by route', {'endpoint': endpoint}, SIZE_BUCKETS
+    ).observe(request.content_length or 0)
+    if response.content_length is not None:
+        REGISTRY.histogram(
+            'http_response_size_bytes', 'Response body size by route', {'endpoint': endpoint}, SIZE_BUCKETS
+        ).observe(response.content_length)
+    return response
+
+def _teardown_request(error=None):
+    g.pop('metrics_started', None)
+    if g.pop('metrics_in_flight', False):
+        REGISTRY.add('http_requests_in_flight', 'Requests being handled', -1)
+
+def _component_samples():
+    for component, stats in dependencies.component_stats().items():
+        for key, value in stats.items():
+            if not isinstance(value, (int, float)):
+                continue
+            if key in MONOTONIC_STATS:
+                name = f'{component}_{key}' if key.endswith('_total') else f'{component}_{key}_total'
+                yield name, f'{key} reported by {component}', {}, value, 'counter'
+            else:
+                yield f'{component}_{key}', f'{key} reported by {component}', {}, value
+
+def init_app(app: Flask) -> None:
+    """
+    Time every request and serve the collected metrics on ``/metrics``.
+    
+    Requests are sampled at the registry's ``sample_rate``
+    (``METRICS_SAMPLE_RATE``). Per route, the latency, request size and
+    response size are recorded; the number of requests in flight counts
+    every request. The export also includes the spans timed with
+    ``src.utils.metrics.timed`` and the statistics of the components
+    created so far.
+    
+    Args:
+        app: Flask application
+    """
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.teardown_request(_teardown_request)
+    
+    @app.route('/metrics')
+    def metrics():
+        return Response(REGISTRY.render(), mimetype='text/plain; version=0.0.4')
+
+REGISTRY.register_collector(_component_samples)
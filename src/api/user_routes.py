@@ -1,50 +1,100 @@
 """
 User management API routes.
 """
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, g, jsonify
+
+from src.api.auth import require_auth
+from src.api.dependencies import get_auth_manager, get_user_service
+from src.api.validation import validate_json
+from src.services.user_service import EmailTakenError
+from src.utils.auth import MAX_PASSWORD_BYTES, AuthBusyError, PasswordTooLongError
+from src.utils.schemas import Field, Schema
 
 bp = Blueprint('user', __name__, url_prefix='/api/user')
 
+# Shortest accepted password
+MIN_PASSWORD_LENGTH = 8
+
+_PASSWORD_ERROR = (
+    f'Password must be at least {MIN_PASSWORD_LENGTH} characters and at most {MAX_PASSWORD_BYTES} bytes',
+    'INVALID_PASSWORD'
+)
+
+# Passwords are capped at bcrypt's limit; multi-byte passwords under the
+# character cap are checked by the hasher
+REGISTER_SCHEMA = Schema({
+    'email': Field('email', required=True, error=('Invalid email', 'INVALID_EMAIL')),
+    'password': Field('string', required=True, min_length=MIN_PASSWORD_LENGTH, max_length=MAX_PASSWORD_BYTES,
+                      error=_PASSWORD_ERROR),
+    'name': Field('string', sanitize=True, error=('Invalid registration', 'INVALID_USER')),
+}, error=('Invalid registration', 'INVALID_USER'))
+
+_CREDENTIALS_ERROR = ('Invalid credentials', 'INVALID_CREDENTIALS')
+
+LOGIN_SCHEMA = Schema({
+    'email': Field('string', required=True, error=_CREDENTIALS_ERROR),
+    'password': Field('string', required=True, max_length=MAX_PASSWORD_BYTES, error=_CREDENTIALS_ERROR),
+}, error=_CREDENTIALS_ERROR)
+
+def _busy():
+    """Response for a request turned away because password hashing is saturated."""
+    response = jsonify({'error': 'Authentication is busy, retry shortly', 'code': 'AUTH_BUSY'})
+    response.headers['Retry-After'] = '1'
+    return response, 503
+
 @bp.route('/register', methods=['POST'])
+@validate_json(REGISTER_SCHEMA)
 def register():
     """
     Register a new user.
     """
-    data = request.get_json()
-    
-    # TODO: Implement user registration with password hashing
+    data = g.payload
+    try:
+        user = get_user_service().register(data['email'], data['password'], data['name'])
+    except AuthBusyError:
+        return _busy()
+    except PasswordTooLongError:
+        message, code = _PASSWORD_ERROR
+        return jsonify({'error': message, 'code': code}), 400
+    except EmailTakenError:
+        return jsonify({'error': 'Email already registered', 'code': 'EMAIL_TAKEN'}), 409
     return jsonify({
         'message': 'User registered successfully',
-        'user_id': 'U12345'
+        'user_id': user['id']
     }), 201
 
 @bp.route('/login', methods=['POST'])
+@validate_json(LOGIN_SCHEMA, status=401)
 def login():
     """
     Authenticate user and return JWT token.
     """
-    data = request.get_json()
-    
-    # TODO: Implement authentication logic
+    try:
+        user = get_user_service().authenticate(g.payload['email'], g.payload['password'])
+    except AuthBusyError:
+        return _busy()
+    if user is None:
+        return jsonify({'error': 'Invalid credentials', 'code': 'INVALID_CREDENTIALS'}), 401
     return jsonify({
-        'token': 'sample_jwt_token',
+        'token': get_auth_manager().generate_token(user['id'], user['email']),
         'user': {
-            'id': 'U12345',
-            'email': data.get('email')
+            'id': user['id'],
+            'email': user['email']
         }
     }), 200
 
 @bp.route('/profile', methods=['GET'])
+@require_auth
 def get_profile():
     """
-    Get user profile information.
+    Get the authenticated user's profile information.
     """
-    # TODO: Implement profile retrieval with JWT validation
+    user = get_user_service().get_user(g.user['user_id'])
+    if user is None:
+        return jsonify({'error': 'User not found', 'code': 'USER_NOT_FOUND'}), 404
     return jsonify({
-        'id': 'U12345',
-        'email': 'user@example.com',
-        'preferences': {
-            'style': 'modern',
-            'budget_range': '1000-5000'
-        }
+        'id': user['id'],
+        'email': user['email'],
+        'name': user.get('name'),
+        'preferences': user.get('preferences') or {}
     }), 200
@@ -0,0 +1,33 @@
+"""
+Request body validation for the API blueprints.
+"""
+from functools import wraps
+
+from flask import g, jsonify, request
+
+from src.utils.schemas import Schema, SchemaError
+
+def validate_json(schema: Schema, status: int = 400):
+    """
+    Check the JSON body of a request against a schema before the view runs.
+    
+    The clean payload is available to the view as ``g.payload``.
+    
+    Args:
+        schema: Compiled schema of the request body
+        status: HTTP status answered when the body does not match
+    
+    Returns:
+        Decorator answering ``status`` with the schema error's message and
+        code when the body is missing, not JSON or invalid
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            try:
+                g.payload = schema.validate(request.get_json(silent=True))
+            except SchemaError as e:
+                return jsonify(e.to_dict()), status
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
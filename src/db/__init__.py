@@ -0,0 +1,3 @@
+"""
+Data access layer: connection pooling and repositories.
+"""
@@ -0,0 +1,169 @@
+"""
+Bounded pool of database connections.
+"""
+import math
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+
+# Most recent checkout waits kept for the latency percentiles
+LATENCY_SAMPLES = 1024
+
+class PooledConnection:
+    """A DB-API connection owned by a pool, with the statements prepared on it."""
+    
+    __slots__ = ('raw', 'prepared')
+    
+    def __init__(self, raw: Any):
+        self.raw = raw
+        self.prepared = set()
+
+class ConnectionPool:
+    """
+    Hands out at most ``max_size`` connections, opening them on demand.
+    
+    A checkout takes an idle connection, opens a new one while the pool is
+    below its bound, or waits for a connection to be returned for up to
+    ``timeout`` seconds. Checkout counts, waits and latency percentiles
+    are kept for ``stats``.
+    """
+    
+    def __init__(self, connect: Callable[[], Any], max_size: int = 10, timeout: float = 5.0):
+        """
+        Initialize an empty pool.
+        
+        Args:
+            connect: Opens a new DB-API connection
+            max_size: Most connections open at once
+            timeout: Longest wait for a connection in seconds
+        """
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self._connect = connect
+        self.max_size = max_size
+        self.timeout = timeout
+        
+        self._lock = threading.Lock()
+        self._returned = threading.Condition(self._lock)
+        self._idle: List[PooledConnection] = []
+        self._size = 0
+        self._closed = False
+        self._waiting = 0
+        self._checkouts = 0
+        self._timeouts = 0
+        self._wait_total = 0.0
+        self._waits = deque(maxlen=LATENCY_SAMPLES)
+    
+    def acquire(self, timeout: Optional[float] = None) -> PooledConnection:
+        """
+        Check out a connection.
+        
+        Args:
+            timeout: Longest wait in seconds (the pool's timeout by default)
+        
+        Returns:
+            Pooled connection, to be handed back with ``release``
+        
+        Raises:
+            TimeoutError: If no connection became free in time
+        """
+        timeout = self.timeout if timeout is None else timeout
+        started = time.perf_counter()
+        deadline = started + timeout
+        with self._lock:
+            while True:
+                if self._closed:
+                    raise ValueError("Connection pool is closed")
+                if self._idle:
+                    connection = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    # Reserve the slot; the connection is opened outside the lock
+                    self._size += 1
+                    connection = None
+                    break
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    self._timeouts += 1
+                    raise TimeoutError(f"No database connection free within {timeout}s")
+                self._waiting += 1
+                try:
+                    self._returned.wait(remaining)
+                finally:
+                    self._waiting -= 1
+        
+        if connection is None:
+            try:
+                connection = PooledConnection(self._connect())
+            except Exception:
+                with self._lock:
+                    self._size -= 1
+                    self._returned.notify()
+                raise
+        
+        waited = time.perf_counter() - started
+        with self._lock:
+            self._checkouts += 1
+            self._wait_total += waited
+            self._waits.append(waited)
+        return connection
+    
+    def release(self, connection: PooledConnection, discard: bool = False) -> None:
+        """
+        Return a checked-out connection.
+        
+        Args:
+            connection: Connection from ``acquire``
+            discard: Close the connection instead of reusing it (e.g. after
+                it failed to roll back)
+        """
+        with self._lock:
+            if discard or self._closed:
+                self._size -= 1
+            else:
+                self._idle.append(connection)
+                connection = None
+            self._returned.notify()
+        if connection is not None:
+            try:
+                connection.raw.close()
+            except Exception:
+                pass
+    
+    def close(self) -> None:
+        """Close idle connections; checked-out ones are closed when released."""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+            self._returned.notify_all()
+        for connection in idle:
+            connection.raw.close()
+    
+    def stats(self) -> Dict:
+        """
+        Report pool usage.
+        
+        Returns:
+            Dictionary with ``max_size``, open connections (``size``,
+            ``in_use``, ``idle``), ``waiting`` threads, ``checkouts``,
+            ``timeouts``, ``wait_seconds_total`` and the p50/p99 checkout
+            latency in milliseconds over the most recent checkouts
+        """
+        with self._lock:
+            waits = sorted(self._waits)
+            stats = {
+                'max_size': self.max_size,
+                'size': self._size,
+                'in_use': self._size - len(self._idle),
+                'idle': len(self._idle),
+                'waiting': self._waiting,
+                'checkouts': self._checkouts,
+                'timeouts': self._timeouts,
+                'wait_seconds_total': self._wait_total,
+            }
+        for name, quantile in (('checkout_ms_p50', 0.5), ('checkout_ms_p99', 0.99)):
+            # Nearest-rank percentile
+            stats[name] = waits[math.ceil(quantile * len(waits)) - 1] * 1000.0 if waits else 0.0
+        return stats
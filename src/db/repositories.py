@@ -0,0 +1,417 @@
+"""
+Repositories persisting the catalog, leases and user accounts.
+"""
+import json
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.db.database import Database, Transaction
+
+SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS items (
+        id TEXT PRIMARY KEY,
+        category TEXT,
+        style TEXT,
+        price DOUBLE PRECISION,
+        status TEXT,
+        data TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS leases (
+        lease_id TEXT PRIMARY KEY,
+        user_id TEXT NOT NULL,
+        status TEXT NOT NULL,
+        start_date TEXT NOT NULL,
+        end_date TEXT NOT NULL,
+        duration_months INTEGER NOT NULL,
+        discount DOUBLE PRECISION NOT NULL,
+        monthly_cents BIGINT NOT NULL,
+        total_cents BIGINT NOT NULL,
+        created_at TEXT NOT NULL,
+        reminder_sent_at TEXT,
+        items TEXT NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS leases_status ON leases (status)",
+    # Half-open [start_day, end_day) day ordinals, as in AvailabilityIndex
+    """
+    CREATE TABLE IF NOT EXISTS bookings (
+        item_id TEXT NOT NULL,
+        lease_id TEXT NOT NULL,
+        start_day INTEGER NOT NULL,
+        end_day INTEGER NOT NULL,
+        PRIMARY KEY (item_id, lease_id)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS bookings_lease ON bookings (lease_id)",
+    # One row per booked item, locked while a transaction books it
+    "CREATE TABLE IF NOT EXISTS booking_locks (item_id TEXT PRIMARY KEY)",
+    """
+    CREATE TABLE IF NOT EXISTS users (
+        id TEXT PRIMARY KEY,
+        email TEXT NOT NULL UNIQUE,
+        name TEXT,
+        password_hash TEXT NOT NULL,
+        preferences TEXT
+    )
+    """,
+)
+
+def create_schema(db: Database) -> None:
+    """
+    Create the tables the repositories use, if they do not exist yet.
+    
+    Args:
+        db: Database to create them in
+    """
+    with db.transaction() as tx:
+        for statement in SCHEMA:
+            tx.execute_once(statement)
+
+def _timestamp(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value is not None else None
+
+def _parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value is not None else None
+
+class ItemRepository:
+    """Stores catalog items, keeping the filterable fields in their own columns."""
+    
+    UPSERT = (
+        "INSERT INTO items (id, category, style, price, status, data) VALUES (?, ?, ?, ?, ?, ?) "
+        "ON CONFLICT (id) DO UPDATE SET category = excluded.category, style = excluded.style, "
+        "price = excluded.price, status = excluded.status, data = excluded.data"
+    )
+    SELECT_ALL = "SELECT data FROM items"
+    SELECT_ONE = "SELECT data FROM items WHERE id = ?"
+    
+    def __init__(self, db: Database):
+        """
+        Initialize the repository.
+        
+        Args:
+            db: Database holding the ``items`` table
+        """
+        self.db = db
+    
+    def save_many(self, items: Iterable[Dict]) -> None:
+        """
+        Insert or replace items in one bulk write.
+        
+        Args:
+            items: Items, each with an ``id``
+        """
+        self.db.insert_many(self.UPSERT, [
+            (
+                item['id'],
+                item.get('category'),
+                item.get('style'),
+                float(item.get('price') or 0),
+                item.get('status'),
+                json.dumps(item, default=str),
+            )
+            for item in items
+        ])
+    
+    def get(self, item_id: str) -> Optional[Dict]:
+        """
+        Retrieve a stored item.
+        
+        Args:
+            item_id: ID of the item
+        
+        Returns:
+            Item information or None
+        """
+        row = self.db.fetchone(self.SELECT_ONE, (item_id,))
+        return json.loads(row[0]) if row is not None else None
+    
+    def load_all(self) -> List[Dict]:
+        """Return every stored item."""
+        return [json.loads(data) for data, in self.db.fetchall(self.SELECT_ALL)]
+
+class LeaseRepository:
+    """
+    Stores leases, with costs in integer cents, and the items they book.
+    
+    Bookings are checked and written in the database, so processes sharing
+    it cannot book an item twice for overlapping days: a transaction first
+    locks the ``booking_locks`` rows of the items it books (in sorted
+    order, through an upsert that takes a row lock on PostgreSQL and the
+    write lock on SQLite), then looks for overlapping bookings, which by
+    then include those committed by any transaction it waited for.
+    """
+    
+    COLUMNS = (
+        'lease_id', 'user_id', 'status', 'start_date', 'end_date', 'duration_months', 'discount',
+        'monthly_cents', 'total_cents', 'created_at', 'reminder_sent_at', 'items'
+    )
+    INSERT = (
+        f"INSERT INTO leases ({', '.join(COLUMNS)}) "
+        f"VALUES ({', '.join('?' * len(COLUMNS))})"
+    )
+    SELECT_ALL = f"SELECT {', '.join(COLUMNS)} FROM leases"
+    UPDATE_STATUS = "UPDATE leases SET status = ? WHERE lease_id = ?"
+    CLAIM_REMINDER = "UPDATE leases SET reminder_sent_at = ? WHERE lease_id = ? AND reminder_sent_at IS NULL"
+    RELEASE_REMINDER = "UPDATE leases SET reminder_sent_at = NULL WHERE lease_id = ? AND reminder_sent_at = ?"
+    LOCK_ITEM = (
+        "INSERT INTO booking_locks (item_id) VALUES (?) "
+        "ON CONFLICT (item_id) DO UPDATE SET item_id = excluded.item_id"
+    )
+    OVERLAP = (
+        "SELECT lease_id FROM bookings "
+        "WHERE item_id = ? AND lease_id <> ? AND start_day < ? AND end_day > ?"
+    )
+    INSERT_BOOKING = "INSERT INTO bookings (item_id, lease_id, start_day, end_day) VALUES (?, ?, ?, ?)"
+    RESTORE_BOOKING = f"{INSERT_BOOKING} ON CONFLICT (item_id, lease_id) DO NOTHING"
+    RELEASE = "DELETE FROM bookings WHERE lease_id = ?"
+    
+    def __init__(self, db: Database):
+        """
+        Initialize the repository.
+        
+        Args:
+            db: Database holding the ``leases`` table
+        """
+        self.db = db
+    
+    @staticmethod
+    def _bookings(lease: Dict) -> List[Tuple[str, str, int, int]]:
+        """Return the ``bookings`` rows of a lease."""
+        start_day, end_day = lease['start_date'].toordinal(), lease['end_date'].toordinal()
+        item_ids = dict.fromkeys(item['id'] for item in lease['items'] if 'id' in item)
+        return [(item_id, lease['lease_id'], start_day, end_day) for item_id in item_ids]
+    
+    def _book(self, tx: Transaction, leases: List[Dict]) -> Tuple[List[Dict], Dict[str, List[str]]]:
+        """
+        Book the items of leases inside a transaction.
+        
+        Returns:
+            The leases whose items were booked, and for each of the others
+            the IDs of its items booked by another lease
+        """
+        rows = [self._bookings(lease) for lease in leases]
+        item_ids = sorted({row[0] for lease_rows in rows for row in lease_rows})
+        tx.execute_many(self.LOCK_ITEM, [(item_id,) for item_id in item_ids])
+        booked, conflicts = [], {}
+        for lease, lease_rows in zip(leases, rows):
+            taken = [
+                item_id for item_id, lease_id, start_day, end_day in lease_rows
+                if tx.fetchone(self.OVERLAP, (item_id, lease_id, end_day, start_day)) is not None
+            ]
+            if taken:
+                conflicts[lease['lease_id']] = taken
+                continue
+            tx.execute_many(self.INSERT_BOOKING, lease_rows)
+            booked.append(lease)
+        return booked, conflicts
+    
+    def save_many(self, leases: List[Dict]) -> Dict[str, List[str]]:
+        """
+        Book the items of new leases and insert the leases, in one transaction.
+        
+        A lease with an item already booked for overlapping days (possibly
+        by another process) is not stored.
+        
+        Args:
+            leases: Lease information as built by ``LeaseService``
+        
+        Returns:
+            For each lease that was not stored, the IDs of its items that
+            are booked by another lease
+        """
+        with self.db.transaction() as tx:
+            booked, conflicts = self._book(tx, leases)
+            tx.insert_many(self.INSERT, self._rows(booked))
+        return conflicts
+    
+    def _rows(self, leases: Iterable[Dict]) -> List[tuple]:
+        return [
+            (
+                lease['lease_id'],
+                lease['user_id'],
+                lease['status'],
+                lease['start_date'].isoformat(),
+                lease['end_date'].isoformat(),
+                lease['duration_months'],
+                lease['discount'],
+                round(lease['monthly_cost'] * 100),
+                round(lease['total_cost'] * 100),
+                lease['created_at'].isoformat(),
+                _timestamp(lease.get('reminder_sent_at')),
+                json.dumps(lease['items'], default=str),
+            )
+            for lease in leases
+        ]
+    
+    def update_statuses(self, transitions: Iterable[Tuple[str, str]]) -> None:
+        """
+        Write new statuses in one batch, releasing the bookings of cancelled leases.
+        
+        Args:
+            transitions: ``(lease_id, status)`` pairs
+        """
+        transitions = list(transitions)
+        with self.db.transaction() as tx:
+            tx.execute_many(self.UPDATE_STATUS, [(status, lease_id) for lease_id, status in transitions])
+            tx.execute_many(self.RELEASE, [(lease_id,) for lease_id, status in transitions if status == 'cancelled'])
+    
+    def reinstate(self, lease: Dict, status: str) -> List[str]:
+        """
+        Book a cancelled lease's items again and set its status, in one transaction.
+        
+        Args:
+            lease: Lease information
+            status: Status the lease returns to
+        
+        Returns:
+            IDs of its items booked by another lease; empty if it was reinstated
+        """
+        with self.db.transaction() as tx:
+            booked, conflicts = self._book(tx, [lease])
+            if booked:
+                tx.execute(self.UPDATE_STATUS, (status, lease['lease_id']))
+        return conflicts.get(lease['lease_id'], [])
+    
+    def restore_bookings(self, leases: Iterable[Dict]) -> None:
+        """
+        Write the bookings of stored live leases that have none yet.
+        
+        Args:
+            leases: Pending and active leases
+        """
+        self.db.insert_many(self.RESTORE_BOOKING, [row for lease in leases for row in self._bookings(lease)])
+    
+    def claim_reminders(self, lease_ids: Iterable[str], sent_at: datetime) -> List[str]:
+        """
+        Mark leases as reminded, unless another process already did, in one transaction.
+        
+        Each lease is claimed with a conditional update, so of several
+        processes claiming the same lease exactly one gets it.
+        
+        Args:
+            lease_ids: IDs of the leases to remind
+            sent_at: When the reminders are sent
+        
+        Returns:
+            IDs of the leases this call claimed
+        """
+        sent_at = sent_at.isoformat()
+        with self.db.transaction() as tx:
+            return [
+                lease_id for lease_id in lease_ids
+                if tx.execute(self.CLAIM_REMINDER, (sent_at, lease_id)) == 1
+            ]
+    
+    def release_reminders(self, lease_ids: Iterable[str], sent_at: datetime) -> None:
+        """
+        Undo the claims of reminders that could not be sent, in one batch.
+        
+        Args:
+            lease_ids: IDs of the claimed leases
+            sent_at: Time they were claimed with
+        """
+        sent_at = sent_at.isoformat()
+        self.db.execute_many(self.RELEASE_REMINDER, [(lease_id, sent_at) for lease_id in lease_ids])
+    
+    def load_all(self) -> List[Dict]:
+        """Return every stored lease."""
+        leases = []
+        for row in self.db.fetchall(self.SELECT_ALL):
+            lease = dict(zip(self.COLUMNS, row))
+            for key in ('start_date', 'end_date', 'created_at', 'reminder_sent_at'):
+                lease[key] = _parse_timestamp(lease[key])
+            lease['monthly_cost'] = lease.pop('monthly_cents') / 100
+            lease['total_cost'] = lease.pop('total_cents') / 100
+            lease['items'] = json.loads(lease['items'])
+            if lease['reminder_sent_at'] is None:
+                del lease['reminder_sent_at']
+            leases.append(lease)
+        return leases
+
+class UserRepository:
+    """Stores user accounts, keyed by ID and unique by email."""
+    
+    COLUMNS = ('id', 'email', 'name', 'password_hash', 'preferences')
+    INSERT = (
+        f"INSERT INTO users ({', '.join(COLUMNS)}) "
+        f"VALUES ({', '.join('?' * len(COLUMNS))})"
+    )
+    SELECT_ALL = f"SELECT {', '.join(COLUMNS)} FROM users"
+    SELECT_ONE = f"SELECT {', '.join(COLUMNS)} FROM users WHERE id = ?"
+    SELECT_BY_EMAIL = f"SELECT {', '.join(COLUMNS)} FROM users WHERE email = ?"
+    UPDATE_PASSWORD = "UPDATE users SET password_hash = ? WHERE id = ?"
+    
+    def __init__(self, db: Database):
+        """
+        Initialize the repository.
+        
+        Args:
+            db: Database holding the ``users`` table
+        """
+        self.db = db
+    
+    def _user(self, row: Optional[tuple]) -> Optional[Dict]:
+        if row is None:
+            return None
+        user = dict(zip(self.COLUMNS, row))
+        if user['preferences'] is None:
+            del user['preferences']
+        else:
+            user['preferences'] = json.loads(user['preferences'])
+        return user
+    
+    def save(self, user: Dict) -> None:
+        """
+        Insert a new user.
+        
+        Args:
+            user: User information as built by ``UserService``, with its password hash
+        """
+        self.db.execute(self.INSERT, (
+            user['id'],
+            user['email'],
+            user.get('name'),
+            user['password_hash'],
+            json.dumps(user['preferences']) if user.get('preferences') is not None else None,
+        ))
+    
+    def get(self, user_id: str) -> Optional[Dict]:
+        """
+        Retrieve a stored user.
+        
+        Args:
+            user_id: ID of the user
+        
+        Returns:
+            User information or None
+        """
+        return self._user(self.db.fetchone(self.SELECT_ONE, (user_id,)))
+    
+    def get_by_email(self, email: str) -> Optional[Dict]:
+        """
+        Retrieve a stored user by email.
+        
+        Args:
+            email: Normalized (lower-case) email address
+        
+        Returns:
+            User information or None
+        """
+        return self._user(self.db.fetchone(self.SELECT_BY_EMAIL, (email,)))
+    
+    def update_password_hash(self, user_id: str, password_hash: str) -> None:
+        """
+        Replace a user's stored password hash.
+        
+        Args:
+            user_id: ID of the user
+            password_hash: New bcrypt hash
+        """
+        self.db.execute(self.UPDATE_PASSWORD, (password_hash, user_id))
+    
+    def load_all(self) -> List[Dict]:
+        """Return every stored user."""
+        return [self._user(row) for row in self.db.fetchall(self.SELECT_ALL)]
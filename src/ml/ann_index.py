@@ -0,0 +1,219 @@
+"""
+Approximate nearest-neighbour index for maximum inner-product search.
+"""
+import threading
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+class IVFIndex:
+    """
+    Inverted-file (IVF) index over item vectors, implemented in NumPy.
+    
+    Vectors are partitioned with k-means into ``n_lists`` cells. A query
+    ranks the cell centroids by inner product and only scans the vectors in
+    the best ``n_probe`` cells, so ``n_probe`` trades recall for latency and
+    ``n_lists`` sets the size of each cell.
+    """
+    
+    def __init__(
+        self,
+        n_lists: Optional[int] = None,
+        n_probe: int = 8,
+        n_iter: int = 10,
+        train_size: int = 65536,
+        seed: int = 0
+    ):
+        """
+        Initialize an empty index.
+        
+        Args:
+            n_lists: Number of cells (defaults to about sqrt(n) at build time)
+            n_probe: Cells scanned per query
+            n_iter: k-means iterations at build time
+            train_size: Largest sample used to train the centroids
+            seed: Random seed for centroid training
+        """
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.n_iter = n_iter
+        self.train_size = train_size
+        self.seed = seed
+        
+        self._lock = threading.RLock()
+        self.centroids: Optional[np.ndarray] = None
+        self._list_ids: List[np.ndarray] = []
+        self._list_vectors: List[np.ndarray] = []
+        self._assignment = {}
+    
+    def __len__(self) -> int:
+        return len(self._assignment)
+    
+    @property
+    def is_built(self) -> bool:
+        """Whether centroids have been trained."""
+        return self.centroids is not None
+    
+    def build(self, ids: np.ndarray, vectors: np.ndarray) -> None:
+        """
+        Train centroids and (re)build the inverted lists from scratch.
+        
+        Args:
+            ids: Integer ID per vector
+            vectors: Array of shape (n, d)
+        """
+        ids = np.asarray(ids, dtype=np.int64)
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        n = len(ids)
+        if n == 0:
+            raise ValueError("Cannot build an index without vectors")
+        
+        n_lists = min(self.n_lists or max(1, int(np.sqrt(n))), n)
+        centroids = self._train(vectors, n_lists)
+        assignment = self._assign(vectors, centroids)
+        
+        order = np.argsort(assignment, kind='stable')
+        bounds = np.searchsorted(assignment[order], np.arange(n_lists + 1))
+        list_ids, list_vectors = [], []
+        for cell in range(n_lists):
+            members = order[bounds[cell]:bounds[cell + 1]]
+            list_ids.append(ids[members])
+            list_vectors.append(vectors[members])
+        
+        with self._lock:
+            self.centroids = centroids
+            self._list_ids = list_ids
+            self._list_vectors = list_vectors
+            self._assignment = dict(zip(ids.tolist(), assignment.tolist()))
+    
+    def _train(self, vectors: np.ndarray, n_lists: int) -> np.ndarray:
+        """Run Lloyd's k-means on a sample of the vectors."""
+        rng = np.random.default_rng(self.seed)
+        if len(vectors) > self.train_size:
+            vectors = vectors[rng.choice(len(vectors), self.train_size, replace=False)]
+        centroids = vectors[rng.choice(len(vectors), n_lists, replace=False)].copy()
+        
+        for _ in range(self.n_iter):
+            assignment = self._assign(vectors, centroids)
+            order = np.argsort(assignment, kind='stable')
+            ordered = assignment[order]
+            starts = np.flatnonzero(np.r_[True, ordered[1:] != ordered[:-1]])
+            filled = np.zeros(n_lists, dtype=bool)
+            filled[ordered[starts]] = True
+            counts = np.diff(np.r_[starts, len(ordered)])
+            centroids[ordered[starts]] = (
+                np.add.reduceat(vectors[order], starts, axis=0) / counts[:, None]
+            )
+            # Re-seed empty cells from random points
+            empty = np.flatnonzero(~filled)
+            if len(empty):
+                centroids[empty] = vectors[rng.choice(len(vectors), len(empty), replace=False)]
+        return centroids
+    
+    @staticmethod
+    def _assign(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+        """Return the nearest centroid (Euclidean) of each vector."""
+        distances = (
+            np.einsum('ij,ij->i', centroids, centroids)[None, :]
+            - 2.0 * (vectors @ centroids.T)
+        )
+        return np.argmin(distances, axis=1)
+    
+    def add(self, item_id: int, vector: np.ndarray) -> None:
+        """
+        Insert or move one vector without retraining.
+        
+        Args:
+            item_id: Integer ID of the vector
+            vector: Array of shape (d,)
+        """
+        if not self.is_built:
+            return
+        vector = np.asarray(vector, dtype=np.float32).reshape(1, -1)
+        with self._lock:
+            self.remove(item_id)
+            cell = int(self._assign(vector, self.centroids)[0])
+            self._list_ids[cell] = np.append(self._list_ids[cell], np.int64(item_id))
+            self._list_vectors[cell] = np.concatenate([self._list_vectors[cell], vector])
+            self._assignment[int(item_id)] = cell
+    
+    def remove(self, item_id: int) -> bool:
+        """
+        Remove a vector.
+        
+        Args:
+            item_id: Integer ID of the vector
+        
+        Returns:
+            True if the vector was indexed
+        """
+        with self._lock:
+            cell = self._assignment.pop(int(item_id), None)
+            if cell is None:
+                return False
+            keep = self._list_ids[cell] != item_id
+            self._list_ids[cell] = self._list_ids[cell][keep]
+            self._list_vectors[cell] = self._list_vectors[cell][keep]
+            return True
+    
+    def _probe(self, query: np.ndarray, n_probe: Optional[int]) -> np.ndarray:
+        """Return the cells to scan for a query, best first."""
+        n_probe = min(n_probe or self.n_probe, len(self.centroids))
+        scores = self.centroids @ query
+        cells = np.argpartition(scores, len(scores) - n_probe)[-n_probe:]
+        return cells[np.argsort(-scores[cells])]
+    
+    def candidates(self, query: np.ndarray, n_probe: Optional[int] = None) -> np.ndarray:
+        """
+        Return the IDs stored in the cells closest to a query.
+        
+        Args:
+            query: Array of shape (d,)
+            n_probe: Cells to scan (defaults to the index setting)
+        
+        Returns:
+            Array of candidate IDs
+        """
+        query = np.asarray(query, dtype=np.float32)
+        with self._lock:
+            if not self.is_built:
+                return np.empty(0, dtype=np.int64)
+            cells = self._probe(query, n_probe)
+            return np.concatenate([self._list_ids[cell] for cell in cells])
+    
+    def search(
+        self,
+        queries: np.ndarray,
+        k: int,
+        n_probe: Optional[int] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find the k vectors with the largest inner product for each query.
+        
+        Args:
+            queries: Array of shape (m, d)
+            k: Neighbours per query
+            n_probe: Cells to scan (defaults to the index setting)
+        
+        Returns:
+            Tuple of (ids, scores), each of shape (m, k); missing
+            neighbours are -1 with score -inf
+        """
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        ids = np.full((len(queries), k), -1, dtype=np.int64)
+        scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        with self._lock:
+            if not self.is_built:
+                return ids, scores
+            for i, query in enumerate(queries):
+                cells = self._probe(query, n_probe)
+                cell_ids = np.concatenate([self._list_ids[cell] for cell in cells])
+                cell_scores = np.concatenate([self._list_vectors[cell] for cell in cells]) @ query
+                top = min(k, len(cell_ids))
+                if top == 0:
+                    continue
+                best = np.argpartition(cell_scores, len(cell_scores) - top)[-top:]
+                best = best[np.argsort(-cell_scores[best])]
+                ids[i, :top] = cell_ids[best]
+                scores[i, :top] = cell_scores[best]
+        return ids, scores
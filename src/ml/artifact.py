@@ -0,0 +1,197 @@
+"""
+Versioned, memory-mapped on-disk format for model parameters.
+
+Layout::
+    
+    magic (8 bytes) | format version (uint16) | reserved (uint16) |
+    header length (uint32) | JSON header | padding |
+    array data, each array starting on an ALIGNMENT-byte boundary
+
+The JSON header describes every array (dtype, shape, offset into the data
+region) plus free-form metadata and a BLAKE2b checksum of the data region.
+Loading maps the file read-only and wraps each array around the mapping,
+so worker processes opening the same artifact share one copy of the
+weights through the page cache.
+"""
+import hashlib
+import json
+import mmap
+import os
+import struct
+import tempfile
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+MAGIC = b'DRMODEL\x00'
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+
+_PREAMBLE = struct.Struct('<8sHHI')
+
+# Header entries every artifact must have, with their JSON types
+_HEADER_FIELDS = {'metadata': dict, 'arrays': dict, 'data_size': int, 'checksum': dict}
+
+def _align(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+def _raw(array: np.ndarray) -> memoryview:
+    """Return the bytes of a C-contiguous array without copying."""
+    return memoryview(array.reshape(-1).view(np.uint8))
+
+def file_identity(path: str) -> Tuple[int, int, int]:
+    """
+    Return a value that changes whenever the file at ``path`` is replaced.
+    
+    Args:
+        path: Artifact path
+    
+    Returns:
+        Tuple of (inode, mtime in ns, size)
+    """
+    return _identity(os.stat(path))
+
+def _identity(stat: os.stat_result) -> Tuple[int, int, int]:
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+class ModelArtifact:
+    """
+    A loaded artifact: read-only arrays backed by a shared memory mapping.
+    """
+    
+    def __init__(self, path: str, metadata: Dict, arrays: Dict[str, np.ndarray], identity):
+        self.path = path
+        self.metadata = metadata
+        self.arrays = arrays
+        self.identity = identity
+    
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.arrays[name]
+    
+    def __contains__(self, name: str) -> bool:
+        return name in self.arrays
+
+def save_artifact(path: str, arrays: Dict[str, np.ndarray], metadata: Optional[Dict] = None) -> None:
+    """
+    Write an artifact atomically.
+    
+    The file is written next to ``path`` under a temporary name, flushed to
+    disk and renamed over ``path``, so readers see either the old or the
+    new artifact, never a partial one. Processes that already mapped the
+    old file keep using it until they reload.
+    
+    Args:
+        path: Destination path
+        arrays: Named arrays to store
+        metadata: JSON-serializable metadata
+    """
+    layout, offset = {}, 0
+    contiguous = {}
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        if array.dtype.hasobject:
+            raise ValueError(f"Array {name!r} has an object dtype and cannot be stored")
+        offset = _align(offset)
+        layout[name] = {
+            'dtype': array.dtype.str,
+            'shape': list(array.shape),
+            'offset': offset,
+            'nbytes': array.nbytes,
+        }
+        contiguous[name] = array
+        offset += array.nbytes
+    data_size = offset
+    
+    checksum = hashlib.blake2b(digest_size=32)
+    position = 0
+    for name, array in contiguous.items():
+        checksum.update(b'\x00' * (layout[name]['offset'] - position))
+        checksum.update(_raw(array))
+        position = layout[name]['offset'] + array.nbytes
+    
+    header = json.dumps({
+        'metadata': metadata or {},
+        'arrays': layout,
+        'data_size': data_size,
+        'checksum': {'algorithm': 'blake2b-256', 'digest': checksum.hexdigest()},
+    }, sort_keys=True).encode('utf-8')
+    data_start = _align(_PREAMBLE.size + len(header))
+    
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix='.artifact-', dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as fh:
+            fh.write(_PREAMBLE.pack(MAGIC, FORMAT_VERSION, 0, len(header)))
+            fh.write(header)
+            fh.write(b'\x00' * (data_start - _PREAMBLE.size - len(header)))
+            position = 0
+            for name, array in contiguous.items():
+                fh.write(b'\x00' * (layout[name]['offset'] - position))
+                fh.write(_raw(array))
+                position = layout[name]['offset'] + array.nbytes
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+def load_artifact(path: str, verify: bool = True) -> ModelArtifact:
+    """
+    Map an artifact into memory.
+    
+    Args:
+        path: Artifact path
+        verify: Check the data checksum (reads every page once)
+    
+    Returns:
+        ModelArtifact whose arrays are read-only views of the mapping
+    
+    Raises:
+        ValueError: If the file is not a valid artifact or fails the checksum
+    """
+    with open(path, 'rb') as fh:
+        # Identify the file actually opened, which may differ from what
+        # ``path`` names by the time the caller checks it
+        stat = os.fstat(fh.fileno())
+        identity, size = _identity(stat), stat.st_size
+        if size < _PREAMBLE.size:
+            raise ValueError(f"{path} is too small to be a model artifact")
+        mapping = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+    
+    magic, version, _, header_length = _PREAMBLE.unpack_from(mapping, 0)
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a model artifact")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"{path} has unsupported format version {version}")
+    try:
+        header = json.loads(mapping[_PREAMBLE.size:_PREAMBLE.size + header_length])
+    except (UnicodeDecodeError, json.JSONDecodeError) as exc:
+        raise ValueError(f"{path} has a corrupt header") from exc
+    if not isinstance(header, dict) or any(
+        not isinstance(header.get(key), kind) for key, kind in _HEADER_FIELDS.items()
+    ) or not isinstance(header['checksum'].get('digest'), str):
+        raise ValueError(f"{path} has an incomplete header")
+    
+    data_start = _align(_PREAMBLE.size + header_length)
+    if data_start + header['data_size'] != size:
+        raise ValueError(f"{path} is truncated or has trailing data")
+    if verify:
+        with memoryview(mapping) as view:
+            digest = hashlib.blake2b(view[data_start:], digest_size=32).hexdigest()
+        if digest != header['checksum']['digest']:
+            raise ValueError(f"{path} failed checksum validation")
+    
+    arrays = {}
+    for name, spec in header['arrays'].items():
+        try:
+            dtype = np.dtype(spec['dtype'])
+            count = int(np.prod(spec['shape'], dtype=np.int64))
+            arrays[name] = np.frombuffer(
+                mapping, dtype=dtype, count=count, offset=data_start + spec['offset']
+            ).reshape(spec['shape'])
+        except (KeyError, TypeError, ValueError) as exc:
+            raise ValueError(f"{path} has an invalid layout for array {name!r}") from exc
+    return ModelArtifact(path, header['metadata'], arrays, identity)
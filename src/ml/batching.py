@@ -0,0 +1,168 @@
+"""
+Micro-batching scheduler for model inference.
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+class MicroBatcher:
+    """
+    Collect concurrent requests for a short window and run them as one batch.
+    
+    Callers block in ``submit`` while a single dispatcher thread gathers up
+    to ``max_batch_size`` requests (waiting at most ``max_wait_ms`` after the
+    first one arrives), hands them to ``handler`` in one call and routes each
+    result back to its caller.
+    """
+    
+    def __init__(
+        self,
+        handler: Callable[[List[Any]], List[Any]],
+        max_batch_size: int = 32,
+        max_wait_ms: float = 2.0,
+        latency_window: int = 4096
+    ):
+        """
+        Initialize the batcher.
+        
+        Args:
+            handler: Function mapping a list of requests to a list of results
+            max_batch_size: Largest number of requests dispatched together
+            max_wait_ms: Longest time to hold a batch open for more requests
+            latency_window: Number of recent request latencies kept for stats
+        """
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        self.handler = handler
+        self.max_batch_size = int(max_batch_size)
+        self.max_wait = max(float(max_wait_ms), 0.0) / 1000.0
+        
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._closed = False
+        
+        self._stats_lock = threading.Lock()
+        self._latencies = np.zeros(int(latency_window), dtype=np.float64)
+        self._latency_count = 0
+        self._batches = 0
+        self._requests = 0
+    
+    def submit(self, request: Any, timeout: Optional[float] = None) -> Any:
+        """
+        Submit a request and wait for its result.
+        
+        Args:
+            request: Request passed to the handler as part of a batch
+            timeout: Seconds to wait for the result (None waits forever)
+        
+        Returns:
+            The handler's result for this request
+        """
+        return self.submit_async(request).result(timeout)
+    
+    def submit_async(self, request: Any) -> Future:
+        """
+        Submit a request without waiting.
+        
+        Args:
+            request: Request passed to the handler as part of a batch
+        
+        Returns:
+            Future resolved with the handler's result for this request
+        """
+        if self._closed:
+            raise RuntimeError("MicroBatcher is closed")
+        self._ensure_started()
+        future: Future = Future()
+        self._queue.put((request, future, time.perf_counter()))
+        return future
+    
+    def close(self) -> None:
+        """Stop the dispatcher once queued requests have been served."""
+        self._closed = True
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+    
+    def stats(self) -> Dict[str, float]:
+        """
+        Return dispatch counters and end-to-end latency percentiles.
+        
+        Returns:
+            Dictionary with batch/request counts, mean batch size and
+            p50/p99 latency in milliseconds over the recent window
+        """
+        with self._stats_lock:
+            filled = min(self._latency_count, len(self._latencies))
+            window = self._latencies[:filled]
+            p50, p99 = np.percentile(window, [50, 99]) if filled else (0.0, 0.0)
+            return {
+                'batches': self._batches,
+                'requests': self._requests,
+                'mean_batch_size': self._requests / self._batches if self._batches else 0.0,
+                'p50_ms': float(p50) * 1000.0,
+                'p99_ms': float(p99) * 1000.0,
+            }
+    
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name='micro-batcher', daemon=True
+                )
+                self._thread.start()
+    
+    def _collect(self, first) -> List:
+        """Gather a batch starting with ``first`` until full or the window closes."""
+        batch = [first]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                entry = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if entry is None:
+                # Re-queue the shutdown marker so the loop exits after this batch
+                self._queue.put(None)
+                break
+            batch.append(entry)
+        return batch
+    
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = self._collect(first)
+            requests = [request for request, _, _ in batch]
+            try:
+                results = self.handler(requests)
+                if len(results) != len(batch):
+                    raise RuntimeError("Batch handler returned the wrong number of results")
+            except Exception as exc:
+                for _, future, _ in batch:
+                    future.set_exception(exc)
+                continue
+            
+            finished = time.perf_counter()
+            for (_, future, submitted), result in zip(batch, results):
+                future.set_result(result)
+            self._record(finished, [submitted for _, _, submitted in batch])
+    
+    def _record(self, finished: float, submitted: List[float]) -> None:
+        with self._stats_lock:
+            size = len(self._latencies)
+            for started in submitted:
+                self._latencies[self._latency_count % size] = finished - started
+                self._latency_count += 1
+            self._batches += 1
+            self._requests += len(submitted)
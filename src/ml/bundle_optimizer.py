@@ -0,0 +1,173 @@
+"""
+Budget-constrained bundle selection: one item from each category.
+"""
+import time
+from typing import List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+# Search nodes expanded between checks of the deadline
+DEADLINE_CHECK_INTERVAL = 256
+
+class BundleSolution(NamedTuple):
+    """Chosen candidate per category and the bundle's totals."""
+    choice: List[int]
+    score: float
+    price: float
+    # False when the time limit stopped the search before it finished
+    optimal: bool
+
+class _Timeout(Exception):
+    pass
+
+def pareto_front(scores: np.ndarray, prices: np.ndarray) -> np.ndarray:
+    """
+    Drop candidates that a cheaper or equally priced one outscores.
+    
+    Args:
+        scores: Score of each candidate
+        prices: Price of each candidate
+    
+    Returns:
+        Indices of the remaining candidates; along them prices and scores
+        both strictly increase
+    """
+    order = np.lexsort((-scores, prices))
+    ordered = scores[order]
+    best_before = np.maximum.accumulate(np.concatenate([[-np.inf], ordered[:-1]]))
+    return order[ordered > best_before]
+
+def _upper_hull(scores: np.ndarray, prices: np.ndarray) -> List[int]:
+    """Return positions on the upper convex hull of a Pareto front, cheapest first."""
+    hull: List[int] = []
+    for j in range(len(prices)):
+        while len(hull) >= 2:
+            a, b = hull[-2], hull[-1]
+            # b lies on or under the segment from a to j
+            if (scores[b] - scores[a]) * (prices[j] - prices[a]) <= (scores[j] - scores[a]) * (prices[b] - prices[a]):
+                hull.pop()
+            else:
+                break
+        hull.append(j)
+    return hull
+
+def _greedy(scores: List[np.ndarray], prices: List[np.ndarray], budget: float) -> List[int]:
+    """
+    Pick a feasible bundle over Pareto fronts in O(n log n).
+    
+    Starts from the cheapest item of every category and applies upgrades
+    along each category's convex hull in order of score gained per unit of
+    price while they remain affordable, then spends what is left on the
+    best affordable item of each category.
+    """
+    choice = [0] * len(scores)
+    remaining = budget - sum(float(p[0]) for p in prices)
+    upgrades = []
+    for c, (s, p) in enumerate(zip(scores, prices)):
+        hull = _upper_hull(s, p)
+        for a, b in zip(hull, hull[1:]):
+            upgrades.append(((s[b] - s[a]) / (p[b] - p[a]), c, a, b))
+    upgrades.sort(key=lambda upgrade: -upgrade[0])
+    for _, c, a, b in upgrades:
+        # Hull steps of a category must be taken in order
+        if choice[c] == a and prices[c][b] - prices[c][a] <= remaining:
+            remaining -= prices[c][b] - prices[c][a]
+            choice[c] = b
+    for c, p in enumerate(prices):
+        best = int(np.searchsorted(p, p[choice[c]] + remaining, side='right')) - 1
+        remaining -= p[best] - p[choice[c]]
+        choice[c] = best
+    return choice
+
+def optimize_bundle(
+    scores: Sequence[np.ndarray],
+    prices: Sequence[np.ndarray],
+    budget: float,
+    time_limit: float
+) -> Optional[BundleSolution]:
+    """
+    Choose one candidate per category to maximize total score within budget.
+    
+    Candidates are first reduced to each category's Pareto front. A greedy
+    solution over the fronts' convex hulls seeds a depth-first
+    branch-and-bound search, which bounds each branch by the best score
+    each remaining category could still afford. When ``time_limit`` runs
+    out the best bundle found so far is returned, so the greedy answer is
+    the worst case.
+    
+    Args:
+        scores: Per category, the score of each candidate
+        prices: Per category, the price of each candidate
+        budget: Largest total price
+        time_limit: Seconds the search may take
+    
+    Returns:
+        BundleSolution indexing into each category's candidates, or None
+        when there is no category or the cheapest bundle exceeds the budget
+    """
+    deadline = time.perf_counter() + time_limit
+    if not len(scores) or any(len(s) == 0 for s in scores):
+        return None
+    fronts = [
+        pareto_front(np.asarray(s, dtype=np.float64), np.asarray(p, dtype=np.float64))
+        for s, p in zip(scores, prices)
+    ]
+    front_scores = [np.asarray(s, dtype=np.float64)[f] for s, f in zip(scores, fronts)]
+    front_prices = [np.asarray(p, dtype=np.float64)[f] for p, f in zip(prices, fronts)]
+    if sum(float(p[0]) for p in front_prices) > budget:
+        return None
+    
+    best = _greedy(front_scores, front_prices, budget)
+    best_score = sum(float(s[j]) for s, j in zip(front_scores, best))
+    
+    # Search categories with the fewest options first; min_after[i] is the
+    # cheapest spend on categories after position i
+    order = sorted(range(len(fronts)), key=lambda c: len(fronts[c]))
+    s_ordered = [front_scores[c] for c in order]
+    p_ordered = [front_prices[c] for c in order]
+    cheapest = [float(p[0]) for p in p_ordered]
+    min_after = [sum(cheapest[i + 1:]) for i in range(len(order))]
+    choice = [0] * len(order)
+    nodes = 0
+    
+    def bound(i: int, remaining: float) -> float:
+        """Best total the categories from position i could reach on their own."""
+        total = 0.0
+        reserved = sum(cheapest[i:])
+        for d in range(i, len(order)):
+            limit = remaining - (reserved - cheapest[d])
+            total += s_ordered[d][np.searchsorted(p_ordered[d], limit, side='right') - 1]
+        return total
+    
+    def search(i: int, remaining: float, score: float) -> None:
+        nonlocal best, best_score, nodes
+        nodes += 1
+        if nodes % DEADLINE_CHECK_INTERVAL == 0 and time.perf_counter() > deadline:
+            raise _Timeout
+        if i == len(order):
+            if score > best_score:
+                best_score = score
+                best = [0] * len(order)
+                for position, c in enumerate(order):
+                    best[c] = choice[position]
+            return
+        s, p = s_ordered[i], p_ordered[i]
+        affordable = int(np.searchsorted(p, remaining - min_after[i], side='right'))
+        # Later categories never do better than with this category's
+        # cheapest item, and scores fall as j decreases
+        rest = bound(i + 1, remaining - p[0]) if i + 1 < len(order) else 0.0
+        for j in range(affordable - 1, -1, -1):
+            if score + s[j] + rest <= best_score:
+                break
+            choice[i] = j
+            search(i + 1, remaining - p[j], score + s[j])
+    
+    optimal = True
+    try:
+        search(0, budget, 0.0)
+    except _Timeout:
+        optimal = False
+    
+    choice = [int(f[j]) for f, j in zip(fronts, best)]
+    price = sum(float(front_prices[c][j]) for c, j in enumerate(best))
+    return BundleSolution(choice, best_score, price, optimal)
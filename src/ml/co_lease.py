@@ -0,0 +1,293 @@
+"""
+Item-item co-lease similarity ("people who leased this also leased").
+"""
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# Item codes are packed into one int64 key per (row, column) pair
+_KEY_SHIFT = 32
+_KEY_MASK = (1 << _KEY_SHIFT) - 1
+
+class CoLeaseModel:
+    """
+    Sparse item co-occurrence model over lease line items.
+    
+    Co-lease counts are kept as a CSR matrix (``indptr``/``indices``/``data``
+    NumPy arrays) plus a small dictionary of recent increments. Similarity
+    is cosine over lease membership, ``co(i, j) / sqrt(n(i) * n(j))``, and
+    the ``top_n`` neighbours of every item are precomputed into dense
+    arrays so a lookup is a single row read.
+    
+    Memory is bounded: each lease contributes at most
+    ``max_items_per_lease`` items, each matrix row keeps its
+    ``max_row_nnz`` largest counts, and increments are folded into the
+    matrix once ``compact_after`` pairs have accumulated.
+    """
+    
+    def __init__(
+        self,
+        top_n: int = 20,
+        max_items_per_lease: int = 50,
+        max_row_nnz: int = 1000,
+        compact_after: int = 100000
+    ):
+        """
+        Initialize an empty model.
+        
+        Args:
+            top_n: Neighbours precomputed per item
+            max_items_per_lease: Items of a lease considered (the rest are ignored)
+            max_row_nnz: Largest number of co-leased items kept per item
+            compact_after: Pending incremental pairs that trigger compaction
+        """
+        self.top_n = top_n
+        self.max_items_per_lease = max_items_per_lease
+        self.max_row_nnz = max_row_nnz
+        self.compact_after = compact_after
+        
+        self._lock = threading.RLock()
+        self._reset()
+    
+    def _reset(self) -> None:
+        self._codes: Dict[str, int] = {}
+        self._ids: List[str] = []
+        self._counts = np.zeros(0, dtype=np.int64)
+        self._indptr = np.zeros(1, dtype=np.int64)
+        self._indices = np.zeros(0, dtype=np.int32)
+        self._data = np.zeros(0, dtype=np.float32)
+        self._delta: Dict[int, Dict[int, int]] = {}
+        self._delta_size = 0
+        self._top_ids = np.full((0, self.top_n), -1, dtype=np.int32)
+        self._top_scores = np.zeros((0, self.top_n), dtype=np.float32)
+    
+    def __len__(self) -> int:
+        return len(self._ids)
+    
+    def _encode(self, item_ids: Iterable) -> np.ndarray:
+        """Map item IDs to codes, growing the per-item arrays as needed."""
+        codes = []
+        for item_id in item_ids:
+            code = self._codes.get(item_id)
+            if code is None:
+                code = self._codes[item_id] = len(self._ids)
+                self._ids.append(item_id)
+            codes.append(code)
+        n = len(self._ids)
+        if n > len(self._counts):
+            capacity = max(n, 2 * len(self._counts), 64)
+            self._counts = np.concatenate([self._counts, np.zeros(capacity - len(self._counts), np.int64)])
+            grow = capacity - len(self._top_ids)
+            self._top_ids = np.vstack([self._top_ids, np.full((grow, self.top_n), -1, np.int32)])
+            self._top_scores = np.vstack([self._top_scores, np.zeros((grow, self.top_n), np.float32)])
+        return np.array(codes, dtype=np.int64)
+    
+    def _lease_codes(self, lease) -> np.ndarray:
+        """Return the distinct item codes of a lease dict or list of item IDs."""
+        items = lease.get('items', []) if isinstance(lease, dict) else lease
+        item_ids = dict.fromkeys(
+            item.get('id') if isinstance(item, dict) else item for item in items
+        )
+        item_ids.pop(None, None)
+        return self._encode(list(item_ids)[:self.max_items_per_lease])
+    
+    def fit(self, leases: Iterable, chunk_size: int = 10000) -> None:
+        """
+        Rebuild the model from lease history.
+        
+        Leases are consumed in chunks, so ``leases`` may be a generator over
+        the full history; pair counts are reduced after every chunk.
+        
+        Args:
+            leases: Lease dicts (with an ``items`` list) or lists of item IDs
+            chunk_size: Leases reduced at a time
+        """
+        with self._lock:
+            self._reset()
+            keys = np.zeros(0, dtype=np.int64)
+            counts = np.zeros(0, dtype=np.float64)
+            chunk, pending, pending_size = [], [], 0
+            for lease in leases:
+                codes = self._lease_codes(lease)
+                self._counts[codes] += 1
+                if len(codes) > 1:
+                    chunk.append(codes)
+                if len(chunk) >= chunk_size:
+                    pending.append(np.unique(self._pair_keys(chunk), return_counts=True))
+                    pending_size += len(pending[-1][0])
+                    chunk = []
+                    # Merging only once the pending pairs rival the running
+                    # totals keeps the number of full re-sorts logarithmic
+                    if pending_size >= len(keys):
+                        keys, counts = self._merge(keys, counts, pending)
+                        pending, pending_size = [], 0
+            if chunk:
+                pending.append(np.unique(self._pair_keys(chunk), return_counts=True))
+            self._build(*self._merge(keys, counts, pending))
+    
+    @staticmethod
+    def _pair_keys(leases: List[np.ndarray]) -> np.ndarray:
+        """Return the packed (i, j) keys of every ordered pair within each lease."""
+        flat = np.concatenate(leases)
+        lengths = np.array([len(codes) for codes in leases])
+        # Each element is paired with every element of its own lease
+        run = np.repeat(lengths, lengths)
+        lease_start = np.repeat(np.cumsum(lengths) - lengths, lengths)
+        rows = np.repeat(flat, run)
+        within = np.arange(len(rows)) - np.repeat(np.cumsum(run) - run, run)
+        cols = flat[np.repeat(lease_start, run) + within]
+        distinct = rows != cols
+        return (rows[distinct] << _KEY_SHIFT) | cols[distinct]
+    
+    def _merge(self, keys: np.ndarray, counts: np.ndarray, pending: List[Tuple[np.ndarray, np.ndarray]]):
+        """Add (key, count) chunks to sorted (key, count) arrays, pruning full rows."""
+        keys = np.concatenate([keys] + [chunk_keys for chunk_keys, _ in pending])
+        counts = np.concatenate([counts] + [chunk_counts for _, chunk_counts in pending])
+        keys, inverse = np.unique(keys, return_inverse=True)
+        counts = np.bincount(inverse, weights=counts, minlength=len(keys))
+        return self._prune(keys, counts)
+    
+    def _prune(self, keys: np.ndarray, counts: np.ndarray):
+        """Keep the ``max_row_nnz`` largest counts of every row."""
+        rows = keys >> _KEY_SHIFT
+        starts = np.searchsorted(rows, rows, side='left')
+        if not len(keys) or (np.arange(len(keys)) - starts).max() < self.max_row_nnz:
+            return keys, counts
+        order = np.lexsort((-counts, rows))
+        rank = np.arange(len(keys)) - starts[order]
+        keep = np.sort(order[rank < self.max_row_nnz])
+        return keys[keep], counts[keep]
+    
+    def _build(self, keys: np.ndarray, counts: np.ndarray) -> None:
+        """Replace the CSR matrix with sorted (key, count) arrays and refresh neighbours."""
+        rows = keys >> _KEY_SHIFT
+        self._indices = (keys & _KEY_MASK).astype(np.int32)
+        self._data = counts.astype(np.float32)
+        self._indptr = np.zeros(len(self._ids) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=len(self._ids)), out=self._indptr[1:])
+        self._delta.clear()
+        self._delta_size = 0
+        
+        self._top_ids.fill(-1)
+        self._top_scores.fill(0.0)
+        if not len(keys):
+            return
+        scores = self._similarity(rows, self._indices, self._data)
+        order = np.lexsort((-scores, rows))
+        rank = np.arange(len(order)) - self._indptr[rows[order]]
+        kept = rank < self.top_n
+        best, rank = order[kept], rank[kept]
+        self._top_ids[rows[best], rank] = self._indices[best]
+        self._top_scores[rows[best], rank] = scores[best]
+    
+    def _similarity(self, rows: np.ndarray, cols: np.ndarray, co_counts: np.ndarray) -> np.ndarray:
+        counts = self._counts.astype(np.float32)
+        return co_counts / np.sqrt(counts[rows] * counts[cols])
+    
+    def add_lease(self, lease) -> None:
+        """
+        Record a new lease.
+        
+        The neighbour lists of the lease's own items are refreshed at once;
+        other items pick up the changed lease counts at the next compaction.
+        
+        Args:
+            lease: Lease dict (with an ``items`` list) or list of item IDs
+        """
+        with self._lock:
+            codes = self._lease_codes(lease)
+            if not len(codes):
+                return
+            self._counts[codes] += 1
+            for i in codes.tolist():
+                row = self._delta.setdefault(i, {})
+                for j in codes.tolist():
+                    if i != j:
+                        row[j] = row.get(j, 0) + 1
+            self._delta_size += len(codes) * (len(codes) - 1)
+            if self._delta_size >= self.compact_after:
+                self.compact()
+            else:
+                self._refresh(codes)
+    
+    def compact(self) -> None:
+        """Fold pending increments into the CSR matrix and recompute all neighbours."""
+        with self._lock:
+            n_rows = len(self._indptr) - 1
+            rows = np.repeat(np.arange(n_rows, dtype=np.int64), np.diff(self._indptr))
+            keys = [(rows << _KEY_SHIFT) | self._indices.astype(np.int64)]
+            counts = [self._data.astype(np.float64)]
+            for i, row in self._delta.items():
+                keys.append((i << _KEY_SHIFT) | np.fromiter(row.keys(), np.int64, len(row)))
+                counts.append(np.fromiter(row.values(), np.float64, len(row)))
+            keys, inverse = np.unique(np.concatenate(keys), return_inverse=True)
+            counts = np.concatenate(counts)
+            counts = np.bincount(inverse, weights=counts, minlength=len(keys))
+            self._build(*self._prune(keys, counts))
+    
+    def _refresh(self, codes: np.ndarray) -> None:
+        """Recompute the neighbour lists of a few items from matrix + increments."""
+        n_rows = len(self._indptr) - 1
+        for i in codes.tolist():
+            cols, co_counts = [], []
+            if i < n_rows:
+                start, end = self._indptr[i], self._indptr[i + 1]
+                cols.append(self._indices[start:end].astype(np.int64))
+                co_counts.append(self._data[start:end])
+            row = self._delta.get(i, {})
+            cols.append(np.fromiter(row.keys(), np.int64, len(row)))
+            co_counts.append(np.fromiter(row.values(), np.float32, len(row)))
+            cols, inverse = np.unique(np.concatenate(cols), return_inverse=True)
+            co_counts = np.bincount(inverse, weights=np.concatenate(co_counts), minlength=len(cols))
+            scores = self._similarity(np.full(len(cols), i), cols, co_counts.astype(np.float32))
+            
+            top = min(self.top_n, len(cols))
+            best = np.argsort(-scores, kind='stable')[:top]
+            self._top_ids[i] = -1
+            self._top_scores[i] = 0.0
+            self._top_ids[i, :top] = cols[best]
+            self._top_scores[i, :top] = scores[best]
+    
+    def neighbours(self, item_id: str, top_n: Optional[int] = None) -> List[Tuple[str, float]]:
+        """
+        Return the items most often leased together with an item.
+        
+        Args:
+            item_id: Item to look up
+            top_n: Number of neighbours (at most the model's ``top_n``)
+        
+        Returns:
+            List of (item ID, similarity) pairs, most similar first
+        """
+        with self._lock:
+            code = self._codes.get(item_id)
+            if code is None:
+                return []
+            limit = min(top_n or self.top_n, self.top_n)
+            ids = self._top_ids[code, :limit]
+            scores = self._top_scores[code, :limit]
+            return [
+                (self._ids[j], round(float(score), 4))
+                for j, score in zip(ids.tolist(), scores.tolist()) if j >= 0
+            ]
+    
+    def stats(self) -> Dict[str, int]:
+        """
+        Return the model size.
+        
+        Returns:
+            Dictionary with item count, stored pairs, pending increments and
+            approximate bytes used by the arrays
+        """
+        with self._lock:
+            arrays = (
+                self._counts, self._indptr, self._indices, self._data,
+                self._top_ids, self._top_scores
+            )
+            return {
+                'items': len(self._ids),
+                'pairs': len(self._indices),
+                'pending_pairs': self._delta_size,
+                'bytes': int(sum(array.nbytes for array in arrays)),
+            }
@@ -0,0 +1,241 @@
+"""
+Append-only, memory-mapped store of per-image feature vectors.
+"""
+import fcntl
+import hashlib
+import json
+import os
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+
+VECTORS_FILE = 'vectors.f32'
+INDEX_FILE = 'index.bin'
+META_FILE = 'meta.json'
+
+INDEX_DTYPE = np.dtype([('digest', 'V16'), ('row', '<i8')])
+
+class FeatureStore:
+    """
+    Content-addressed store of fixed-width float32 vectors.
+    
+    Vectors are appended to a flat little-endian float32 file that is read
+    through ``np.memmap``, so opening a store copies nothing and lookups
+    return views into the page cache. A second append-only file holds one
+    (digest, row) record per vector and is loaded into a dict on open.
+    Records are written after their vector, so a crash can at worst leave
+    an unreferenced vector or a torn tail, both of which are trimmed on the
+    next open.
+    
+    Several processes may share a directory: appends hold an exclusive
+    ``flock`` on the vectors file, take their row numbers from its size
+    and first read the records other processes appended, so no row is
+    handed out twice and a key stored elsewhere is not stored again.
+    """
+    
+    def __init__(self, directory: str, dim: int, tag: str = ''):
+        """
+        Open or create a store.
+        
+        Args:
+            directory: Directory holding the store files
+            dim: Width of every vector
+            tag: Identifies what produced the vectors; reopening with a
+                different tag or width raises ValueError
+        """
+        if dim < 1:
+            raise ValueError("dim must be at least 1")
+        self.directory = directory
+        self.dim = int(dim)
+        self.tag = tag
+        os.makedirs(directory, exist_ok=True)
+        
+        self._check_meta()
+        self._lock = threading.Lock()
+        self._vectors_path = os.path.join(directory, VECTORS_FILE)
+        self._index_path = os.path.join(directory, INDEX_FILE)
+        
+        self._row_bytes = self.dim * 4
+        self._vector_file = open(self._vectors_path, 'ab')
+        self._index_file = open(self._index_path, 'ab')
+        self._rows = 0
+        self._index_read = 0
+        self._offsets: Dict[bytes, int] = {}
+        with self._file_lock():
+            rows = self._trim(self._vectors_path, self._row_bytes)
+            self._trim(self._index_path, INDEX_DTYPE.itemsize)
+            self._read_records()
+        self._offsets = {digest: row for digest, row in self._offsets.items() if row < rows}
+        self._rows = rows
+        self._view = self._map()
+    
+    def __len__(self) -> int:
+        return len(self._offsets)
+    
+    def __contains__(self, digest: bytes) -> bool:
+        return digest in self._offsets
+    
+    @staticmethod
+    def digest(data: bytes) -> bytes:
+        """
+        Return the content key for a blob.
+        
+        Args:
+            data: Raw file contents
+        
+        Returns:
+            16-byte BLAKE2b digest
+        """
+        return hashlib.blake2b(data, digest_size=16).digest()
+    
+    def get(self, digest: bytes) -> Optional[np.ndarray]:
+        """
+        Look up a vector.
+        
+        Args:
+            digest: Key from ``digest``
+        
+        Returns:
+            Read-only view of the stored vector, or None if absent
+        """
+        row = self._offsets.get(digest)
+        if row is None:
+            # Another process may have stored it since we last looked
+            with self._lock:
+                self._read_records()
+                row = self._offsets.get(digest)
+            if row is None:
+                return None
+        view = self._view
+        if row >= len(view):
+            with self._lock:
+                if row >= len(self._view):
+                    self._view = self._map()
+                view = self._view
+        return view[row]
+    
+    def put(self, digest: bytes, vector: np.ndarray) -> int:
+        """
+        Append a vector unless its key is already stored.
+        
+        Args:
+            digest: Key from ``digest``
+            vector: Array of shape (dim,)
+        
+        Returns:
+            Row of the stored vector
+        """
+        return self.put_many([digest], np.asarray(vector).reshape(1, -1))[0]
+    
+    def put_many(self, digests: Iterable[bytes], vectors: np.ndarray) -> list:
+        """
+        Append several vectors with one write per file.
+        
+        Args:
+            digests: Key per vector
+            vectors: Array of shape (n, dim)
+        
+        Returns:
+            Row of each vector
+        """
+        digests = list(digests)
+        vectors = np.asarray(vectors, dtype='<f4').reshape(len(digests), -1)
+        if vectors.shape[1] != self.dim:
+            raise ValueError(f"Expected vectors of width {self.dim}, got {vectors.shape[1]}")
+        
+        with self._lock:
+            if all(digest in self._offsets for digest in digests):
+                return [self._offsets[digest] for digest in digests]
+            with self._file_lock():
+                self._read_records()
+                size = os.fstat(self._vector_file.fileno()).st_size
+                if size % self._row_bytes:
+                    # A writer died mid-append; drop its partial vector
+                    self._vector_file.truncate(size - size % self._row_bytes)
+                base = size // self._row_bytes
+                
+                rows, fresh, seen = [], [], {}
+                for i, digest in enumerate(digests):
+                    row = self._offsets.get(digest, seen.get(digest))
+                    if row is None:
+                        row = seen[digest] = base + len(fresh)
+                        fresh.append(i)
+                    rows.append(row)
+                if not fresh:
+                    return rows
+                
+                records = np.empty(len(fresh), dtype=INDEX_DTYPE)
+                records['digest'] = [digests[i] for i in fresh]
+                records['row'] = np.arange(base, base + len(fresh))
+                self._vector_file.write(vectors[fresh].tobytes())
+                self._vector_file.flush()
+                self._index_file.write(records.tobytes())
+                self._index_file.flush()
+                self._index_read += records.nbytes
+            
+            self._rows = base + len(fresh)
+            self._offsets.update(seen)
+            return rows
+    
+    def close(self) -> None:
+        """Close the underlying files."""
+        with self._lock:
+            self._vector_file.close()
+            self._index_file.close()
+    
+    @contextmanager
+    def _file_lock(self):
+        """Hold the exclusive cross-process lock on the store."""
+        fcntl.flock(self._vector_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._vector_file.fileno(), fcntl.LOCK_UN)
+    
+    def _read_records(self) -> None:
+        """Load the index records appended since the last read."""
+        size = os.path.getsize(self._index_path)
+        size -= (size - self._index_read) % INDEX_DTYPE.itemsize
+        if size <= self._index_read:
+            return
+        with open(self._index_path, 'rb') as fh:
+            fh.seek(self._index_read)
+            records = np.frombuffer(fh.read(size - self._index_read), dtype=INDEX_DTYPE)
+        self._index_read = size
+        self._offsets.update(zip(records['digest'].tolist(), records['row'].tolist()))
+        if len(records):
+            self._rows = max(self._rows, int(records['row'].max()) + 1)
+    
+    def _map(self) -> np.ndarray:
+        """Map the vectors written so far."""
+        if self._rows == 0:
+            return np.empty((0, self.dim), dtype='<f4')
+        return np.memmap(self._vectors_path, dtype='<f4', mode='r', shape=(self._rows, self.dim))
+    
+    @staticmethod
+    def _trim(path: str, record_size: int) -> int:
+        """Drop a torn trailing record and return the number of whole records."""
+        if not os.path.exists(path):
+            open(path, 'wb').close()
+            return 0
+        size = os.path.getsize(path)
+        if size % record_size:
+            with open(path, 'r+b') as fh:
+                fh.truncate(size - size % record_size)
+        return size // record_size
+    
+    def _check_meta(self) -> None:
+        path = os.path.join(self.directory, META_FILE)
+        meta = {'dim': self.dim, 'tag': self.tag}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as fh:
+                stored = json.load(fh)
+            if stored != meta:
+                raise ValueError(
+                    f"Feature store at {self.directory} holds {stored}, expected {meta}"
+                )
+            return
+        with open(path, 'w', encoding='utf-8') as fh:
+            json.dump(meta, fh)
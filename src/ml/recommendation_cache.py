@@ -0,0 +1,256 @@
+"""
+Result cache for design recommendations.
+"""
+import json
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+class _Entry:
+    """A cached recommendation list and what is needed to invalidate it."""
+    
+    __slots__ = ('request', 'result', 'item_ids', 'min_score', 'full', 'context', 'expires', 'size')
+    
+    def __init__(self, request, result, context, expires, size):
+        self.request = request
+        self.result = result
+        self.item_ids = frozenset(item['id'] for item in result)
+        self.min_score = min((item.get('score', 0.0) for item in result), default=-math.inf)
+        self.full = len(result) >= int(request.get('top_k') or 0)
+        self.context = context
+        self.expires = expires
+        self.size = size
+
+class RecommendationCache:
+    """
+    LRU + TTL cache of recommendation lists keyed by a quantized request.
+    
+    Budgets are rounded down to ``budget_step`` and room dimensions down to
+    ``dimension_step`` before lookup, and results are computed for that
+    canonical request, so near-duplicate requests share an entry and a
+    cached answer never exceeds the caller's actual budget or room size.
+    
+    Entries are invalidated per item: when an item changes, every entry
+    that lists it is dropped, and every other entry is offered to a
+    predicate that decides whether the item's new state could now enter
+    that result.
+    """
+    
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl_seconds: float = 300.0,
+        budget_step: float = 25.0,
+        dimension_step: float = 0.5,
+        default_top_k: int = 10
+    ):
+        """
+        Initialize the cache.
+        
+        Args:
+            max_entries: Largest number of cached results
+            max_bytes: Approximate memory bound for cached results
+            ttl_seconds: Lifetime of an entry
+            budget_step: Budget quantization step
+            dimension_step: Room dimension quantization step
+            default_top_k: ``top_k`` assumed when a request does not set one
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.budget_step = budget_step
+        self.dimension_step = dimension_step
+        self.default_top_k = default_top_k
+        
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._by_item: Dict[Any, set] = {}
+        self._bytes = 0
+        self._counters = {
+            'hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'expirations': 0,
+            'invalidations': 0,
+        }
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    @staticmethod
+    def _floor(value, step: float) -> Optional[float]:
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            return None
+        if value <= 0:
+            return None
+        quantized = math.floor(value / step) * step if step > 0 else value
+        # Values below one step are kept as-is rather than collapsing to 0
+        return quantized if quantized > 0 else value
+    
+    def canonicalize(self, request: Dict) -> Tuple[Hashable, Dict]:
+        """
+        Normalize and quantize a request.
+        
+        Args:
+            request: ``get_recommendations`` arguments
+        
+        Returns:
+            Tuple of the cache key and the canonical request to compute
+        """
+        def normalize(value):
+            return None if value is None else str(value).strip().lower().replace(' ', '_')
+        
+        budget = self._floor(request.get('budget'), self.budget_step)
+        dimensions = request.get('dimensions') or None
+        if dimensions:
+            dimensions = {
+                key: self._floor(dimensions.get(key), self.dimension_step)
+                for key in ('length', 'width', 'height')
+            }
+        canonical = {
+            'space_type': normalize(request.get('space_type')),
+            'style_preference': normalize(request.get('style_preference')),
+            'budget': budget,
+            'dimensions': dimensions,
+            'top_k': int(request.get('top_k') or self.default_top_k),
+        }
+        key = (
+            canonical['space_type'],
+            canonical['style_preference'],
+            budget,
+            tuple(sorted(dimensions.items())) if dimensions else None,
+            canonical['top_k'],
+        )
+        return key, canonical
+    
+    def get(self, key: Hashable) -> Optional[List[Dict]]:
+        """
+        Look up a cached result.
+        
+        Args:
+            key: Key from ``canonicalize``
+        
+        Returns:
+            Copy of the cached recommendation list, or None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires <= time.monotonic():
+                self._remove(key)
+                self._counters['expirations'] += 1
+                entry = None
+            if entry is None:
+                self._counters['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._counters['hits'] += 1
+            return [dict(item) for item in entry.result]
+    
+    def put(
+        self,
+        key: Hashable,
+        request: Dict,
+        result: List[Dict],
+        context: Any = None,
+        is_current: Optional[Callable[[], bool]] = None
+    ) -> bool:
+        """
+        Store a result.
+        
+        Args:
+            key: Key from ``canonicalize``
+            request: Canonical request the result was computed for
+            result: Recommendation list
+            context: Opaque value handed back to invalidation predicates
+            is_current: Checked under the cache lock; the result is dropped
+                if it returns False (e.g. the catalog changed meanwhile)
+        
+        Returns:
+            True if the result was stored
+        """
+        result = [dict(item) for item in result]
+        size = len(json.dumps(result, default=str)) + 256
+        if size > self.max_bytes:
+            return False
+        with self._lock:
+            if is_current is not None and not is_current():
+                return False
+            if key in self._entries:
+                self._remove(key)
+            entry = _Entry(request, result, context, time.monotonic() + self.ttl_seconds, size)
+            self._entries[key] = entry
+            self._bytes += size
+            for item_id in entry.item_ids:
+                self._by_item.setdefault(item_id, set()).add(key)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self._counters['evictions'] += 1
+            return True
+    
+    def invalidate(
+        self,
+        item_id: Any,
+        may_enter: Optional[Callable[[_Entry], bool]] = None
+    ) -> int:
+        """
+        Drop the entries an item change could affect.
+        
+        Args:
+            item_id: ID of the changed item
+            may_enter: Predicate telling whether the item's new state could
+                appear in an entry's result; None only drops entries that
+                already list the item
+        
+        Returns:
+            Number of entries dropped
+        """
+        with self._lock:
+            stale = set(self._by_item.get(item_id, ()))
+            if may_enter is not None:
+                stale.update(
+                    key for key, entry in self._entries.items()
+                    if key not in stale and may_enter(entry)
+                )
+            for key in stale:
+                self._remove(key)
+            self._counters['invalidations'] += len(stale)
+            return len(stale)
+    
+    def clear(self) -> None:
+        """Drop every entry."""
+        with self._lock:
+            self._counters['invalidations'] += len(self._entries)
+            self._entries.clear()
+            self._by_item.clear()
+            self._bytes = 0
+    
+    def stats(self) -> Dict[str, float]:
+        """
+        Return cache counters and occupancy.
+        
+        Returns:
+            Dictionary with hit/miss/eviction/expiration/invalidation
+            counts, hit rate, entry count and approximate bytes
+        """
+        with self._lock:
+            stats = dict(self._counters)
+            lookups = stats['hits'] + stats['misses']
+            stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+            stats['entries'] = len(self._entries)
+            stats['bytes'] = self._bytes
+            return stats
+    
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+        for item_id in entry.item_ids:
+            keys = self._by_item.get(item_id)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_item[item_id]
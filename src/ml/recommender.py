@@ -1,31 +1,576 @@
 """
 Design recommendation engine using machine learning.
 """
+import os
+import threading
+import time
 import numpy as np
-from typing import List, Dict
+from datetime import date, datetime
+from typing import Any, Iterable, Iterator, List, Dict, NamedTuple, Optional
+
+from src.ml.ann_index import IVFIndex
+from src.ml.artifact import ModelArtifact, file_identity, load_artifact, save_artifact
+from src.ml.bundle_optimizer import optimize_bundle
+from src.ml.co_lease import CoLeaseModel
+from src.ml.recommendation_cache import RecommendationCache
+from src.ml.room_fit import UsableSpace, fit_mask, pack_floor, select_packable, usable_space
+from src.services.catalog_index import CatalogIndex, CatalogChange
+from src.services.quote_engine import default_quote_engine
+from src.utils.metrics import timed
+from src.utils.settings import get_settings
+
+# Relative weight of the style, space-type, price and size components
+DEFAULT_WEIGHTS = (0.4, 0.3, 0.2, 0.1)
+
+DEFAULT_TOP_K = 10
+
+# Identifies recommender parameters in a model artifact's metadata
+MODEL_FORMAT = 'design-recommender/1'
+
+# Random catalog items used as negatives for each positive training example
+DEFAULT_NEGATIVES = 4
+
+# Catalog changes in one notification above which the result cache is
+# cleared instead of checked entry by entry; each checked change scans
+# every entry under the cache lock, blocking lookups meanwhile
+CACHE_BULK_CHANGES = 32
+
+# Catalog size from which a built ANN index replaces the exact scan
+ANN_MIN_ITEMS = 50000
+
+# Largest share of the floor area a single item may cover and still get
+# a non-zero size-fit score
+MAX_FOOTPRINT_SHARE = 0.25
+
+# Share of the budget prefix below which only the items that pass the
+# availability and room-fit checks are gathered and scored
+PRUNED_SCORING_SHARE = 0.5
+
+# Candidates ranked per requested item when the result must also pack
+# onto the room's floor
+PACKING_CANDIDATES = 4
+
+# Default search time of the bundle optimizer per request
+BUNDLE_TIME_LIMIT_MS = 50.0
+
+# Times a bundle that does not fit on the floor is re-solved without its
+# largest item before the request is given up as infeasible
+BUNDLE_PACKING_ATTEMPTS = 10
+
+# Symmetric similarity between styles that combine well; unlisted pairs
+# of different styles score 0
+RELATED_STYLES = {
+    ('modern', 'contemporary'): 0.7,
+    ('modern', 'minimalist'): 0.6,
+    ('modern', 'mid-century'): 0.5,
+    ('modern', 'industrial'): 0.4,
+    ('contemporary', 'minimalist'): 0.5,
+    ('minimalist', 'scandinavian'): 0.6,
+    ('scandinavian', 'mid-century'): 0.5,
+    ('scandinavian', 'coastal'): 0.4,
+    ('industrial', 'rustic'): 0.4,
+    ('rustic', 'traditional'): 0.5,
+    ('bohemian', 'coastal'): 0.4,
+    ('bohemian', 'rustic'): 0.3,
+}
+
+# How well each furniture category suits each space type
+SPACE_FIT = {
+    'seating': {'living_room': 1.0, 'dining_room': 0.8, 'office': 0.7, 'outdoor': 0.6, 'bedroom': 0.3, 'kitchen': 0.4},
+    'tables': {'dining_room': 1.0, 'office': 0.8, 'living_room': 0.7, 'kitchen': 0.6, 'outdoor': 0.5, 'bedroom': 0.3},
+    'storage': {'bedroom': 0.8, 'office': 0.7, 'living_room': 0.6, 'kitchen': 0.6, 'bathroom': 0.6, 'dining_room': 0.5},
+    'beds': {'bedroom': 1.0},
+    'lighting': {'living_room': 0.8, 'bedroom': 0.8, 'office': 0.8, 'dining_room': 0.7, 'kitchen': 0.6, 'bathroom': 0.5, 'outdoor': 0.5},
+    'decor': {'living_room': 0.7, 'bedroom': 0.6, 'dining_room': 0.6, 'bathroom': 0.5, 'office': 0.5, 'kitchen': 0.4, 'outdoor': 0.4},
+}
+
+def _normalize(value: Optional[str]) -> Optional[str]:
+    """Normalize a user-supplied categorical value."""
+    if value is None:
+        return None
+    return str(value).strip().lower().replace(' ', '_')
+
+def _positive(value) -> float:
+    """Return a positive float, or NaN for missing and non-positive values."""
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return np.nan
+    return value if value > 0 else np.nan
+
+def _floor_area(dimensions: Optional[Dict[str, float]]) -> float:
+    """Return the room floor area, or NaN when dimensions are missing."""
+    if not dimensions:
+        return np.nan
+    return _positive(dimensions.get('length')) * _positive(dimensions.get('width'))
+
+def _preference_features(catalog: CatalogIndex, rows: np.ndarray) -> np.ndarray:
+    """
+    Encode the style and category columns of catalog rows.
+    
+    Style columns hold the item's StyleAnalyzer scores when it has them and
+    a one-hot of its style otherwise; category columns are one-hot. Must be
+    called with the catalog lock held.
+    """
+    n_styles, n_categories = len(catalog.styles), len(catalog.categories)
+    features = np.zeros((len(rows), n_styles + n_categories), dtype=np.float32)
+    positions = np.arange(len(rows))
+    style = catalog.style[rows].astype(np.int64)
+    known = (style >= 0) & (style < n_styles)
+    features[positions[known], style[known]] = 1.0
+    style_scores = catalog.style_scores[rows]
+    scored = ~np.isnan(style_scores[:, 0]) if n_styles else np.zeros(len(rows), dtype=bool)
+    features[scored, :n_styles] = style_scores[scored]
+    category = catalog.category[rows].astype(np.int64)
+    known = (category >= 0) & (category < n_categories)
+    features[positions[known], n_styles + category[known]] = 1.0
+    return features
+
+def _feature_matrix(preferences: np.ndarray, price: np.ndarray, footprint: np.ndarray) -> np.ndarray:
+    """Append the ``[price, has_dimensions, footprint, no_dimensions, 1]`` columns."""
+    has_dimensions = ~np.isnan(footprint)
+    offset = preferences.shape[1]
+    matrix = np.zeros((len(preferences), offset + _FeatureSnapshot.EXTRA_COLUMNS), dtype=np.float32)
+    matrix[:, :offset] = preferences
+    matrix[:, offset] = price
+    matrix[:, offset + 1] = has_dimensions
+    matrix[:, offset + 2] = np.where(has_dimensions, footprint, 0.0)
+    matrix[:, offset + 3] = ~has_dimensions
+    matrix[:, offset + 4] = 1.0
+    return matrix
+
+class _FeatureSnapshot:
+    """
+    Item-feature matrix and numeric columns for one catalog version.
+    
+    Matrix columns are the style columns (StyleAnalyzer scores, or a one-hot
+    of the style), the one-hot category codes, then ``[price, has_dimensions, footprint, no_dimensions, 1]`` so that
+    every scoring term is linear in the features and a whole batch of
+    requests is scored by one matrix product.
+    """
+    
+    EXTRA_COLUMNS = 5
+    
+    def __init__(self, catalog: CatalogIndex):
+        with catalog._lock:
+            n = len(catalog)
+            self.version = catalog.version
+            # Rows are laid out in ascending price order so that a budget
+            # filter is a prefix of the matrix
+            self.rows = catalog._price_order.copy()
+            preferences = _preference_features(catalog, self.rows)
+            self.price = catalog.price[self.rows]
+            self.active = catalog.active[self.rows]
+            self.category = catalog.category[self.rows]
+            dimensions = catalog.dimensions[self.rows].astype(np.float32)
+        
+        # Matrix position of each catalog row
+        self.position_of = np.empty(n, dtype=np.int64)
+        self.position_of[self.rows] = np.arange(n)
+        self.footprint = dimensions[:, 0] * dimensions[:, 1]
+        self.long_side = np.maximum(dimensions[:, 0], dimensions[:, 1])
+        self.short_side = np.minimum(dimensions[:, 0], dimensions[:, 1])
+        self.height = dimensions[:, 2]
+        self.matrix = _feature_matrix(preferences, self.price, self.footprint)
+        # Columns are consumed transposed by the batch product
+        self.matrix_t = np.ascontiguousarray(self.matrix.T)
+
+def _timestamp(value: Any) -> Optional[float]:
+    """Convert a datetime, date, ISO string or epoch number to epoch seconds."""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day).timestamp()
+    return datetime.fromisoformat(str(value)).timestamp()
+
+def _mini_batches(data: Iterable, batch_size: int) -> Iterator[List[Dict]]:
+    """Yield lists of examples from an iterable of examples or of batches."""
+    batch = []
+    for element in data:
+        if isinstance(element, dict):
+            batch.append(element)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+            continue
+        if batch:
+            yield batch
+            batch = []
+        yield list(element)
+    if batch:
+        yield batch
+
+class _ModelParams(NamedTuple):
+    """Learned parameters, swapped as one unit when a model is (re)loaded."""
+    weights: np.ndarray
+    style_affinity: np.ndarray
+    space_fit: np.ndarray
+
+def _reindex(matrix: np.ndarray, saved: tuple, current: tuple, default: np.ndarray) -> np.ndarray:
+    """
+    Map a saved matrix onto the current row/column labels.
+    
+    Returns ``matrix`` itself (no copy) when the labels match; otherwise a
+    copy of ``default`` with the entries for shared labels filled in.
+    """
+    if all(list(a) == list(b) for a, b in zip(saved, current)):
+        return matrix
+    aligned = default.copy()
+    index = []
+    for saved_labels, labels in zip(saved, current):
+        positions = {label: i for i, label in enumerate(saved_labels)}
+        shared = [label for label in labels if label in positions]
+        index.append((
+            [labels.index(label) for label in shared],
+            [positions[label] for label in shared],
+        ))
+    (rows, saved_rows), (cols, saved_cols) = index
+    aligned[np.ix_(rows, cols)] = matrix[np.ix_(saved_rows, saved_cols)]
+    return aligned
 
 class DesignRecommender:
     """
     AI-powered design recommendation system.
     """
     
-    def __init__(self, model_path: str = None):
+    def __init__(
+        self,
+        model_path: str = None,
+        catalog: Optional[CatalogIndex] = None,
+        ann_index: Optional[IVFIndex] = None,
+        ann_min_items: int = ANN_MIN_ITEMS,
+        cache: Optional[RecommendationCache] = None,
+        reload_interval: Optional[float] = None,
+        co_lease: Optional[CoLeaseModel] = None,
+        bundle_time_limit_ms: float = BUNDLE_TIME_LIMIT_MS
+    ):
         """
         Initialize the recommender with a pre-trained model.
         
         Args:
             model_path: Path to the trained model file
+            catalog: Catalog index to recommend from (empty by default)
+            ann_index: Approximate index used for large catalogs once built
+            ann_min_items: Catalog size from which the ANN index is used
+            cache: Result cache consulted before scoring
+            reload_interval: Seconds between checks of ``model_path`` for a
+                replaced artifact (None disables hot reloading)
+            co_lease: Co-lease model behind ``get_also_leased``
+            bundle_time_limit_ms: Search time allowed per ``get_bundle`` call
         """
-        self.model = None
+        self.model: Optional[ModelArtifact] = None
         self.model_path = model_path
-        # TODO: Load pre-trained model
+        self.catalog = catalog if catalog is not None else CatalogIndex()
+        
+        self.styles = list(self.catalog.styles)
+        self.categories = list(self.catalog.categories)
+        self.space_types = list(get_settings().space_types)
+        self._params = self._default_params()
+        self.model_version = 0
+        
+        self._style_codes = {style: i for i, style in enumerate(self.styles)}
+        self._space_codes = {space: i for i, space in enumerate(self.space_types)}
+        self._snapshot: Optional[_FeatureSnapshot] = None
+        self._snapshot_lock = threading.Lock()
+        
+        self.ann_index = ann_index if ann_index is not None else IVFIndex()
+        self.ann_min_items = ann_min_items
+        self.cache = cache
+        self.co_lease = co_lease if co_lease is not None else CoLeaseModel()
+        self.bundle_time_limit_ms = bundle_time_limit_ms
+        self.catalog.subscribe(self._on_catalog_change)
+        
+        self.reload_interval = reload_interval
+        self._next_reload_check = 0.0
+        self._reload_lock = threading.Lock()
+        self._rejected_identity = None
+        if model_path and os.path.exists(model_path):
+            self.load_model(model_path)
+    
+    @property
+    def weights(self) -> np.ndarray:
+        """Relative weight of the style, space-type, price and size terms."""
+        return self._params.weights
+    
+    @property
+    def style_affinity(self) -> np.ndarray:
+        """Style-by-style affinity matrix."""
+        return self._params.style_affinity
+    
+    @property
+    def space_fit(self) -> np.ndarray:
+        """Category-by-space-type fit matrix."""
+        return self._params.space_fit
+    
+    def _default_params(self) -> _ModelParams:
+        return _ModelParams(
+            np.array(DEFAULT_WEIGHTS, dtype=np.float64),
+            self._build_style_affinity(self.styles),
+            self._build_space_fit(self.categories, self.space_types)
+        )
+    
+    def _set_params(self, params: _ModelParams) -> None:
+        """Swap in new parameters and drop results computed with the old ones."""
+        self._params = params
+        # Bumped before clearing so in-flight results are refused by the cache
+        self.model_version += 1
+        if self.cache is not None:
+            self.cache.clear()
+    
+    @staticmethod
+    def _build_style_affinity(styles: List[str]) -> np.ndarray:
+        """Build the symmetric style-to-style affinity matrix."""
+        codes = {style: i for i, style in enumerate(styles)}
+        affinity = np.eye(len(styles), dtype=np.float64)
+        for (a, b), value in RELATED_STYLES.items():
+            if a in codes and b in codes:
+                affinity[codes[a], codes[b]] = affinity[codes[b], codes[a]] = value
+        return affinity
+    
+    @staticmethod
+    def _build_space_fit(categories: List[str], space_types: List[str]) -> np.ndarray:
+        """Build the category-by-space-type fit matrix."""
+        fit = np.zeros((len(categories), len(space_types)), dtype=np.float64)
+        for i, category in enumerate(categories):
+            for j, space_type in enumerate(space_types):
+                fit[i, j] = SPACE_FIT.get(category, {}).get(space_type, 0.0)
+        return fit
+    
+    def _features(self) -> _FeatureSnapshot:
+        """Return the item-feature snapshot, rebuilding it if the catalog changed."""
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.version == self.catalog.version:
+            return snapshot
+        with self._snapshot_lock:
+            if self._snapshot is None or self._snapshot.version != self.catalog.version:
+                self._snapshot = _FeatureSnapshot(self.catalog)
+            return self._snapshot
+    
+    def warm_up(self) -> None:
+        """
+        Build the feature snapshot and run one request through the scorer.
+        
+        Also builds the ANN index when the catalog is large enough to use
+        it, so the first live request does not pay for either.
+        """
+        features = self._features()
+        if len(features.rows) >= self.ann_min_items and not self.ann_index.is_built:
+            self.build_ann_index()
+        self._recommend(features, [{'top_k': 1}])
+    
+    def _query_terms(self, request: Dict, params: _ModelParams) -> np.ndarray:
+        """
+        Build one unweighted query vector per scoring term.
+        
+        Row ``j`` dotted with an item's feature row gives term ``j`` of its
+        score, so ``weights @ terms`` is the query vector.
+        """
+        n_styles = len(self.styles)
+        offset = n_styles + len(self.categories)
+        terms = np.zeros((len(DEFAULT_WEIGHTS), offset + _FeatureSnapshot.EXTRA_COLUMNS))
+        
+        style = self._style_codes.get(_normalize(request.get('style_preference')))
+        if style is not None:
+            terms[0, :n_styles] = params.style_affinity[style]
+        space = self._space_codes.get(_normalize(request.get('space_type')))
+        if space is not None:
+            terms[1, n_styles:offset] = params.space_fit[:, space]
+        
+        # Price: 1 - price / budget
+        budget = _positive(request.get('budget'))
+        if budget > 0:
+            terms[2, offset] = -1.0 / budget
+            terms[2, offset + 4] = 1.0
+        
+        # Size: 1 - footprint / (MAX_FOOTPRINT_SHARE * area), and a neutral
+        # 1/2 for items without dimensions
+        area = _floor_area(request.get('dimensions'))
+        if area > 0:
+            terms[3, offset + 1] = 1.0
+            terms[3, offset + 2] = -1.0 / (MAX_FOOTPRINT_SHARE * area)
+            terms[3, offset + 3] = 0.5
+        return terms
+    
+    def _query_vector(self, request: Dict) -> np.ndarray:
+        """Build the weighted query vector matching the feature matrix columns."""
+        params = self._params
+        return (params.weights @ self._query_terms(request, params)).astype(np.float32)
+    
+    @staticmethod
+    def _budget_cutoff(features: _FeatureSnapshot, request: Dict) -> int:
+        """Return the length of the price-ordered prefix within budget."""
+        budget = _positive(request.get('budget'))
+        if budget > 0:
+            return int(np.searchsorted(features.price, budget, side='right'))
+        return len(features.rows)
+    
+    @staticmethod
+    def _eligible(features: _FeatureSnapshot, positions, space: Optional[UsableSpace]) -> np.ndarray:
+        """Return which items at ``positions`` are available and fit the room."""
+        eligible = features.active[positions]
+        if space is not None:
+            eligible = eligible & fit_mask(
+                features.long_side[positions],
+                features.short_side[positions],
+                features.height[positions],
+                space
+            )
+        return eligible
+    
+    def _score_batch(self, features: _FeatureSnapshot, requests: List[Dict], spaces: List[Optional[UsableSpace]]):
+        """
+        Score catalog items for a batch of requests.
+        
+        All scoring terms come from one (requests x features) @ (features x
+        items) product. Because items are in price order, each request only
+        needs the prefix of items within its budget. Availability and room
+        fit are checked on that prefix before scoring; when few items pass,
+        only their columns are gathered into the product and ranked,
+        otherwise the whole prefix is scored and the rest get -inf.
+        
+        Returns:
+            Per request, a tuple of the scored matrix positions (None for
+            the whole within-budget prefix) and their scores
+        """
+        cutoffs = [self._budget_cutoff(features, request) for request in requests]
+        masks = [
+            self._eligible(features, slice(0, cutoff), space)
+            for cutoff, space in zip(cutoffs, spaces)
+        ]
+        width = max(cutoffs)
+        union = np.zeros(width, dtype=bool)
+        for mask in masks:
+            union[:len(mask)] |= mask
+        columns = np.flatnonzero(union)
+        queries = np.stack([self._query_vector(request) for request in requests])
+        
+        if len(columns) < PRUNED_SCORING_SHARE * width:
+            scores = queries @ features.matrix_t[:, columns]
+            scored = []
+            for row, cutoff, mask in zip(scores, cutoffs, masks):
+                within = int(np.searchsorted(columns, cutoff))
+                keep = mask[columns[:within]]
+                scored.append((columns[:within][keep], row[:within][keep]))
+            return scored
+        
+        scores = queries @ features.matrix_t[:, :width]
+        scored = []
+        for row, cutoff, mask in zip(scores, cutoffs, masks):
+            row = row[:cutoff]
+            if np.count_nonzero(mask) < PRUNED_SCORING_SHARE * cutoff:
+                # Ranking only the eligible items is cheaper than ranking
+                # a row that is mostly -inf
+                positions = np.flatnonzero(mask)
+                scored.append((positions, row[positions]))
+            else:
+                row[~mask] = -np.inf
+                scored.append((None, row))
+        return scored
+    
+    def _score_candidates(self, features: _FeatureSnapshot, request: Dict, space: Optional[UsableSpace]):
+        """
+        Score only the ANN candidates for one request.
+        
+        Returns:
+            Tuple of eligible candidate matrix positions and their scores
+        """
+        query = self._query_vector(request)
+        rows = self.ann_index.candidates(query[:len(self.styles) + len(self.categories)])
+        # Items added after this snapshot was taken are picked up next time
+        rows = rows[rows < len(features.position_of)]
+        positions = features.position_of[rows]
+        positions = positions[positions < self._budget_cutoff(features, request)]
+        positions = positions[self._eligible(features, positions, space)]
+        return positions, features.matrix[positions] @ query
+    
+    def _use_ann(self, features: _FeatureSnapshot) -> bool:
+        return self.ann_index.is_built and len(features.rows) >= self.ann_min_items
+    
+    def build_ann_index(self) -> None:
+        """
+        Build (or rebuild) the ANN index from the current catalog.
+        
+        Items added or updated afterwards are inserted incrementally; a
+        rebuild re-trains the cells once the catalog has drifted.
+        """
+        features = self._features()
+        if len(features.rows) == 0:
+            return
+        n_preferences = len(self.styles) + len(self.categories)
+        self.ann_index.build(features.rows, features.matrix[:, :n_preferences])
+    
+    def _on_catalog_change(self, changes: List[CatalogChange]) -> None:
+        """Keep the ANN index and the result cache in step with the catalog."""
+        if self.cache is not None and len(changes) > CACHE_BULK_CHANGES:
+            self.cache.clear()
+        if not self.ann_index.is_built and (self.cache is None or len(changes) > CACHE_BULK_CHANGES):
+            return
+        
+        rows = np.array([row for row, _, _ in changes], dtype=np.int64)
+        with self.catalog._lock:
+            preferences = _preference_features(self.catalog, rows)
+            price = self.catalog.price[rows]
+            active = self.catalog.active[rows]
+            dimensions = self.catalog.dimensions[rows]
+        
+        if self.ann_index.is_built:
+            for row, vector in zip(rows, preferences):
+                self.ann_index.add(int(row), vector)
+        
+        if self.cache is not None and len(changes) <= CACHE_BULK_CHANGES:
+            footprint = dimensions[:, 0] * dimensions[:, 1]
+            vectors = _feature_matrix(preferences, price, footprint)
+            for (_, _, item), vector, item_price, item_footprint, item_active in zip(
+                changes, vectors, price, footprint, active
+            ):
+                self.cache.invalidate(
+                    item['id'],
+                    self._admission_check(vector, item_price, item_footprint, item_active)
+                )
+    
+    @staticmethod
+    def _admission_check(vector, price, footprint, active):
+        """
+        Build a cache predicate telling whether an item in its new state could
+        appear in a cached result.
+        """
+        def may_enter(entry) -> bool:
+            if not active:
+                return False
+            budget = _positive(entry.request.get('budget'))
+            if budget > 0 and price > budget:
+                return False
+            area = _floor_area(entry.request.get('dimensions'))
+            if area > 0 and footprint > area:
+                return False
+            if not entry.full:
+                return True
+            # entry.context is the request's query vector
+            return float(entry.context @ vector) >= entry.min_score - 1e-4
+        return may_enter
     
+    @staticmethod
+    def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+        """Return indices of the k best finite scores, best first."""
+        eligible = int(np.count_nonzero(np.isfinite(scores)))
+        k = min(k, eligible)
+        if k <= 0:
+            return np.empty(0, dtype=np.int64)
+        top = np.argpartition(scores, len(scores) - k)[-k:]
+        return top[np.argsort(-scores[top], kind='stable')]
+    
+    @timed('recommender.get_recommendations')
     def get_recommendations(
         self,
         space_type: str,
         style_preference: str,
         budget: float,
-        dimensions: Dict[str, float]
+        dimensions: Dict[str, float],
+        top_k: int = DEFAULT_TOP_K
     ) -> List[Dict]:
         """
         Generate design recommendations based on user preferences.
@@ -35,31 +580,522 @@ class DesignRecommender:
             style_preference: Preferred interior style (modern, vintage, minimalist, etc.)
             budget: Available budget
             dimensions: Room dimensions (length, width, height)
+            top_k: Maximum number of items to return
         
         Returns:
             List of recommended furniture and decor items
         """
-        # TODO: Implement ML-based recommendation logic
-        recommendations = []
+        return self.get_recommendations_batch([{
+            'space_type': space_type,
+            'style_preference': style_preference,
+            'budget': budget,
+            'dimensions': dimensions,
+            'top_k': top_k,
+        }])[0]
+    
+    def get_also_leased(self, item_id: str, top_k: int = DEFAULT_TOP_K) -> List[Dict]:
+        """
+        Suggest items that are often leased together with an item.
+        
+        Args:
+            item_id: ID of the item being viewed
+            top_k: Maximum number of items to return
+        
+        Returns:
+            Active catalog items with a co-lease ``score``, most similar first
+        """
+        suggestions = []
+        for neighbour_id, score in self.co_lease.neighbours(item_id):
+            row = self.catalog.row_of(neighbour_id)
+            if row is None or not self.catalog.active[row]:
+                continue
+            item = self.catalog.items([row])[0]
+            item['score'] = score
+            suggestions.append(item)
+            if len(suggestions) >= top_k:
+                break
+        return suggestions
+    
+    def get_bundle(
+        self,
+        space_type: str,
+        style_preference: Optional[str],
+        monthly_budget: float,
+        dimensions: Optional[Dict[str, float]] = None,
+        duration_months: int = 1
+    ) -> Dict:
+        """
+        Furnish a room with one item per required category within a monthly budget.
+        
+        The categories a space type needs come from ``bundle_categories`` in
+        the settings file. Items are scored as for ``get_recommendations``
+        and the bundle with the highest total score whose discounted monthly
+        cost fits the budget is searched for within the configured time
+        limit, falling back to the best bundle found so far. With room
+        dimensions the bundle also fits on the floor together.
+        
+        Args:
+            space_type: Type of space (bedroom, living room, office, etc.)
+            style_preference: Preferred interior style
+            monthly_budget: Largest monthly lease cost
+            dimensions: Room dimensions (length, width, height)
+            duration_months: Lease length, selecting the discount tier
+        
+        Returns:
+            Dictionary with the chosen ``items`` (each with its ``score``),
+            the required ``categories``, the ``discount`` applied, the
+            discounted ``monthly_cost`` and a ``status`` of ``optimal``,
+            ``time_limit`` (best bundle found in time) or ``infeasible``
+            (no bundle fits the budget or the room; ``items`` is empty)
+        """
+        deadline = time.perf_counter() + self.bundle_time_limit_ms / 1000.0
+        self._maybe_reload()
+        settings = get_settings()
+        categories = list(settings.bundle_categories.get(_normalize(space_type), ()))
+        # Priced like the lease itself would be, from the same discount table
+        quotes = default_quote_engine()
+        discount = quotes.discount_rate(duration_months)
+        list_budget = float(monthly_budget) / (1.0 - discount)
+        bundle = {
+            'items': [],
+            'categories': categories,
+            'duration_months': duration_months,
+            'discount': discount,
+            'monthly_cost': 0.0,
+            'status': 'infeasible',
+        }
+        features = self._features()
+        if not categories or len(features.rows) == 0:
+            return bundle
+        
+        space = usable_space(dimensions, space_type)
+        request = {
+            'space_type': space_type,
+            'style_preference': style_preference,
+            'budget': list_budget,
+            'dimensions': dimensions,
+        }
+        positions, scores = self._score_batch(features, [request], [space])[0]
+        if positions is None:
+            positions = np.arange(len(scores))
+        eligible = np.isfinite(scores)
+        positions, scores = positions[eligible], scores[eligible]
+        codes = features.category[positions]
+        candidates = [
+            np.flatnonzero(codes == self.catalog.category_codes.get(_normalize(category), -1))
+            for category in categories
+        ]
+        
+        excluded = np.zeros(len(positions), dtype=bool)
+        for _ in range(BUNDLE_PACKING_ATTEMPTS):
+            pools = [pool[~excluded[pool]] for pool in candidates]
+            solution = optimize_bundle(
+                [scores[pool] for pool in pools],
+                [features.price[positions[pool]] for pool in pools],
+                list_budget,
+                max(deadline - time.perf_counter(), 0.0)
+            )
+            if solution is None:
+                return bundle
+            chosen = np.array([pool[j] for pool, j in zip(pools, solution.choice)])
+            chosen_positions = positions[chosen]
+            if space is not None:
+                sized = ~np.isnan(features.footprint[chosen_positions])
+                footprints = np.stack([
+                    features.long_side[chosen_positions[sized]],
+                    features.short_side[chosen_positions[sized]]
+                ], axis=1)
+                if pack_floor(footprints.tolist(), space) is None:
+                    largest = np.argmax(np.where(sized, features.footprint[chosen_positions], -1.0))
+                    excluded[chosen[largest]] = True
+                    continue
+            
+            items = self.catalog.items(features.rows[chosen_positions])
+            for item, score in zip(items, scores[chosen]):
+                item['score'] = round(float(score), 4)
+            bundle.update(
+                items=items,
+                monthly_cost=int(quotes.quote_leases(
+                    [features.price[chosen_positions].tolist()], [duration_months]
+                )['monthly_cents'][0]) / 100,
+                status='optimal' if solution.optimal else 'time_limit'
+            )
+            return bundle
+        return bundle
+    
+    @timed('recommender.get_recommendations_batch')
+    def get_recommendations_batch(self, requests: List[Dict]) -> List[List[Dict]]:
+        """
+        Generate recommendations for many requests in one scoring pass.
+        
+        Args:
+            requests: Dictionaries with the ``get_recommendations`` arguments
+                (``space_type``, ``style_preference``, ``budget``,
+                ``dimensions`` and optionally ``top_k``)
+        
+        Returns:
+            One recommendation list per request, in request order
+        """
+        if not requests:
+            return []
+        self._maybe_reload()
+        if self.cache is None:
+            return self._recommend(self._features(), requests)
         
-        return recommendations
+        canonical = [self.cache.canonicalize(request) for request in requests]
+        results = [self.cache.get(key) for key, _ in canonical]
+        missing = {}
+        for position, ((key, request), result) in enumerate(zip(canonical, results)):
+            if result is None:
+                missing.setdefault(key, (request, []))[1].append(position)
+        if not missing:
+            return results
+        
+        features = self._features()
+        model_version = self.model_version
+        pending = list(missing.items())
+        computed = self._recommend(features, [request for _, (request, _) in pending])
+        for (key, (request, positions)), result in zip(pending, computed):
+            self.cache.put(
+                key,
+                request,
+                result,
+                context=self._query_vector(request),
+                is_current=lambda: (
+                    self.catalog.version == features.version
+                    and self.model_version == model_version
+                )
+            )
+            for position in positions:
+                results[position] = [dict(item) for item in result]
+        return results
+    
+    def _recommend(self, features: _FeatureSnapshot, requests: List[Dict]) -> List[List[Dict]]:
+        """Score and rank the catalog snapshot for a batch of requests."""
+        if len(features.rows) == 0:
+            return [[] for _ in requests]
+        
+        spaces = [
+            usable_space(request.get('dimensions'), request.get('space_type'))
+            for request in requests
+        ]
+        if self._use_ann(features):
+            scored = [
+                self._score_candidates(features, request, space)
+                for request, space in zip(requests, spaces)
+            ]
+        else:
+            scored = self._score_batch(features, requests, spaces)
+        
+        results = []
+        for request, space, (positions, row_scores) in zip(requests, spaces, scored):
+            k = int(request.get('top_k') or DEFAULT_TOP_K)
+            if space is None:
+                top = self._top_k(row_scores, k)
+            else:
+                # Rank a few extra candidates so items that would not fit
+                # on the floor next to better-ranked ones can be replaced
+                top = self._top_k(row_scores, k * PACKING_CANDIDATES)
+                top_positions = top if positions is None else positions[top]
+                footprints = np.stack(
+                    [features.long_side[top_positions], features.short_side[top_positions]], axis=1
+                )
+                top = top[select_packable(footprints.tolist(), k, space)]
+            top_positions = top if positions is None else positions[top]
+            recommendations = self.catalog.items(features.rows[top_positions])
+            for item, score in zip(recommendations, row_scores[top]):
+                item['score'] = round(float(score), 4)
+            results.append(recommendations)
+        
+        return results
     
-    def train(self, training_data: List[Dict]) -> None:
+    def train(
+        self,
+        training_data: Iterable,
+        learning_rate: float = 0.1,
+        l2: float = 1e-4,
+        batch_size: int = 256,
+        negatives: int = DEFAULT_NEGATIVES,
+        checkpoint_path: Optional[str] = None,
+        checkpoint_every: int = 100,
+        resume: bool = False,
+        since: Any = None,
+        seed: int = 0
+    ) -> Dict:
         """
-        Train the recommendation model.
+        Train the recommendation model incrementally.
+        
+        Each example is an interaction: ``item_id``, the request fields
+        (``space_type``, ``style_preference``, ``budget``, ``dimensions``),
+        an optional ``label`` (1 for a lease, 0 for an item shown but not
+        taken; default 1) and an optional ``timestamp``. Every positive is
+        paired with ``negatives`` random catalog items labelled 0.
+        
+        The term weights are fitted by logistic regression with one AdaGrad
+        step per mini-batch, so ``training_data`` can be a generator of
+        examples or of mini-batches covering any amount of history: only
+        one batch is held in memory at a time.
+        
+        With ``checkpoint_path`` the model, optimizer state and the latest
+        timestamp processed (the cursor) are saved every
+        ``checkpoint_every`` batches and at the end. The checkpoint is a
+        regular model artifact. ``resume=True`` continues from it and skips
+        examples at or before its cursor, so a nightly refresh only
+        processes new leases. Every batch of a run is filtered against the
+        cursor the run started from, so examples with equal or out-of-order
+        timestamps are all used; the cursor advances to the latest
+        timestamp seen only when the run finishes, and resuming an
+        interrupted run processes its examples again.
         
         Args:
-            training_data: Historical data for training
+            training_data: Iterable of examples or of lists of examples
+            learning_rate: AdaGrad base step size
+            l2: L2 penalty on the weights
+            batch_size: Examples per step when examples are given one by one
+            negatives: Random negatives drawn per positive example
+            checkpoint_path: Where to save checkpoints (None disables)
+            checkpoint_every: Batches between checkpoints
+            resume: Continue from ``checkpoint_path`` if it exists
+            since: Skip examples with a timestamp at or before this one
+            seed: Seed for negative sampling
+        
+        Returns:
+            Dictionary with examples used, examples skipped, batches, mean
+            loss, the cursor and the resulting weights
+        """
+        weights = np.array(self._params.weights, dtype=np.float64)
+        # Start at the log-odds of the sampled base rate (1 positive per
+        # ``negatives`` negatives) so early steps move the term weights
+        # rather than all pushing them down to fit the bias
+        bias = -float(np.log(negatives)) if negatives > 0 else 0.0
+        grad_sq = np.zeros(len(weights) + 1)
+        progress = {'examples': 0, 'batches': 0, 'cursor': _timestamp(since)}
+        if resume and checkpoint_path and os.path.exists(checkpoint_path):
+            self.load_model(checkpoint_path)
+            weights = np.array(self.model['weights'], dtype=np.float64)
+            if 'bias' in self.model:
+                bias = float(self.model['bias'][0])
+                grad_sq = np.array(self.model['grad_sq'], dtype=np.float64)
+            saved = self.model.metadata.get('training', {})
+            progress['examples'] = saved.get('examples', 0)
+            progress['batches'] = saved.get('batches', 0)
+            if saved.get('cursor') is not None:
+                progress['cursor'] = max(progress['cursor'] or saved['cursor'], saved['cursor'])
+        
+        rng = np.random.default_rng([seed, progress['batches']])
+        skipped, loss_sum, loss_batches = 0, 0.0, 0
+        cursor = latest = progress['cursor']
+        for batch in _mini_batches(training_data, batch_size):
+            stamps = [_timestamp(example.get('timestamp')) for example in batch]
+            kept = [
+                example for example, stamp in zip(batch, stamps)
+                if cursor is None or stamp is None or stamp > cursor
+            ]
+            terms, labels, used = self._training_terms(kept, negatives, rng)
+            skipped += len(batch) - used
+            if used:
+                logits = terms @ weights + bias
+                errors = 1.0 / (1.0 + np.exp(-np.clip(logits, -30.0, 30.0))) - labels
+                gradient = np.append(terms.T @ errors / len(labels) + l2 * weights, errors.mean())
+                grad_sq += gradient ** 2
+                step = learning_rate * gradient / (np.sqrt(grad_sq) + 1e-8)
+                # Term weights stay non-negative so every term keeps its meaning
+                weights = np.maximum(weights - step[:-1], 0.0)
+                bias -= step[-1]
+                loss_sum += float(np.mean(np.logaddexp(0.0, logits) - labels * logits))
+                loss_batches += 1
+            
+            progress['examples'] += used
+            progress['batches'] += 1
+            known = [stamp for stamp in stamps if stamp is not None]
+            if known:
+                latest = max(known + ([latest] if latest is not None else []))
+            if checkpoint_path and progress['batches'] % checkpoint_every == 0:
+                self._save_checkpoint(checkpoint_path, weights, bias, grad_sq, progress)
+        
+        progress['cursor'] = latest
+        self._set_params(self._params._replace(weights=weights))
+        if checkpoint_path:
+            self._save_checkpoint(checkpoint_path, weights, bias, grad_sq, progress)
+        return {
+            'examples': progress['examples'],
+            'skipped': skipped,
+            'batches': progress['batches'],
+            'loss': loss_sum / loss_batches if loss_batches else None,
+            'cursor': progress['cursor'],
+            'weights': weights.tolist(),
+        }
+    
+    def _training_terms(self, examples: List[Dict], negatives: int, rng: np.random.Generator):
         """
-        # TODO: Implement training logic
-        pass
+        Compute the per-term scores of labelled (request, item) pairs.
+        
+        Returns:
+            Tuple of a (pairs, terms) matrix, the labels, and the number of
+            examples whose item is in the catalog
+        """
+        rows, requests, labels = [], [], []
+        used, n_items = 0, len(self.catalog)
+        for example in examples:
+            row = self.catalog.row_of(example.get('item_id'))
+            if row is None:
+                continue
+            used += 1
+            label = float(example.get('label', 1))
+            rows.append(row)
+            requests.append(example)
+            labels.append(label)
+            if label > 0 and negatives > 0 and n_items > 1:
+                rows.extend(rng.integers(0, n_items, negatives).tolist())
+                requests.extend([example] * negatives)
+                labels.extend([0.0] * negatives)
+        if not rows:
+            return np.empty((0, len(DEFAULT_WEIGHTS))), np.empty(0), 0
+        
+        rows = np.array(rows, dtype=np.int64)
+        with self.catalog._lock:
+            preferences = _preference_features(self.catalog, rows)
+            price = self.catalog.price[rows]
+            dimensions = self.catalog.dimensions[rows]
+        features = _feature_matrix(preferences, price, dimensions[:, 0] * dimensions[:, 1])
+        
+        params = self._params
+        query_terms, cached = [], {}
+        for request in requests:
+            if id(request) not in cached:
+                cached[id(request)] = self._query_terms(request, params)
+            query_terms.append(cached[id(request)])
+        terms = np.einsum('mjd,md->mj', np.stack(query_terms), features.astype(np.float64))
+        return terms, np.array(labels), used
+    
+    def _save_checkpoint(self, path, weights, bias, grad_sq, progress) -> None:
+        """Save the model with the optimizer state and training progress."""
+        self._save(
+            path,
+            self._params._replace(weights=weights),
+            {'bias': np.array([bias]), 'grad_sq': grad_sq},
+            {'training': dict(progress)}
+        )
     
     def save_model(self, path: str) -> None:
         """
         Save the trained model to disk.
         
+        The file is a memory-mappable artifact (see ``src.ml.artifact``) and
+        replaces ``path`` atomically, so workers polling it with
+        ``reload_model_if_changed`` pick it up without a restart.
+        
         Args:
             path: File path to save the model
         """
-        # TODO: Implement model saving
-        pass
+        self._save(path, self._params)
+    
+    def _save(
+        self,
+        path: str,
+        params: _ModelParams,
+        arrays: Optional[Dict[str, np.ndarray]] = None,
+        metadata: Optional[Dict] = None
+    ) -> None:
+        save_artifact(
+            path,
+            {
+                'weights': params.weights,
+                'style_affinity': params.style_affinity,
+                'space_fit': params.space_fit,
+                **(arrays or {}),
+            },
+            {
+                'model': MODEL_FORMAT,
+                'styles': self.styles,
+                'categories': self.categories,
+                'space_types': self.space_types,
+                **(metadata or {}),
+            }
+        )
+    
+    def load_model(self, path: str) -> None:
+        """
+        Load a saved model and swap it in for subsequent requests.
+        
+        The parameters stay memory-mapped (shared between processes) unless
+        the artifact was saved with different style, category or space-type
+        labels, in which case they are re-indexed into a private copy.
+        
+        Args:
+            path: File path of a model saved by ``save_model``
+        
+        Raises:
+            ValueError: If the file is not a valid recommender artifact
+        """
+        artifact = load_artifact(path)
+        metadata = artifact.metadata
+        if metadata.get('model') != MODEL_FORMAT:
+            raise ValueError(f"{path} is not a {MODEL_FORMAT} artifact")
+        shapes = {
+            'weights': (len(DEFAULT_WEIGHTS),),
+            'style_affinity': (len(metadata.get('styles', [])),) * 2,
+            'space_fit': (len(metadata.get('categories', [])), len(metadata.get('space_types', []))),
+        }
+        for name, shape in shapes.items():
+            if name not in artifact or artifact[name].shape != shape:
+                raise ValueError(f"{path} has a malformed {name!r} array")
+        
+        defaults = self._default_params()
+        params = _ModelParams(
+            artifact['weights'],
+            _reindex(
+                artifact['style_affinity'],
+                (metadata['styles'], metadata['styles']),
+                (self.styles, self.styles),
+                defaults.style_affinity
+            ),
+            _reindex(
+                artifact['space_fit'],
+                (metadata['categories'], metadata['space_types']),
+                (self.categories, self.space_types),
+                defaults.space_fit
+            )
+        )
+        self.model = artifact
+        self.model_path = path
+        self._set_params(params)
+    
+    def reload_model_if_changed(self) -> bool:
+        """
+        Load ``model_path`` again if the file has been replaced.
+        
+        An artifact that fails to load (e.g. a checksum mismatch) is skipped
+        until the file changes again, and the current model stays in use.
+        
+        Returns:
+            True if a new model was swapped in
+        """
+        if not self.model_path:
+            return False
+        try:
+            identity = file_identity(self.model_path)
+        except OSError:
+            return False
+        current = self.model.identity if self.model is not None else None
+        if identity in (current, self._rejected_identity):
+            return False
+        try:
+            self.load_model(self.model_path)
+        except (OSError, ValueError):
+            self._rejected_identity = identity
+            return False
+        return True
+    
+    def _maybe_reload(self) -> None:
+        """Check for a replaced model at most once per ``reload_interval``."""
+        if self.reload_interval is None:
+            return
+        now = time.monotonic()
+        if now < self._next_reload_check or not self._reload_lock.acquire(blocking=False):
+            return
+        try:
+            self._next_reload_check = now + self.reload_interval
+            self.reload_model_if_changed()
+        finally:
+            self._reload_lock.release()
@@ -0,0 +1,169 @@
+"""
+Physical fit checks between furniture and a room.
+"""
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.utils.settings import load_settings
+
+# Used when the settings file has no ``room_fit`` section
+DEFAULT_CLEARANCE = 2.0
+DEFAULT_HEADROOM = 0.5
+
+class UsableSpace(NamedTuple):
+    """Floor and height left for furniture once clearances are subtracted."""
+    long_side: float
+    short_side: float
+    # NaN when the room height is unknown
+    height: float
+
+def _length(value) -> float:
+    """Return a positive float, or NaN for missing and non-positive values."""
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return np.nan
+    return value if value > 0 else np.nan
+
+def clearance_for(space_type: Optional[str]) -> float:
+    """
+    Return the walkway clearance kept free along each floor side of a room.
+    
+    Args:
+        space_type: Type of space (bedroom, living room, office, etc.)
+    
+    Returns:
+        Clearance in the same unit as the room dimensions
+    """
+    rules = load_settings().get('room_fit', {})
+    default = float(rules.get('default_clearance', DEFAULT_CLEARANCE))
+    if space_type is None:
+        return default
+    key = str(space_type).strip().lower().replace(' ', '_')
+    return float(rules.get('clearance', {}).get(key, default))
+
+def usable_space(dimensions: Optional[Dict[str, float]], space_type: Optional[str] = None) -> Optional[UsableSpace]:
+    """
+    Work out the space furniture may occupy in a room.
+    
+    The space type's clearance is subtracted from the room length and
+    width, and the settings' headroom from its height.
+    
+    Args:
+        dimensions: Room dimensions (length, width, height)
+        space_type: Type of space, selecting the clearance rule
+    
+    Returns:
+        UsableSpace, or None when the room length or width is unknown
+    """
+    if not dimensions:
+        return None
+    length, width = _length(dimensions.get('length')), _length(dimensions.get('width'))
+    if np.isnan(length) or np.isnan(width):
+        return None
+    clearance = clearance_for(space_type)
+    headroom = float(load_settings().get('room_fit', {}).get('headroom', DEFAULT_HEADROOM))
+    return UsableSpace(
+        long_side=max(max(length, width) - clearance, 0.0),
+        short_side=max(min(length, width) - clearance, 0.0),
+        height=_length(dimensions.get('height')) - headroom
+    )
+
+def fit_mask(long_side: np.ndarray, short_side: np.ndarray, height: np.ndarray, space: UsableSpace) -> np.ndarray:
+    """
+    Check which items fit within a room's usable space.
+    
+    An item fits when, in either orientation, its footprint lies inside the
+    usable floor and it is no taller than the usable height. Items without
+    a footprint or height are given the benefit of the doubt.
+    
+    Args:
+        long_side: Longer footprint side of each item (NaN when unknown)
+        short_side: Shorter footprint side of each item (NaN when unknown)
+        height: Height of each item (NaN when unknown)
+        space: Usable space from ``usable_space``
+    
+    Returns:
+        Boolean array, True where the item fits
+    """
+    # Comparing sorted sides covers both orientations at once
+    fits = (long_side <= space.long_side) & (short_side <= space.short_side)
+    fits |= np.isnan(long_side) | np.isnan(short_side)
+    if not np.isnan(space.height):
+        fits &= ~(height > space.height)
+    return fits
+
+def pack_floor(footprints: Sequence[Tuple[float, float]], space: UsableSpace) -> Optional[List[Tuple[float, float, float, float]]]:
+    """
+    Greedily lay out item footprints on the usable floor.
+    
+    Uses first-fit decreasing-height shelf packing: items are sorted by
+    their shorter side and placed left to right on shelves running along
+    the room's long side, opening a new shelf when none has room. Each item
+    is tried lying along the shelf, then turned across it. A None result
+    means this heuristic found no layout, which is taken as "does not fit".
+    
+    Args:
+        footprints: (long side, short side) of each item
+        space: Usable space from ``usable_space``
+    
+    Returns:
+        (x, y, extent along, extent across) of each item in input order,
+        or None if the items could not all be placed
+    """
+    sizes = [(max(a, b), min(a, b)) for a, b in footprints]
+    if sum(a * b for a, b in sizes) > space.long_side * space.short_side:
+        return None
+    
+    # Each shelf is [y, depth, used length]
+    shelves: List[List[float]] = []
+    top = 0.0
+    placements: List[Optional[Tuple[float, float, float, float]]] = [None] * len(sizes)
+    for index in sorted(range(len(sizes)), key=lambda i: (-sizes[i][1], -sizes[i][0])):
+        long_side, short_side = sizes[index]
+        for along, across in ((long_side, short_side), (short_side, long_side)):
+            shelf = next(
+                (s for s in shelves if across <= s[1] and s[2] + along <= space.long_side),
+                None
+            )
+            if shelf is not None:
+                placements[index] = (shelf[2], shelf[0], along, across)
+                shelf[2] += along
+                break
+        else:
+            along, across = (long_side, short_side) if long_side <= space.long_side else (short_side, long_side)
+            if along > space.long_side or top + across > space.short_side:
+                return None
+            shelves.append([top, across, along])
+            placements[index] = (0.0, top, along, across)
+            top += across
+    return placements
+
+def select_packable(footprints: Sequence[Tuple[float, float]], k: int, space: UsableSpace) -> List[int]:
+    """
+    Pick up to ``k`` items, in order, that can all be laid out together.
+    
+    Items are taken in the given (ranked) order and skipped when adding
+    them would make the set unpackable. Items with an unknown footprint
+    (NaN sides) are always taken.
+    
+    Args:
+        footprints: (long side, short side) of each candidate, best first
+        k: Number of items wanted
+        space: Usable space from ``usable_space``
+    
+    Returns:
+        Indices of the selected candidates, in order
+    """
+    selected: List[int] = []
+    placed: List[Tuple[float, float]] = []
+    for index, footprint in enumerate(footprints):
+        if len(selected) >= k:
+            break
+        if not np.isnan(footprint).any():
+            if pack_floor(placed + [footprint], space) is None:
+                continue
+            placed.append(footprint)
+        selected.append(index)
+    return selected
@@ -1,29 +1,108 @@
 """
 Style analysis and matching using computer vision.
 """
+import hashlib
+import io
+import os
+import threading
 import numpy as np
-from PIL import Image
-from typing import Dict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.ml.feature_store import FeatureStore
+from src.utils.metrics import timed
+from src.utils.settings import get_settings
+
+# Model input size (width, height)
+INPUT_SIZE = (224, 224)
+
+# Colour/texture descriptor computed for every image
+FEATURE_NAMES = ('brightness', 'saturation', 'warmth', 'edge_density', 'contrast')
+
+# Colour/texture signature of each style used until a trained classifier is
+# available: (brightness, saturation, warmth, edge density, contrast)
+STYLE_PROTOTYPES = {
+    'modern': (0.60, 0.25, 0.50, 0.35, 0.55),
+    'contemporary': (0.65, 0.30, 0.50, 0.30, 0.45),
+    'minimalist': (0.80, 0.10, 0.50, 0.15, 0.30),
+    'industrial': (0.40, 0.15, 0.55, 0.50, 0.50),
+    'scandinavian': (0.80, 0.15, 0.55, 0.20, 0.30),
+    'bohemian': (0.55, 0.60, 0.65, 0.60, 0.50),
+    'traditional': (0.45, 0.40, 0.65, 0.45, 0.45),
+    'rustic': (0.45, 0.40, 0.70, 0.50, 0.40),
+    'mid-century': (0.55, 0.45, 0.65, 0.35, 0.45),
+    'coastal': (0.75, 0.35, 0.40, 0.25, 0.35),
+}
+PROTOTYPE_TEMPERATURE = 0.05
 
 class StyleAnalyzer:
     """
     Analyze and classify interior design styles using ML.
     """
     
-    def __init__(self, model_path: str = None):
+    def __init__(self, model_path: str = None, feature_store_dir: Optional[str] = None):
         """
         Initialize the style analyzer.
         
         Args:
             model_path: Path to the trained model
+            feature_store_dir: Directory for the content-addressed cache of
+                scores and features (None disables caching)
         """
         self.model = None
         self.model_path = model_path
-        self.styles = [
-            'modern', 'contemporary', 'minimalist', 'industrial',
-            'scandinavian', 'bohemian', 'traditional', 'rustic'
-        ]
+        self._model_loaded = False
+        self._model_lock = threading.Lock()
+        self.styles = list(get_settings().styles)
+        self.input_size = INPUT_SIZE
+        self.feature_store = None
+        if feature_store_dir:
+            self.feature_store = self._open_store(feature_store_dir)
+    
+    def _open_store(self, directory: str) -> FeatureStore:
+        """
+        Open the feature store for the current model and style list.
+        
+        Each model/style combination gets its own subdirectory, so results
+        from a previous model are never served after an upgrade.
+        """
+        tag = f"{self.model_path or 'prototypes'}|{','.join(self.styles)}|{','.join(FEATURE_NAMES)}"
+        fingerprint = hashlib.blake2b(tag.encode('utf-8'), digest_size=6).hexdigest()
+        return FeatureStore(
+            os.path.join(directory, fingerprint),
+            dim=len(self.styles) + len(FEATURE_NAMES),
+            tag=tag
+        )
+    
+    @property
+    def is_loaded(self) -> bool:
+        """Whether ``load_model`` has completed."""
+        return self._model_loaded
+    
+    def load_model(self) -> None:
+        """
+        Load the classifier if it is not loaded yet (thread-safe).
+        
+        TensorFlow is only imported when a model file exists; without one
+        the analyzer scores images against the style prototypes.
+        """
+        if self._model_loaded:
+            return
+        with self._model_lock:
+            if self._model_loaded:
+                return
+            if self.model_path and os.path.exists(self.model_path):
+                from tensorflow import keras
+                self.model = keras.models.load_model(self.model_path)
+            self._model_loaded = True
+    
+    def warm_up(self) -> None:
+        """Load the classifier and run one batch through it."""
+        self.load_model()
+        width, height = self.input_size
+        self._describe_batch(np.zeros((1, height, width, 3), dtype=np.uint8))
     
+    @timed('style_analyzer.analyze_image')
     def analyze_image(self, image_path: str) -> Dict[str, float]:
         """
         Analyze an image and return style probabilities.
@@ -34,10 +113,203 @@ class StyleAnalyzer:
         Returns:
             Dictionary with style names and confidence scores
         """
-        # TODO: Implement image analysis with CNN
-        style_scores = {}
+        return self._scores(self._record(image_path))
+    
+    def extract_features(self, image_path: str) -> Dict[str, float]:
+        """
+        Return the colour/texture descriptor of an image.
+        
+        Args:
+            image_path: Path to the image file
+        
+        Returns:
+            Dictionary with feature names and values in [0, 1]
+        """
+        record = self._record(image_path)
+        return dict(zip(FEATURE_NAMES, record[len(self.styles):].tolist()))
+    
+    def _record(self, image_path: str) -> np.ndarray:
+        """Return the stored or freshly computed scores + features of one image."""
+        digest, record, pixels = self._prepare(image_path)
+        if record is None:
+            record = self._describe_batch(pixels[None, ...])[0]
+            if digest is not None:
+                self.feature_store.put(digest, record)
+        return record
+    
+    def _scores(self, record: np.ndarray) -> Dict[str, float]:
+        return dict(zip(self.styles, record[:len(self.styles)].tolist()))
+    
+    def analyze_images(
+        self,
+        image_paths: Iterable[str],
+        batch_size: int = 32,
+        workers: int = 4,
+        max_pending: Optional[int] = None
+    ) -> Iterator[Tuple[str, Optional[Dict[str, float]]]]:
+        """
+        Analyze many images, streaming results as batches complete.
+        
+        Images already in the feature store are answered from it without
+        being decoded. Others are decoded and downscaled on a thread pool (PIL releases the
+        GIL while decoding), packed into fixed-size batches and classified
+        one batch at a time. At most ``max_pending`` images are being
+        decoded or waiting for a batch at any moment, and new paths are only
+        read from ``image_paths`` as that backlog drains, so memory stays
+        bounded however many paths are supplied.
         
-        return style_scores
+        Args:
+            image_paths: Paths to the image files (may be a lazy iterator)
+            batch_size: Images classified per model call
+            workers: Decoder threads
+            max_pending: Largest decode backlog (defaults to 2 * batch_size)
+        
+        Returns:
+            Iterator of ``(image_path, style_scores)`` in completion order;
+            ``style_scores`` is None for images that could not be decoded
+        """
+        max_pending = max(max_pending or 2 * batch_size, 1)
+        width, height = self.input_size
+        batch = np.empty((batch_size, height, width, 3), dtype=np.uint8)
+        batch_paths, batch_digests = [], []
+        paths = iter(image_paths)
+        pending = {}
+        exhausted = False
+        
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='style-decode')
+        try:
+            while True:
+                while not exhausted and len(pending) + len(batch_paths) < max_pending:
+                    path = next(paths, None)
+                    if path is None:
+                        exhausted = True
+                        break
+                    pending[executor.submit(self._prepare, path)] = path
+                
+                if not pending:
+                    break
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    path = pending.pop(future)
+                    try:
+                        digest, record, pixels = future.result()
+                    except (OSError, ValueError):
+                        yield path, None
+                        continue
+                    if record is not None:
+                        yield path, self._scores(record)
+                        continue
+                    batch[len(batch_paths)] = pixels
+                    batch_paths.append(path)
+                    batch_digests.append(digest)
+                    if len(batch_paths) == batch_size:
+                        yield from self._flush(batch, batch_paths, batch_digests)
+                        batch_paths, batch_digests = [], []
+            
+            if batch_paths:
+                yield from self._flush(batch, batch_paths, batch_digests)
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+    
+    def _flush(
+        self,
+        batch: np.ndarray,
+        paths: List[str],
+        digests: List[Optional[bytes]]
+    ) -> Iterator[Tuple[str, Dict[str, float]]]:
+        """Classify the filled part of a batch, persist it and yield per-image results."""
+        records = self._describe_batch(batch[:len(paths)])
+        if self.feature_store is not None:
+            self.feature_store.put_many(digests, records)
+        for path, record in zip(paths, records):
+            yield path, self._scores(record)
+    
+    def _prepare(
+        self,
+        image_path: str
+    ) -> Tuple[Optional[bytes], Optional[np.ndarray], Optional[np.ndarray]]:
+        """
+        Read an image and either find it in the feature store or decode it.
+        
+        Returns:
+            Tuple of (content digest, stored record, decoded pixels); the
+            digest is None without a store, and exactly one of record and
+            pixels is set
+        """
+        with open(image_path, 'rb') as fh:
+            data = fh.read()
+        digest = None
+        if self.feature_store is not None:
+            digest = FeatureStore.digest(data)
+            record = self.feature_store.get(digest)
+            if record is not None:
+                return digest, record, None
+        return digest, None, self._decode(data)
+    
+    def _decode(self, data: bytes) -> np.ndarray:
+        """
+        Decode an image into an RGB array of the model input size.
+        
+        For JPEGs, ``Image.draft`` lets the decoder downscale by a power of
+        two while decoding, which avoids materializing full-resolution
+        pixels for large photos.
+        """
+        from PIL import Image, ImageOps
+        
+        with Image.open(io.BytesIO(data)) as image:
+            image.draft('RGB', self.input_size)
+            image = image.convert('RGB')
+            image = ImageOps.fit(image, self.input_size, Image.BILINEAR)
+            return np.asarray(image, dtype=np.uint8)
+    
+    def _describe_batch(self, batch: np.ndarray) -> np.ndarray:
+        """
+        Return style probabilities followed by features for a batch of images.
+        
+        Args:
+            batch: uint8 array of shape (n, height, width, 3)
+        
+        Returns:
+            float32 array of shape (n, len(self.styles) + len(FEATURE_NAMES))
+        """
+        self.load_model()
+        features = self._color_features(batch)
+        if self.model is not None:
+            scores = np.asarray(self.model.predict(batch.astype(np.float32) / 255.0, verbose=0))
+        else:
+            scores = self._prototype_scores(features)
+        return np.hstack([scores, features]).astype(np.float32)
+    
+    @staticmethod
+    def _color_features(batch: np.ndarray) -> np.ndarray:
+        """Compute the FEATURE_NAMES descriptor of each image."""
+        pixels = batch.astype(np.float32) / 255.0
+        value = pixels.max(axis=3)
+        chroma = value - pixels.min(axis=3)
+        saturation = np.divide(chroma, value, out=np.zeros_like(chroma), where=value > 0)
+        luma = pixels @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+        edges = (
+            np.abs(np.diff(luma, axis=1)).mean(axis=(1, 2))
+            + np.abs(np.diff(luma, axis=2)).mean(axis=(1, 2))
+        )
+        return np.stack([
+            value.mean(axis=(1, 2)),
+            saturation.mean(axis=(1, 2)),
+            0.5 + (pixels[..., 0] - pixels[..., 2]).mean(axis=(1, 2)) / 2.0,
+            np.clip(edges * 4.0, 0.0, 1.0),
+            np.clip(luma.std(axis=(1, 2)) * 2.0, 0.0, 1.0),
+        ], axis=1)
+    
+    def _prototype_scores(self, features: np.ndarray) -> np.ndarray:
+        """Score images by distance to each style's colour/texture prototype."""
+        prototypes = np.array(
+            [STYLE_PROTOTYPES.get(style, (0.5,) * 5) for style in self.styles], dtype=np.float32
+        )
+        distances = ((features[:, None, :] - prototypes[None, :, :]) ** 2).sum(axis=2)
+        logits = -distances / PROTOTYPE_TEMPERATURE
+        logits -= logits.max(axis=1, keepdims=True)
+        probabilities = np.exp(logits)
+        return probabilities / probabilities.sum(axis=1, keepdims=True)
     
     def match_preferences(
         self,
@@ -0,0 +1,111 @@
+"""
+Floor-plan rendering of a furnished room.
+"""
+import os
+from typing import Dict, List, Optional, Tuple
+
+from src.ml.room_fit import clearance_for, pack_floor, select_packable, usable_space
+
+# Output image size (width, height) in pixels
+RENDER_SIZE = (800, 600)
+MARGIN = 40
+LEGEND_HEIGHT = 60
+
+# Room used when the design gives no (or unusable) dimensions
+DEFAULT_ROOM = {'length': 12.0, 'width': 10.0, 'height': 9.0}
+# Footprint (width, depth) of items without dimensions
+DEFAULT_FOOTPRINT = (2.0, 2.0)
+
+PALETTE = (
+    (76, 114, 176), (221, 132, 82), (85, 168, 104), (196, 78, 82),
+    (129, 114, 179), (147, 120, 96), (218, 139, 195), (140, 140, 140),
+)
+
+def _footprint(item: Dict) -> Tuple[float, float]:
+    dimensions = item.get('dimensions') or {}
+    try:
+        width, depth = float(dimensions['width']), float(dimensions['depth'])
+    except (KeyError, TypeError, ValueError):
+        return DEFAULT_FOOTPRINT
+    if width <= 0 or depth <= 0:
+        return DEFAULT_FOOTPRINT
+    return max(width, depth), min(width, depth)
+
+def _colour(category: Optional[str], categories: List[str]) -> Tuple[int, int, int]:
+    if category not in categories:
+        categories.append(category)
+    return PALETTE[categories.index(category) % len(PALETTE)]
+
+def render_floor_plan(design: Dict, path: str) -> str:
+    """
+    Draw a top-down plan of a room with its items laid out and save it as PNG.
+    
+    Items are placed with the room-fit shelf packer inside the space type's
+    walkway clearance; items that do not fit are listed under the plan. The
+    file is written to a temporary name and moved into place, so readers
+    never see a partial image.
+    
+    Args:
+        design: ``dimensions`` (length, width, height) and ``space_type`` of
+            the room, ``style_preference`` and the ``items`` (dictionaries
+            with ``id``, ``name``, ``category`` and ``dimensions``)
+        path: Output PNG path
+    
+    Returns:
+        ``path``
+    """
+    from PIL import Image, ImageDraw
+    
+    space_type = design.get('space_type')
+    room = design.get('dimensions') or DEFAULT_ROOM
+    space = usable_space(room, space_type)
+    if space is None:
+        room = DEFAULT_ROOM
+        space = usable_space(room, space_type)
+    clearance = clearance_for(space_type)
+    room_long, room_short = space.long_side + 2 * clearance, space.short_side + 2 * clearance
+    
+    items = list(design.get('items') or [])
+    footprints = [_footprint(item) for item in items]
+    chosen = select_packable(footprints, len(footprints), space)
+    placements = pack_floor([footprints[i] for i in chosen], space) or []
+    
+    width, height = RENDER_SIZE
+    scale = min((width - 2 * MARGIN) / room_long, (height - 2 * MARGIN - LEGEND_HEIGHT) / room_short)
+    image = Image.new('RGB', RENDER_SIZE, (255, 255, 255))
+    draw = ImageDraw.Draw(image)
+    
+    def box(x, y, along, across):
+        return (
+            MARGIN + x * scale, MARGIN + y * scale,
+            MARGIN + (x + along) * scale, MARGIN + (y + across) * scale,
+        )
+    
+    title = ' '.join(str(part).replace('_', ' ') for part in (design.get('style_preference'), space_type) if part)
+    draw.text((MARGIN, MARGIN // 3), title or 'room', fill=(0, 0, 0))
+    draw.rectangle(box(0, 0, room_long, room_short), outline=(0, 0, 0), width=3)
+    draw.rectangle(box(clearance, clearance, space.long_side, space.short_side), outline=(200, 200, 200))
+    
+    categories: List[str] = []
+    for index, (x, y, along, across) in zip(chosen, placements):
+        item = items[index]
+        area = box(clearance + x, clearance + y, along, across)
+        draw.rectangle(area, fill=_colour(item.get('category'), categories), outline=(0, 0, 0))
+        draw.text((area[0] + 3, area[1] + 3), str(item.get('name') or item.get('id'))[:24], fill=(255, 255, 255))
+    
+    placed = set(chosen)
+    skipped = [str(item.get('name') or item.get('id')) for i, item in enumerate(items) if i not in placed]
+    if skipped:
+        draw.text(
+            (MARGIN, height - LEGEND_HEIGHT + 10),
+            ('Not placed: ' + ', '.join(skipped))[:120],
+            fill=(160, 0, 0)
+        )
+    
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    image.save(temporary, format='PNG')
+    os.replace(temporary, path)
+    return path
@@ -0,0 +1,226 @@
+"""
+Per-item booking index used for availability checks.
+"""
+import threading
+from bisect import bisect_right
+from contextlib import contextmanager
+from datetime import date, datetime
+from typing import Dict, Hashable, Iterable, List, Tuple, Union
+
+DateLike = Union[date, datetime, str]
+
+def to_day(value: DateLike) -> int:
+    """
+    Convert a date-like value to a day ordinal.
+    
+    Args:
+        value: ``date``, ``datetime`` or ISO-8601 string
+    
+    Returns:
+        Proleptic Gregorian ordinal of the day
+    """
+    if isinstance(value, datetime):
+        return value.date().toordinal()
+    if isinstance(value, date):
+        return value.toordinal()
+    if isinstance(value, str):
+        return datetime.fromisoformat(value).date().toordinal()
+    raise TypeError(f"Unsupported date value: {value!r}")
+
+def to_span(start: DateLike, end: DateLike) -> Tuple[int, int]:
+    """Convert a start/end pair to a half-open ``[start, end)`` day span."""
+    start_day, end_day = to_day(start), to_day(end)
+    if end_day <= start_day:
+        raise ValueError("end_date must be after start_date")
+    return start_day, end_day
+
+class ItemsUnavailableError(ValueError):
+    """Raised when a lease's items are already booked for its period."""
+    
+    def __init__(self, item_ids: List[Hashable]):
+        super().__init__(f"Items not available for the requested period: {item_ids}")
+        self.item_ids = item_ids
+
+class UnknownItemsError(ValueError):
+    """Raised when a lease names items that are not in the catalog."""
+    
+    def __init__(self, item_ids: List[Hashable]):
+        super().__init__(f"Items not in the catalog: {item_ids}")
+        self.item_ids = item_ids
+
+class _ItemBookings:
+    """Sorted, non-overlapping booking spans for one item."""
+    
+    __slots__ = ('starts', 'ends', 'lease_ids')
+    
+    def __init__(self):
+        self.starts: List[int] = []
+        self.ends: List[int] = []
+        self.lease_ids: List[Hashable] = []
+    
+    def conflicts(self, start: int, end: int) -> bool:
+        # Spans never overlap, so ends are sorted as well: the only span that
+        # can overlap [start, end) is the first one ending after start.
+        i = bisect_right(self.ends, start)
+        return i < len(self.starts) and self.starts[i] < end
+    
+    def insert(self, start: int, end: int, lease_id: Hashable) -> None:
+        i = bisect_right(self.starts, start)
+        self.starts.insert(i, start)
+        self.ends.insert(i, end)
+        self.lease_ids.insert(i, lease_id)
+    
+    def remove(self, lease_id: Hashable) -> bool:
+        try:
+            i = self.lease_ids.index(lease_id)
+        except ValueError:
+            return False
+        del self.starts[i], self.ends[i], self.lease_ids[i]
+        return True
+
+class AvailabilityIndex:
+    """
+    Booking index answering overlap queries in O(log n) per item.
+    
+    Each item keeps its bookings as sorted, non-overlapping half-open day
+    spans, so a conflict check is a single binary search regardless of how
+    much booking history the item has accumulated.
+    
+    Items are guarded by striped locks (item hash modulo ``stripes``) so
+    that bookings of unrelated items do not wait on each other. An
+    operation on several items takes their stripes in ascending order,
+    which makes check-and-book atomic for a multi-item lease without any
+    risk of deadlock.
+    """
+    
+    def __init__(self, stripes: int = 64):
+        """
+        Initialize an empty index.
+        
+        Args:
+            stripes: Number of item locks (1 serializes all bookings)
+        """
+        if stripes < 1:
+            raise ValueError("stripes must be at least 1")
+        self._stripes = [threading.Lock() for _ in range(stripes)]
+        self._items: Dict[Hashable, _ItemBookings] = {}
+        # Guards the lease-to-items map only; never held while taking a stripe
+        self._leases_lock = threading.Lock()
+        self._leases: Dict[Hashable, List[Hashable]] = {}
+    
+    @contextmanager
+    def _locked(self, item_ids: Iterable[Hashable]):
+        """Hold the stripes of the given items, taken in ascending order."""
+        stripes = sorted({hash(item_id) % len(self._stripes) for item_id in item_ids})
+        for stripe in stripes:
+            self._stripes[stripe].acquire()
+        try:
+            yield
+        finally:
+            for stripe in reversed(stripes):
+                self._stripes[stripe].release()
+    
+    def is_available(self, item_id: Hashable, start: DateLike, end: DateLike) -> bool:
+        """
+        Check whether an item is free for the whole period.
+        
+        Args:
+            item_id: ID of the item
+            start: Period start (inclusive)
+            end: Period end (exclusive)
+        
+        Returns:
+            True if no booking overlaps the period
+        """
+        return self.available_many([item_id], start, end)[item_id]
+    
+    def available_many(
+        self,
+        item_ids: Iterable[Hashable],
+        start: DateLike,
+        end: DateLike
+    ) -> Dict[Hashable, bool]:
+        """
+        Check many items against the same period.
+        
+        Args:
+            item_ids: IDs of the items
+            start: Period start (inclusive)
+            end: Period end (exclusive)
+        
+        Returns:
+            Mapping of item ID to availability
+        """
+        start_day, end_day = to_span(start, end)
+        item_ids = list(item_ids)
+        with self._locked(item_ids):
+            result = {}
+            for item_id in item_ids:
+                bookings = self._items.get(item_id)
+                result[item_id] = bookings is None or not bookings.conflicts(start_day, end_day)
+            return result
+    
+    def book(
+        self,
+        item_ids: Iterable[Hashable],
+        start: DateLike,
+        end: DateLike,
+        lease_id: Hashable
+    ) -> List[Hashable]:
+        """
+        Atomically book all items for a lease, or none of them.
+        
+        Args:
+            item_ids: IDs of the items to book
+            start: Period start (inclusive)
+            end: Period end (exclusive)
+            lease_id: Lease that owns the bookings
+        
+        Returns:
+            IDs of conflicting items; empty if the booking was made
+        """
+        start_day, end_day = to_span(start, end)
+        item_ids = list(dict.fromkeys(item_ids))
+        with self._locked(item_ids):
+            conflicts = [
+                item_id for item_id in item_ids
+                if item_id in self._items and self._items[item_id].conflicts(start_day, end_day)
+            ]
+            if conflicts:
+                return conflicts
+            for item_id in item_ids:
+                self._items.setdefault(item_id, _ItemBookings()).insert(start_day, end_day, lease_id)
+            with self._leases_lock:
+                self._leases.setdefault(lease_id, []).extend(item_ids)
+            return []
+    
+    def release(self, lease_id: Hashable) -> int:
+        """
+        Remove every booking held by a lease.
+        
+        Args:
+            lease_id: ID of the lease
+        
+        Returns:
+            Number of bookings removed
+        """
+        with self._leases_lock:
+            item_ids = self._leases.pop(lease_id, [])
+        removed = 0
+        with self._locked(item_ids):
+            for item_id in item_ids:
+                bookings = self._items.get(item_id)
+                if bookings is not None and bookings.remove(lease_id):
+                    removed += 1
+        return removed
+    
+    def bookings(self, item_id: Hashable) -> List[Tuple[date, date, Hashable]]:
+        """Return an item's bookings as ``(start, end, lease_id)`` tuples."""
+        with self._locked([item_id]):
+            bookings = self._items.get(item_id)
+            if bookings is None:
+                return []
+            return [
+                (date.fromordinal(s), date.fromordinal(e), lease_id)
+                for s, e, lease_id in zip(bookings.starts, bookings.ends, bookings.lease_ids)
+            ]
@@ -0,0 +1,397 @@
+"""
+In-memory columnar index over the leasable catalog.
+"""
+import threading
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from src.utils.settings import get_settings
+
+AVAILABLE_STATUSES = (None, 'available')
+DIMENSION_KEYS = ('width', 'depth', 'height')
+
+# (row, item before the change or None for new items, item after the change)
+CatalogChange = Tuple[int, Optional[Dict], Dict]
+
+class _RowValues(NamedTuple):
+    """An item's numeric column values, parsed before any column is written."""
+    price: float
+    dimensions: List[float]
+    style_scores: Optional[List[float]]
+
+class CatalogIndex:
+    """
+    Columnar, NumPy-backed index used to filter the catalog without a
+    database round trip.
+    
+    Category and style are stored as small integer codes (seeded from
+    ``furniture_categories`` / ``supported_styles`` in the settings file),
+    each code owns a boolean bitmap over the rows, and a price-sorted
+    permutation of the rows answers ``max_price`` with a binary search.
+    A combined filter is therefore a couple of bitmap ANDs plus one
+    ``searchsorted`` call.
+    """
+    
+    def __init__(
+        self,
+        categories: Optional[Iterable[str]] = None,
+        styles: Optional[Iterable[str]] = None,
+        capacity: int = 1024
+    ):
+        """
+        Initialize an empty index.
+        
+        Args:
+            categories: Known category values (defaults to settings)
+            styles: Known style values (defaults to settings)
+            capacity: Initial number of rows to allocate
+        """
+        settings = get_settings()
+        if categories is None:
+            categories = settings.categories
+        if styles is None:
+            styles = settings.styles
+        
+        self._lock = threading.RLock()
+        self._capacity = max(int(capacity), 1)
+        self._size = 0
+        self.version = 0
+        
+        self.category_codes: Dict[str, int] = {}
+        self.style_codes: Dict[str, int] = {}
+        for value in categories:
+            self.category_codes.setdefault(self._normalize(value), len(self.category_codes))
+        for value in styles:
+            self.style_codes.setdefault(self._normalize(value), len(self.style_codes))
+        # Configured values, in code order
+        self.categories = tuple(self.category_codes)
+        self.styles = tuple(self.style_codes)
+        
+        self.category = np.full(self._capacity, -1, dtype=np.int16)
+        self.style = np.full(self._capacity, -1, dtype=np.int16)
+        self.price = np.zeros(self._capacity, dtype=np.float64)
+        self.active = np.zeros(self._capacity, dtype=bool)
+        # Item footprint and height; NaN when the item has no dimensions
+        self.dimensions = np.full((self._capacity, len(DIMENSION_KEYS)), np.nan, dtype=np.float32)
+        # Per-style scores from StyleAnalyzer; NaN when the item has none
+        self.style_scores = np.full((self._capacity, len(self.styles)), np.nan, dtype=np.float32)
+        
+        self._category_bitmaps = {
+            code: np.zeros(self._capacity, dtype=bool)
+            for code in self.category_codes.values()
+        }
+        self._style_bitmaps = {
+            code: np.zeros(self._capacity, dtype=bool)
+            for code in self.style_codes.values()
+        }
+        
+        # Rows ordered by ascending price, and the prices in that order
+        self._price_order = np.empty(0, dtype=np.int64)
+        self._sorted_prices = np.empty(0, dtype=np.float64)
+        
+        self._ids: List[str] = []
+        self._items: List[Dict] = []
+        self._rows: Dict[str, int] = {}
+        self._listeners: List[Callable[[List[CatalogChange]], None]] = []
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self._rows
+    
+    @staticmethod
+    def _normalize(value: Optional[str]) -> Optional[str]:
+        """Normalize a categorical value for code lookup."""
+        if value is None:
+            return None
+        return str(value).strip().lower()
+    
+    def _code_for(self, codes: Dict[str, int], bitmaps: Dict[int, np.ndarray], value) -> int:
+        """Return the code for a value, registering unseen values."""
+        key = self._normalize(value)
+        if key is None or key == '':
+            return -1
+        code = codes.get(key)
+        if code is None:
+            code = len(codes)
+            codes[key] = code
+            bitmaps[code] = np.zeros(self._capacity, dtype=bool)
+        return code
+    
+    def _grow(self) -> None:
+        """Double the column capacity."""
+        new_capacity = self._capacity * 2
+        
+        def grow(column: np.ndarray, fill) -> np.ndarray:
+            grown = np.full((new_capacity,) + column.shape[1:], fill, dtype=column.dtype)
+            grown[:self._capacity] = column
+            return grown
+        
+        self.category = grow(self.category, -1)
+        self.style = grow(self.style, -1)
+        self.price = grow(self.price, 0)
+        self.active = grow(self.active, False)
+        self.dimensions = grow(self.dimensions, np.nan)
+        self.style_scores = grow(self.style_scores, np.nan)
+        for bitmaps in (self._category_bitmaps, self._style_bitmaps):
+            for code in bitmaps:
+                bitmaps[code] = grow(bitmaps[code], False)
+        self._capacity = new_capacity
+    
+    def _insert_price(self, row: int, price: float) -> None:
+        pos = int(np.searchsorted(self._sorted_prices, price, side='right'))
+        self._price_order = np.insert(self._price_order, pos, row)
+        self._sorted_prices = np.insert(self._sorted_prices, pos, price)
+    
+    def _remove_price(self, row: int, price: float) -> None:
+        lo = int(np.searchsorted(self._sorted_prices, price, side='left'))
+        hi = int(np.searchsorted(self._sorted_prices, price, side='right'))
+        offset = int(np.flatnonzero(self._price_order[lo:hi] == row)[0])
+        self._price_order = np.delete(self._price_order, lo + offset)
+        self._sorted_prices = np.delete(self._sorted_prices, lo + offset)
+    
+    def _parse_row(self, item: Dict) -> _RowValues:
+        """
+        Parse an item's numeric fields without touching the index.
+        
+        Raises:
+            ValueError: If a price, dimension or style score is not a number
+        """
+        try:
+            dimensions = item.get('dimensions') or {}
+            style_scores = item.get('style_scores')
+            return _RowValues(
+                price=float(item.get('price') or 0),
+                dimensions=[
+                    float(dimensions[key]) if dimensions.get(key) is not None else np.nan
+                    for key in DIMENSION_KEYS
+                ],
+                style_scores=[float(style_scores.get(style, 0.0)) for style in self.styles] if style_scores else None,
+            )
+        except (AttributeError, TypeError, ValueError) as e:
+            raise ValueError(f"Item {item.get('id')} has an invalid field: {e}") from e
+    
+    def _write_row(self, row: int, item: Dict, values: _RowValues) -> None:
+        """Write an item's parsed values, columns and bitmap bits at the given row."""
+        old_category = int(self.category[row])
+        old_style = int(self.style[row])
+        if old_category >= 0:
+            self._category_bitmaps[old_category][row] = False
+        if old_style >= 0:
+            self._style_bitmaps[old_style][row] = False
+        
+        category = self._code_for(self.category_codes, self._category_bitmaps, item.get('category'))
+        style = self._code_for(self.style_codes, self._style_bitmaps, item.get('style'))
+        self.category[row] = category
+        self.style[row] = style
+        if category >= 0:
+            self._category_bitmaps[category][row] = True
+        if style >= 0:
+            self._style_bitmaps[style][row] = True
+        self.active[row] = item.get('status') in AVAILABLE_STATUSES
+        self.dimensions[row] = values.dimensions
+        self.style_scores[row] = values.style_scores if values.style_scores is not None else np.nan
+    
+    def subscribe(self, callback: Callable[[List[CatalogChange]], None]) -> None:
+        """
+        Register a callback invoked after items are added or updated.
+        
+        Args:
+            callback: Called with a list of ``(row, old_item, new_item)``
+                tuples; ``old_item`` is None for new items
+        """
+        self._listeners.append(callback)
+    
+    def _notify(self, changes: List[CatalogChange]) -> None:
+        for callback in self._listeners:
+            callback(changes)
+    
+    def add(self, item: Dict) -> int:
+        """
+        Add an item to the index.
+        
+        Args:
+            item: Item information; must contain an ``id``
+        
+        Returns:
+            Row number assigned to the item
+        
+        Raises:
+            ValueError: If the item is already indexed or a field is invalid
+        """
+        item_id = item['id']
+        stored = dict(item)
+        values = self._parse_row(stored)
+        with self._lock:
+            if item_id in self._rows:
+                raise ValueError(f"Item {item_id} is already indexed")
+            if self._size == self._capacity:
+                self._grow()
+            
+            row = self._size
+            self._write_row(row, stored, values)
+            self.price[row] = values.price
+            self._insert_price(row, values.price)
+            
+            self._ids.append(item_id)
+            self._items.append(stored)
+            self._rows[item_id] = row
+            self._size += 1
+            self.version += 1
+        self._notify([(row, None, dict(stored))])
+        return row
+    
+    def add_many(self, items: Iterable[Dict]) -> List[int]:
+        """
+        Add many items at once, re-sorting the price column a single time.
+        
+        The batch is checked before anything is indexed, so a rejected
+        batch leaves the index unchanged.
+        
+        Args:
+            items: Items to add; each must contain an ``id``
+        
+        Returns:
+            Row numbers assigned to the items
+        
+        Raises:
+            ValueError: If an item is already indexed, repeated in the batch
+                or has an invalid field
+        """
+        batch = [dict(item) for item in items]
+        parsed = [self._parse_row(stored) for stored in batch]
+        with self._lock:
+            seen = set()
+            for stored in batch:
+                item_id = stored['id']
+                if item_id in self._rows or item_id in seen:
+                    raise ValueError(f"Item {item_id} is already indexed")
+                seen.add(item_id)
+            
+            rows = []
+            for stored, values in zip(batch, parsed):
+                item_id = stored['id']
+                if self._size == self._capacity:
+                    self._grow()
+                row = self._size
+                self._write_row(row, stored, values)
+                self.price[row] = values.price
+                self._ids.append(item_id)
+                self._items.append(stored)
+                self._rows[item_id] = row
+                self._size += 1
+                rows.append(row)
+            
+            if rows:
+                order = np.concatenate([self._price_order, np.asarray(rows, dtype=np.int64)])
+                prices = self.price[order]
+                permutation = np.argsort(prices, kind='stable')
+                self._price_order = order[permutation]
+                self._sorted_prices = prices[permutation]
+                self.version += 1
+            changes = [(row, None, dict(self._items[row])) for row in rows]
+        if changes:
+            self._notify(changes)
+        return rows
+    
+    def update(self, item_id: str, updates: Dict) -> bool:
+        """
+        Apply field updates to an indexed item.
+        
+        The updated item is parsed first, so an invalid update leaves the
+        item unchanged.
+        
+        Args:
+            item_id: ID of the item
+            updates: Fields to update
+        
+        Returns:
+            True if the item exists, False otherwise
+        
+        Raises:
+            ValueError: If an updated field is invalid
+        """
+        with self._lock:
+            row = self._rows.get(item_id)
+            if row is None:
+                return False
+            
+            stored = self._items[row]
+            old = dict(stored)
+            updated = dict(stored)
+            updated.update({k: v for k, v in updates.items() if k != 'id'})
+            values = self._parse_row(updated)
+            stored.update(updated)
+            self._write_row(row, stored, values)
+            
+            price = values.price
+            if price != self.price[row]:
+                self._remove_price(row, float(self.price[row]))
+                self.price[row] = price
+                self._insert_price(row, price)
+            self.version += 1
+            new = dict(stored)
+        self._notify([(row, old, new)])
+        return True
+    
+    def get(self, item_id: str) -> Optional[Dict]:
+        """Return a copy of an indexed item, or None."""
+        with self._lock:
+            row = self._rows.get(item_id)
+            return None if row is None else dict(self._items[row])
+    
+    def row_of(self, item_id: str) -> Optional[int]:
+        """Return the row number of an item, or None."""
+        return self._rows.get(item_id)
+    
+    def filter_rows(
+        self,
+        category: Optional[str] = None,
+        style: Optional[str] = None,
+        max_price: Optional[float] = None,
+        include_inactive: bool = False
+    ) -> np.ndarray:
+        """
+        Return matching row numbers in ascending price order.
+        
+        Args:
+            category: Category value to match
+            style: Style value to match
+            max_price: Maximum price per month (inclusive)
+            include_inactive: Also return items that are not available
+        
+        Returns:
+            Array of row numbers
+        """
+        with self._lock:
+            n = self._size
+            mask = None if include_inactive else self.active
+            for value, codes, bitmaps in (
+                (category, self.category_codes, self._category_bitmaps),
+                (style, self.style_codes, self._style_bitmaps),
+            ):
+                if value is None:
+                    continue
+                code = codes.get(self._normalize(value))
+                if code is None:
+                    return np.empty(0, dtype=np.int64)
+                mask = bitmaps[code] if mask is None else mask & bitmaps[code]
+            
+            candidates = self._price_order
+            if max_price is not None:
+                cutoff = int(np.searchsorted(self._sorted_prices, max_price, side='right'))
+                candidates = candidates[:cutoff]
+            if mask is None:
+                return candidates.copy()
+            return candidates[mask[:n][candidates]]
+    
+    def items(self, rows: Iterable[int]) -> List[Dict]:
+        """Return copies of the items stored at the given rows."""
+        with self._lock:
+            return [dict(self._items[row]) for row in rows]
+    
+    def ids(self, rows: Iterable[int]) -> List[str]:
+        """Return the item IDs stored at the given rows."""
+        return [self._ids[row] for row in rows]
@@ -2,21 +2,41 @@
 Inventory management service.
 """
 from typing import Dict, List, Optional
+import uuid
+
+from src.db.repositories import ItemRepository
+from src.services.availability_index import AvailabilityIndex
+from src.services.catalog_index import CatalogIndex
+from src.utils.metrics import timed
 
 class InventoryService:
     """
     Manages furniture and decor inventory.
     """
     
-    def __init__(self, db_connection=None):
+    def __init__(
+        self,
+        db_connection=None,
+        index: Optional[CatalogIndex] = None,
+        availability: Optional[AvailabilityIndex] = None
+    ):
         """
         Initialize the inventory service.
         
         Args:
-            db_connection: Database connection object
+            db_connection: Database the catalog is persisted to (``Database``);
+                stored items are loaded into the index
+            index: In-memory catalog index (a new empty one by default)
+            availability: Booking index (a new empty one by default)
         """
         self.db = db_connection
+        self.index = index if index is not None else CatalogIndex()
+        self.availability = availability if availability is not None else AvailabilityIndex()
+        self.repository = ItemRepository(db_connection) if db_connection is not None else None
+        if self.repository is not None:
+            self.index.add_many(item for item in self.repository.load_all() if item['id'] not in self.index)
     
+    @timed('inventory.get_available_items')
     def get_available_items(
         self,
         category: Optional[str] = None,
@@ -32,13 +52,12 @@ class InventoryService:
             max_price: Maximum price per month
         
         Returns:
-            List of available items
+            List of available items, cheapest first
         """
-        # TODO: Query database with filters
-        items = []
-        
-        return items
+        rows = self.index.filter_rows(category=category, style=style, max_price=max_price)
+        return self.index.items(rows)
     
+    @timed('inventory.check_availability')
     def check_availability(
         self,
         item_id: str,
@@ -51,13 +70,75 @@ class InventoryService:
         Args:
             item_id: ID of the item
             start_date: Desired start date
-            end_date: Desired end date
+            end_date: Desired end date (exclusive)
         
         Returns:
             True if available, False otherwise
         """
-        # TODO: Check database for conflicts
-        return True
+        return self.check_availability_many([item_id], start_date, end_date)[item_id]
+    
+    def check_availability_many(
+        self,
+        items: List,
+        start_date: str,
+        end_date: str
+    ) -> Dict[str, bool]:
+        """
+        Check availability of many items for the same period in one pass.
+        
+        Args:
+            items: Item IDs or item dictionaries with an ``id``
+            start_date: Desired start date
+            end_date: Desired end date (exclusive)
+        
+        Returns:
+            Mapping of item ID to availability
+        """
+        item_ids = [item['id'] if isinstance(item, dict) else item for item in items]
+        result = self.availability.available_many(item_ids, start_date, end_date)
+        for item_id in self._inactive_items(item_ids):
+            result[item_id] = False
+        return result
+    
+    def reserve_items(
+        self,
+        item_ids: List[str],
+        start_date: str,
+        end_date: str,
+        lease_id: str
+    ) -> List[str]:
+        """
+        Book items for a lease if all of them are free.
+        
+        The availability check and the booking are one atomic step, so of
+        two concurrent reservations for overlapping periods at most one
+        succeeds.
+        
+        Args:
+            item_ids: IDs of the items to book
+            start_date: Lease start date
+            end_date: Lease end date (exclusive)
+            lease_id: ID of the lease
+        
+        Returns:
+            IDs of unavailable items; empty if the booking was made
+        """
+        inactive = self._inactive_items(item_ids)
+        if inactive:
+            return inactive
+        return self.availability.book(item_ids, start_date, end_date, lease_id)
+    
+    def release_items(self, lease_id: str) -> int:
+        """
+        Release every booking held by a lease.
+        
+        Args:
+            lease_id: ID of the lease
+        
+        Returns:
+            Number of released bookings
+        """
+        return self.availability.release(lease_id)
     
     def add_item(self, item: Dict) -> str:
         """
@@ -69,8 +150,30 @@ class InventoryService:
         Returns:
             Created item ID
         """
-        # TODO: Insert into database
-        return "ITEM12345"
+        item = dict(item)
+        item.setdefault('id', self._generate_item_id())
+        self.index.add(item)
+        if self.repository is not None:
+            self.repository.save_many([item])
+        return item['id']
+    
+    def add_items(self, items: List[Dict]) -> List[str]:
+        """
+        Add many items to the inventory in one call.
+        
+        Args:
+            items: Item information for each new item
+        
+        Returns:
+            Created item IDs
+        """
+        items = [dict(item) for item in items]
+        for item in items:
+            item.setdefault('id', self._generate_item_id())
+        self.index.add_many(items)
+        if self.repository is not None:
+            self.repository.save_many(items)
+        return [item['id'] for item in items]
     
     def update_item(self, item_id: str, updates: Dict) -> bool:
         """
@@ -83,5 +186,33 @@ class InventoryService:
         Returns:
             Success status
         """
-        # TODO: Update in database
+        if not self.index.update(item_id, updates):
+            return False
+        if self.repository is not None:
+            self.repository.save_many([self.index.get(item_id)])
         return True
+    
+    def get_item(self, item_id: str) -> Optional[Dict]:
+        """
+        Retrieve item information.
+        
+        Args:
+            item_id: ID of the item
+        
+        Returns:
+            Item information or None
+        """
+        return self.index.get(item_id)
+    
+    def _inactive_items(self, item_ids: List[str]) -> List[str]:
+        """Return the catalogued items that are not available for lease."""
+        inactive = []
+        for item_id in item_ids:
+            row = self.index.row_of(item_id)
+            if row is not None and not self.index.active[row]:
+                inactive.append(item_id)
+        return inactive
+    
+    def _generate_item_id(self) -> str:
+        """Generate a unique item ID."""
+        return f"ITEM{uuid.uuid4().hex[:8].upper()}"
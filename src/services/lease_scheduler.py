@@ -0,0 +1,294 @@
+"""
+Time-driven lease lifecycle: activation, return reminders and completion.
+"""
+import heapq
+import itertools
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from src.services.lease_service import LeaseChange, LeaseService
+
+# Days before the end date that a lease's return reminder is due
+RETURN_REMINDER_DAYS = 7
+
+# Transitions in the order they are applied when due at the same moment
+ACTIVATE, REMIND, COMPLETE = 0, 1, 2
+EVENTS = ('activate', 'remind', 'complete')
+
+logger = logging.getLogger(__name__)
+
+class LeaseScheduler:
+    """
+    Fires lease transitions as they fall due.
+    
+    Upcoming events (start date: activate, end date less the reminder
+    window: remind, end date: complete) sit in a min-heap keyed by due
+    time, so each run only touches the events that are due and the cost
+    does not grow with the size of the lease book. Due events are popped
+    in batches and applied through ``LeaseService.advance_statuses``.
+    
+    Events are checked against the lease when they fire rather than
+    removed when a lease changes: transitions only ever move a lease
+    forward and a reminder is sent once, so events left behind by a
+    cancellation, or replayed after a restart, do nothing. Every worker
+    process may run a scheduler over the same stored leases: transitions
+    are idempotent and each reminder is claimed in the database by one
+    process before it is sent.
+    
+    Events that fail to apply (a failing status write or reminder hook)
+    are logged and queued again ``retry_delay`` seconds later, so a
+    transient failure delays leases rather than losing their transitions.
+    """
+    
+    def __init__(
+        self,
+        leases: LeaseService,
+        batch_size: int = 500,
+        reminder_days: int = RETURN_REMINDER_DAYS,
+        on_reminder: Optional[Callable[[List[Dict]], None]] = None,
+        clock: Callable[[], datetime] = datetime.now,
+        retry_delay: float = 60.0
+    ):
+        """
+        Initialize the scheduler and follow new leases.
+        
+        Args:
+            leases: Lease service whose leases are driven
+            batch_size: Most events applied per status write
+            reminder_days: Days before the end date to remind the lessee
+            on_reminder: Called with each batch of leases to remind, once
+                this process has claimed them; if it raises, the claims are
+                given back and the reminders retried
+            clock: Returns the current time
+            retry_delay: Seconds before events that failed are tried again
+        """
+        self.leases = leases
+        self.batch_size = batch_size
+        self.reminder = timedelta(days=reminder_days)
+        self.on_reminder = on_reminder
+        self.clock = clock
+        self.retry_delay = timedelta(seconds=retry_delay)
+        
+        self._heap: List[Tuple[datetime, int, int, str]] = []
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._thread: Optional[threading.Thread] = None
+        self._poll_interval = 60.0
+        self._stopping = False
+        leases.subscribe(self._on_lease_change)
+    
+    def __len__(self) -> int:
+        return len(self._heap)
+    
+    def _events(self, lease: Dict) -> List[Tuple[datetime, int, int, str]]:
+        """Return the heap entries a lease still needs for its status."""
+        status = lease['status']
+        if status not in ('pending', 'active'):
+            return []
+        lease_id, end = lease['lease_id'], lease['end_date']
+        events = []
+        if status == 'pending':
+            events.append((lease['start_date'], ACTIVATE, next(self._sequence), lease_id))
+        if lease.get('reminder_sent_at') is None:
+            events.append((end - self.reminder, REMIND, next(self._sequence), lease_id))
+        events.append((end, COMPLETE, next(self._sequence), lease_id))
+        return events
+    
+    def schedule(self, leases: Iterable[Dict]) -> None:
+        """
+        Queue the upcoming events of leases.
+        
+        Args:
+            leases: Lease information with ``lease_id``, ``status``,
+                ``start_date`` and ``end_date``
+        """
+        events = [event for lease in leases for event in self._events(lease)]
+        if not events:
+            return
+        with self._lock:
+            head = self._heap[0][0] if self._heap else None
+            for event in events:
+                heapq.heappush(self._heap, event)
+            if head is None or self._heap[0][0] < head:
+                self._wake.notify()
+    
+    def rebuild(self, leases: Optional[Iterable[Dict]] = None) -> int:
+        """
+        Replace the queue with the events of stored leases.
+        
+        Args:
+            leases: Leases to schedule (the lease service's pending and
+                active leases by default)
+        
+        Returns:
+            Number of queued events
+        """
+        if leases is None:
+            leases = self.leases.list_leases(('pending', 'active'))
+        events = [event for lease in leases for event in self._events(lease)]
+        heapq.heapify(events)
+        with self._lock:
+            self._heap = events
+            self._wake.notify()
+            return len(events)
+    
+    def _on_lease_change(self, changes: List[LeaseChange]) -> None:
+        # New and reinstated leases need events; other changes leave the
+        # queued events valid or make them no-ops
+        self.schedule(lease for lease, previous in changes if previous in (None, 'cancelled'))
+    
+    def next_due(self) -> Optional[datetime]:
+        """
+        Return when the next queued event is due.
+        
+        Returns:
+            Due time, or None when nothing is queued
+        """
+        with self._lock:
+            return self._heap[0][0] if self._heap else None
+    
+    def _pop_due(self, now: datetime) -> List[Tuple[datetime, int, int, str]]:
+        with self._lock:
+            batch = []
+            while self._heap and self._heap[0][0] <= now and len(batch) < self.batch_size:
+                batch.append(heapq.heappop(self._heap))
+            return batch
+    
+    def run_due(self, now: Optional[datetime] = None) -> Dict[str, int]:
+        """
+        Apply every event due by ``now``, in due order and in batches.
+        
+        Args:
+            now: Cut-off time (the clock's current time by default)
+        
+        Returns:
+            Number of leases activated, reminded and completed
+        
+        Raises:
+            Exception: Whatever the status write raised; the unapplied
+                events are queued again first
+        """
+        now = now if now is not None else self.clock()
+        fired = dict.fromkeys(EVENTS, 0)
+        retry = []
+        try:
+            while True:
+                batch = self._pop_due(now)
+                if not batch:
+                    return fired
+                transitions = [
+                    (lease_id, 'active' if kind == ACTIVATE else 'completed')
+                    for _, kind, _, lease_id in batch if kind != REMIND
+                ]
+                try:
+                    advanced = self.leases.advance_statuses(transitions)
+                except Exception:
+                    # Replayed transitions are no-ops, so the whole batch goes back
+                    retry.extend(batch)
+                    raise
+                for _, status in advanced:
+                    fired['activate' if status == 'active' else 'complete'] += 1
+                
+                # Reminders for leases that already ended while the scheduler
+                # was down are dropped
+                due = {}
+                for event in batch:
+                    lease = self.leases.get_lease(event[3]) if event[1] == REMIND else None
+                    if (lease is not None and lease['status'] == 'active' and now < lease['end_date']
+                            and lease.get('reminder_sent_at') is None):
+                        due[event[3]] = event
+                if not due:
+                    continue
+                # Claimed first, so a process sharing the database does not
+                # send the same reminders; a failed send gives them back
+                try:
+                    reminded = self.leases.record_reminders(list(due), now)
+                except Exception:
+                    logger.exception("Claiming %d return reminders failed; retrying later", len(due))
+                    retry.extend(due.values())
+                    continue
+                try:
+                    if self.on_reminder is not None and reminded:
+                        self.on_reminder([self.leases.get_lease(lease_id) for lease_id in reminded])
+                except Exception:
+                    logger.exception("Sending %d return reminders failed; retrying later", len(reminded))
+                    retry.extend(due[lease_id] for lease_id in reminded)
+                    self.leases.release_reminders(reminded, now)
+                    continue
+                fired['remind'] += len(reminded)
+        finally:
+            if retry:
+                self._requeue(retry, now + self.retry_delay)
+    
+    def _requeue(self, events: List[Tuple[datetime, int, int, str]], due: datetime) -> None:
+        """Queue failed events again, due no earlier than ``due``."""
+        with self._lock:
+            for when, kind, _, lease_id in events:
+                heapq.heappush(self._heap, (max(when, due), kind, next(self._sequence), lease_id))
+    
+    def start(self, poll_interval: float = 60.0) -> threading.Thread:
+        """
+        Run due events on a background thread.
+        
+        The thread sleeps until the next event is due, a new lease brings an
+        earlier one, or ``poll_interval`` seconds pass.
+        
+        Args:
+            poll_interval: Longest sleep in seconds
+        
+        Returns:
+            The scheduler thread (the existing one on repeated calls)
+        """
+        with self._lock:
+            if self._thread is None:
+                self._stopping = False
+                self._poll_interval = poll_interval
+                self._thread = threading.Thread(
+                    target=self._run, args=(poll_interval,), name='lease-scheduler', daemon=True
+                )
+                self._thread.start()
+            return self._thread
+    
+    def restart_after_fork(self) -> None:
+        """
+        Restart the background thread in a forked child process.
+        
+        A fork copies the scheduler but not its thread; call this in the
+        child (e.g. from an ``os.register_at_fork`` hook) to keep running
+        due events there.
+        """
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        if self._thread is not None:
+            self._thread = None
+            self.start(self._poll_interval)
+    
+    def stop(self) -> None:
+        """Stop the background thread and wait for it to exit."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+            self._stopping = True
+            self._wake.notify()
+        if thread is not None:
+            thread.join()
+    
+    def _run(self, poll_interval: float) -> None:
+        while True:
+            try:
+                self.run_due()
+            except Exception:
+                # The failed events are queued again; keep the thread alive
+                logger.exception("Applying due lease transitions failed; retrying later")
+            with self._lock:
+                if self._stopping:
+                    return
+                timeout = poll_interval
+                if self._heap:
+                    timeout = min(timeout, max((self._heap[0][0] - self.clock()).total_seconds(), 0.0))
+                if timeout > 0:
+                    self._wake.wait(timeout)
+                if self._stopping:
+                    return
@@ -3,22 +3,107 @@ Lease management service.
 """
 from datetime import datetime, timedelta
 from dateutil.relativedelta import relativedelta
-from typing import Dict, List, Optional
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import logging
 import uuid
 
+from src.db.repositories import LeaseRepository
+from src.services.availability_index import ItemsUnavailableError, UnknownItemsError
+from src.services.quote_engine import BASIS_POINTS, QuoteEngine, default_quote_engine
+from src.utils.validators import to_local_time
+
+LEASE_STATUSES = ('pending', 'active', 'completed', 'cancelled')
+
+# Order of the statuses a lease moves through on its own
+LIFECYCLE = ('pending', 'active', 'completed')
+
+# (lease, previous status) for each changed lease; the previous status is
+# None for new leases
+LeaseChange = Tuple[Dict, Optional[str]]
+
+logger = logging.getLogger(__name__)
+
 class LeaseService:
     """
     Handles lease creation, management, and tracking.
+    
+    Leases are served from memory. With a database, every change is
+    written through to a ``LeaseRepository`` and stored leases are loaded
+    when the service starts: their items are booked again and the co-lease
+    model is fitted to them. Bookings are also checked in the database, so
+    processes sharing it cannot book an item twice.
     """
     
-    def __init__(self, db_connection=None):
+    def __init__(self, db_connection=None, inventory=None, co_lease=None, quotes: Optional[QuoteEngine] = None):
         """
         Initialize the lease service.
         
         Args:
-            db_connection: Database connection object
+            db_connection: Database leases are persisted to (``Database``)
+            inventory: InventoryService used to book leased items
+            co_lease: CoLeaseModel updated with every new lease
+            quotes: QuoteEngine pricing leases (the settings' discount table by default)
         """
         self.db = db_connection
+        self.inventory = inventory
+        self.co_lease = co_lease
+        self._quotes = quotes
+        self._leases: Dict[str, Dict] = {}
+        self._listeners: List[Callable[[List[LeaseChange]], None]] = []
+        self.repository = LeaseRepository(db_connection) if db_connection is not None else None
+        if self.repository is not None:
+            self._load()
+    
+    @property
+    def quotes(self) -> QuoteEngine:
+        """QuoteEngine pricing new leases."""
+        return self._quotes if self._quotes is not None else default_quote_engine()
+    
+    def _load(self) -> None:
+        """
+        Load stored leases, book the items of the live ones and fit the co-lease model.
+        
+        Live leases stored before bookings were kept in the database get
+        their booking rows written.
+        """
+        for lease in self.repository.load_all():
+            self._leases[lease['lease_id']] = lease
+            if self.inventory is not None and lease['status'] in ('pending', 'active'):
+                conflicts = self.inventory.reserve_items(
+                    self._item_ids(lease['items']), lease['start_date'], lease['end_date'], lease['lease_id']
+                )
+                if conflicts:
+                    logger.warning(
+                        "Stored lease %s could not book items %s; they are booked by another lease",
+                        lease['lease_id'], conflicts
+                    )
+        self.repository.restore_bookings(
+            lease for lease in self._leases.values() if lease['status'] in ('pending', 'active')
+        )
+        if self.co_lease is not None and self._leases:
+            self.co_lease.fit(self._item_ids(lease['items']) for lease in self._leases.values())
+    
+    def subscribe(self, callback: Callable[[List[LeaseChange]], None]) -> None:
+        """
+        Register a callback invoked after leases are created or change status.
+        
+        Callbacks run after the change is stored; one that raises is logged
+        and does not fail the change or stop the other callbacks.
+        
+        Args:
+            callback: Called with a list of ``(lease, previous_status)``
+                tuples; ``previous_status`` is None for new leases
+        """
+        self._listeners.append(callback)
+    
+    def _notify(self, changes: List[LeaseChange]) -> None:
+        if not changes:
+            return
+        for callback in self._listeners:
+            try:
+                callback(changes)
+            except Exception:
+                logger.exception("Lease change subscriber %r failed for %d leases", callback, len(changes))
     
     def create_lease(
         self,
@@ -30,33 +115,148 @@ class LeaseService:
         """
         Create a new lease agreement.
         
+        The cost is the items' monthly prices less the duration discount
+        from the ``lease_durations`` table, times the number of months.
+        With an inventory, items are priced from the catalog rather than
+        from the request.
+        
         Args:
             user_id: ID of the user creating the lease
             items: List of items to lease
-            start_date: Lease start date
+            start_date: Lease start date (an aware date is converted to server local time)
             duration_months: Duration in months
         
         Returns:
             Created lease information
-        """
-        end_date = start_date + relativedelta(months=duration_months)
-        total_cost = sum(item.get('price', 0) for item in items) * duration_months
         
-        lease = {
-            'lease_id': self._generate_lease_id(),
+        Raises:
+            UnknownItemsError: If any item is not in the catalog
+            ItemsUnavailableError: If any item is already booked for the period
+        """
+        result = self.create_leases_bulk([{
             'user_id': user_id,
             'items': items,
             'start_date': start_date,
-            'end_date': end_date,
             'duration_months': duration_months,
-            'total_cost': total_cost,
-            'status': 'pending',
-            'created_at': datetime.now()
-        }
+        }])
+        if result['failed']:
+            failure = result['failed'][0]
+            if failure['code'] == 'UNKNOWN_ITEMS':
+                raise UnknownItemsError(failure['items'])
+            raise ItemsUnavailableError(failure['items'])
+        return result['created'][0]
+    
+    def create_leases_bulk(self, requests: List[Dict]) -> Dict[str, List[Dict]]:
+        """
+        Create many leases in one call.
         
-        # TODO: Save to database
+        All leases are quoted in a single vectorized pass and stored with
+        one batched write. Each lease checks and books its items in one
+        atomic step, so concurrent requests for the same items cannot both
+        succeed; with a database the bookings are checked again in the
+        write's transaction, which covers other processes. A lease whose items are unknown or unavailable is reported
+        and the others still go ahead.
         
-        return lease
+        Args:
+            requests: Dictionaries with the ``create_lease`` arguments
+                (``user_id``, ``items``, ``start_date``, ``duration_months``)
+        
+        Returns:
+            Dictionary with the ``created`` leases and the ``failed``
+            requests (each with its ``index`` in ``requests``, ``error``,
+            ``code`` (``UNKNOWN_ITEMS`` or ``ITEMS_UNAVAILABLE``) and the
+            offending ``items``)
+        """
+        resolved = [self._catalog_items(request['items']) for request in requests]
+        quotes = self.quotes.quote_leases(
+            [[item.get('price', 0) for item in items] for items, _ in resolved],
+            [request['duration_months'] for request in requests]
+        )
+        discounts = quotes['discounts'].tolist()
+        monthly_cents = quotes['monthly_cents'].tolist()
+        total_cents = quotes['total_cents'].tolist()
+        created_at = datetime.now()
+        created, failed = [], []
+        indexes = {}
+        for index, request in enumerate(requests):
+            items, unknown = resolved[index]
+            if unknown:
+                failed.append({
+                    'index': index,
+                    'error': str(UnknownItemsError(unknown)),
+                    'code': 'UNKNOWN_ITEMS',
+                    'items': unknown
+                })
+                continue
+            # Aware dates would not compare with the naive ones held elsewhere
+            start_date = to_local_time(request['start_date'])
+            duration_months = request['duration_months']
+            lease = {
+                'lease_id': self._generate_lease_id(),
+                'user_id': request['user_id'],
+                'items': items,
+                'start_date': start_date,
+                'end_date': start_date + relativedelta(months=duration_months),
+                'duration_months': duration_months,
+                'discount': discounts[index] / BASIS_POINTS,
+                'monthly_cost': monthly_cents[index] / 100,
+                'total_cost': total_cents[index] / 100,
+                'status': 'pending',
+                'created_at': created_at
+            }
+            
+            if self.inventory is not None:
+                unavailable = self.inventory.reserve_items(
+                    self._item_ids(lease['items']), lease['start_date'], lease['end_date'], lease['lease_id']
+                )
+                if unavailable:
+                    failed.append({
+                        'index': index,
+                        'error': str(ItemsUnavailableError(unavailable)),
+                        'code': 'ITEMS_UNAVAILABLE',
+                        'items': unavailable
+                    })
+                    continue
+            created.append(lease)
+            indexes[lease['lease_id']] = index
+        
+        try:
+            conflicts = self._save_leases(created)
+        except Exception:
+            if self.inventory is not None:
+                for lease in created:
+                    self.inventory.release_items(lease['lease_id'])
+            raise
+        if conflicts:
+            # Booked by another process sharing the database
+            for lease_id, unavailable in conflicts.items():
+                if self.inventory is not None:
+                    self.inventory.release_items(lease_id)
+                failed.append({
+                    'index': indexes[lease_id],
+                    'error': str(ItemsUnavailableError(unavailable)),
+                    'code': 'ITEMS_UNAVAILABLE',
+                    'items': unavailable
+                })
+            failed.sort(key=lambda failure: failure['index'])
+            created = [lease for lease in created if lease['lease_id'] not in conflicts]
+        if self.co_lease is not None:
+            for lease in created:
+                self.co_lease.add_lease(self._item_ids(lease['items']))
+        self._notify([(lease, None) for lease in created])
+        return {'created': created, 'failed': failed}
+    
+    def _save_leases(self, leases: List[Dict]) -> Dict[str, List]:
+        """
+        Store new leases with a single write.
+        
+        Returns:
+            For each lease the database turned away, its items booked by
+            another lease; those leases are not stored
+        """
+        conflicts = self.repository.save_many(leases) if self.repository is not None else {}
+        self._leases.update((lease['lease_id'], lease) for lease in leases if lease['lease_id'] not in conflicts)
+        return conflicts
     
     def get_lease(self, lease_id: str) -> Optional[Dict]:
         """
@@ -68,8 +268,23 @@ class LeaseService:
         Returns:
             Lease information or None
         """
-        # TODO: Fetch from database
-        return None
+        return self._leases.get(lease_id)
+    
+    def list_leases(self, statuses: Optional[Iterable[str]] = None) -> List[Dict]:
+        """
+        Retrieve stored leases.
+        
+        Args:
+            statuses: Only return leases in these statuses (all by default)
+        
+        Returns:
+            List of lease information
+        """
+        leases = list(self._leases.values())
+        if statuses is None:
+            return leases
+        statuses = set(statuses)
+        return [lease for lease in leases if lease['status'] in statuses]
     
     def update_lease_status(self, lease_id: str, status: str) -> bool:
         """
@@ -82,9 +297,141 @@ class LeaseService:
         Returns:
             Success status
         """
-        # TODO: Update in database
+        lease = self._leases.get(lease_id)
+        if lease is None or status not in LEASE_STATUSES:
+            return False
+        
+        if self.inventory is not None:
+            if status == 'cancelled':
+                self.inventory.release_items(lease_id)
+            elif lease['status'] == 'cancelled':
+                # Reinstating a cancelled lease has to win its bookings back
+                unavailable = self.inventory.reserve_items(
+                    self._item_ids(lease['items']),
+                    lease['start_date'],
+                    lease['end_date'],
+                    lease_id
+                )
+                if unavailable:
+                    return False
+        
+        if self.repository is not None:
+            if lease['status'] == 'cancelled' and status != 'cancelled':
+                try:
+                    unavailable = self.repository.reinstate(lease, status)
+                except Exception:
+                    if self.inventory is not None:
+                        self.inventory.release_items(lease_id)
+                    raise
+                if unavailable:
+                    if self.inventory is not None:
+                        self.inventory.release_items(lease_id)
+                    return False
+            else:
+                self.repository.update_statuses([(lease_id, status)])
+        previous, lease['status'] = lease['status'], status
+        self._notify([(lease, previous)])
         return True
     
+    def advance_statuses(self, transitions: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+        """
+        Apply lifecycle transitions in one batch.
+        
+        Leases only move forward along pending, active, completed; a
+        transition to the current or an earlier status, or of a cancelled
+        lease, is skipped, so replaying transitions is harmless.
+        
+        Args:
+            transitions: ``(lease_id, status)`` pairs applied in order
+        
+        Returns:
+            The ``(lease_id, status)`` transitions that were applied
+        """
+        applied, changes = [], []
+        statuses = {}
+        for lease_id, status in transitions:
+            lease = self._leases.get(lease_id)
+            if lease is None:
+                continue
+            current = statuses.get(lease_id, lease['status'])
+            if current not in LIFECYCLE or LIFECYCLE.index(status) <= LIFECYCLE.index(current):
+                continue
+            statuses[lease_id] = status
+            changes.append((lease, current))
+            applied.append((lease_id, status))
+        if self.repository is not None:
+            self.repository.update_statuses(applied)
+        for lease_id, status in applied:
+            self._leases[lease_id]['status'] = status
+        self._notify(changes)
+        return applied
+    
+    def record_reminders(self, lease_ids: List[str], sent_at: datetime) -> List[str]:
+        """
+        Claim leases' return reminders before sending them.
+        
+        With a database the claim is atomic across processes sharing it, so
+        every reminder is claimed, and sent, by one process only. Leases
+        claimed elsewhere are marked as reminded here too but not returned.
+        
+        Args:
+            lease_ids: IDs of the leases to remind
+            sent_at: When the reminders are sent
+        
+        Returns:
+            IDs of the leases this call claimed, to be reminded by the caller
+        """
+        marked = []
+        for lease_id in dict.fromkeys(lease_ids):
+            lease = self._leases.get(lease_id)
+            if lease is not None and lease.get('reminder_sent_at') is None:
+                marked.append(lease_id)
+        claimed = self.repository.claim_reminders(marked, sent_at) if self.repository is not None else marked
+        for lease_id in marked:
+            self._leases[lease_id]['reminder_sent_at'] = sent_at
+        return claimed
+    
+    def release_reminders(self, lease_ids: List[str], sent_at: datetime) -> None:
+        """
+        Give back reminders claimed by ``record_reminders`` that could not be sent.
+        
+        Args:
+            lease_ids: IDs of the claimed leases
+            sent_at: Time passed to ``record_reminders``
+        """
+        if self.repository is not None:
+            self.repository.release_reminders(lease_ids, sent_at)
+        for lease_id in lease_ids:
+            lease = self._leases.get(lease_id)
+            if lease is not None and lease.get('reminder_sent_at') == sent_at:
+                del lease['reminder_sent_at']
+    
+    def _catalog_items(self, items: List[Dict]) -> Tuple[List[Dict], List]:
+        """
+        Price line items from the catalog.
+        
+        Without an inventory the items are used as given.
+        
+        Returns:
+            Tuple of the items with their catalog prices and the IDs that
+            are not in the catalog
+        """
+        if self.inventory is None:
+            return items, []
+        priced, unknown = [], []
+        for item in items:
+            stored = self.inventory.get_item(item.get('id'))
+            if stored is None:
+                unknown.append(item.get('id'))
+            else:
+                priced.append(dict(item, price=stored.get('price') or 0))
+        return priced, unknown
+    
+    @staticmethod
+    def _item_ids(items: List[Dict]) -> List:
+        """Extract item IDs from lease line items."""
+        return [item['id'] for item in items if 'id' in item]
+    
     def _generate_lease_id(self) -> str:
         """Generate a unique lease ID."""
         return f"L{uuid.uuid4().hex[:8].upper()}"
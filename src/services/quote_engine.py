@@ -0,0 +1,166 @@
+"""
+Lease pricing: duration discounts and quotes in integer cents.
+"""
+import threading
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from src.utils.settings import discount_table, get_settings
+
+# Discounts are held in basis points so all cost math stays integral
+BASIS_POINTS = 10000
+
+class QuoteEngine:
+    """
+    Prices leases from monthly item prices and the duration discount table.
+    
+    The ``lease_durations`` tiers are turned once into a lookup table of
+    the discount (in basis points) for every lease length up to the longest
+    tier; longer leases get the longest tier's discount. Prices are
+    converted to integer cents and every quote is computed over NumPy int64
+    arrays, so a single call prices any number of items or leases without
+    floating-point drift. Discounts apply to a lease's monthly subtotal and
+    are rounded half up to the cent.
+    """
+    
+    def __init__(self, durations: Optional[List[Dict]] = None):
+        """
+        Build the discount table.
+        
+        Args:
+            durations: Tiers of ``{'months', 'discount'}``, defaulting to
+                ``lease_durations`` in the settings file
+        """
+        if durations is None:
+            durations = get_settings().lease_durations
+        tiers = sorted(
+            ({'months': int(tier['months']), 'discount': float(tier['discount'])} for tier in durations),
+            key=lambda tier: tier['months']
+        )
+        self.durations = np.array([tier['months'] for tier in tiers], dtype=np.int64)
+        self.discounts = np.array(
+            [int(round(tier['discount'] * BASIS_POINTS)) for tier in tiers], dtype=np.int64
+        )
+        if np.any(self.discounts < 0) or np.any(self.discounts >= BASIS_POINTS):
+            raise ValueError("Lease discounts must be in [0, 1)")
+        
+        # Expanded the same way as the settings' ``discount_by_months``
+        self._discount_by_months = np.array(
+            [int(round(discount * BASIS_POINTS)) for discount in discount_table(tiers)], dtype=np.int64
+        )
+    
+    @staticmethod
+    def to_cents(prices) -> np.ndarray:
+        """
+        Convert dollar prices to integer cents.
+        
+        Args:
+            prices: Price or array of prices in dollars
+        
+        Returns:
+            int64 array of cents
+        """
+        return np.rint(np.asarray(prices, dtype=np.float64) * 100).astype(np.int64)
+    
+    def discount_basis_points(self, duration_months) -> np.ndarray:
+        """
+        Look up the discount for lease lengths.
+        
+        Args:
+            duration_months: Lease length or array of lengths in months
+        
+        Returns:
+            int64 array of discounts in basis points
+        """
+        months = np.clip(np.asarray(duration_months, dtype=np.int64), 0, len(self._discount_by_months) - 1)
+        return self._discount_by_months[months]
+    
+    def discount_rate(self, duration_months: int) -> float:
+        """
+        Return the discount for a lease length.
+        
+        Args:
+            duration_months: Lease length in months
+        
+        Returns:
+            Discount as a fraction of the list price
+        """
+        return int(self.discount_basis_points(duration_months)) / BASIS_POINTS
+    
+    def _discounted(self, cents: np.ndarray, discount: np.ndarray) -> np.ndarray:
+        """Apply basis-point discounts to cent amounts, rounding half up."""
+        return (cents * (BASIS_POINTS - discount) + BASIS_POINTS // 2) // BASIS_POINTS
+    
+    def price_matrix(self, prices) -> Dict[str, np.ndarray]:
+        """
+        Quote every item for every duration tier.
+        
+        Args:
+            prices: Monthly list price of each item in dollars
+        
+        Returns:
+            Dictionary with the tier ``months`` and ``discounts`` (basis
+            points) and (items x tiers) ``monthly_cents`` and ``total_cents``
+        """
+        cents = self.to_cents(prices).reshape(-1, 1)
+        monthly = self._discounted(cents, self.discounts[np.newaxis, :])
+        return {
+            'months': self.durations,
+            'discounts': self.discounts,
+            'monthly_cents': monthly,
+            'total_cents': monthly * self.durations[np.newaxis, :],
+        }
+    
+    def quote_leases(self, item_prices: Sequence[Sequence[float]], duration_months: Sequence[int]) -> Dict[str, np.ndarray]:
+        """
+        Quote many leases at once.
+        
+        Args:
+            item_prices: Per lease, the monthly list price of each item in dollars
+            duration_months: Length of each lease in months
+        
+        Returns:
+            Dictionary of per-lease int64 arrays: ``subtotal_cents`` (monthly
+            list price), ``discounts`` (basis points), ``monthly_cents`` and
+            ``total_cents``
+        """
+        counts = np.fromiter((len(prices) for prices in item_prices), dtype=np.int64, count=len(item_prices))
+        flat = [price for prices in item_prices for price in prices]
+        cents = self.to_cents(flat) if flat else np.zeros(0, dtype=np.int64)
+        # Exact integer per-lease sums from one cumulative sum
+        ends = np.cumsum(np.concatenate([[0], cents]))
+        offsets = np.concatenate([[0], np.cumsum(counts)])
+        subtotal = ends[offsets[1:]] - ends[offsets[:-1]]
+        
+        months = np.asarray(duration_months, dtype=np.int64)
+        discounts = self.discount_basis_points(months)
+        monthly = self._discounted(subtotal, discounts)
+        return {
+            'subtotal_cents': subtotal,
+            'discounts': discounts,
+            'monthly_cents': monthly,
+            'total_cents': monthly * months,
+        }
+
+_default_engine = None
+_default_lock = threading.Lock()
+
+def default_quote_engine() -> QuoteEngine:
+    """
+    Return a quote engine built from the settings file's discount table.
+    
+    The engine is rebuilt once when a new settings version is loaded.
+    
+    Returns:
+        Shared QuoteEngine instance for the current settings
+    """
+    global _default_engine
+    settings = get_settings()
+    current = _default_engine
+    if current is None or current[0] != settings.version:
+        with _default_lock:
+            current = _default_engine
+            if current is None or current[0] != settings.version:
+                current = _default_engine = (settings.version, QuoteEngine(settings.lease_durations))
+    return current[1]
@@ -0,0 +1,145 @@
+"""
+User account service.
+"""
+import threading
+import uuid
+from typing import Dict, Optional
+
+from src.db.repositories import UserRepository
+from src.utils.auth import AuthManager
+
+class EmailTakenError(ValueError):
+    """Raised when registering an email that already has an account."""
+
+class UserService:
+    """
+    Registers users and checks their credentials.
+    
+    Password hashes are made and checked on the auth manager's bounded
+    bcrypt pool; a login whose stored hash uses an outdated cost stores
+    the upgraded hash. With a database, accounts are written through to
+    it and users registered by other processes are read on first use.
+    """
+    
+    def __init__(self, auth: AuthManager, db_connection=None):
+        """
+        Initialize the user service.
+        
+        Args:
+            auth: AuthManager hashing and verifying passwords
+            db_connection: Database accounts are persisted to (``Database``)
+        """
+        self.auth = auth
+        self.db = db_connection
+        self._lock = threading.Lock()
+        self._users: Dict[str, Dict] = {}
+        self._ids_by_email: Dict[str, str] = {}
+        self._dummy_hash: Optional[str] = None
+        self.repository = UserRepository(db_connection) if db_connection is not None else None
+        if self.repository is not None:
+            for user in self.repository.load_all():
+                self._remember(user)
+    
+    def _remember(self, user: Dict) -> Dict:
+        self._users[user['id']] = user
+        self._ids_by_email[user['email']] = user['id']
+        return user
+    
+    def _find_by_email(self, email: str) -> Optional[Dict]:
+        """Return the user with an email, reading the database on a miss."""
+        user = self._users.get(self._ids_by_email.get(email))
+        if user is None and self.repository is not None:
+            user = self.repository.get_by_email(email)
+            if user is not None:
+                with self._lock:
+                    self._remember(user)
+        return user
+    
+    @staticmethod
+    def _public(user: Dict) -> Dict:
+        return {key: value for key, value in user.items() if key != 'password_hash'}
+    
+    def register(self, email: str, password: str, name: Optional[str] = None) -> Dict:
+        """
+        Create a user account.
+        
+        Args:
+            email: Email address (case-insensitive, unique)
+            password: Plain text password
+            name: Display name
+        
+        Returns:
+            Created user information (without the password hash)
+        
+        Raises:
+            EmailTakenError: If the email is already registered
+            PasswordTooLongError: If the password is over bcrypt's 72 bytes
+            AuthBusyError: If password hashing is at capacity
+        """
+        email = email.strip().lower()
+        if self._find_by_email(email) is not None:
+            raise EmailTakenError(f"Email already registered: {email}")
+        password_hash = self.auth.hash_password(password)
+        user = {
+            'id': f"U{uuid.uuid4().hex[:8].upper()}",
+            'email': email,
+            'name': name,
+            'password_hash': password_hash,
+        }
+        with self._lock:
+            if email in self._ids_by_email:
+                raise EmailTakenError(f"Email already registered: {email}")
+            if self.repository is not None:
+                self.repository.save(user)
+            self._remember(user)
+        return self._public(user)
+    
+    def authenticate(self, email: str, password: str) -> Optional[Dict]:
+        """
+        Check a user's credentials.
+        
+        Unknown emails are checked against a dummy hash, so both failures
+        take the same time.
+        
+        Args:
+            email: Email address
+            password: Plain text password
+        
+        Returns:
+            User information, or None if the credentials are wrong
+        
+        Raises:
+            AuthBusyError: If password hashing is at capacity
+        """
+        user = self._find_by_email(email.strip().lower())
+        if user is None:
+            if self._dummy_hash is None:
+                self._dummy_hash = self.auth.hash_password(uuid.uuid4().hex)
+            self.auth.verify_password(password, self._dummy_hash)
+            return None
+        valid, new_hash = self.auth.verify_and_rehash(password, user['password_hash'])
+        if not valid:
+            return None
+        if new_hash is not None:
+            if self.repository is not None:
+                self.repository.update_password_hash(user['id'], new_hash)
+            user['password_hash'] = new_hash
+        return self._public(user)
+    
+    def get_user(self, user_id: str) -> Optional[Dict]:
+        """
+        Retrieve user information.
+        
+        Args:
+            user_id: ID of the user
+        
+        Returns:
+            User information (without the password hash) or None
+        """
+        user = self._users.get(user_id)
+        if user is None and self.repository is not None:
+            user = self.repository.get(user_id)
+            if user is not None:
+                with self._lock:
+                    self._remember(user)
+        return self._public(user) if user is not None else None
@@ -0,0 +1,187 @@
+"""
+Background rendering of design visualizations.
+"""
+import hashlib
+import json
+import multiprocessing
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from typing import Callable, Dict, Optional
+
+class VisualizationBusyError(RuntimeError):
+    """Raised when too many visualizations are already waiting to render."""
+
+def design_key(design: Dict) -> str:
+    """
+    Return the cache key of a design: a digest of its canonical JSON.
+    
+    Args:
+        design: Design payload
+    
+    Returns:
+        Hex digest identifying the design
+    """
+    canonical = json.dumps(design, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:32]
+
+class VisualizationJobs:
+    """
+    Queues design renders on a bounded pool of worker processes.
+    
+    Submitting returns a job at once; clients poll ``get`` until it is
+    ``done`` (with a result file) or ``failed``. Results are stored in
+    ``output_dir`` under the design's key, so an identical design is
+    answered from the stored file without rendering, including after a
+    restart. A design already being rendered is not queued twice: later
+    submissions get the in-flight job. At most ``max_pending`` renders wait
+    or run at once; beyond that, ``submit`` fails fast with
+    ``VisualizationBusyError``.
+    """
+    
+    def __init__(
+        self,
+        output_dir: str,
+        render: Optional[Callable[[Dict, str], str]] = None,
+        workers: int = 2,
+        max_pending: int = 32,
+        max_jobs: int = 10000,
+        executor: Optional[Executor] = None
+    ):
+        """
+        Initialize the job queue.
+        
+        Args:
+            output_dir: Directory the rendered images are stored in
+            render: Picklable ``render(design, path)`` run in the workers
+                (the floor-plan renderer by default)
+            workers: Worker processes
+            max_pending: Most renders queued or running at once
+            max_jobs: Most job records kept for polling (oldest finished
+                ones are forgotten first)
+            executor: Executor to run renders on instead of a new process
+                pool (e.g. a thread pool in tests)
+        """
+        if render is None:
+            from src.ml.visualizer import render_floor_plan
+            render = render_floor_plan
+        self.output_dir = output_dir
+        self.render = render
+        self.workers = workers
+        self.max_pending = max_pending
+        self.max_jobs = max_jobs
+        # Spawned workers do not inherit the request threads' locks
+        self._executor = executor if executor is not None else ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context('spawn')
+        )
+        self._lock = threading.Lock()
+        self._jobs: 'OrderedDict[str, Dict]' = OrderedDict()
+        self._in_flight: Dict[str, str] = {}
+        self._counters = {'submitted': 0, 'rendered': 0, 'cached': 0, 'coalesced': 0, 'failed': 0, 'rejected': 0}
+        os.makedirs(output_dir, exist_ok=True)
+    
+    def result_path(self, key: str) -> str:
+        """Return the path of the rendered image of a design key."""
+        return os.path.join(self.output_dir, f'{key}.png')
+    
+    def submit(self, design: Dict) -> Dict:
+        """
+        Queue a design for rendering.
+        
+        Args:
+            design: Design payload passed to the renderer
+        
+        Returns:
+            Job information: ``job_id``, ``key``, ``status`` (``pending``,
+            ``done`` or ``failed``) and whether it was ``cached``
+        
+        Raises:
+            VisualizationBusyError: If ``max_pending`` renders are already queued
+        """
+        key = design_key(design)
+        with self._lock:
+            self._counters['submitted'] += 1
+            job_id = self._in_flight.get(key)
+            if job_id is not None:
+                self._counters['coalesced'] += 1
+                return dict(self._jobs[job_id])
+            if os.path.exists(self.result_path(key)):
+                self._counters['cached'] += 1
+                return dict(self._add_job(key, 'done', cached=True))
+            if len(self._in_flight) >= self.max_pending:
+                self._counters['rejected'] += 1
+                raise VisualizationBusyError("Too many visualizations are queued")
+            job = self._add_job(key, 'pending', cached=False)
+            self._in_flight[key] = job['job_id']
+        try:
+            future = self._executor.submit(self.render, design, self.result_path(key))
+        except Exception:
+            with self._lock:
+                self._in_flight.pop(key, None)
+                job['status'] = 'failed'
+                job['error'] = 'Rendering is unavailable'
+            raise
+        future.add_done_callback(lambda done: self._finish(job['job_id'], key, done))
+        return dict(job)
+    
+    def _add_job(self, key: str, status: str, cached: bool) -> Dict:
+        job = {'job_id': uuid.uuid4().hex, 'key': key, 'status': status, 'cached': cached}
+        self._jobs[job['job_id']] = job
+        while len(self._jobs) > self.max_jobs:
+            oldest = next((job_id for job_id, old in self._jobs.items() if old['status'] != 'pending'), None)
+            if oldest is None:
+                break
+            del self._jobs[oldest]
+        return job
+    
+    def _finish(self, job_id: str, key: str, future: Future) -> None:
+        error = future.exception()
+        with self._lock:
+            self._in_flight.pop(key, None)
+            job = self._jobs.get(job_id)
+            if error is None:
+                self._counters['rendered'] += 1
+            else:
+                self._counters['failed'] += 1
+            if job is not None:
+                job['status'] = 'done' if error is None else 'failed'
+                if error is not None:
+                    job['error'] = str(error) or type(error).__name__
+    
+    def get(self, job_id: str) -> Optional[Dict]:
+        """
+        Look up a job.
+        
+        Args:
+            job_id: ID returned by ``submit``
+        
+        Returns:
+            Job information, or None if the job is unknown
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
+    
+    def stats(self) -> Dict[str, int]:
+        """
+        Report queue usage.
+        
+        Returns:
+            Dictionary with ``workers``, ``max_pending``, ``pending``
+            renders, kept ``jobs`` and submitted, rendered, cached,
+            coalesced, failed and rejected counts
+        """
+        with self._lock:
+            return dict(
+                self._counters,
+                workers=self.workers,
+                max_pending=self.max_pending,
+                pending=len(self._in_flight),
+                jobs=len(self._jobs),
+            )
+    
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the worker pool."""
+        self._executor.shutdown(wait=wait)
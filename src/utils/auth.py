@@ -3,17 +3,294 @@ Authentication and authorization utilities.
 """
 import jwt
 import bcrypt
+import hashlib
+import heapq
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple
 import os
 
+from src.utils.metrics import timed
+
+# bcrypt cost factor for new hashes
+DEFAULT_BCRYPT_ROUNDS = 12
+
+# Longest password bcrypt accepts, in UTF-8 bytes
+MAX_PASSWORD_BYTES = 72
+
+# bcrypt calls as run on the hasher's threads, timed without the queue wait
+_hashpw = timed('bcrypt.hashpw')(bcrypt.hashpw)
+_checkpw = timed('bcrypt.checkpw')(bcrypt.checkpw)
+
+class AuthBusyError(RuntimeError):
+    """Raised when the password hasher's queue is full."""
+
+class PasswordTooLongError(ValueError):
+    """Raised when a password to hash is longer than ``MAX_PASSWORD_BYTES``."""
+
+class PasswordHasher:
+    """
+    Runs bcrypt on a small dedicated thread pool.
+    
+    bcrypt releases the GIL, so the hashing itself runs alongside request
+    threads; bounding it to ``workers`` threads keeps a burst of logins
+    from taking every core. At most ``max_queue`` jobs wait for a worker:
+    beyond that, callers fail fast with ``AuthBusyError`` instead of
+    queueing for seconds.
+    """
+    
+    def __init__(self, rounds: int = DEFAULT_BCRYPT_ROUNDS, workers: int = 2, max_queue: int = 16):
+        """
+        Initialize the hasher and its thread pool.
+        
+        Args:
+            rounds: bcrypt cost factor for new hashes (4-31)
+            workers: Threads running bcrypt
+            max_queue: Most jobs waiting for a thread
+        """
+        if not 4 <= rounds <= 31:
+            raise ValueError("bcrypt rounds must be between 4 and 31")
+        if workers < 1 or max_queue < 0:
+            raise ValueError("workers must be at least 1 and max_queue non-negative")
+        self.rounds = rounds
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='bcrypt')
+        self._slots = threading.BoundedSemaphore(workers + max_queue)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._rejected = 0
+    
+    def _run(self, function, *args):
+        """Run a bcrypt call on the pool and wait for its result."""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise AuthBusyError("Password hashing is at capacity")
+        with self._lock:
+            self._pending += 1
+        try:
+            return self._executor.submit(function, *args).result()
+        finally:
+            with self._lock:
+                self._pending -= 1
+            self._slots.release()
+    
+    def hash(self, password: str) -> str:
+        """
+        Hash a password with the configured cost.
+        
+        Args:
+            password: Plain text password
+        
+        Returns:
+            bcrypt hash
+        
+        Raises:
+            PasswordTooLongError: If the password is over ``MAX_PASSWORD_BYTES``
+            AuthBusyError: If the queue is full
+        """
+        encoded = password.encode('utf-8')
+        if len(encoded) > MAX_PASSWORD_BYTES:
+            raise PasswordTooLongError(f"Password is longer than {MAX_PASSWORD_BYTES} bytes")
+        salt = bcrypt.gensalt(self.rounds)
+        return self._run(_hashpw, encoded, salt).decode('utf-8')
+    
+    def verify(self, password: str, hashed: str) -> bool:
+        """
+        Check a password against a bcrypt hash.
+        
+        A password over ``MAX_PASSWORD_BYTES`` cannot have been hashed, so
+        it never matches.
+        
+        Args:
+            password: Plain text password
+            hashed: bcrypt hash
+        
+        Returns:
+            True if the password matches
+        
+        Raises:
+            AuthBusyError: If the queue is full
+        """
+        encoded = password.encode('utf-8')
+        if len(encoded) > MAX_PASSWORD_BYTES:
+            return False
+        return self._run(_checkpw, encoded, hashed.encode('utf-8'))
+    
+    def needs_rehash(self, hashed: str) -> bool:
+        """
+        Check whether a hash was made with a different cost.
+        
+        Args:
+            hashed: bcrypt hash (``$2b$<cost>$...``)
+        
+        Returns:
+            True if it should be replaced by a hash with ``rounds``
+        """
+        parts = hashed.split('$')
+        return len(parts) < 4 or not parts[2].isdigit() or int(parts[2]) != self.rounds
+    
+    def stats(self) -> Dict:
+        """
+        Report hasher load.
+        
+        Returns:
+            Dictionary with ``workers``, ``max_queue``, ``pending`` jobs
+            (running or queued) and ``rejected`` calls
+        """
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'max_queue': self.max_queue,
+                'pending': self._pending,
+                'rejected': self._rejected,
+            }
+
+class TokenCache:
+    """
+    Bounded cache of verified token payloads, keyed by token digest.
+    
+    An entry is dropped once its ``exp`` claim passes, so a cached token
+    never outlives its signature check; expired entries are also swept
+    from a min-heap of expiry times on every insert. When full, the least
+    recently used entry is evicted.
+    """
+    
+    def __init__(self, max_entries: int = 10000, clock=time.time):
+        """
+        Initialize an empty cache.
+        
+        Args:
+            max_entries: Largest number of cached payloads
+            clock: Returns the current Unix time
+        """
+        self.max_entries = max_entries
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[bytes, Tuple[Dict, float]]" = OrderedDict()
+        self._expiries: List[Tuple[float, bytes]] = []
+        self._counters = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0}
+        # Bumped by ``clear`` so payloads verified before it are not stored
+        self.generation = 0
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode('utf-8')).digest()
+    
+    def get(self, token: str) -> Optional[Dict]:
+        """
+        Look up a verified payload.
+        
+        Args:
+            token: JWT token string
+        
+        Returns:
+            Copy of the cached payload, or None if absent or expired
+        """
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._counters['misses'] += 1
+                return None
+            payload, expires = entry
+            if self.clock() >= expires:
+                del self._entries[key]
+                self._counters['expirations'] += 1
+                self._counters['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._counters['hits'] += 1
+            return dict(payload)
+    
+    def put(self, token: str, payload: Dict, generation: Optional[int] = None) -> None:
+        """
+        Cache a verified payload until its ``exp`` claim.
+        
+        Args:
+            token: JWT token string
+            payload: Decoded payload; not cached without an ``exp`` claim
+            generation: ``generation`` read before the token was verified;
+                the payload is dropped if the cache was cleared since
+        """
+        if self.max_entries <= 0 or 'exp' not in payload:
+            return
+        expires = float(payload['exp'])
+        key = self._key(token)
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            now = self.clock()
+            while self._expiries and self._expiries[0][0] <= now:
+                _, expired = heapq.heappop(self._expiries)
+                entry = self._entries.get(expired)
+                if entry is not None and entry[1] <= now:
+                    del self._entries[expired]
+                    self._counters['expirations'] += 1
+            self._entries[key] = (dict(payload), expires)
+            self._entries.move_to_end(key)
+            heapq.heappush(self._expiries, (expires, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._counters['evictions'] += 1
+            if len(self._expiries) > 2 * self.max_entries:
+                # Drop heap entries of evicted tokens
+                self._expiries = [(e, k) for e, k in self._expiries if k in self._entries]
+                heapq.heapify(self._expiries)
+    
+    def clear(self) -> None:
+        """Drop every cached payload."""
+        with self._lock:
+            self._entries.clear()
+            self._expiries.clear()
+            self.generation += 1
+    
+    def stats(self) -> Dict:
+        """
+        Report cache usage.
+        
+        Returns:
+            Dictionary with ``entries`` and hit, miss, eviction and
+            expiration counts
+        """
+        with self._lock:
+            return dict(self._counters, entries=len(self._entries))
+
 class AuthManager:
     """
     Handles user authentication and JWT token management.
+    
+    Verified token payloads are cached until they expire, so repeat
+    requests with the same token skip the signature check. Password
+    hashing runs on a bounded ``PasswordHasher`` sized by
+    ``BCRYPT_ROUNDS``, ``BCRYPT_WORKERS`` and ``BCRYPT_MAX_QUEUE``. Use one
+    instance per process (``get_auth_manager``) so the cache and the
+    hashing threads are shared.
     """
     
-    def __init__(self):
-        """Initialize the auth manager."""
+    def __init__(self, token_cache_size: Optional[int] = None):
+        """
+        Initialize the auth manager.
+        
+        Args:
+            token_cache_size: Most cached verified tokens (default:
+                ``AUTH_TOKEN_CACHE_SIZE``, 10000; 0 disables the cache)
+        """
+        if token_cache_size is None:
+            token_cache_size = int(os.getenv('AUTH_TOKEN_CACHE_SIZE', 10000))
+        self.token_cache = TokenCache(max_entries=token_cache_size)
+        self.passwords = PasswordHasher(
+            rounds=int(os.getenv('BCRYPT_ROUNDS', DEFAULT_BCRYPT_ROUNDS)),
+            workers=int(os.getenv('BCRYPT_WORKERS', 2)),
+            max_queue=int(os.getenv('BCRYPT_MAX_QUEUE', 16))
+        )
         self.secret_key = os.getenv('JWT_SECRET')
         if not self.secret_key:
             raise ValueError(
@@ -50,9 +327,12 @@ class AuthManager:
         
         Returns:
             Hashed password
+        
+        Raises:
+            PasswordTooLongError: If the password is over ``MAX_PASSWORD_BYTES``
+            AuthBusyError: If password hashing is at capacity
         """
-        salt = bcrypt.gensalt()
-        return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+        return self.passwords.hash(password)
     
     def verify_password(self, password: str, hashed: str) -> bool:
         """
@@ -64,8 +344,38 @@ class AuthManager:
         
         Returns:
             True if password matches, False otherwise
+        
+        Raises:
+            AuthBusyError: If password hashing is at capacity
+        """
+        return self.passwords.verify(password, hashed)
+    
+    def verify_and_rehash(self, password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+        """
+        Verify a password and upgrade its hash if the cost is out of date.
+        
+        The rehash is best effort: when hashing is at capacity the old
+        hash is kept and the upgrade happens on a later login.
+        
+        Args:
+            password: Plain text password
+            hashed: Stored hash
+        
+        Returns:
+            Whether the password matches, and the replacement hash to store
+            (None if the stored one is current)
+        
+        Raises:
+            AuthBusyError: If password hashing is at capacity
         """
-        return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+        if not self.passwords.verify(password, hashed):
+            return False, None
+        if not self.passwords.needs_rehash(hashed):
+            return True, None
+        try:
+            return True, self.passwords.hash(password)
+        except AuthBusyError:
+            return True, None
     
     def generate_token(self, user_id: str, email: str) -> str:
         """
@@ -85,6 +395,7 @@ class AuthManager:
         }
         return jwt.encode(payload, self.secret_key, algorithm='HS256')
     
+    @timed('auth.verify_token')
     def verify_token(self, token: str) -> Optional[Dict]:
         """
         Verify and decode a JWT token.
@@ -95,10 +406,30 @@ class AuthManager:
         Returns:
             Decoded payload or None if invalid
         """
+        payload = self.token_cache.get(token)
+        if payload is not None:
+            return payload
+        generation = self.token_cache.generation
         try:
             payload = jwt.decode(token, self.secret_key, algorithms=['HS256'])
-            return payload
         except jwt.ExpiredSignatureError:
             return None
         except jwt.InvalidTokenError:
             return None
+        self.token_cache.put(token, payload, generation)
+        return payload
+    
+    def rotate_secret(self, secret_key: str) -> None:
+        """
+        Switch to a new signing secret.
+        
+        Tokens signed with the old secret stop verifying at once: cached
+        payloads are dropped.
+        
+        Args:
+            secret_key: New JWT secret
+        """
+        if not secret_key:
+            raise ValueError("JWT secret must not be empty")
+        self.secret_key = secret_key
+        self.token_cache.clear()
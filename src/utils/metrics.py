@@ -0,0 +1,228 @@
+"""
+In-process metrics exported in the Prometheus text format.
+"""
+import os
+import random
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Upper bounds of the latency buckets, in seconds
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Upper bounds of the payload size buckets, in bytes
+SIZE_BUCKETS = (64, 256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+# (metric name, help text, labels, value[, type]) reported by a collector;
+# the type defaults to gauge
+Sample = Tuple[str, str, Dict[str, str], float]
+
+class Histogram:
+    """Counts of observed values per bucket, with their sum."""
+    
+    __slots__ = ('buckets', 'counts', 'sum', 'count', '_lock')
+    
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        """
+        Initialize an empty histogram.
+        
+        Args:
+            buckets: Increasing bucket upper bounds; a ``+Inf`` bucket is implied
+        """
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+    
+    def observe(self, value: float) -> None:
+        """Record one value."""
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+    
+    def snapshot(self) -> Tuple[List[int], float, int]:
+        """Return cumulative bucket counts, the sum and the count."""
+        with self._lock:
+            counts, total, count = list(self.counts), self.sum, self.count
+        for index in range(1, len(counts)):
+            counts[index] += counts[index - 1]
+        return counts, total, count
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(labels: Iterable[Tuple[str, str]]) -> str:
+    pairs = ','.join(f'{key}="{_escape(value)}"' for key, value in labels)
+    return f'{{{pairs}}}' if pairs else ''
+
+def _format_number(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class MetricsRegistry:
+    """
+    Histograms and gauges kept in memory and rendered on request.
+    
+    Timings are sampled: each request or span is recorded with probability
+    ``sample_rate``, so at 0 the hooks cost one attribute check and at 1
+    every call is recorded. Histogram counts are of sampled calls.
+    Collectors add values owned by other components (pool, cache and
+    hasher statistics) at render time.
+    """
+    
+    def __init__(self, sample_rate: float = 1.0):
+        """
+        Initialize an empty registry.
+        
+        Args:
+            sample_rate: Fraction of requests and spans recorded (0 disables)
+        """
+        self.sample_rate = sample_rate
+        self._lock = threading.Lock()
+        self._histograms: Dict[Tuple[str, Labels], Histogram] = {}
+        self._gauges: Dict[Tuple[str, Labels], float] = {}
+        self._help: Dict[str, Tuple[str, str]] = {}
+        self._collectors: List[Callable[[], Iterable[Sample]]] = []
+    
+    def sampled(self) -> bool:
+        """Decide whether to record the current call."""
+        rate = self.sample_rate
+        return rate >= 1.0 or (rate > 0.0 and random.random() < rate)
+    
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        labels: Optional[Dict[str, str]] = None,
+        buckets: Tuple[float, ...] = LATENCY_BUCKETS
+    ) -> Histogram:
+        """
+        Return the histogram of a metric and label set, creating it on first use.
+        
+        Args:
+            name: Metric name
+            help_text: Metric description
+            labels: Label values
+            buckets: Bucket upper bounds used when the histogram is created
+        
+        Returns:
+            Histogram instance
+        """
+        key = (name, tuple(sorted((labels or {}).items())))
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.get(key)
+                if histogram is None:
+                    self._help.setdefault(name, (help_text, 'histogram'))
+                    histogram = self._histograms[key] = Histogram(buckets)
+        return histogram
+    
+    def add(self, name: str, help_text: str, delta: float, labels: Optional[Dict[str, str]] = None) -> None:
+        """
+        Add to a gauge.
+        
+        Args:
+            name: Metric name
+            help_text: Metric description
+            delta: Amount added (negative to subtract)
+            labels: Label values
+        """
+        key = (name, tuple(sorted((labels or {}).items())))
+        with self._lock:
+            self._help.setdefault(name, (help_text, 'gauge'))
+            self._gauges[key] = self._gauges.get(key, 0.0) + delta
+    
+    def register_collector(self, collector: Callable[[], Iterable[Sample]]) -> None:
+        """
+        Add a callable whose samples are included in every render.
+        
+        Args:
+            collector: Callable returning ``(name, help, labels, value)``
+                gauge samples, or ``(name, help, labels, value, type)``
+        """
+        with self._lock:
+            self._collectors.append(collector)
+    
+    def render(self) -> str:
+        """
+        Render every metric in the Prometheus text exposition format.
+        
+        Returns:
+            Exposition text
+        """
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+            gauges = sorted(self._gauges.items())
+            described = dict(self._help)
+            collectors = list(self._collectors)
+        
+        samples: Dict[str, List[str]] = {}
+        for (name, labels), histogram in histograms:
+            counts, total, count = histogram.snapshot()
+            lines = samples.setdefault(name, [])
+            for bound, cumulative in zip(histogram.buckets + (float('inf'),), counts):
+                bucket_labels = _format_labels(labels + (('le', _format_number(bound)),))
+                lines.append(f'{name}_bucket{bucket_labels} {cumulative}')
+            lines.append(f'{name}_sum{_format_labels(labels)} {_format_number(total)}')
+            lines.append(f'{name}_count{_format_labels(labels)} {count}')
+        for (name, labels), value in gauges:
+            samples.setdefault(name, []).append(f'{name}{_format_labels(labels)} {_format_number(value)}')
+        for collector in collectors:
+            for name, help_text, labels, value, *kind in collector():
+                described.setdefault(name, (help_text, kind[0] if kind else 'gauge'))
+                samples.setdefault(name, []).append(
+                    f'{name}{_format_labels(sorted(labels.items()))} {_format_number(value)}'
+                )
+        
+        output = []
+        for name in sorted(samples):
+            help_text, kind = described[name]
+            output.append(f'# HELP {name} {help_text}')
+            output.append(f'# TYPE {name} {kind}')
+            output.extend(samples[name])
+        return '\n'.join(output) + '\n'
+
+# Process-wide registry; METRICS_SAMPLE_RATE is read when the module is imported
+REGISTRY = MetricsRegistry(sample_rate=float(os.getenv('METRICS_SAMPLE_RATE', 1.0)))
+
+def timed(span: str) -> Callable:
+    """
+    Record the duration of every sampled call to a function.
+    
+    Durations go to the ``span_duration_seconds`` histogram with a
+    ``span`` label; calls that are not sampled run without timing.
+    
+    Args:
+        span: Name of the span (e.g. ``"recommender.get_recommendations"``)
+    
+    Returns:
+        Decorator
+    """
+    def decorator(function):
+        histogram = None
+        
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            nonlocal histogram
+            if not REGISTRY.sampled():
+                return function(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                if histogram is None:
+                    histogram = REGISTRY.histogram(
+                        'span_duration_seconds', 'Time spent in instrumented code paths', {'span': span}
+                    )
+                histogram.observe(time.perf_counter() - started)
+        return wrapper
+    return decorator
@@ -0,0 +1,226 @@
+"""
+Declarative request schemas compiled into checker functions.
+"""
+import re
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from src.utils.validators import EMAIL_PATTERN, sanitize_input, to_local_time
+
+_MISSING = object()
+
+class SchemaError(ValueError):
+    """Raised when a payload does not match its schema."""
+    
+    def __init__(self, message: str, code: str, **details):
+        super().__init__(message)
+        self.message = message
+        self.code = code
+        self.details = details
+    
+    def to_dict(self) -> Dict:
+        """Return the API error body."""
+        return {'error': self.message, 'code': self.code, **self.details}
+
+class Field:
+    """
+    Declaration of one payload value.
+    
+    Kinds are ``string``, ``email``, ``integer``, ``number`` (booleans are
+    never numbers), ``boolean``, ``date`` (ISO-8601, returned as a
+    naive ``datetime`` in server local time), ``object`` (with ``fields``), ``array`` (with ``items``)
+    and ``any``.
+    """
+    
+    def __init__(
+        self,
+        kind: str,
+        required: bool = False,
+        default: Any = None,
+        error: Tuple[str, str] = ('Invalid request', 'INVALID_REQUEST'),
+        gt: Optional[float] = None,
+        ge: Optional[float] = None,
+        min_length: Optional[int] = None,
+        max_length: Optional[int] = None,
+        fields: Optional[Dict[str, 'Field']] = None,
+        items: Optional['Field'] = None,
+        item_error: Optional[Tuple[str, str]] = None,
+        sanitize: bool = False,
+        extra: bool = False
+    ):
+        """
+        Declare a value.
+        
+        Args:
+            kind: Value kind (see the class docstring)
+            required: Reject payloads without the value
+            default: Value used when an optional value is absent or null
+            error: ``(message, code)`` reported when the value is invalid
+            gt: Exclusive lower bound for numbers
+            ge: Inclusive lower bound for numbers
+            min_length: Shortest string or array
+            max_length: Longest string or array
+            fields: Declared keys of an object; other keys are dropped
+            items: Declaration of every array element
+            item_error: ``(message, code)`` reported, with the ``indexes``
+                of the invalid elements, when array elements are invalid
+            sanitize: HTML-escape and strip strings (see ``sanitize_input``)
+            extra: Keep an object's undeclared keys as they are instead of
+                dropping them
+        """
+        self.kind = kind
+        self.required = required
+        self.default = default
+        self.error = error
+        self.gt = gt
+        self.ge = ge
+        self.min_length = min_length
+        self.max_length = max_length
+        self.fields = fields
+        self.items = items
+        self.item_error = item_error
+        self.sanitize = sanitize
+        self.extra = extra
+
+def _fail(field: Field):
+    raise SchemaError(*field.error)
+
+def _compile(field: Field) -> Callable[[Any], Any]:
+    """Build the checker for one declaration; checkers return the clean value."""
+    kind = field.kind
+    gt, ge = field.gt, field.ge
+    min_length, max_length = field.min_length, field.max_length
+    
+    if kind in ('string', 'email'):
+        pattern = re.compile(EMAIL_PATTERN) if kind == 'email' else None
+        sanitize = field.sanitize
+        
+        def check(value):
+            if type(value) is not str:
+                _fail(field)
+            if sanitize:
+                value = sanitize_input(value)
+            if (min_length is not None and len(value) < min_length) or (
+                    max_length is not None and len(value) > max_length):
+                _fail(field)
+            if pattern is not None and not pattern.match(value.strip()):
+                _fail(field)
+            return value
+        return check
+    
+    if kind in ('integer', 'number'):
+        types = (int,) if kind == 'integer' else (int, float)
+        
+        def check(value):
+            if type(value) is bool or not isinstance(value, types):
+                _fail(field)
+            if (gt is not None and not value > gt) or (ge is not None and not value >= ge):
+                _fail(field)
+            return value
+        return check
+    
+    if kind == 'boolean':
+        def check(value):
+            if type(value) is not bool:
+                _fail(field)
+            return value
+        return check
+    
+    if kind == 'date':
+        def check(value):
+            try:
+                return to_local_time(datetime.fromisoformat(value))
+            except (TypeError, ValueError):
+                _fail(field)
+        return check
+    
+    if kind == 'object':
+        return _compile_object(field)
+    
+    if kind == 'array':
+        element = _compile(field.items) if field.items is not None else None
+        item_error = field.item_error
+        
+        def check(value):
+            if type(value) is not list:
+                _fail(field)
+            if (min_length is not None and len(value) < min_length) or (
+                    max_length is not None and len(value) > max_length):
+                _fail(field)
+            if element is None:
+                return value
+            cleaned, invalid = [], []
+            for index, item in enumerate(value):
+                try:
+                    cleaned.append(element(item))
+                except SchemaError:
+                    if item_error is None:
+                        raise
+                    invalid.append(index)
+            if invalid:
+                raise SchemaError(*item_error, indexes=invalid)
+            return cleaned
+        return check
+    
+    if kind == 'any':
+        return lambda value: value
+    
+    raise ValueError(f"Unknown field kind: {kind}")
+
+def _compile_object(field: Field) -> Callable[[Any], Dict]:
+    # Resolve everything per key once, so a check is one pass over a tuple
+    plan = tuple(
+        (name, _compile(child), child.required, child.default, child)
+        for name, child in (field.fields or {}).items()
+    )
+    extra = field.extra
+    
+    def check(value):
+        if type(value) is not dict:
+            _fail(field)
+        cleaned = dict(value) if extra else {}
+        for name, checker, required, default, child in plan:
+            item = value.get(name, _MISSING)
+            if item is _MISSING or item is None:
+                if required:
+                    _fail(child)
+                cleaned[name] = default
+            else:
+                cleaned[name] = checker(item)
+        return cleaned
+    return check
+
+class Schema:
+    """
+    A request payload declaration compiled once into a checker.
+    
+    The payload must be a JSON object; declared keys are checked and
+    converted, absent optional keys get their defaults and undeclared
+    keys are dropped.
+    """
+    
+    def __init__(self, fields: Dict[str, Field], error: Tuple[str, str] = ('Invalid request', 'INVALID_REQUEST')):
+        """
+        Compile a schema.
+        
+        Args:
+            fields: Declared keys of the payload object
+            error: ``(message, code)`` reported when the payload is not an object
+        """
+        self.fields = fields
+        self._check = _compile(Field('object', fields=fields, error=error))
+    
+    def validate(self, payload: Any) -> Dict:
+        """
+        Check a payload.
+        
+        Args:
+            payload: Decoded JSON body
+        
+        Returns:
+            The clean payload
+        
+        Raises:
+            SchemaError: With the message and code of the first invalid value
+        """
+        return self._check(payload)
@@ -0,0 +1,264 @@
+"""
+Application settings loaded from config/settings.json.
+"""
+import json
+import os
+import threading
+import time
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, Mapping, NamedTuple, Optional, Tuple
+
+DEFAULT_SETTINGS_PATH = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..', '..', 'config', 'settings.json')
+)
+
+def normalize_key(value) -> Optional[str]:
+    """Normalize a style, category or space type for code lookup."""
+    if value is None:
+        return None
+    return str(value).strip().lower()
+
+def normalize_space_type(value) -> Optional[str]:
+    """Normalize a space type ("Living Room" -> "living_room") for code lookup."""
+    if value is None:
+        return None
+    return str(value).strip().lower().replace(' ', '_')
+
+def _codes(values, normalize) -> Mapping[str, int]:
+    codes: Dict[str, int] = {}
+    for value in values:
+        codes.setdefault(normalize(value), len(codes))
+    return MappingProxyType(codes)
+
+def discount_table(tiers) -> Tuple[float, ...]:
+    """
+    Expand lease duration tiers into a discount per lease length.
+    
+    Args:
+        tiers: ``{'months', 'discount'}`` tiers sorted by ``months``
+    
+    Returns:
+        Discount for every lease length from 0 up to the longest tier
+    """
+    discounts = [0.0] * ((tiers[-1]['months'] if tiers else 0) + 1)
+    for tier in tiers:
+        discounts[tier['months']:] = [tier['discount']] * (len(discounts) - tier['months'])
+    return tuple(discounts)
+
+class Settings(NamedTuple):
+    """
+    One parsed, read-only version of the settings file.
+    
+    Styles, categories and space types are numbered in file order, and the
+    ``lease_durations`` tiers are expanded into a discount per lease length
+    up to the longest tier, so lookups on the request path are dictionary
+    or tuple indexing.
+    """
+    raw: Dict
+    version: int
+    styles: Tuple[str, ...]
+    style_codes: Mapping[str, int]
+    categories: Tuple[str, ...]
+    category_codes: Mapping[str, int]
+    space_types: Tuple[str, ...]
+    space_type_codes: Mapping[str, int]
+    bundle_categories: Mapping[str, Tuple[str, ...]]
+    lease_durations: Tuple[Mapping, ...]
+    discount_by_months: Tuple[float, ...]
+    
+    @classmethod
+    def parse(cls, raw: Dict, version: int = 1) -> 'Settings':
+        """
+        Index a settings dictionary.
+        
+        Args:
+            raw: Parsed settings file
+            version: Version number of this snapshot
+        
+        Returns:
+            Settings snapshot
+        
+        Raises:
+            ValueError: If a lease discount is outside [0, 1)
+        """
+        style_codes = _codes(raw.get('supported_styles', []), normalize_key)
+        category_codes = _codes(raw.get('furniture_categories', []), normalize_key)
+        space_type_codes = _codes(raw.get('space_types', []), normalize_space_type)
+        
+        tiers = tuple(sorted(
+            (MappingProxyType({'months': int(tier['months']), 'discount': float(tier['discount'])})
+             for tier in raw.get('lease_durations', [])),
+            key=lambda tier: tier['months']
+        ))
+        if any(not 0 <= tier['discount'] < 1 for tier in tiers):
+            raise ValueError("Lease discounts must be in [0, 1)")
+        
+        return cls(
+            raw=raw,
+            version=version,
+            styles=tuple(style_codes),
+            style_codes=style_codes,
+            categories=tuple(category_codes),
+            category_codes=category_codes,
+            space_types=tuple(space_type_codes),
+            space_type_codes=space_type_codes,
+            bundle_categories=MappingProxyType({
+                normalize_space_type(space_type): tuple(normalize_key(category) for category in categories)
+                for space_type, categories in raw.get('bundle_categories', {}).items()
+            }),
+            lease_durations=tiers,
+            discount_by_months=discount_table(tiers),
+        )
+    
+    def style_code(self, style) -> Optional[int]:
+        """Return the code of a style, or None if it is not configured."""
+        return self.style_codes.get(normalize_key(style))
+    
+    def category_code(self, category) -> Optional[int]:
+        """Return the code of a furniture category, or None if it is not configured."""
+        return self.category_codes.get(normalize_key(category))
+    
+    def space_type_code(self, space_type) -> Optional[int]:
+        """Return the code of a space type, or None if it is not configured."""
+        return self.space_type_codes.get(normalize_space_type(space_type))
+    
+    def discount(self, duration_months: int) -> float:
+        """
+        Return the discount rate for a lease length.
+        
+        Leases longer than the longest tier get its discount.
+        
+        Args:
+            duration_months: Lease length in months
+        
+        Returns:
+            Discount as a fraction of the monthly price
+        """
+        table = self.discount_by_months
+        if not table:
+            return 0.0
+        return table[min(max(int(duration_months), 0), len(table) - 1)]
+
+def _identity(path: str) -> Tuple[int, int, int]:
+    stat = os.stat(path)
+    return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+class SettingsRegistry:
+    """
+    Holds the current ``Settings`` of one file and reloads it when it changes.
+    
+    Readers get the current snapshot without locking. At most once per
+    ``reload_interval`` a reader checks the file's identity (inode, size
+    and mtime); if it changed, that reader parses the file and swaps the
+    snapshot in while others keep using the previous one. A file that fails
+    to parse is skipped until it changes again.
+    
+    Values indexed into long-lived structures when a component is built
+    (catalog codes, model inputs) keep the version they were built from;
+    values read per request see reloads.
+    """
+    
+    def __init__(self, path: str = DEFAULT_SETTINGS_PATH, reload_interval: Optional[float] = None):
+        """
+        Load the settings file.
+        
+        Args:
+            path: Path to the settings JSON file
+            reload_interval: Seconds between checks of the file for changes
+                (None disables hot reloading)
+        
+        Raises:
+            OSError: If the file cannot be read
+            ValueError: If the file is not valid settings JSON
+        """
+        self.path = path
+        self.reload_interval = reload_interval
+        self._reload_lock = threading.Lock()
+        self._next_check = 0.0
+        self._rejected_identity = None
+        self._identity = _identity(path)
+        self._current = self._read(version=1)
+    
+    def _read(self, version: int) -> Settings:
+        with open(self.path, 'r', encoding='utf-8') as fh:
+            return Settings.parse(json.load(fh), version=version)
+    
+    def get(self) -> Settings:
+        """Return the current settings, checking the file for changes when due."""
+        if self.reload_interval is not None and time.monotonic() >= self._next_check:
+            self._maybe_reload()
+        return self._current
+    
+    def _maybe_reload(self) -> None:
+        if not self._reload_lock.acquire(blocking=False):
+            return
+        try:
+            self._next_check = time.monotonic() + self.reload_interval
+            self.reload_if_changed()
+        finally:
+            self._reload_lock.release()
+    
+    def reload_if_changed(self) -> bool:
+        """
+        Parse the file again if it has changed since it was last read.
+        
+        Returns:
+            True if a new version was swapped in
+        """
+        try:
+            identity = _identity(self.path)
+        except OSError:
+            return False
+        if identity in (self._identity, self._rejected_identity):
+            return False
+        try:
+            settings = self._read(version=self._current.version + 1)
+        except (OSError, ValueError, KeyError, TypeError):
+            self._rejected_identity = identity
+            return False
+        self._identity = identity
+        self._current = settings
+        return True
+
+@lru_cache(maxsize=None)
+def get_registry(path: str = DEFAULT_SETTINGS_PATH) -> SettingsRegistry:
+    """
+    Return the process-wide registry of a settings file.
+    
+    The file is checked for changes every ``SETTINGS_RELOAD_INTERVAL``
+    seconds (default 5; 0 disables hot reloading).
+    
+    Args:
+        path: Path to the settings JSON file
+    
+    Returns:
+        Shared SettingsRegistry instance
+    """
+    interval = float(os.getenv('SETTINGS_RELOAD_INTERVAL', 5))
+    return SettingsRegistry(path, reload_interval=interval if interval > 0 else None)
+
+def get_settings(path: str = DEFAULT_SETTINGS_PATH) -> Settings:
+    """
+    Return the current indexed settings.
+    
+    Args:
+        path: Path to the settings JSON file
+    
+    Returns:
+        Settings snapshot (shared, read-only)
+    """
+    return get_registry(path).get()
+
+def load_settings(path: str = DEFAULT_SETTINGS_PATH) -> Dict:
+    """
+    Load the platform settings file.
+    
+    Args:
+        path: Path to the settings JSON file
+    
+    Returns:
+        Parsed settings dictionary of the current version (shared, treat as
+        read-only)
+    """
+    return get_registry(path).get().raw
@@ -1,10 +1,20 @@
 """
 Data validation utilities.
 """
+from datetime import datetime
 from typing import Dict, List, Any
 import re
 import html
 
+from src.utils.settings import get_settings
+
+EMAIL_PATTERN = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
+_EMAIL = re.compile(EMAIL_PATTERN)
+
+# Deepest nesting and most values sanitize_input accepts
+MAX_DEPTH = 32
+MAX_VALUES = 100000
+
 def validate_email(email: str) -> bool:
     """
     Validate email format.
@@ -15,8 +25,31 @@ def validate_email(email: str) -> bool:
     Returns:
         True if valid, False otherwise
     """
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return bool(re.match(pattern, email))
+    return bool(_EMAIL.match(email))
+
+def validate_space_type(space_type: str) -> bool:
+    """
+    Validate that a space type is configured in the settings file.
+    
+    Args:
+        space_type: Space type ("living_room", "Living Room", ...)
+    
+    Returns:
+        True if valid, False otherwise
+    """
+    return isinstance(space_type, str) and get_settings().space_type_code(space_type) is not None
+
+def validate_style(style: str) -> bool:
+    """
+    Validate that a design style is configured in the settings file.
+    
+    Args:
+        style: Style name
+    
+    Returns:
+        True if valid, False otherwise
+    """
+    return isinstance(style, str) and get_settings().style_code(style) is not None
 
 def validate_dimensions(dimensions: Dict[str, float]) -> bool:
     """
@@ -51,21 +84,93 @@ def validate_budget(budget: float, min_budget: float = 0) -> bool:
     """
     return isinstance(budget, (int, float)) and budget >= min_budget
 
-def sanitize_input(data: Any) -> Any:
+def to_local_time(value: datetime) -> datetime:
+    """
+    Convert a timezone-aware datetime to naive server local time.
+    
+    Lease dates are compared with ``datetime.now()``, so they are all kept
+    naive in the server's time zone; naive values are returned as they are.
+    
+    Args:
+        value: Naive or aware datetime
+    
+    Returns:
+        Naive datetime in server local time
+    """
+    if value.tzinfo is None or value.utcoffset() is None:
+        return value
+    return value.astimezone().replace(tzinfo=None)
+
+def _sanitize_string(value: str) -> str:
+    # Strings html.escape and strip would leave alone are returned as they are
+    if ('&' in value or '<' in value or '>' in value or '"' in value or "'" in value
+            or value[:1].isspace() or value[-1:].isspace()):
+        return html.escape(value.strip(), quote=True)
+    return value
+
+def sanitize_input(data: Any, max_depth: int = MAX_DEPTH, max_values: int = MAX_VALUES) -> Any:
     """
     Sanitize user input to prevent injection attacks.
     
+    Strings are stripped and HTML-escaped. Nested dicts and lists are
+    walked iteratively, and a container is only copied when something
+    inside it changed, so clean input comes back as the same objects.
+    
     Args:
         data: Input data to sanitize
+        max_depth: Deepest container nesting accepted
+        max_values: Most values (at any depth) accepted
     
     Returns:
         Sanitized data with HTML entities escaped
+    
+    Raises:
+        ValueError: If the input is nested too deeply or too large
     """
     if isinstance(data, str):
-        # Use html.escape to properly sanitize HTML content
-        return html.escape(data.strip(), quote=True)
-    elif isinstance(data, dict):
-        return {k: sanitize_input(v) for k, v in data.items()}
-    elif isinstance(data, list):
-        return [sanitize_input(item) for item in data]
-    return data
+        return _sanitize_string(data)
+    if not isinstance(data, (dict, list)):
+        return data
+    
+    # Entries are [container, copy or None, parent entry, key in parent, depth]
+    root = [data, None, None, None, 1]
+    stack = [root]
+    values = 0
+    while stack:
+        entry = stack.pop()
+        node, depth = entry[0], entry[4]
+        values += len(node)
+        if values > max_values:
+            raise ValueError(f"Input has more than {max_values} values")
+        pairs = node.items() if isinstance(node, dict) else enumerate(node)
+        for key, value in pairs:
+            kind = type(value)
+            if kind is str:
+                cleaned = _sanitize_string(value)
+                if cleaned is not value:
+                    _copy(entry)[key] = cleaned
+            elif kind is dict or kind is list or isinstance(value, (dict, list)):
+                if depth >= max_depth:
+                    raise ValueError(f"Input is nested deeper than {max_depth} levels")
+                stack.append([value, None, entry, key, depth + 1])
+    return root[1] if root[1] is not None else data
+
+def _shallow_copy(container: Any) -> Any:
+    return dict(container) if isinstance(container, dict) else list(container)
+
+def _copy(entry: List) -> Any:
+    """Return an entry's copy of its container, copying its parents on first use."""
+    if entry[1] is not None:
+        return entry[1]
+    entry[1] = _shallow_copy(entry[0])
+    child = entry
+    while child[2] is not None:
+        parent = child[2]
+        copied = parent[1] is not None
+        if not copied:
+            parent[1] = _shallow_copy(parent[0])
+        parent[1][child[3]] = child[1]
+        if copied:
+            break
+        child = parent
+    return entry[1]
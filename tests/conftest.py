@@ -0,0 +1,7 @@
+"""
+Shared test configuration.
+"""
+import os
+
+# Tests build the app many times; load models lazily rather than at startup
+os.environ.setdefault('MODEL_WARM_UP', 'off')
@@ -0,0 +1,54 @@
+"""
+Tests for the approximate nearest-neighbour index.
+"""
+import pytest
+import sys
+import os
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.ml.ann_index import IVFIndex
+from src.ml.recommender import DesignRecommender
+from src.services.catalog_index import CatalogIndex
+
+def test_search_matches_brute_force_with_all_cells():
+    """Test that probing every cell is an exact search."""
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(500, 8)).astype(np.float32)
+    index = IVFIndex(n_lists=10)
+    index.build(np.arange(500), vectors)
+    query = rng.normal(size=8).astype(np.float32)
+    ids, _ = index.search(query[None, :], k=5, n_probe=10)
+    expected = np.argsort(-(vectors @ query))[:5]
+    assert ids[0].tolist() == expected.tolist()
+
+def test_add_and_remove():
+    """Test incremental inserts and removals."""
+    rng = np.random.default_rng(1)
+    index = IVFIndex(n_lists=4)
+    index.build(np.arange(100), rng.normal(size=(100, 4)))
+    index.add(1000, np.array([50.0, 0, 0, 0]))
+    ids, _ = index.search(np.array([[1.0, 0, 0, 0]]), k=1, n_probe=4)
+    assert ids[0, 0] == 1000
+    assert index.remove(1000) is True
+    assert len(index) == 100
+
+def test_recommender_uses_ann_and_tracks_inserts():
+    """Test that the ANN path agrees with the exact scan and sees new items."""
+    catalog = CatalogIndex()
+    rng = np.random.default_rng(2)
+    styles, categories = catalog.styles, catalog.categories
+    catalog.add_many([
+        {'id': f'i{n}', 'style': styles[n % len(styles)],
+         'category': categories[n % len(categories)], 'price': float(rng.uniform(10, 100))}
+        for n in range(300)
+    ])
+    exact = DesignRecommender(catalog=catalog)
+    ann = DesignRecommender(catalog=catalog, ann_index=IVFIndex(n_lists=8, n_probe=8), ann_min_items=0)
+    ann.build_ann_index()
+    request = {'space_type': 'bedroom', 'style_preference': 'rustic', 'budget': 80, 'dimensions': None}
+    assert ann.get_recommendations(**request) == exact.get_recommendations(**request)
+    
+    catalog.add({'id': 'new-bed', 'style': 'rustic', 'category': 'beds', 'price': 1})
+    assert ann.get_recommendations(**request)[0]['id'] == 'new-bed'
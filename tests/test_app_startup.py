@@ -0,0 +1,94 @@
+"""
+Tests for lazy model loading, warm-up and readiness.
+"""
+import pytest
+import sys
+import os
+import subprocess
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+def test_create_app_defers_model_imports():
+    """Test building the app does not import NumPy, PIL or TensorFlow."""
+    code = (
+        "import sys\n"
+        "from app import create_app\n"
+        "create_app()\n"
+        "print(','.join(m for m in ('numpy', 'PIL', 'tensorflow') if m in sys.modules))\n"
+    )
+    env = dict(os.environ, MODEL_WARM_UP='off')
+    result = subprocess.run(
+        [sys.executable, '-c', code], cwd=ROOT, env=env,
+        check=True, capture_output=True, text=True
+    )
+    assert result.stdout.strip() == ''
+
+def _fresh_state(monkeypatch, dependencies):
+    monkeypatch.setattr(dependencies, '_component_state', {
+        name: {'status': 'cold'} for name in dependencies.WARM_UP_COMPONENTS
+    })
+    # The real warmer starts the shared scheduler's background thread
+    monkeypatch.setitem(dependencies._WARMERS, 'lease_scheduler', lambda: None)
+
+def test_ready_after_warm_up(monkeypatch):
+    """Test the readiness endpoint reports 200 once models are loaded."""
+    from app import create_app
+    from src.api import dependencies
+    _fresh_state(monkeypatch, dependencies)
+    components = dependencies.warm_up()
+    response = create_app().test_client().get('/ready')
+    assert all(state['status'] == 'ready' for state in components.values())
+    assert response.status_code == 200
+    assert response.get_json()['ready'] is True
+
+def test_failed_component_is_not_ready(monkeypatch):
+    """Test a component that fails to load keeps the app unready."""
+    from app import create_app
+    from src.api import dependencies
+    
+    def broken():
+        raise OSError("model file is corrupt")
+    
+    _fresh_state(monkeypatch, dependencies)
+    monkeypatch.setitem(dependencies._WARMERS, 'style_analyzer', broken)
+    dependencies.warm_up(['style_analyzer'])
+    response = create_app().test_client().get('/ready')
+    assert response.status_code == 503
+    state = response.get_json()['components']['style_analyzer']
+    assert state == {'status': 'failed', 'error': 'model file is corrupt'}
+    assert create_app().test_client().get('/health').status_code == 200
+
+def test_style_analyzer_loads_model_once():
+    """Test concurrent first use loads the classifier a single time."""
+    from concurrent.futures import ThreadPoolExecutor
+    from src.ml.style_analyzer import StyleAnalyzer
+    analyzer = StyleAnalyzer(model_path='missing/style_classifier.h5')
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda _: analyzer.load_model(), range(16)))
+    assert analyzer.is_loaded
+    assert analyzer.model is None
+
+def test_forked_worker_restarts_background_threads(monkeypatch):
+    """Test that the after-fork hook restarts the scheduler and an unfinished warm-up."""
+    from src.api import dependencies
+    from src.services.lease_scheduler import LeaseScheduler
+    from src.services.lease_service import LeaseService
+    import threading
+    scheduler = LeaseScheduler(LeaseService())
+    # A forked child holds the parent's thread object, but no running thread
+    parent_thread = scheduler._thread = threading.Thread(target=lambda: None)
+    restarted = []
+    _fresh_state(monkeypatch, dependencies)
+    monkeypatch.setattr(dependencies, '_lease_scheduler', scheduler)
+    monkeypatch.setattr(dependencies, '_warm_up_thread', object())
+    monkeypatch.setattr(dependencies, 'start_warm_up', lambda: restarted.append(True))
+    dependencies._component_state['recommender'] = {'status': 'loading'}
+    try:
+        dependencies._after_fork_in_child()
+        assert scheduler._thread is not parent_thread and scheduler._thread.is_alive()
+    finally:
+        scheduler.stop()
+    assert restarted == [True]
+    assert dependencies._component_state['recommender'] == {'status': 'cold'}
@@ -0,0 +1,78 @@
+"""
+Tests for token verification caching and the auth decorator.
+"""
+import pytest
+import sys
+import os
+from datetime import datetime, timedelta
+
+import jwt
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.utils.auth import AuthManager, TokenCache
+
+SECRET = 'test-secret-' + '0' * 32
+
+@pytest.fixture
+def auth(monkeypatch):
+    monkeypatch.setenv('JWT_SECRET', SECRET)
+    return AuthManager(token_cache_size=2)
+
+def test_verified_tokens_skip_decoding(auth, monkeypatch):
+    """Test that a repeat verification is served from the cache."""
+    token = auth.generate_token('U1', 'u1@example.com')
+    calls = []
+    decode = jwt.decode
+    monkeypatch.setattr(jwt, 'decode', lambda *args, **kwargs: calls.append(1) or decode(*args, **kwargs))
+    
+    first = auth.verify_token(token)
+    first['user_id'] = 'tampered'
+    second = auth.verify_token(token)
+    
+    assert len(calls) == 1
+    assert second['user_id'] == 'U1'
+    assert auth.verify_token('not-a-token') is None
+    assert auth.token_cache.stats()['hits'] == 1
+
+def test_cache_expires_evicts_and_rotates(auth):
+    """Test expiry at the exp claim, LRU eviction and clearing on rotation."""
+    now = [1000.0]
+    cache = TokenCache(max_entries=2, clock=lambda: now[0])
+    cache.put('a', {'exp': 1010})
+    cache.put('b', {'exp': 2000})
+    assert cache.get('a') == {'exp': 1010}
+    cache.put('c', {'exp': 2000})
+    assert cache.get('b') is None and cache.get('a') is not None
+    now[0] = 1010.0
+    assert cache.get('a') is None
+    
+    token = auth.generate_token('U1', 'u1@example.com')
+    assert auth.verify_token(token) is not None
+    auth.rotate_secret('rotated-secret-' + '1' * 32)
+    assert len(auth.token_cache) == 0
+    assert auth.verify_token(token) is None
+
+def test_profile_requires_token(monkeypatch):
+    """Test that the profile endpoint rejects missing tokens and reads the verified user."""
+    monkeypatch.setenv('JWT_SECRET', SECRET)
+    from app import create_app
+    from src.api import dependencies
+    monkeypatch.setattr(dependencies, '_auth_manager', None)
+    monkeypatch.setattr(dependencies, '_user_service', None)
+    client = create_app().test_client()
+    user = dependencies.get_user_service().register('u7@example.com', 'correct horse', name='U7')
+    token = dependencies.get_auth_manager().generate_token(user['id'], user['email'])
+    stranger = dependencies.get_auth_manager().generate_token('nobody', 'nobody@example.com')
+    expired = jwt.encode({'user_id': user['id'], 'exp': datetime.utcnow() - timedelta(seconds=1)},
+                         SECRET, algorithm='HS256')
+    
+    assert client.get('/api/user/profile').status_code == 401
+    assert client.get('/api/user/profile', headers={'Authorization': f'Bearer {expired}'}).status_code == 401
+    response = client.get('/api/user/profile', headers={'Authorization': f'Bearer {token}'})
+    assert response.status_code == 200
+    assert response.get_json() == {'id': user['id'], 'email': 'u7@example.com', 'name': 'U7', 'preferences': {}}
+    missing = client.get('/api/user/profile', headers={'Authorization': f'Bearer {stranger}'})
+    assert missing.status_code == 404
+    assert missing.get_json()['code'] == 'USER_NOT_FOUND'
+    assert dependencies.get_auth_manager() is dependencies.get_auth_manager()
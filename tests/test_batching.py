@@ -0,0 +1,49 @@
+"""
+Tests for the micro-batching scheduler.
+"""
+import pytest
+import sys
+import os
+import threading
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.ml.batching import MicroBatcher
+
+def test_each_caller_gets_own_result():
+    """Test that concurrent submissions are batched and routed back."""
+    sizes = []
+    
+    def handler(requests):
+        sizes.append(len(requests))
+        return [r * 2 for r in requests]
+    
+    batcher = MicroBatcher(handler, max_batch_size=8, max_wait_ms=20)
+    results = {}
+    
+    def call(n):
+        results[n] = batcher.submit(n, timeout=5)
+    
+    threads = [threading.Thread(target=call, args=(n,)) for n in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    batcher.close()
+    
+    assert results == {n: n * 2 for n in range(20)}
+    assert max(sizes) <= 8
+    assert len(sizes) < 20
+    stats = batcher.stats()
+    assert stats['requests'] == 20
+    assert stats['p99_ms'] >= stats['p50_ms'] > 0
+
+def test_handler_errors_propagate():
+    """Test that a failing batch fails every caller in it."""
+    def handler(requests):
+        raise RuntimeError('boom')
+    
+    batcher = MicroBatcher(handler, max_wait_ms=0)
+    with pytest.raises(RuntimeError):
+        batcher.submit(1, timeout=5)
+    batcher.close()
@@ -0,0 +1,35 @@
+"""
+Tests for the benchmark suite and its synthetic data.
+"""
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.suite import CASES, compare, run
+from benchmarks.synthetic import make_catalog, make_leases
+
+def test_generators_are_deterministic():
+    """Test that the same seed gives the same catalog and lease history."""
+    items = make_catalog(50, seed=3)
+    
+    assert make_catalog(50, seed=3) == items
+    assert make_leases(20, items, seed=4) == make_leases(20, items, seed=4)
+    assert all(1 <= len(lease['items']) <= 4 for lease in make_leases(20, items, seed=4))
+
+def test_every_case_runs():
+    """Test that every case builds and times at a small size."""
+    results = run(list(CASES), [200], repeats=1, min_time=0.0)
+    
+    assert sorted(results) == sorted(f'{name}[200]' for name in CASES)
+    assert all(ms > 0 for ms in results.values())
+
+def test_compare_flags_regressions_past_the_threshold():
+    """Test that only slowdowns beyond both the tolerance and the noise floor fail."""
+    baseline = {'a[10]': 1.0, 'b[10]': 1.0, 'c[10]': 0.001, 'd[10]': 1.0}
+    results = {'a[10]': 1.2, 'b[10]': 1.5, 'c[10]': 0.004}
+    
+    failures = compare(results, baseline, tolerance=0.25, min_delta_ms=0.005)
+    
+    assert len(failures) == 1 and failures[0].startswith('b[10]')
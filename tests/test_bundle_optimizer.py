@@ -0,0 +1,58 @@
+"""
+Tests for the bundle optimizer.
+"""
+import pytest
+import sys
+import os
+import itertools
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+from src.ml.bundle_optimizer import optimize_bundle, pareto_front
+
+def _brute_force(scores, prices, budget):
+    best = None
+    for combo in itertools.product(*[range(len(s)) for s in scores]):
+        price = sum(p[j] for p, j in zip(prices, combo))
+        score = sum(s[j] for s, j in zip(scores, combo))
+        if price <= budget and (best is None or score > best):
+            best = score
+    return best
+
+def test_pareto_front_drops_dominated_items():
+    """Test that items beaten by a cheaper one are dropped"""
+    scores = np.array([0.5, 0.9, 0.4, 0.9, 0.7])
+    prices = np.array([10.0, 30.0, 20.0, 40.0, 10.0])
+    assert sorted(pareto_front(scores, prices).tolist()) == [1, 4]
+
+def test_optimize_bundle_matches_brute_force():
+    """Test that the search finds the best bundle within budget"""
+    rng = np.random.default_rng(7)
+    for _ in range(100):
+        n_categories = int(rng.integers(1, 5))
+        scores = [rng.uniform(-1, 1, int(rng.integers(1, 6))) for _ in range(n_categories)]
+        prices = [rng.integers(1, 50, len(s)).astype(float) for s in scores]
+        budget = float(rng.integers(10, 120))
+        expected = _brute_force(scores, prices, budget)
+        solution = optimize_bundle(scores, prices, budget, time_limit=1.0)
+        if expected is None:
+            assert solution is None
+            continue
+        assert solution.optimal
+        assert solution.score == pytest.approx(expected)
+        assert solution.price <= budget
+        assert sum(s[j] for s, j in zip(scores, solution.choice)) == pytest.approx(expected)
+
+def test_optimize_bundle_respects_time_limit():
+    """Test that an exhausted time limit still returns a feasible bundle"""
+    rng = np.random.default_rng(3)
+    prices = [rng.uniform(10, 2000, 5000) for _ in range(6)]
+    # Score tracks price, so the bound prunes little and the search is long
+    scores = [p / 2000 + rng.normal(0, 0.01, len(p)) for p in prices]
+    solution = optimize_bundle(scores, prices, 3000.0, time_limit=0.0)
+    assert solution is not None
+    assert not solution.optimal
+    assert solution.price <= 3000.0
+    assert optimize_bundle(scores, prices, 10.0, time_limit=0.0) is None
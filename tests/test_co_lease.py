@@ -0,0 +1,73 @@
+"""
+Tests for the co-lease similarity model.
+"""
+import pytest
+import sys
+import os
+from datetime import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.ml.co_lease import CoLeaseModel
+
+def test_fit_ranks_frequent_companions_first():
+    """Test neighbours are ordered by cosine co-lease similarity."""
+    model = CoLeaseModel(top_n=5)
+    model.fit([
+        {'items': [{'id': 'sofa'}, {'id': 'rug'}, {'id': 'lamp'}]},
+        ['sofa', 'rug'],
+        ['sofa', 'rug', 'table'],
+        ['lamp', 'desk'],
+        ['solo'],
+    ], chunk_size=2)
+    neighbours = model.neighbours('sofa')
+    assert [item_id for item_id, _ in neighbours] == ['rug', 'table', 'lamp']
+    assert neighbours[0][1] == pytest.approx(1.0)
+    assert model.neighbours('solo') == []
+    assert model.neighbours('unknown') == []
+
+def test_incremental_updates_match_refit():
+    """Test add_lease and compaction agree with fitting from scratch."""
+    history = [['a', 'b'], ['a', 'c'], ['b', 'c', 'd'], ['a', 'b', 'd']]
+    incremental = CoLeaseModel(compact_after=1000)
+    incremental.fit(history[:2])
+    for lease in history[2:]:
+        incremental.add_lease(lease)
+    refit = CoLeaseModel()
+    refit.fit(history)
+    for item_id in 'abcd':
+        fresh = incremental.neighbours(item_id)
+        assert [i for i, _ in fresh] == [i for i, _ in refit.neighbours(item_id)]
+    incremental.compact()
+    assert incremental.stats()['pending_pairs'] == 0
+    for item_id in 'abcd':
+        assert incremental.neighbours(item_id) == refit.neighbours(item_id)
+
+def test_rows_are_bounded():
+    """Test each item keeps at most max_row_nnz co-leased items."""
+    model = CoLeaseModel(top_n=3, max_row_nnz=4, compact_after=10)
+    model.fit([['hub', f'spoke{i}'] for i in range(20)] + [['hub', 'spoke0']] * 3)
+    for i in range(5):
+        model.add_lease(['hub', f'extra{i}'])
+    model.compact()
+    assert model.stats()['pairs'] <= 4 + 25
+    assert model.neighbours('hub')[0][0] == 'spoke0'
+
+def test_lease_service_feeds_recommender():
+    """Test new leases update also-leased suggestions."""
+    from src.ml.recommender import DesignRecommender
+    from src.services.inventory_service import InventoryService
+    from src.services.lease_service import LeaseService
+    inventory = InventoryService()
+    for item_id in ('sofa', 'rug', 'lamp'):
+        inventory.add_item({'id': item_id, 'category': 'decor', 'style': 'modern', 'price': 10})
+    co_lease = CoLeaseModel()
+    leases = LeaseService(inventory=inventory, co_lease=co_lease)
+    recommender = DesignRecommender(catalog=inventory.index, co_lease=co_lease)
+    leases.create_lease('U1', [{'id': 'sofa'}, {'id': 'rug'}], datetime(2025, 1, 1), 3)
+    leases.create_lease('U2', [{'id': 'sofa'}, {'id': 'lamp'}], datetime(2025, 6, 1), 3)
+    leases.create_lease('U3', [{'id': 'rug'}, {'id': 'sofa'}], datetime(2026, 1, 1), 3)
+    inventory.update_item('lamp', {'status': 'retired'})
+    suggestions = recommender.get_also_leased('sofa')
+    assert [item['id'] for item in suggestions] == ['rug']
+    assert suggestions[0]['score'] > 0
@@ -0,0 +1,190 @@
+"""
+Tests for the connection pool and repositories.
+"""
+import pytest
+import sys
+import os
+import threading
+from datetime import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.db.database import Database
+from src.db.pool import ConnectionPool
+from src.db.repositories import LeaseRepository, create_schema
+from src.services.availability_index import ItemsUnavailableError
+from src.services.inventory_service import InventoryService
+from src.services.lease_service import LeaseService
+
+def _database(tmp_path, pool_size=4):
+    database = Database(f"sqlite:///{tmp_path / 'test.db'}", pool_size=pool_size, timeout=1.0)
+    create_schema(database)
+    return database
+
+def test_pool_is_bounded_and_reports_waits():
+    """Test that checkouts beyond max_size wait, time out and are counted."""
+    pool = ConnectionPool(lambda: object(), max_size=1, timeout=0.05)
+    first = pool.acquire()
+    with pytest.raises(TimeoutError):
+        pool.acquire()
+    
+    released = threading.Timer(0.02, pool.release, args=(first,))
+    released.start()
+    second = pool.acquire(timeout=1.0)
+    released.join()
+    
+    assert second is first
+    stats = pool.stats()
+    assert stats['size'] == 1 and stats['in_use'] == 1 and stats['idle'] == 0
+    assert stats['checkouts'] == 2 and stats['timeouts'] == 1
+    assert stats['checkout_ms_p99'] >= 10.0
+
+def test_transaction_rolls_back_and_reuses_connections(tmp_path):
+    """Test that a failed transaction leaves no rows and the connection is pooled again."""
+    database = _database(tmp_path)
+    with pytest.raises(RuntimeError):
+        with database.transaction() as tx:
+            tx.execute("INSERT INTO items (id, data) VALUES (?, ?)", ('x', '{}'))
+            raise RuntimeError('boom')
+    
+    assert database.fetchone("SELECT COUNT(*) FROM items") == (0,)
+    assert database.pool.stats()['size'] == 1
+
+def test_services_persist_and_reload(tmp_path):
+    """Test that items and leases survive a restart, with their bookings."""
+    database = _database(tmp_path)
+    inventory = InventoryService(db_connection=database)
+    inventory.add_items([
+        {'id': 'sofa', 'category': 'seating', 'price': 100},
+        {'id': 'lamp', 'category': 'lighting', 'price': 20},
+    ])
+    inventory.update_item('lamp', {'price': 25})
+    leases = LeaseService(db_connection=database, inventory=inventory)
+    created = leases.create_leases_bulk([
+        {'user_id': 'U1', 'items': [{'id': 'sofa', 'price': 100}], 'start_date': datetime(2026, 1, 1), 'duration_months': 3},
+        {'user_id': 'U2', 'items': [{'id': 'lamp', 'price': 25}], 'start_date': datetime(2026, 1, 1), 'duration_months': 1},
+    ])['created']
+    leases.advance_statuses([(created[0]['lease_id'], 'active')])
+    leases.update_lease_status(created[1]['lease_id'], 'cancelled')
+    leases.record_reminders([created[0]['lease_id']], datetime(2026, 3, 25))
+    
+    inventory = InventoryService(db_connection=database)
+    reloaded = LeaseService(db_connection=database, inventory=inventory)
+    
+    assert inventory.get_item('lamp')['price'] == 25
+    assert reloaded.get_lease(created[0]['lease_id']) == created[0]
+    assert reloaded.get_lease(created[1]['lease_id'])['status'] == 'cancelled'
+    assert inventory.check_availability('sofa', '2026-02-01', '2026-02-02') is False
+    assert inventory.check_availability('lamp', '2026-01-10', '2026-01-11') is True
+
+def test_failed_write_releases_bookings(tmp_path):
+    """Test that leases whose write fails do not keep their items booked."""
+    database = _database(tmp_path)
+    inventory = InventoryService()
+    inventory.add_item({'id': 'desk', 'category': 'tables', 'price': 50})
+    leases = LeaseService(db_connection=database, inventory=inventory)
+    lease = {'user_id': 'U1', 'items': [{'id': 'desk'}], 'start_date': datetime(2026, 1, 1), 'duration_months': 1}
+    database.execute("DROP TABLE leases")
+    
+    with pytest.raises(Exception):
+        leases.create_leases_bulk([lease])
+    
+    assert inventory.check_availability('desk', '2026-01-01', '2026-01-02') is True
+    assert leases.list_leases() == []
+
+def test_reload_fits_co_lease_model_and_logs_conflicts(tmp_path, caplog):
+    """Test that stored leases feed also-leased suggestions and report booking conflicts."""
+    from src.ml.co_lease import CoLeaseModel
+    database = _database(tmp_path)
+    inventory = InventoryService(db_connection=database)
+    inventory.add_items([{'id': item_id, 'category': 'decor', 'price': 10} for item_id in ('sofa', 'rug', 'lamp')])
+    leases = LeaseService(db_connection=database, inventory=inventory)
+    leases.create_lease('U1', [{'id': 'sofa'}, {'id': 'rug'}], datetime(2026, 1, 1), 1)
+    leases.create_lease('U2', [{'id': 'lamp'}], datetime(2026, 1, 1), 1)
+    inventory = InventoryService(db_connection=database)
+    inventory.reserve_items(['lamp'], datetime(2026, 1, 1), datetime(2026, 2, 1), 'other')
+    co_lease = CoLeaseModel()
+    with caplog.at_level('WARNING', logger='src.services.lease_service'):
+        LeaseService(db_connection=database, inventory=inventory, co_lease=co_lease)
+    assert [item_id for item_id, _ in co_lease.neighbours('sofa')] == ['rug']
+    assert "could not book items ['lamp']" in caplog.text
+
+def test_users_persist_and_reload(tmp_path, monkeypatch):
+    """Test that accounts, upgraded hashes and other processes' users are read from the database."""
+    monkeypatch.setenv('JWT_SECRET', 'database-test-secret-' + '0' * 32)
+    monkeypatch.setenv('BCRYPT_ROUNDS', '4')
+    from src.services.user_service import EmailTakenError, UserService
+    from src.utils.auth import AuthManager
+    database = _database(tmp_path)
+    auth = AuthManager()
+    users = UserService(auth, db_connection=database)
+    other = UserService(auth, db_connection=database)
+    user = users.register('Ada@Example.com', 'correct horse', name='Ada')
+    assert other.get_user(user['id']) == user
+    with pytest.raises(EmailTakenError):
+        other.register('ada@example.com', 'another horse')
+    auth.passwords.rounds = 5
+    assert other.authenticate('ada@example.com', 'correct horse') == user
+    reloaded = UserService(auth, db_connection=database)
+    assert reloaded.get_user(user['id']) == user
+    assert reloaded._users[user['id']]['password_hash'].startswith('$2b$05$')
+    assert reloaded.authenticate('ada@example.com', 'wrong horse') is None
+
+def test_bookings_are_exclusive_across_processes(tmp_path):
+    """Test that services with their own memory but one database cannot double-book an item."""
+    database = _database(tmp_path)
+    InventoryService(db_connection=database).add_items([{'id': 'sofa', 'category': 'seating', 'price': 100}])
+    workers = [
+        LeaseService(db_connection=database, inventory=InventoryService(db_connection=database))
+        for _ in range(8)
+    ]
+    results = []
+    threads = [
+        threading.Thread(target=lambda leases=leases: results.append(leases.create_leases_bulk(
+            [{'user_id': 'U1', 'items': [{'id': 'sofa'}], 'start_date': datetime(2026, 1, 1), 'duration_months': 2}]
+        )))
+        for leases in workers
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(len(result['created']) for result in results) == [0] * 7 + [1]
+    assert all(failure['code'] == 'ITEMS_UNAVAILABLE' for result in results for failure in result['failed'])
+    
+    owner = next(leases for leases, result in zip(workers, results) if result['created'])
+    lease = owner.list_leases()[0]
+    other = next(leases for leases in workers if leases is not owner)
+    assert other.inventory.check_availability('sofa', '2026-01-01', '2026-03-01') is True
+    with pytest.raises(ItemsUnavailableError):
+        other.create_lease('U2', [{'id': 'sofa'}], datetime(2026, 2, 1), 1)
+    assert other.inventory.check_availability('sofa', '2026-02-01', '2026-03-01') is True
+    
+    assert owner.update_lease_status(lease['lease_id'], 'cancelled') is True
+    taken = other.create_lease('U2', [{'id': 'sofa'}], datetime(2026, 2, 1), 1)
+    assert owner.update_lease_status(lease['lease_id'], 'pending') is False
+    assert owner.inventory.check_availability('sofa', '2026-01-01', '2026-02-01') is True
+    assert database.fetchall("SELECT lease_id FROM bookings") == [(taken['lease_id'],)]
+
+def test_each_reminder_is_sent_by_one_process(tmp_path):
+    """Test that schedulers sharing a database claim every reminder once and retry failed sends."""
+    from src.services.lease_scheduler import LeaseScheduler
+    database = _database(tmp_path)
+    LeaseService(db_connection=database).create_lease('U1', [{'id': 'sofa'}], datetime(2026, 1, 1), 1)
+    sent, failures = [], [RuntimeError('mail server down')]
+    
+    def hook(batch):
+        if failures:
+            raise failures.pop()
+        sent.extend(lease['lease_id'] for lease in batch)
+    
+    schedulers = []
+    for _ in range(2):
+        leases = LeaseService(db_connection=database)
+        scheduler = LeaseScheduler(leases, on_reminder=hook, retry_delay=0)
+        scheduler.rebuild()
+        schedulers.append(scheduler)
+    assert [scheduler.run_due(datetime(2026, 1, 25))['remind'] for scheduler in schedulers] == [0, 1]
+    assert [scheduler.run_due(datetime(2026, 1, 26))['remind'] for scheduler in schedulers] == [0, 0]
+    assert len(sent) == 1
+    assert database.fetchone("SELECT reminder_sent_at FROM leases") == (datetime(2026, 1, 25).isoformat(),)
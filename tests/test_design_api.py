@@ -19,4 +19,74 @@ def test_design_routes_blueprint():
     assert bp.name == 'design'
     assert bp.url_prefix == '/api/design'
 
+def test_recommendations_endpoint():
+    """Test that the endpoint returns engine recommendations."""
+    from app import create_app
+    from src.api.dependencies import get_inventory_service
+    get_inventory_service().add_item({
+        'id': 'api-sofa', 'name': 'Modern Sofa', 'category': 'seating',
+        'style': 'modern', 'price': 150
+    })
+    client = create_app().test_client()
+    response = client.post('/api/design/recommendations', json={
+        'space_type': 'living_room',
+        'style_preference': 'modern',
+        'budget': 5000,
+        'dimensions': {'length': 20, 'width': 15, 'height': 10}
+    })
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['items'][0]['id'] == 'api-sofa'
+    assert body['total_estimated_cost'] == sum(item['price'] for item in body['items'])
+
+def test_recommendations_rejects_bad_budget():
+    """Test that an invalid budget is rejected."""
+    from app import create_app
+    client = create_app().test_client()
+    response = client.post('/api/design/recommendations', json={'budget': -5})
+    assert response.status_code == 400
+
 # TODO: Add more comprehensive tests
+
+def test_also_leased_endpoint():
+    """Test the also-leased endpoint returns co-leased catalog items."""
+    from app import create_app
+    from src.api.dependencies import get_inventory_service, get_co_lease_model
+    inventory = get_inventory_service()
+    for item_id in ('api-desk', 'api-chair'):
+        inventory.add_item({'id': item_id, 'category': 'office', 'style': 'modern', 'price': 80})
+    get_co_lease_model().add_lease(['api-desk', 'api-chair'])
+    client = create_app().test_client()
+    
+    response = client.get('/api/design/items/api-desk/also-leased?limit=5')
+    
+    assert response.status_code == 200
+    assert [item['id'] for item in response.get_json()['items']] == ['api-chair']
+    assert client.get('/api/design/items/api-desk/also-leased?limit=0').status_code == 400
+
+def test_bundle_endpoint():
+    """Test the bundle endpoint returns one item per category and validates input."""
+    from app import create_app
+    from src.api.dependencies import get_inventory_service
+    get_inventory_service().add_items([
+        {'id': 'api-desk-bundle', 'category': 'tables', 'style': 'modern', 'price': 60},
+        {'id': 'api-chair-bundle', 'category': 'seating', 'style': 'modern', 'price': 30},
+        {'id': 'api-shelf-bundle', 'category': 'storage', 'style': 'modern', 'price': 25},
+        {'id': 'api-lamp-bundle', 'category': 'lighting', 'style': 'modern', 'price': 5},
+    ])
+    client = create_app().test_client()
+    
+    response = client.post('/api/design/bundle', json={
+        'space_type': 'office', 'style_preference': 'modern',
+        'monthly_budget': 1000, 'duration_months': 3
+    })
+    
+    assert response.status_code == 200
+    body = response.get_json()
+    assert [item['category'] for item in body['items']] == body['categories']
+    assert body['discount'] == 0.05
+    assert body['monthly_cost'] <= 1000
+    bad = {'space_type': 'office', 'monthly_budget': 100}
+    assert client.post('/api/design/bundle', json=dict(bad, space_type='garage')).status_code == 400
+    assert client.post('/api/design/bundle', json=dict(bad, monthly_budget=-1)).status_code == 400
+    assert client.post('/api/design/bundle', json=dict(bad, duration_months=0)).status_code == 400
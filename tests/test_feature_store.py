@@ -0,0 +1,72 @@
+"""
+Tests for the memory-mapped feature store.
+"""
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+from src.ml.feature_store import FeatureStore, VECTORS_FILE
+
+def test_put_and_get_round_trip(tmp_path):
+    """Test vectors are stored once per digest and read back."""
+    store = FeatureStore(str(tmp_path), dim=3)
+    key = FeatureStore.digest(b'photo')
+    row = store.put(key, np.array([1.0, 2.0, 3.0]))
+    assert store.put(key, np.array([9.0, 9.0, 9.0])) == row
+    assert key in store
+    assert len(store) == 1
+    assert store.get(key).tolist() == [1.0, 2.0, 3.0]
+    assert store.get(FeatureStore.digest(b'other')) is None
+
+def test_reopen_maps_existing_vectors(tmp_path):
+    """Test a reopened store serves earlier vectors from the memory map."""
+    store = FeatureStore(str(tmp_path), dim=2, tag='v1')
+    keys = [FeatureStore.digest(bytes([i])) for i in range(5)]
+    store.put_many(keys + keys[:1], np.arange(12).reshape(6, 2))
+    store.close()
+    reopened = FeatureStore(str(tmp_path), dim=2, tag='v1')
+    assert len(reopened) == 5
+    assert isinstance(reopened.get(keys[4]), np.memmap)
+    assert reopened.get(keys[4]).tolist() == [8.0, 9.0]
+
+def test_torn_tail_is_trimmed(tmp_path):
+    """Test a partially written vector is discarded on open."""
+    store = FeatureStore(str(tmp_path), dim=2)
+    key = FeatureStore.digest(b'a')
+    store.put(key, np.array([1.0, 2.0]))
+    store.close()
+    with open(os.path.join(str(tmp_path), VECTORS_FILE), 'ab') as fh:
+        fh.write(b'\x00\x01')
+    reopened = FeatureStore(str(tmp_path), dim=2)
+    second = FeatureStore.digest(b'b')
+    reopened.put(second, np.array([3.0, 4.0]))
+    assert reopened.get(key).tolist() == [1.0, 2.0]
+    assert reopened.get(second).tolist() == [3.0, 4.0]
+
+def test_mismatched_layout_is_rejected(tmp_path):
+    """Test a store cannot be reopened with another width or tag."""
+    FeatureStore(str(tmp_path), dim=2, tag='v1').close()
+    with pytest.raises(ValueError):
+        FeatureStore(str(tmp_path), dim=3, tag='v1')
+    with pytest.raises(ValueError):
+        FeatureStore(str(tmp_path), dim=2, tag='v2')
+
+def test_stores_sharing_a_directory_do_not_reuse_rows(tmp_path):
+    """Test that two open stores on one directory append to distinct rows."""
+    first = FeatureStore(str(tmp_path), dim=2)
+    second = FeatureStore(str(tmp_path), dim=2)
+    a, b, c = (FeatureStore.digest(name) for name in (b'a', b'b', b'c'))
+    first.put(a, np.array([1.0, 1.0]))
+    second.put(b, np.array([2.0, 2.0]))
+    first.put(c, np.array([3.0, 3.0]))
+    assert second.put(a, np.array([9.0, 9.0])) == 0
+    assert first.get(b).tolist() == [2.0, 2.0]
+    first.close()
+    second.close()
+    reopened = FeatureStore(str(tmp_path), dim=2)
+    assert len(reopened) == 3
+    assert [reopened.get(key).tolist() for key in (a, b, c)] == [[1.0, 1.0], [2.0, 2.0], [3.0, 3.0]]
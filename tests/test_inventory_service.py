@@ -0,0 +1,90 @@
+"""
+Tests for the inventory service and catalog index.
+"""
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.services.inventory_service import InventoryService
+from src.services.catalog_index import CatalogIndex
+
+def _service():
+    service = InventoryService()
+    service.add_item({'id': 'sofa', 'category': 'seating', 'style': 'modern', 'price': 120})
+    service.add_item({'id': 'chair', 'category': 'seating', 'style': 'rustic', 'price': 40})
+    service.add_item({'id': 'desk', 'category': 'tables', 'style': 'modern', 'price': 60})
+    service.add_item({'id': 'lamp', 'category': 'lighting', 'style': 'modern', 'price': 15})
+    return service
+
+def test_add_item_generates_id():
+    """Test that items without an ID get one."""
+    service = InventoryService()
+    item_id = service.add_item({'category': 'decor', 'price': 10})
+    assert item_id.startswith('ITEM')
+    assert service.get_item(item_id)['price'] == 10
+
+def test_get_available_items_filters():
+    """Test combined category/style/price filters."""
+    service = _service()
+    assert [i['id'] for i in service.get_available_items()] == ['lamp', 'chair', 'desk', 'sofa']
+    assert [i['id'] for i in service.get_available_items(category='seating')] == ['chair', 'sofa']
+    assert [i['id'] for i in service.get_available_items(style='modern', max_price=60)] == ['lamp', 'desk']
+    assert service.get_available_items(category='seating', style='modern', max_price=100) == []
+    assert service.get_available_items(category='unknown') == []
+
+def test_update_item_maintains_index():
+    """Test that updates move items between bitmaps and price positions."""
+    service = _service()
+    assert service.update_item('sofa', {'price': 10, 'style': 'rustic'}) is True
+    assert [i['id'] for i in service.get_available_items(style='rustic')] == ['sofa', 'chair']
+    assert service.update_item('chair', {'status': 'retired'}) is True
+    assert [i['id'] for i in service.get_available_items(category='seating')] == ['sofa']
+    assert service.update_item('missing', {'price': 1}) is False
+
+def test_catalog_index_grows():
+    """Test that the index grows past its initial capacity."""
+    index = CatalogIndex(capacity=2)
+    for n in range(50):
+        index.add({'id': str(n), 'category': 'decor', 'style': 'coastal', 'price': 50 - n})
+    rows = index.filter_rows(category='decor', max_price=10)
+    assert index.ids(rows) == [str(n) for n in range(49, 39, -1)]
+
+def test_add_items_bulk():
+    """Test bulk loading keeps price order across existing rows."""
+    service = _service()
+    ids = service.add_items([{'category': 'decor', 'price': 20}, {'category': 'decor', 'price': 5}])
+    assert len(ids) == 2
+    prices = [i['price'] for i in service.get_available_items()]
+    assert prices == sorted(prices)
+
+def test_add_many_rejects_duplicates_atomically():
+    """Test that a batch with a duplicate ID indexes none of its items."""
+    index = CatalogIndex()
+    index.add({'id': 'a', 'category': 'decor', 'price': 10})
+    for batch in ([{'id': 'b', 'price': 5}, {'id': 'a', 'price': 1}],
+                  [{'id': 'b', 'price': 5}, {'id': 'b', 'price': 6}]):
+        with pytest.raises(ValueError):
+            index.add_many(batch)
+    assert index.ids(index.filter_rows()) == ['a']
+    assert index.add_many([{'id': 'b', 'category': 'decor', 'price': 5}]) == [1]
+    assert index.ids(index.filter_rows(category='decor')) == ['b', 'a']
+
+def test_invalid_fields_leave_the_index_unchanged():
+    """Test that a bad dimension, score or price anywhere rejects the whole add or update."""
+    index = CatalogIndex()
+    index.add({'id': 'a', 'category': 'decor', 'price': 10})
+    for batch in ([{'id': 'b', 'price': 5}, {'id': 'c', 'dimensions': {'width': 'wide'}}],
+                  [{'id': 'b', 'price': 5}, {'id': 'c', 'style_scores': ['modern']}]):
+        with pytest.raises(ValueError):
+            index.add_many(batch)
+    version = index.version
+    with pytest.raises(ValueError):
+        index.update('a', {'price': 'abc', 'category': 'seating'})
+    assert index.version == version
+    assert index.get('a') == {'id': 'a', 'category': 'decor', 'price': 10}
+    assert index.ids(index.filter_rows(category='seating')) == []
+    assert index.ids(index.filter_rows(category='decor')) == ['a']
+    assert index.add_many([{'id': 'b', 'price': 5}, {'id': 'c', 'price': 1}]) == [1, 2]
+    assert index.ids(index.filter_rows(max_price=5)) == ['c', 'b']
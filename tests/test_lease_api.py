@@ -0,0 +1,106 @@
+"""
+Tests for the lease management API.
+"""
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+SECRET = 'lease-test-secret-' + '0' * 32
+
+@pytest.fixture
+def headers(monkeypatch):
+    monkeypatch.setenv('JWT_SECRET', SECRET)
+    from src.api import dependencies
+    monkeypatch.setattr(dependencies, '_auth_manager', None)
+    token = dependencies.get_auth_manager().generate_token('U42', 'u42@example.com')
+    return {'Authorization': f'Bearer {token}'}
+
+def test_lease_writes_require_token():
+    """Test that lease creation rejects unauthenticated requests."""
+    from app import create_app
+    client = create_app().test_client()
+    lease = {'items': [{'id': 'any'}], 'start_date': '2026-01-01', 'duration_months': 1}
+    assert client.post('/api/lease/create', json=lease).status_code == 401
+    assert client.post('/api/lease/bulk', json={'leases': [lease]}).status_code == 401
+
+def test_bulk_lease_endpoint(headers):
+    """Test that bulk creation returns created leases and failures."""
+    from app import create_app
+    from src.api.dependencies import get_inventory_service
+    get_inventory_service().add_items([
+        {'id': 'bulk-sofa', 'category': 'seating', 'price': 100},
+        {'id': 'bulk-lamp', 'category': 'lighting', 'price': 20},
+    ])
+    client = create_app().test_client()
+    lease = {'items': [{'id': 'bulk-sofa', 'price': 100}],
+             'start_date': '2026-01-01', 'duration_months': 12}
+    
+    response = client.post('/api/lease/bulk', json={'leases': [
+        lease,
+        dict(lease, items=[{'id': 'bulk-lamp', 'price': 20}]),
+        lease,
+    ]}, headers=headers)
+    
+    assert response.status_code == 201
+    body = response.get_json()
+    assert [created['total_cost'] for created in body['created']] == [1020.0, 204.0]
+    # The user comes from the token, not the body
+    assert {created['user_id'] for created in body['created']} == {'U42'}
+    assert [failure['index'] for failure in body['failed']] == [2]
+    invalid = client.post('/api/lease/bulk', json={'leases': [lease, dict(lease, duration_months=0)]}, headers=headers)
+    assert invalid.status_code == 400
+    assert invalid.get_json()['indexes'] == [1]
+    assert client.post('/api/lease/bulk', json={'leases': []}, headers=headers).status_code == 400
+
+def test_quote_endpoint():
+    """Test that items are quoted for every duration tier."""
+    from app import create_app
+    client = create_app().test_client()
+    
+    response = client.post('/api/lease/quote', json={'items': [{'id': 'a', 'price': 100}, {'id': 'b', 'price': 19.99}]})
+    
+    assert response.status_code == 200
+    body = response.get_json()
+    assert [quote['months'] for quote in body['quotes']] == [1, 3, 6, 12]
+    assert body['quotes'][1] == {'months': 3, 'discount': 0.05, 'monthly_cost': 113.99, 'total_cost': 341.97}
+    assert body['items'][1]['monthly_cost'] == [19.99, 18.99, 17.99, 16.99]
+    assert client.post('/api/lease/quote', json={'items': [{'price': -1}]}).status_code == 400
+
+def test_create_lease_endpoint_conflict(headers):
+    """Test that creating a lease for booked items returns 409."""
+    from app import create_app
+    from src.api.dependencies import get_inventory_service
+    get_inventory_service().add_item({'id': 'create-desk', 'category': 'tables', 'price': 50})
+    client = create_app().test_client()
+    lease = {'items': [{'id': 'create-desk', 'price': 50}],
+             'start_date': '2026-03-01', 'duration_months': 3}
+    
+    created = client.post('/api/lease/create', json=lease, headers=headers)
+    conflict = client.post('/api/lease/create', json=dict(lease, start_date='2026-04-01'), headers=headers)
+    
+    assert created.status_code == 201
+    assert created.get_json()['total_cost'] == 142.5
+    assert conflict.status_code == 409
+    assert conflict.get_json()['code'] == 'ITEMS_UNAVAILABLE'
+    assert conflict.get_json()['items'] == ['create-desk']
+    assert client.post('/api/lease/create', json=dict(lease, items=[]), headers=headers).status_code == 400
+
+def test_create_lease_prices_items_from_the_catalog(headers):
+    """Test that client prices are ignored and unknown or mistyped items are rejected."""
+    from app import create_app
+    from src.api.dependencies import get_inventory_service
+    get_inventory_service().add_item({'id': 'priced-rug', 'category': 'decor', 'price': 40})
+    client = create_app().test_client()
+    lease = {'start_date': '2026-05-01', 'duration_months': 1}
+    created = client.post('/api/lease/create', json=dict(lease, items=[{'id': 'priced-rug', 'price': 1}]), headers=headers)
+    unknown = client.post('/api/lease/create', json=dict(lease, items=[{'id': 'nope-100', 'price': -100}]), headers=headers)
+    assert created.status_code == 201
+    assert created.get_json()['total_cost'] == 40.0
+    assert created.get_json()['items'][0]['price'] == 40
+    assert unknown.status_code == 400
+    assert client.post('/api/lease/create', json=dict(lease, items=[{'id': 'nope'}]), headers=headers).get_json()['items'] == ['nope']
+    for price in ('abc', -100):
+        invalid = client.post('/api/lease/create', json=dict(lease, items=[{'id': 'priced-rug', 'price': price}]), headers=headers)
+        assert invalid.status_code == 400
@@ -0,0 +1,129 @@
+"""
+Tests for the lease lifecycle scheduler.
+"""
+import pytest
+import sys
+import os
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.services.lease_scheduler import LeaseScheduler
+from src.services.lease_service import LeaseService
+
+def _scheduler(**kwargs):
+    leases = LeaseService()
+    return leases, LeaseScheduler(leases, **kwargs)
+
+def test_transitions_fire_when_due():
+    """Test that leases activate, get reminded and complete on schedule"""
+    reminded = []
+    leases, scheduler = _scheduler(on_reminder=lambda batch: reminded.extend(lease['lease_id'] for lease in batch))
+    lease = leases.create_lease('U1', [{'id': 'sofa', 'price': 100}], datetime(2026, 1, 1), 1)
+    assert len(scheduler) == 3
+    assert scheduler.next_due() == datetime(2026, 1, 1)
+    
+    assert scheduler.run_due(datetime(2025, 12, 31)) == {'activate': 0, 'remind': 0, 'complete': 0}
+    assert scheduler.run_due(datetime(2026, 1, 1)) == {'activate': 1, 'remind': 0, 'complete': 0}
+    assert lease['status'] == 'active'
+    assert scheduler.run_due(datetime(2026, 1, 25))['remind'] == 1
+    assert reminded == [lease['lease_id']]
+    assert scheduler.run_due(datetime(2026, 2, 1))['complete'] == 1
+    assert lease['status'] == 'completed'
+    assert len(scheduler) == 0
+
+def test_catch_up_is_idempotent():
+    """Test that a rebuild after downtime replays transitions safely"""
+    reminded = []
+    leases, scheduler = _scheduler(batch_size=2, on_reminder=reminded.extend)
+    ended = leases.create_lease('U1', [{'id': 'a'}], datetime(2026, 1, 1), 1)
+    running = leases.create_lease('U2', [{'id': 'b'}], datetime(2026, 1, 15), 3)
+    cancelled = leases.create_lease('U3', [{'id': 'c'}], datetime(2026, 1, 20), 1)
+    leases.update_lease_status(cancelled['lease_id'], 'cancelled')
+    
+    fired = scheduler.run_due(datetime(2026, 3, 1))
+    
+    # The ended lease passes through active to completed and is never reminded
+    assert fired == {'activate': 2, 'remind': 0, 'complete': 1}
+    assert (ended['status'], running['status'], cancelled['status']) == ('completed', 'active', 'cancelled')
+    
+    # A restarted scheduler rebuilt from the stored leases replays nothing
+    restarted = LeaseScheduler(leases, on_reminder=reminded.extend)
+    assert restarted.rebuild() == 2
+    assert restarted.run_due(datetime(2026, 3, 1)) == {'activate': 0, 'remind': 0, 'complete': 0}
+    assert restarted.run_due(datetime(2026, 4, 10))['remind'] == 1
+    assert restarted.rebuild() == 1
+    assert restarted.run_due(datetime(2026, 4, 15)) == {'activate': 0, 'remind': 0, 'complete': 1}
+    assert [lease['lease_id'] for lease in reminded] == [running['lease_id']]
+
+def test_reinstated_lease_is_rescheduled():
+    """Test that reinstating a cancelled lease queues its transitions again"""
+    leases, scheduler = _scheduler()
+    lease = leases.create_lease('U1', [{'id': 'a'}], datetime(2026, 1, 1), 1)
+    leases.update_lease_status(lease['lease_id'], 'cancelled')
+    assert scheduler.run_due(datetime(2026, 1, 2))['activate'] == 0
+    leases.update_lease_status(lease['lease_id'], 'pending')
+    assert scheduler.run_due(datetime(2026, 1, 2))['activate'] == 1
+
+def test_background_thread_applies_due_transitions():
+    """Test that the scheduler thread wakes up for a newly due lease"""
+    import time
+    leases, scheduler = _scheduler()
+    scheduler.start(poll_interval=30)
+    try:
+        lease = leases.create_lease('U1', [{'id': 'a'}], datetime(2020, 1, 1), 1)
+        deadline = time.monotonic() + 5
+        while lease['status'] != 'completed' and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        scheduler.stop()
+    assert lease['status'] == 'completed'
+
+def test_failed_events_are_retried():
+    """Test that events whose status write or reminder hook fails are queued again."""
+    calls = []
+    
+    def flaky_hook(batch):
+        calls.append([lease['lease_id'] for lease in batch])
+        if len(calls) == 1:
+            raise RuntimeError('mail server down')
+    
+    def unavailable(transitions):
+        raise OSError('database unavailable')
+    
+    leases, scheduler = _scheduler(on_reminder=flaky_hook, retry_delay=3600)
+    lease = leases.create_lease('U1', [{'id': 'a'}], datetime(2026, 1, 1), 1)
+    write = leases.advance_statuses
+    leases.advance_statuses = unavailable
+    with pytest.raises(OSError):
+        scheduler.run_due(datetime(2026, 1, 1))
+    assert lease['status'] == 'pending' and len(scheduler) == 3
+    leases.advance_statuses = write
+    assert scheduler.run_due(datetime(2026, 1, 1))['activate'] == 0
+    assert scheduler.run_due(datetime(2026, 1, 1, 1))['activate'] == 1
+    
+    assert scheduler.run_due(datetime(2026, 1, 25))['remind'] == 0
+    assert lease.get('reminder_sent_at') is None
+    assert scheduler.run_due(datetime(2026, 1, 25, 1))['remind'] == 1
+    assert calls == [[lease['lease_id']]] * 2
+    assert scheduler.run_due(datetime(2026, 2, 1))['complete'] == 1
+
+def test_aware_start_dates_are_scheduled_with_naive_ones(caplog):
+    """Test that aware start dates are made local and a failing subscriber cannot fail a create."""
+    leases, scheduler = _scheduler()
+    aware = datetime(2030, 1, 1, tzinfo=timezone.utc)
+    result = leases.create_leases_bulk([
+        {'user_id': 'U1', 'items': [{'id': 'a'}], 'start_date': datetime(2030, 1, 1), 'duration_months': 1},
+        {'user_id': 'U2', 'items': [{'id': 'b'}], 'start_date': aware, 'duration_months': 1},
+    ])
+    assert result['failed'] == [] and len(scheduler) == 6
+    assert result['created'][1]['start_date'] == aware.astimezone().replace(tzinfo=None)
+    
+    def broken(changes):
+        raise RuntimeError('subscriber down')
+    
+    leases.subscribe(broken)
+    with caplog.at_level('ERROR', logger='src.services.lease_service'):
+        lease = leases.create_lease('U3', [{'id': 'c'}], datetime(2030, 1, 1), 1)
+    assert leases.get_lease(lease['lease_id']) is lease and len(scheduler) == 9
+    assert 'subscriber' in caplog.text and 'failed' in caplog.text
@@ -0,0 +1,114 @@
+"""
+Tests for the lease service and availability index.
+"""
+import pytest
+import sys
+import os
+from datetime import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.services.inventory_service import InventoryService
+from src.services.lease_service import LeaseService
+
+def _services():
+    inventory = InventoryService()
+    inventory.add_items([
+        {'id': 'sofa', 'category': 'seating', 'price': 100},
+        {'id': 'lamp', 'category': 'lighting', 'price': 20.5},
+    ])
+    return inventory, LeaseService(inventory=inventory)
+
+def test_create_lease_books_items():
+    """Test that a lease makes its items unavailable for the period."""
+    inventory, leases = _services()
+    lease = leases.create_lease('U1', [{'id': 'sofa', 'price': 100}], datetime(2026, 1, 1), 3)
+    assert leases.get_lease(lease['lease_id']) is lease
+    assert inventory.check_availability('sofa', '2026-02-01', '2026-02-10') is False
+    assert inventory.check_availability('sofa', '2026-04-01', '2026-05-01') is True
+    assert inventory.check_availability_many(['sofa', 'lamp'], '2025-12-15', '2026-01-02') == {
+        'sofa': False,
+        'lamp': True,
+    }
+
+def test_double_booking_rejected():
+    """Test that overlapping leases for the same item are refused."""
+    inventory, leases = _services()
+    leases.create_lease('U1', [{'id': 'sofa', 'price': 100}], datetime(2026, 1, 1), 3)
+    with pytest.raises(ValueError):
+        leases.create_lease('U2', [{'id': 'lamp'}, {'id': 'sofa'}], datetime(2026, 3, 1), 1)
+    # All-or-nothing: the lamp was not booked by the failed lease
+    assert inventory.check_availability('lamp', '2026-03-01', '2026-04-01') is True
+
+def test_cancel_releases_booking():
+    """Test that cancelling a lease frees its items."""
+    inventory, leases = _services()
+    lease = leases.create_lease('U1', [{'id': 'sofa'}], datetime(2026, 1, 1), 1)
+    assert leases.update_lease_status(lease['lease_id'], 'cancelled') is True
+    assert inventory.check_availability('sofa', '2026-01-01', '2026-02-01') is True
+    assert leases.update_lease_status(lease['lease_id'], 'bogus') is False
+    assert leases.update_lease_status('missing', 'active') is False
+
+def test_retired_item_unavailable():
+    """Test that items taken out of circulation are never available."""
+    inventory, _ = _services()
+    inventory.update_item('lamp', {'status': 'retired'})
+    assert inventory.check_availability('lamp', '2026-01-01', '2026-02-01') is False
+
+def test_create_lease_applies_duration_discount():
+    """Test that lease costs use the settings' duration discounts."""
+    _, leases = _services()
+    lease = leases.create_lease('U1', [{'id': 'sofa', 'price': 100}, {'id': 'lamp', 'price': 20.5}], datetime(2026, 1, 1), 6)
+    assert lease['discount'] == 0.1
+    assert lease['monthly_cost'] == 108.45
+    assert lease['total_cost'] == 650.7
+
+def test_create_leases_bulk():
+    """Test that bulk creation books each lease and reports conflicts."""
+    inventory, leases = _services()
+    result = leases.create_leases_bulk([
+        {'user_id': 'B1', 'items': [{'id': 'sofa', 'price': 100}], 'start_date': datetime(2026, 1, 1), 'duration_months': 3},
+        {'user_id': 'B1', 'items': [{'id': 'lamp', 'price': 20}], 'start_date': datetime(2026, 1, 1), 'duration_months': 1},
+        {'user_id': 'B1', 'items': [{'id': 'sofa', 'price': 100}], 'start_date': datetime(2026, 2, 1), 'duration_months': 1},
+        {'user_id': 'B1', 'items': [{'id': 'ghost', 'price': -5}], 'start_date': datetime(2026, 2, 1), 'duration_months': 1},
+    ])
+    assert [lease['total_cost'] for lease in result['created']] == [285.0, 20.5]
+    assert [(failure['index'], failure['code']) for failure in result['failed']] == [
+        (2, 'ITEMS_UNAVAILABLE'), (3, 'UNKNOWN_ITEMS')
+    ]
+    assert all(leases.get_lease(lease['lease_id']) is lease for lease in result['created'])
+    assert inventory.check_availability('lamp', '2026-01-10', '2026-01-20') is False
+
+
+def test_concurrent_leases_never_double_book():
+    """Test that racing multi-item leases book each item at most once."""
+    import threading
+    from src.services.availability_index import ItemsUnavailableError
+    inventory = InventoryService()
+    inventory.add_items([{'id': f'hot-{i}', 'category': 'seating', 'price': 10} for i in range(4)])
+    leases = LeaseService(inventory=inventory)
+    barrier = threading.Barrier(16)
+    won, lost = [], []
+    
+    def lease(worker):
+        # Overlapping item sets requested in opposite orders
+        ids = [f'hot-{i}' for i in (worker % 4, (worker + 1) % 4)]
+        items = [{'id': item_id} for item_id in (ids if worker % 2 else ids[::-1])]
+        barrier.wait()
+        try:
+            won.append(leases.create_lease(f'U{worker}', items, datetime(2026, 1, 1), 1))
+        except ItemsUnavailableError as e:
+            lost.append(e.item_ids)
+    
+    threads = [threading.Thread(target=lease, args=(worker,)) for worker in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+    
+    assert len(won) + len(lost) == 16
+    assert 1 <= len(won) <= 2
+    booked = [item['id'] for lease in won for item in lease['items']]
+    assert len(booked) == len(set(booked))
+    for i in range(4):
+        assert len(inventory.availability.bookings(f'hot-{i}')) == booked.count(f'hot-{i}')
@@ -0,0 +1,82 @@
+"""
+Tests for request metrics and the /metrics endpoint.
+"""
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.utils.metrics import REGISTRY, MetricsRegistry, timed
+
+def test_histograms_render_in_prometheus_format():
+    """Test that buckets are cumulative and labels are escaped."""
+    registry = MetricsRegistry()
+    histogram = registry.histogram('op_seconds', 'Op time', {'op': 'a"b'}, buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        histogram.observe(value)
+    registry.add('busy', 'Busy workers', 2)
+    registry.register_collector(lambda: [('pool_size', 'Pool size', {}, 3)])
+    
+    text = registry.render()
+    
+    assert '# TYPE op_seconds histogram' in text
+    assert 'op_seconds_bucket{op="a\\"b",le="0.1"} 1' in text
+    assert 'op_seconds_bucket{op="a\\"b",le="1.0"} 2' in text
+    assert 'op_seconds_bucket{op="a\\"b",le="+Inf"} 3' in text
+    assert 'op_seconds_count{op="a\\"b"} 3' in text
+    assert 'busy 2.0' in text and 'pool_size 3' in text
+
+def test_spans_are_not_recorded_when_sampling_is_off(monkeypatch):
+    """Test that a timed function only records sampled calls."""
+    calls = timed('test.span')(lambda value: value * 2)
+    monkeypatch.setattr(REGISTRY, 'sample_rate', 0.0)
+    assert calls(2) == 4
+    assert 'span="test.span"' not in REGISTRY.render()
+    
+    monkeypatch.setattr(REGISTRY, 'sample_rate', 1.0)
+    assert calls(3) == 6
+    assert 'span_duration_seconds_count{span="test.span"} 1' in REGISTRY.render()
+
+def test_metrics_endpoint_reports_routes_and_components(monkeypatch):
+    """Test that requests are recorded per route pattern alongside component stats."""
+    monkeypatch.setattr(REGISTRY, 'sample_rate', 1.0)
+    monkeypatch.setenv('JWT_SECRET', 'metrics-test-secret-' + '0' * 32)
+    from app import create_app
+    from src.api.dependencies import get_auth_manager
+    get_auth_manager()
+    client = create_app().test_client()
+    client.get('/api/design/items/sofa-1/also-leased?limit=0')
+    
+    response = client.get('/metrics')
+    text = response.get_data(as_text=True)
+    
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+    assert ('http_request_duration_seconds_count{endpoint="/api/design/items/<item_id>/also-leased",'
+            'method="GET",status="400"}') in text
+    assert 'http_requests_in_flight' in text
+    assert 'token_cache_entries' in text and 'password_hasher_workers' in text
+
+def _value(text, name):
+    return next(float(line.split()[-1]) for line in text.splitlines() if line.startswith(f'{name} '))
+
+def test_in_flight_is_exact_and_component_counts_are_counters(monkeypatch):
+    """Test that unsampled requests are in flight and growing stats render as _total counters."""
+    monkeypatch.setattr(REGISTRY, 'sample_rate', 0.0)
+    monkeypatch.setenv('JWT_SECRET', 'metrics-test-secret-' + '0' * 32)
+    from app import create_app
+    from src.api.dependencies import get_auth_manager
+    get_auth_manager().token_cache.get('missing-token')
+    app = create_app()
+    app.add_url_rule('/test/render', 'test_render', lambda: REGISTRY.render())
+    client = app.test_client()
+    idle = _value(client.get('/metrics').get_data(as_text=True), 'http_requests_in_flight') - 1
+    during = client.get('/test/render').get_data(as_text=True)
+    after = REGISTRY.render()
+    assert _value(during, 'http_requests_in_flight') == idle + 1
+    assert _value(after, 'http_requests_in_flight') == idle
+    assert '# TYPE token_cache_misses_total counter' in after
+    assert _value(after, 'token_cache_misses_total') >= 1
+    assert '# TYPE token_cache_entries gauge' in after
+    assert 'token_cache_misses ' not in after
@@ -7,7 +7,23 @@ import os
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+import numpy as np
+
 from src.ml.recommender import DesignRecommender
+from src.services.catalog_index import CatalogIndex
+
+def _catalog():
+    catalog = CatalogIndex()
+    catalog.add_many([
+        {'id': 'sofa', 'category': 'seating', 'style': 'modern', 'price': 120,
+         'dimensions': {'width': 7, 'depth': 3, 'height': 3}},
+        {'id': 'bed', 'category': 'beds', 'style': 'modern', 'price': 150,
+         'dimensions': {'width': 6, 'depth': 7, 'height': 3}},
+        {'id': 'armchair', 'category': 'seating', 'style': 'rustic', 'price': 60},
+        {'id': 'lamp', 'category': 'lighting', 'style': 'contemporary', 'price': 20},
+        {'id': 'retired', 'category': 'seating', 'style': 'modern', 'price': 10, 'status': 'retired'},
+    ])
+    return catalog
 
 def test_recommender_initialization():
     """Test that the recommender can be initialized."""
@@ -21,4 +37,243 @@ def test_recommender_methods():
     assert hasattr(recommender, 'train')
     assert hasattr(recommender, 'save_model')
 
-# TODO: Add more comprehensive tests
+def test_recommendations_empty_catalog():
+    """Test that an empty catalog yields no recommendations."""
+    recommender = DesignRecommender()
+    assert recommender.get_recommendations('living_room', 'modern', 500, None) == []
+
+def test_recommendations_ranked():
+    """Test that items are ranked by style and space fit."""
+    recommender = DesignRecommender(catalog=_catalog())
+    results = recommender.get_recommendations('living_room', 'modern', 500, None)
+    ids = [item['id'] for item in results]
+    assert ids[0] == 'sofa'
+    assert 'retired' not in ids
+    scores = [item['score'] for item in results]
+    assert scores == sorted(scores, reverse=True)
+
+def test_recommendations_budget_and_size():
+    """Test that over-budget and oversized items are excluded."""
+    recommender = DesignRecommender(catalog=_catalog())
+    results = recommender.get_recommendations('bedroom', 'modern', 100, None)
+    assert {item['id'] for item in results} == {'armchair', 'lamp'}
+    room = {'length': 5, 'width': 5, 'height': 8}
+    results = recommender.get_recommendations('bedroom', 'modern', 500, room, top_k=2)
+    assert 'bed' not in [item['id'] for item in results]
+    assert len(results) == 2
+
+def test_recommendations_follow_catalog_updates():
+    """Test that the feature matrix is rebuilt when the catalog changes."""
+    catalog = _catalog()
+    recommender = DesignRecommender(catalog=catalog)
+    assert recommender.get_recommendations('living_room', 'modern', 500, None)[0]['id'] == 'sofa'
+    catalog.update('sofa', {'status': 'leased'})
+    ids = [item['id'] for item in recommender.get_recommendations('living_room', 'modern', 500, None)]
+    assert 'sofa' not in ids
+
+
+def test_recommendations_batch_matches_single():
+    """Test that batched scoring matches one-at-a-time scoring."""
+    recommender = DesignRecommender(catalog=_catalog())
+    requests = [
+        {'space_type': 'living_room', 'style_preference': 'modern', 'budget': 500, 'dimensions': None},
+        {'space_type': 'bedroom', 'style_preference': 'rustic', 'budget': 100, 'dimensions': None},
+        {'space_type': 'office', 'style_preference': None, 'budget': None,
+         'dimensions': {'length': 5, 'width': 5, 'height': 8}, 'top_k': 2},
+    ]
+    batched = recommender.get_recommendations_batch(requests)
+    for request, result in zip(requests, batched):
+        assert result == recommender.get_recommendations(**request)
+
+def test_recommendations_fit_room_floor():
+    """Test that results fit the room one by one and packed together"""
+    recommender = DesignRecommender(catalog=_catalog())
+    room = {'length': 12, 'width': 10, 'height': 8}
+    ids = [item['id'] for item in recommender.get_recommendations('living_room', 'modern', 500, room)]
+    # Sofa and bed each fit the 9 x 7 usable floor but not side by side
+    assert ids[0] == 'sofa'
+    assert 'bed' not in ids
+    assert {'armchair', 'lamp'} <= set(ids)
+    low_ceiling = {'length': 30, 'width': 30, 'height': 3}
+    ids = [item['id'] for item in recommender.get_recommendations('bedroom', 'modern', 500, low_ceiling)]
+    assert 'bed' not in ids and 'sofa' not in ids
+
+def test_pruned_scoring_matches_dense(monkeypatch):
+    """Test that gathering only fitting items scores like the full prefix"""
+    import src.ml.recommender as recommender_module
+    catalog = CatalogIndex()
+    rng = np.random.default_rng(0)
+    catalog.add_many([
+        {'id': f'item-{i}', 'category': ['seating', 'tables', 'storage'][i % 3],
+         'style': ['modern', 'rustic'][i % 2], 'price': float(rng.integers(10, 1000)),
+         'dimensions': {'width': float(w), 'depth': float(d), 'height': 3}}
+        for i, (w, d) in enumerate(rng.uniform(1, 20, size=(300, 2)))
+    ])
+    requests = [
+        {'space_type': 'office', 'style_preference': 'modern', 'budget': 800,
+         'dimensions': {'length': 8, 'width': 7, 'height': 9}},
+        {'space_type': 'bedroom', 'style_preference': 'rustic', 'budget': 500,
+         'dimensions': {'length': 6, 'width': 6, 'height': 9}},
+    ]
+    pruned = DesignRecommender(catalog=catalog).get_recommendations_batch(requests)
+    monkeypatch.setattr(recommender_module, 'PRUNED_SCORING_SHARE', 0.0)
+    dense = DesignRecommender(catalog=catalog).get_recommendations_batch(requests)
+    assert pruned == dense
+    assert all(pruned)
+
+def test_bundle_one_item_per_category_within_budget():
+    """Test the bundle picks the best affordable item of each category"""
+    catalog = CatalogIndex()
+    catalog.add_many([
+        {'id': 'bed-luxe', 'category': 'beds', 'style': 'modern', 'price': 300},
+        {'id': 'bed-basic', 'category': 'beds', 'style': 'rustic', 'price': 100},
+        {'id': 'dresser', 'category': 'storage', 'style': 'modern', 'price': 80},
+        {'id': 'chest', 'category': 'storage', 'style': 'rustic', 'price': 40},
+        {'id': 'lamp', 'category': 'lighting', 'style': 'modern', 'price': 20},
+        {'id': 'sofa', 'category': 'seating', 'style': 'modern', 'price': 50},
+    ])
+    recommender = DesignRecommender(catalog=catalog)
+    bundle = recommender.get_bundle('bedroom', 'modern', 200, duration_months=1)
+    assert bundle['status'] == 'optimal'
+    assert [item['category'] for item in bundle['items']] == ['beds', 'storage', 'lighting']
+    assert bundle['monthly_cost'] <= 200
+    assert 'bed-luxe' not in [item['id'] for item in bundle['items']]
+    
+    # A 12-month lease discounts prices enough to afford the better bed
+    bundle = recommender.get_bundle('bedroom', 'modern', 340, duration_months=12)
+    assert bundle['discount'] == 0.15
+    assert bundle['items'][0]['id'] == 'bed-luxe'
+    assert bundle['monthly_cost'] == round((300 + 20 + bundle['items'][1]['price']) * 0.85, 2)
+    
+    assert recommender.get_bundle('bedroom', 'modern', 50)['status'] == 'infeasible'
+
+def test_bundle_fits_room_floor():
+    """Test that a bundle too large for the floor is re-solved"""
+    catalog = CatalogIndex()
+    catalog.add_many([
+        {'id': 'king', 'category': 'beds', 'style': 'modern', 'price': 200,
+         'dimensions': {'width': 7, 'depth': 7, 'height': 3}},
+        {'id': 'single', 'category': 'beds', 'style': 'rustic', 'price': 150,
+         'dimensions': {'width': 7, 'depth': 3, 'height': 3}},
+        {'id': 'wardrobe', 'category': 'storage', 'style': 'modern', 'price': 90,
+         'dimensions': {'width': 6, 'depth': 3, 'height': 6}},
+        {'id': 'lamp', 'category': 'lighting', 'style': 'modern', 'price': 10},
+    ])
+    recommender = DesignRecommender(catalog=catalog)
+    room = {'length': 11, 'width': 10, 'height': 9}
+    # The king bed scores best but leaves no floor for the wardrobe
+    assert recommender.get_bundle('bedroom', 'modern', 1000)['items'][0]['id'] == 'king'
+    bundle = recommender.get_bundle('bedroom', 'modern', 1000, dimensions=room)
+    assert [item['id'] for item in bundle['items']] == ['single', 'wardrobe', 'lamp']
+
+def test_save_and_load_model(tmp_path):
+    """Test a saved model is reloaded with identical parameters"""
+    path = str(tmp_path / 'recommender.model')
+    recommender = DesignRecommender(catalog=_catalog())
+    recommender._set_params(recommender._params._replace(weights=np.array([0.1, 0.2, 0.3, 0.4])))
+    recommender.save_model(path)
+    
+    loaded = DesignRecommender(model_path=path, catalog=_catalog())
+    
+    assert loaded.weights.tolist() == [0.1, 0.2, 0.3, 0.4]
+    np.testing.assert_array_equal(loaded.style_affinity, recommender.style_affinity)
+    np.testing.assert_array_equal(loaded.space_fit, recommender.space_fit)
+    request = {'space_type': 'bedroom', 'style_preference': 'modern', 'budget': 500, 'dimensions': None}
+    assert loaded.get_recommendations(**request) == recommender.get_recommendations(**request)
+
+def test_model_hot_swap(tmp_path):
+    """Test a replaced artifact is picked up and a corrupt one is ignored"""
+    from src.ml.recommendation_cache import RecommendationCache
+    path = str(tmp_path / 'recommender.model')
+    trainer = DesignRecommender(catalog=_catalog())
+    trainer.save_model(path)
+    serving = DesignRecommender(model_path=path, catalog=_catalog(), cache=RecommendationCache())
+    serving.get_recommendations('living_room', 'modern', 500, None)
+    
+    trainer._set_params(trainer._params._replace(weights=np.array([0.0, 0.0, 1.0, 0.0])))
+    trainer.save_model(path)
+    
+    assert serving.reload_model_if_changed()
+    assert serving.weights.tolist() == [0.0, 0.0, 1.0, 0.0]
+    assert len(serving.cache) == 0
+    assert not serving.reload_model_if_changed()
+    
+    with open(path, 'r+b') as fh:
+        fh.seek(-1, os.SEEK_END)
+        fh.write(b'\xff')
+    
+    assert not serving.reload_model_if_changed()
+    assert serving.weights.tolist() == [0.0, 0.0, 1.0, 0.0]
+
+def _price_driven_history(catalog, n, start=0):
+    """Interactions where users lease the cheapest items regardless of style."""
+    cheapest = catalog.ids(catalog.filter_rows()[:3])
+    for i in range(start, start + n):
+        yield {
+            'item_id': cheapest[i % 3], 'space_type': 'living_room',
+            'style_preference': 'industrial',
+            'budget': 200, 'timestamp': 1700000000 + i
+        }
+
+def _training_catalog():
+    catalog = CatalogIndex()
+    styles = ['modern', 'rustic', 'contemporary', 'industrial']
+    catalog.add_many([
+        {'id': f'item{i}', 'category': 'seating', 'style': styles[i % 4], 'price': 10 + 5 * i}
+        for i in range(40)
+    ])
+    return catalog
+
+def test_train_streams_mini_batches():
+    """Test training consumes a generator of mini-batches and learns the price term"""
+    catalog = _training_catalog()
+    recommender = DesignRecommender(catalog=catalog)
+    history = _price_driven_history(catalog, 2000)
+    batches = iter(lambda: [example for _, example in zip(range(100), history)], [])
+    
+    stats = recommender.train(batches, seed=1)
+    
+    assert stats['examples'] == 2000
+    assert stats['batches'] == 20
+    assert recommender.weights[2] > recommender.weights[0]
+
+def test_train_resumes_from_checkpoint(tmp_path):
+    """Test a resumed run only processes examples after the checkpoint cursor"""
+    path = str(tmp_path / 'checkpoint.model')
+    catalog = _training_catalog()
+    first = DesignRecommender(catalog=catalog)
+    first.train(_price_driven_history(catalog, 500), batch_size=50, checkpoint_path=path)
+    
+    resumed = DesignRecommender(catalog=catalog)
+    stats = resumed.train(
+        _price_driven_history(catalog, 800), batch_size=50, checkpoint_path=path, resume=True
+    )
+    
+    assert stats['skipped'] == 500
+    assert stats['examples'] == 800
+    assert stats['cursor'] == 1700000000 + 799
+    serving = DesignRecommender(model_path=path, catalog=catalog)
+    assert serving.weights.tolist() == resumed.weights.tolist()
+
+def test_train_keeps_tied_and_unordered_timestamps():
+    """Test that batches are filtered against the cursor the run started from."""
+    catalog = _training_catalog()
+    tied = [dict(example, timestamp=1700000000) for example in _price_driven_history(catalog, 10)]
+    stats = DesignRecommender(catalog=catalog).train(tied, batch_size=4)
+    assert (stats['examples'], stats['skipped']) == (10, 0)
+    
+    history = list(_price_driven_history(catalog, 8))
+    unordered = history[4:] + history[:4]
+    stats = DesignRecommender(catalog=catalog).train(unordered, batch_size=4, since=1699999999)
+    assert (stats['examples'], stats['skipped']) == (8, 0)
+    assert stats['cursor'] == 1700000000 + 7
+
+def test_train_accepts_a_list():
+    """Test the original list-of-examples form still trains"""
+    catalog = _training_catalog()
+    recommender = DesignRecommender(catalog=catalog)
+    
+    stats = recommender.train(list(_price_driven_history(catalog, 10)) + [{'item_id': 'unknown'}])
+    
+    assert stats['examples'] == 10
+    assert stats['skipped'] == 1
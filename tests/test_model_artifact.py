@@ -0,0 +1,67 @@
+"""
+Tests for the memory-mapped model artifact format.
+"""
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+from src.ml.artifact import ALIGNMENT, load_artifact, save_artifact
+
+def test_round_trip_is_memory_mapped(tmp_path):
+    """Test arrays come back equal, aligned and read-only."""
+    path = str(tmp_path / 'model.bin')
+    arrays = {
+        'weights': np.array([0.4, 0.3, 0.2, 0.1]),
+        'matrix': np.arange(12, dtype=np.float32).reshape(3, 4),
+        'empty': np.zeros((0, 5), dtype=np.int64),
+    }
+    save_artifact(path, arrays, {'styles': ['modern']})
+    artifact = load_artifact(path)
+    assert artifact.metadata == {'styles': ['modern']}
+    for name, array in arrays.items():
+        assert artifact[name].dtype == array.dtype
+        np.testing.assert_array_equal(artifact[name], array)
+        assert not artifact[name].flags.writeable
+    assert artifact['matrix'].ctypes.data % ALIGNMENT == 0
+
+def test_corruption_is_detected(tmp_path):
+    """Test a flipped data byte fails checksum validation."""
+    path = str(tmp_path / 'model.bin')
+    save_artifact(path, {'weights': np.ones(64)})
+    with open(path, 'r+b') as fh:
+        fh.seek(-8, os.SEEK_END)
+        fh.write(b'\xff')
+    with pytest.raises(ValueError, match='checksum'):
+        load_artifact(path)
+    with pytest.raises(ValueError):
+        save_artifact(path, {'bad': np.array([object()])})
+
+def test_replace_keeps_mapped_arrays_valid(tmp_path):
+    """Test replacing the file leaves previously loaded arrays intact."""
+    path = str(tmp_path / 'model.bin')
+    save_artifact(path, {'weights': np.full(8, 1.0)})
+    old = load_artifact(path)
+    save_artifact(path, {'weights': np.full(8, 2.0)})
+    new = load_artifact(path)
+    assert old['weights'].tolist() == [1.0] * 8
+    assert new['weights'].tolist() == [2.0] * 8
+    assert old.identity != new.identity
+    assert [name for name in os.listdir(str(tmp_path))] == ['model.bin']
+
+def test_incomplete_header_is_rejected(tmp_path):
+    """Test that a header missing required entries raises ValueError."""
+    import json
+    from src.ml.artifact import FORMAT_VERSION, MAGIC, _PREAMBLE
+    path = str(tmp_path / 'model.bin')
+    for header in ({'metadata': {}, 'arrays': {}}, ['not', 'a', 'header'],
+                   {'metadata': {}, 'arrays': {'w': {}}, 'data_size': 0, 'checksum': {'digest': ''}}):
+        encoded = json.dumps(header).encode('utf-8')
+        with open(path, 'wb') as fh:
+            fh.write(_PREAMBLE.pack(MAGIC, FORMAT_VERSION, 0, len(encoded)) + encoded)
+            fh.write(b'\x00' * (-(_PREAMBLE.size + len(encoded)) % ALIGNMENT))
+        with pytest.raises(ValueError):
+            load_artifact(path, verify=False)
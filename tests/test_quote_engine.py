@@ -0,0 +1,59 @@
+"""
+Tests for the lease quote engine.
+"""
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+from src.services.quote_engine import QuoteEngine
+from src.utils.settings import Settings
+
+TIERS = [
+    {'months': 1, 'discount': 0},
+    {'months': 3, 'discount': 0.05},
+    {'months': 6, 'discount': 0.10},
+    {'months': 12, 'discount': 0.15},
+]
+
+def test_discount_table_uses_longest_reached_tier():
+    """Test that durations between tiers get the shorter tier's discount"""
+    quotes = QuoteEngine(TIERS)
+    assert [quotes.discount_rate(months) for months in (0, 1, 2, 3, 5, 6, 12, 36)] == [
+        0.0, 0.0, 0.0, 0.05, 0.05, 0.1, 0.15, 0.15
+    ]
+    with pytest.raises(ValueError):
+        QuoteEngine([{'months': 1, 'discount': 1.0}])
+
+def test_discount_table_matches_settings():
+    """Test that quotes and settings lookups share one discount per lease length."""
+    tiers = [{'months': '12', 'discount': '0.15'}, {'months': 3, 'discount': 0.05}]
+    settings = Settings.parse({'lease_durations': tiers})
+    quotes = QuoteEngine(tiers)
+    assert [quotes.discount_rate(months) for months in range(-1, 20)] == [
+        settings.discount(months) for months in range(-1, 20)
+    ]
+
+def test_price_matrix_in_cents():
+    """Test that every item is quoted for every tier without float drift"""
+    quotes = QuoteEngine(TIERS)
+    matrix = quotes.price_matrix([19.99, 100, 0.1])
+    assert matrix['months'].tolist() == [1, 3, 6, 12]
+    assert matrix['monthly_cents'].tolist() == [
+        [1999, 1899, 1799, 1699],
+        [10000, 9500, 9000, 8500],
+        [10, 10, 9, 9],
+    ]
+    np.testing.assert_array_equal(matrix['total_cents'], matrix['monthly_cents'] * [1, 3, 6, 12])
+
+def test_quote_leases_discounts_each_subtotal():
+    """Test that leases are summed exactly and discounted by their own duration"""
+    quotes = QuoteEngine(TIERS)
+    result = quotes.quote_leases([[0.1, 0.2], [], [100, 50.5]], [1, 3, 12])
+    assert result['subtotal_cents'].tolist() == [30, 0, 15050]
+    assert result['discounts'].tolist() == [0, 500, 1500]
+    assert result['monthly_cents'].tolist() == [30, 0, 12793]
+    assert result['total_cents'].tolist() == [30, 0, 12793 * 12]
@@ -0,0 +1,82 @@
+"""
+Tests for the recommendation result cache.
+"""
+import pytest
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.ml.recommendation_cache import RecommendationCache
+from src.ml.recommender import DesignRecommender
+from src.services.catalog_index import CatalogIndex
+
+REQUEST = {'space_type': 'living_room', 'style_preference': 'modern', 'budget': 510,
+           'dimensions': {'length': 20.2, 'width': 15.4, 'height': 10}}
+
+def _recommender():
+    catalog = CatalogIndex()
+    catalog.add_many([
+        {'id': 'sofa', 'category': 'seating', 'style': 'modern', 'price': 120},
+        {'id': 'chair', 'category': 'seating', 'style': 'rustic', 'price': 60},
+        {'id': 'lamp', 'category': 'lighting', 'style': 'modern', 'price': 20},
+    ])
+    return catalog, DesignRecommender(catalog=catalog, cache=RecommendationCache())
+
+def test_near_duplicate_requests_share_entry():
+    """Test that budgets and dimensions are quantized into one key."""
+    cache = RecommendationCache(budget_step=25, dimension_step=0.5)
+    key, canonical = cache.canonicalize(REQUEST)
+    other, _ = cache.canonicalize(dict(REQUEST, budget=502, space_type='Living Room'))
+    assert key == other
+    assert canonical['budget'] == 500
+    assert canonical['dimensions'] == {'length': 20.0, 'width': 15.0, 'height': 10.0}
+
+def test_lru_and_ttl_eviction():
+    """Test capacity eviction and expiry."""
+    cache = RecommendationCache(max_entries=2, ttl_seconds=0.05)
+    for n in range(3):
+        key, request = cache.canonicalize(dict(REQUEST, budget=100 * (n + 1)))
+        cache.put(key, request, [{'id': n, 'score': 1.0}])
+    assert len(cache) == 2
+    assert cache.stats()['evictions'] == 1
+    time.sleep(0.06)
+    assert cache.get(key) is None
+    assert cache.stats()['expirations'] == 1
+
+def test_hits_served_from_cache():
+    """Test that repeat requests hit the cache."""
+    _, recommender = _recommender()
+    first = recommender.get_recommendations(**REQUEST)
+    second = recommender.get_recommendations(**dict(REQUEST, budget=505))
+    assert first == second
+    stats = recommender.cache.stats()
+    assert stats['hits'] == 1 and stats['misses'] == 1
+
+def test_invalidation_on_relevant_changes_only():
+    """Test that only entries an item change could affect are dropped."""
+    catalog, recommender = _recommender()
+    recommender.get_recommendations(**REQUEST)
+    # A new item that cannot afford the budget leaves the entry alone
+    catalog.add({'id': 'pricey', 'category': 'seating', 'style': 'modern', 'price': 9000})
+    assert len(recommender.cache) == 1
+    # A new item that would rank is picked up
+    catalog.add({'id': 'couch', 'category': 'seating', 'style': 'modern', 'price': 30})
+    assert len(recommender.cache) == 0
+    assert recommender.get_recommendations(**REQUEST)[0]['id'] == 'couch'
+    # Retiring a listed item drops the entry
+    catalog.update('lamp', {'status': 'retired'})
+    ids = [item['id'] for item in recommender.get_recommendations(**REQUEST)]
+    assert 'lamp' not in ids
+
+def test_bulk_catalog_changes_clear_the_cache():
+    """Test that a large batch of changes clears the cache instead of scanning it."""
+    from src.ml.recommender import CACHE_BULK_CHANGES
+    catalog, recommender = _recommender()
+    recommender.get_recommendations(**REQUEST)
+    catalog.add_many([
+        {'id': f'bulk-{n}', 'category': 'decor', 'style': 'rustic', 'price': 9000}
+        for n in range(CACHE_BULK_CHANGES + 1)
+    ])
+    assert len(recommender.cache) == 0
@@ -0,0 +1,53 @@
+"""
+Tests for room-fit checks.
+"""
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+from src.ml.room_fit import UsableSpace, clearance_for, fit_mask, pack_floor, select_packable, usable_space
+
+def test_usable_space_subtracts_clearance():
+    """Test that clearance and headroom are taken off the room dimensions"""
+    space = usable_space({'length': 12, 'width': 20, 'height': 9}, 'living room')
+    assert space.long_side == 20 - clearance_for('living_room')
+    assert space.short_side == 12 - clearance_for('living_room')
+    assert space.height < 9
+    assert usable_space(None, 'bedroom') is None
+    assert usable_space({'length': 0, 'width': 10}, 'bedroom') is None
+    assert np.isnan(usable_space({'length': 10, 'width': 10}, 'bedroom').height)
+
+def test_fit_mask_checks_both_orientations_and_height():
+    """Test footprints fit either way round and unknown sizes pass"""
+    space = UsableSpace(long_side=10.0, short_side=6.0, height=7.5)
+    long_side = np.array([9, 11, 7, np.nan, 5], dtype=np.float32)
+    short_side = np.array([6, 2, 7, np.nan, 5], dtype=np.float32)
+    height = np.array([3, 3, 3, np.nan, 8], dtype=np.float32)
+    assert fit_mask(long_side, short_side, height, space).tolist() == [True, False, False, True, False]
+    no_ceiling = space._replace(height=np.nan)
+    assert fit_mask(long_side, short_side, height, no_ceiling)[4]
+
+def test_pack_floor_places_items_without_overlap():
+    """Test shelf packing returns non-overlapping placements inside the floor"""
+    space = UsableSpace(long_side=10.0, short_side=8.0, height=np.nan)
+    footprints = [(7, 3), (6, 4), (2, 2), (3, 2)]
+    placements = pack_floor(footprints, space)
+    assert placements is not None
+    for (x, y, along, across), footprint in zip(placements, footprints):
+        assert sorted((along, across)) == sorted(footprint)
+        assert x + along <= space.long_side and y + across <= space.short_side
+    for i, a in enumerate(placements):
+        for b in placements[i + 1:]:
+            assert a[0] + a[2] <= b[0] or b[0] + b[2] <= a[0] or a[1] + a[3] <= b[1] or b[1] + b[3] <= a[1]
+    assert pack_floor([(7, 3), (7, 3), (7, 3)], space) is None
+
+def test_select_packable_skips_items_that_crowd_the_floor():
+    """Test greedy selection keeps rank order and skips items that no longer fit"""
+    space = UsableSpace(long_side=10.0, short_side=6.0, height=np.nan)
+    footprints = [(9, 4), (8, 4), (np.nan, np.nan), (5, 2), (4, 2)]
+    assert select_packable(footprints, 3, space) == [0, 2, 3]
+    assert select_packable(footprints, 10, space) == [0, 2, 3, 4]
@@ -0,0 +1,70 @@
+"""
+Tests for compiled request schemas.
+"""
+import pytest
+import sys
+import os
+from datetime import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.utils.schemas import Field, Schema, SchemaError
+
+def test_schema_converts_defaults_and_drops_undeclared_keys():
+    """Test that valid payloads come back clean."""
+    schema = Schema({
+        'name': Field('string', sanitize=True),
+        'start': Field('date', required=True),
+        'months': Field('integer', ge=1, default=1),
+    })
+    
+    payload = schema.validate({'name': ' <b> ', 'start': '2026-01-01', 'other': 1})
+    
+    assert payload == {'name': '&lt;b&gt;', 'start': datetime(2026, 1, 1), 'months': 1}
+    aware = schema.validate({'start': '2026-01-01T00:00:00+00:00'})['start']
+    assert aware.tzinfo is None
+    assert aware == datetime.fromisoformat('2026-01-01T00:00:00+00:00').astimezone().replace(tzinfo=None)
+
+def test_schema_reports_the_field_error():
+    """Test that the first invalid value raises its own message and code."""
+    schema = Schema({
+        'budget': Field('number', ge=0, error=('Invalid budget', 'INVALID_BUDGET')),
+        'email': Field('email', required=True, error=('Invalid email', 'INVALID_EMAIL')),
+    }, error=('Invalid body', 'INVALID_BODY'))
+    
+    with pytest.raises(SchemaError) as missing:
+        schema.validate({'budget': 10})
+    with pytest.raises(SchemaError) as boolean:
+        schema.validate({'budget': True, 'email': 'a@example.com'})
+    with pytest.raises(SchemaError) as body:
+        schema.validate(None)
+    
+    assert missing.value.code == 'INVALID_EMAIL'
+    assert boolean.value.to_dict() == {'error': 'Invalid budget', 'code': 'INVALID_BUDGET'}
+    assert body.value.code == 'INVALID_BODY'
+
+def test_array_items_report_invalid_indexes():
+    """Test that invalid array elements are listed together and extra keys kept."""
+    item = Field('object', extra=True, fields={'price': Field('number', required=True, ge=0)})
+    schema = Schema({
+        'items': Field('array', min_length=1, max_length=3, items=item, item_error=('Invalid items', 'INVALID_ITEMS')),
+    })
+    
+    with pytest.raises(SchemaError) as invalid:
+        schema.validate({'items': [{'price': 1}, {'price': -1}, {}]})
+    with pytest.raises(SchemaError):
+        schema.validate({'items': [{'price': 1}] * 4})
+    
+    assert invalid.value.to_dict()['indexes'] == [1, 2]
+    assert schema.validate({'items': [{'price': 1, 'name': '<x>'}]}) == {'items': [{'price': 1, 'name': '<x>'}]}
+
+def test_oversized_request_body_is_rejected(monkeypatch):
+    """Test that bodies above MAX_REQUEST_BYTES are answered with 413."""
+    monkeypatch.setenv('MAX_REQUEST_BYTES', '1024')
+    from app import create_app
+    client = create_app().test_client()
+    
+    response = client.post('/api/lease/quote', json={'items': [{'price': 1}] * 200})
+    
+    assert response.status_code == 413
+    assert response.get_json()['code'] == 'PAYLOAD_TOO_LARGE'
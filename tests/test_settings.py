@@ -0,0 +1,56 @@
+"""
+Tests for the settings registry.
+"""
+import pytest
+import sys
+import os
+import json
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.utils.settings import Settings, SettingsRegistry, get_settings
+
+RAW = {
+    'supported_styles': ['Modern', 'rustic', 'modern'],
+    'space_types': ['living_room', 'office'],
+    'furniture_categories': ['seating'],
+    'bundle_categories': {'Living Room': ['Seating']},
+    'lease_durations': [{'months': 6, 'discount': 0.1}, {'months': 1, 'discount': 0}, {'months': 3, 'discount': 0.05}],
+}
+
+def test_settings_are_indexed():
+    """Test that values get codes in file order and discounts are expanded per month."""
+    settings = Settings.parse(RAW)
+    
+    assert settings.styles == ('modern', 'rustic')
+    assert settings.style_code(' MODERN ') == 0 and settings.style_code('coastal') is None
+    assert settings.space_type_code('Living Room') == 0
+    assert settings.bundle_categories['living_room'] == ('seating',)
+    assert [settings.discount(months) for months in (0, 1, 2, 3, 5, 6, 24)] == [0.0, 0.0, 0.0, 0.05, 0.05, 0.1, 0.1]
+    with pytest.raises(TypeError):
+        settings.style_codes['coastal'] = 2
+    with pytest.raises(ValueError):
+        Settings.parse({'lease_durations': [{'months': 1, 'discount': 1.0}]})
+
+def test_registry_reloads_changed_file(tmp_path):
+    """Test that a changed file is picked up and an invalid one is skipped."""
+    path = tmp_path / 'settings.json'
+    path.write_text(json.dumps(RAW))
+    registry = SettingsRegistry(str(path), reload_interval=0.0)
+    first = registry.get()
+    
+    path.write_text(json.dumps(dict(RAW, supported_styles=['coastal'])))
+    second = registry.get()
+    path.write_text('{not json')
+    
+    assert registry.reload_if_changed() is False
+    assert registry.get() is second
+    assert first.styles == ('modern', 'rustic')
+    assert second.styles == ('coastal',) and second.version == first.version + 1
+
+def test_shipped_settings_drive_the_style_analyzer():
+    """Test that the style analyzer classifies every configured style."""
+    from src.ml.style_analyzer import StyleAnalyzer
+    
+    assert StyleAnalyzer().styles == list(get_settings().styles)
+    assert {'mid-century', 'coastal'} <= set(get_settings().styles)
@@ -0,0 +1,85 @@
+"""
+Tests for the style analyzer image pipeline.
+"""
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from PIL import Image
+
+from src.ml.style_analyzer import StyleAnalyzer
+
+def _write_images(directory, count, size=(640, 480), fmt='JPEG'):
+    paths = []
+    for i in range(count):
+        path = os.path.join(str(directory), f"room{i}.{fmt.lower()}")
+        Image.new('RGB', size, (20 * i % 255, 120, 255 - 20 * i % 255)).save(path, fmt)
+        paths.append(path)
+    return paths
+
+def test_analyze_image_returns_probabilities(tmp_path):
+    """Test single-image analysis returns a distribution over styles."""
+    analyzer = StyleAnalyzer()
+    path = _write_images(tmp_path, 1)[0]
+    scores = analyzer.analyze_image(path)
+    assert set(scores) == set(analyzer.styles)
+    assert sum(scores.values()) == pytest.approx(1.0, abs=1e-5)
+
+def test_analyze_images_streams_every_path(tmp_path):
+    """Test the pipeline yields one result per path across partial batches."""
+    analyzer = StyleAnalyzer()
+    paths = _write_images(tmp_path, 7) + _write_images(tmp_path, 2, fmt='PNG')
+    results = dict(analyzer.analyze_images(iter(paths), batch_size=3, workers=2))
+    assert set(results) == set(paths)
+    for path in paths:
+        assert results[path] == pytest.approx(analyzer.analyze_image(path), abs=1e-5)
+
+def test_analyze_images_reports_unreadable_files(tmp_path):
+    """Test undecodable images yield None instead of aborting the stream."""
+    analyzer = StyleAnalyzer()
+    good = _write_images(tmp_path, 2)
+    broken = tmp_path / 'broken.jpg'
+    broken.write_bytes(b'not an image')
+    missing = str(tmp_path / 'missing.jpg')
+    results = dict(analyzer.analyze_images(good + [str(broken), missing], batch_size=4))
+    assert results[str(broken)] is None
+    assert results[missing] is None
+    assert all(results[path] for path in good)
+
+def test_analyze_images_bounds_pending_work(tmp_path):
+    """Test paths are only pulled from the input as the backlog drains."""
+    analyzer = StyleAnalyzer()
+    paths = _write_images(tmp_path, 20)
+    pulled = []
+    
+    def source():
+        for path in paths:
+            pulled.append(path)
+            yield path
+    
+    stream = analyzer.analyze_images(source(), batch_size=2, workers=2, max_pending=4)
+    first = next(stream)
+    assert first[0] in paths
+    assert len(pulled) <= 5
+    assert len(list(stream)) == len(paths) - 1
+
+def test_feature_store_skips_decoding_seen_images(tmp_path):
+    """Test already-analyzed images are served from the feature store."""
+    paths = _write_images(tmp_path, 4)
+    store_dir = str(tmp_path / 'features')
+    first = dict(StyleAnalyzer(feature_store_dir=store_dir).analyze_images(paths, batch_size=3))
+    analyzer = StyleAnalyzer(feature_store_dir=store_dir)
+    
+    def fail(data):
+        raise AssertionError("cached image was decoded")
+    
+    analyzer._decode = fail
+    second = dict(analyzer.analyze_images(paths, batch_size=3))
+    assert len(analyzer.feature_store) == 4
+    for path in paths:
+        assert second[path] == pytest.approx(first[path], abs=1e-6)
+    assert set(analyzer.extract_features(paths[0])) == {
+        'brightness', 'saturation', 'warmth', 'edge_density', 'contrast'
+    }
@@ -0,0 +1,97 @@
+"""
+Tests for password hashing and the user API.
+"""
+import pytest
+import sys
+import os
+import threading
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.utils.auth import AuthBusyError, PasswordHasher
+
+SECRET = 'test-secret-' + '0' * 32
+
+def test_hasher_fails_fast_when_saturated():
+    """Test that calls beyond the workers and queue are rejected at once."""
+    hasher = PasswordHasher(rounds=4, workers=1, max_queue=1)
+    release = threading.Event()
+    callers = [threading.Thread(target=hasher._run, args=(release.wait,)) for _ in range(2)]
+    for caller in callers:
+        caller.start()
+    while hasher.stats()['pending'] < 2:
+        release.wait(0.001)
+    
+    with pytest.raises(AuthBusyError):
+        hasher.hash('password123')
+    release.set()
+    for caller in callers:
+        caller.join()
+    assert hasher.stats()['rejected'] == 1
+    assert hasher.verify('password123', hasher.hash('password123'))
+
+def test_register_login_and_rehash(monkeypatch):
+    """Test the register/login flow and that an outdated hash is upgraded on login."""
+    monkeypatch.setenv('JWT_SECRET', SECRET)
+    monkeypatch.setenv('BCRYPT_ROUNDS', '4')
+    from app import create_app
+    from src.api import dependencies
+    monkeypatch.setattr(dependencies, '_auth_manager', None)
+    monkeypatch.setattr(dependencies, '_user_service', None)
+    client = create_app().test_client()
+    account = {'email': 'Ada@Example.com', 'password': 'correct horse', 'name': 'Ada'}
+    
+    assert client.post('/api/user/register', json=account).status_code == 201
+    assert client.post('/api/user/register', json=account).status_code == 409
+    assert client.post('/api/user/register', json=dict(account, password='short')).status_code == 400
+    assert client.post('/api/user/login', json=dict(account, password='wrong password')).status_code == 401
+    assert client.post('/api/user/login', json=dict(account, email='nobody@example.com')).status_code == 401
+    
+    users = dependencies.get_user_service()
+    stored = users._users[users._ids_by_email['ada@example.com']]
+    dependencies.get_auth_manager().passwords.rounds = 5
+    response = client.post('/api/user/login', json={'email': 'ada@example.com', 'password': 'correct horse'})
+    
+    assert response.status_code == 200
+    assert stored['password_hash'].startswith('$2b$05$')
+    token = response.get_json()['token']
+    profile = client.get('/api/user/profile', headers={'Authorization': f'Bearer {token}'})
+    assert profile.get_json()['email'] == 'ada@example.com'
+
+def test_login_busy_returns_503(monkeypatch):
+    """Test that a saturated hasher turns logins away with 503."""
+    monkeypatch.setenv('JWT_SECRET', SECRET)
+    from app import create_app
+    from src.api import dependencies
+    
+    class Busy:
+        def authenticate(self, email, password):
+            raise AuthBusyError("Password hashing is at capacity")
+    
+    monkeypatch.setattr(dependencies, '_user_service', Busy())
+    response = create_app().test_client().post(
+        '/api/user/login', json={'email': 'a@example.com', 'password': 'whatever1'}
+    )
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '1'
+
+def test_passwords_over_bcrypt_limit_are_rejected(monkeypatch):
+    """Test that passwords over 72 bytes fail validation rather than reaching bcrypt."""
+    monkeypatch.setenv('JWT_SECRET', SECRET)
+    monkeypatch.setenv('BCRYPT_ROUNDS', '4')
+    from app import create_app
+    from src.api import dependencies
+    monkeypatch.setattr(dependencies, '_auth_manager', None)
+    monkeypatch.setattr(dependencies, '_user_service', None)
+    client = create_app().test_client()
+    account = {'email': 'long@example.com', 'password': 'correct horse'}
+    assert client.post('/api/user/register', json=account).status_code == 201
+    for password in ('x' * 100, '€' * 40):
+        response = client.post('/api/user/register', json={'email': 'new@example.com', 'password': password})
+        assert response.status_code == 400
+        assert response.get_json()['code'] == 'INVALID_PASSWORD'
+        for email in ('long@example.com', 'nobody@example.com'):
+            response = client.post('/api/user/login', json={'email': email, 'password': password})
+            assert response.status_code == 401
+    response = client.post('/api/user/register', json={'email': 'new@example.com', 'password': 'é' * 36})
+    assert response.status_code == 201
@@ -11,6 +11,8 @@ from src.utils.validators import (
     validate_email,
     validate_dimensions,
     validate_budget,
+    validate_space_type,
+    validate_style,
     sanitize_input
 )
 
@@ -43,3 +45,33 @@ def test_sanitize_input():
     assert sanitize_input('  hello  ') == 'hello'
     assert sanitize_input({'key': '<value>'}) == {'key': '&lt;value&gt;'}
     assert sanitize_input(['<item>', 'safe']) == ['&lt;item&gt;', 'safe']
+
+def test_sanitize_input_returns_clean_input_unchanged():
+    """Test that clean input is returned without copies and dirty containers are copied."""
+    clean = {'rooms': [{'name': 'living room', 'size': 20}], 'style': 'modern'}
+    dirty = {'rooms': [{'name': '<b>den</b>'}], 'style': 'modern'}
+    
+    result = sanitize_input(dirty)
+    
+    assert sanitize_input(clean) is clean
+    assert result['style'] is dirty['style']
+    assert dirty['rooms'][0]['name'] == '<b>den</b>'
+
+def test_sanitize_input_limits():
+    """Test that deeply nested or oversized input is rejected."""
+    nested = 'x'
+    for _ in range(100):
+        nested = [nested]
+    
+    with pytest.raises(ValueError):
+        sanitize_input(nested)
+    with pytest.raises(ValueError):
+        sanitize_input(['a'] * 11, max_values=10)
+    assert sanitize_input(nested, max_depth=200)
+
+def test_validate_configured_values():
+    """Test style and space type validation against the settings file."""
+    assert validate_style('Mid-Century') is True
+    assert validate_style('baroque') is False
+    assert validate_space_type('Living Room') is True
+    assert validate_space_type(None) is False
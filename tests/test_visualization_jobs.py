@@ -0,0 +1,153 @@
+"""
+Tests for the background visualization job queue and its API.
+"""
+import pytest
+import sys
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.services.visualization_jobs import VisualizationBusyError, VisualizationJobs, design_key
+
+DESIGN = {
+    'space_type': 'living_room',
+    'dimensions': {'length': 14, 'width': 12, 'height': 9},
+    'items': [
+        {'id': 'sofa', 'name': 'Sofa', 'category': 'seating', 'dimensions': {'width': 7, 'depth': 3}},
+        {'id': 'table', 'name': 'Table', 'category': 'tables', 'dimensions': {'width': 4, 'depth': 2}},
+    ],
+}
+
+class GatedRender:
+    """Render stand-in that writes a file once released."""
+    
+    def __init__(self, fail=False):
+        self.release = threading.Event()
+        self.calls = 0
+        self.fail = fail
+    
+    def __call__(self, design, path):
+        self.calls += 1
+        self.release.wait(5)
+        if self.fail:
+            raise RuntimeError('render crashed')
+        with open(path, 'wb') as fh:
+            fh.write(b'png')
+        return path
+
+def _jobs(tmp_path, render, max_pending=32):
+    return VisualizationJobs(
+        str(tmp_path), render=render, max_pending=max_pending, executor=ThreadPoolExecutor(max_workers=2)
+    )
+
+def test_design_key_ignores_key_order():
+    """Test that equal designs hash alike regardless of key order."""
+    reordered = {'items': DESIGN['items'], 'dimensions': DESIGN['dimensions'], 'space_type': 'living_room'}
+    assert design_key(reordered) == design_key(DESIGN)
+    assert design_key(dict(DESIGN, space_type='office')) != design_key(DESIGN)
+
+def test_duplicate_submissions_are_coalesced_and_results_cached(tmp_path):
+    """Test that an in-flight design renders once and is then served from disk."""
+    render = GatedRender()
+    jobs = _jobs(tmp_path, render)
+    
+    first = jobs.submit(DESIGN)
+    second = jobs.submit(dict(DESIGN))
+    assert first['status'] == 'pending'
+    assert second['job_id'] == first['job_id']
+    
+    render.release.set()
+    jobs.shutdown()
+    assert jobs.get(first['job_id'])['status'] == 'done'
+    assert os.path.exists(jobs.result_path(first['key']))
+    
+    cached = jobs.submit(DESIGN)
+    assert cached['status'] == 'done' and cached['cached'] is True
+    assert render.calls == 1
+    assert jobs.stats()['coalesced'] == 1 and jobs.stats()['cached'] == 1
+
+def test_full_queue_fails_fast(tmp_path):
+    """Test that submissions beyond max_pending are rejected."""
+    render = GatedRender()
+    jobs = _jobs(tmp_path, render, max_pending=1)
+    jobs.submit(DESIGN)
+    
+    with pytest.raises(VisualizationBusyError):
+        jobs.submit(dict(DESIGN, space_type='office'))
+    
+    render.release.set()
+    jobs.shutdown()
+    assert jobs.stats()['rejected'] == 1
+
+def test_failed_render_is_reported(tmp_path):
+    """Test that a render error marks the job failed and frees its slot."""
+    render = GatedRender(fail=True)
+    render.release.set()
+    jobs = _jobs(tmp_path, render)
+    
+    job = jobs.submit(DESIGN)
+    jobs.shutdown()
+    
+    failed = jobs.get(job['job_id'])
+    assert failed['status'] == 'failed' and failed['error'] == 'render crashed'
+    assert jobs.stats()['pending'] == 0
+
+def test_floor_plan_renders_in_worker_process(tmp_path):
+    """Test the default renderer on a spawned worker process."""
+    pytest.importorskip('PIL')
+    jobs = VisualizationJobs(str(tmp_path), workers=1)
+    job = jobs.submit(DESIGN)
+    jobs.shutdown()
+    
+    assert jobs.get(job['job_id'])['status'] == 'done'
+    with open(jobs.result_path(job['key']), 'rb') as fh:
+        assert fh.read(8) == b'\x89PNG\r\n\x1a\n'
+
+def test_visualize_endpoint_queues_and_serves_result(tmp_path, monkeypatch):
+    """Test submitting a design, polling its job and fetching the image."""
+    from app import create_app
+    from src.api import dependencies
+    dependencies.get_inventory_service().add_items([
+        {'id': 'vis-sofa', 'name': 'Sofa', 'category': 'seating', 'style': 'modern', 'price': 100,
+         'dimensions': {'width': 7, 'depth': 3, 'height': 3}},
+    ])
+    render = GatedRender()
+    render.release.set()
+    jobs = _jobs(tmp_path, render)
+    monkeypatch.setattr(dependencies, '_visualization_jobs', jobs)
+    client = create_app().test_client()
+    
+    response = client.post('/api/design/visualize', json={'items': ['vis-sofa'], 'space_type': 'living_room'})
+    assert response.status_code == 202
+    job = response.get_json()
+    jobs.shutdown()
+    
+    status = client.get(job['status_url']).get_json()
+    assert status['status'] == 'done'
+    image = client.get(status['visualization_url'])
+    assert image.status_code == 200 and image.data == b'png'
+    
+    assert client.get('/api/design/visualize/missing').status_code == 404
+    unknown = client.post('/api/design/visualize', json={'items': ['vis-sofa', 'nope']})
+    assert unknown.status_code == 400 and unknown.get_json()['items'] == ['nope']
+    assert client.post('/api/design/visualize', json={'items': []}).status_code == 400
+
+def test_visualize_endpoint_reports_busy(tmp_path, monkeypatch):
+    """Test that a full queue answers 503 with Retry-After."""
+    from app import create_app
+    from src.api import dependencies
+    dependencies.get_inventory_service().add_item({'id': 'vis-lamp', 'category': 'lighting', 'price': 20})
+    render = GatedRender()
+    jobs = _jobs(tmp_path, render, max_pending=0)
+    monkeypatch.setattr(dependencies, '_visualization_jobs', jobs)
+    client = create_app().test_client()
+    
+    response = client.post('/api/design/visualize', json={'items': ['vis-lamp']})
+    
+    assert response.status_code == 503
+    assert response.get_json()['code'] == 'VISUALIZATION_BUSY'
+    assert response.headers['Retry-After']
+    render.release.set()
+    jobs.shutdown()